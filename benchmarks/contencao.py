@@ -0,0 +1,149 @@
+# contencao.py - BENCHMARK DE CONTENÇÃO LEITOR/ESCRITOR
+"""Mede quanto as gravações de salvar_cotacao atrasam as leituras do histórico.
+
+Compara o modo antigo (journal DELETE, synchronous FULL) com os perfis de
+armazenamento. Uso:
+
+    python -m benchmarks.contencao --segundos 5 --leitores 3
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from database.database import Database
+from database.storage import StorageProfile, PROFILES
+
+LEGACY = StorageProfile(
+    name="legacy",
+    description="journal DELETE + synchronous FULL (comportamento anterior)",
+    journal_mode="DELETE",
+    synchronous="FULL",
+    cache_size=-2000,
+    mmap_size=0,
+    temp_store="DEFAULT",
+)
+
+HISTORICO_SQL = """
+    SELECT c.id, c.data, c.fornecedor, c.valor_nf, t.nome, ct.valor_frete
+    FROM cotacoes c
+    LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
+    LEFT JOIN cotacoes_transportadoras ct ON c.id = ct.cotacao_id AND ct.selecionada = 1
+    WHERE c.data BETWEEN ? AND ?
+    ORDER BY c.data DESC, c.id DESC
+    LIMIT 200
+"""
+
+
+def popular(db, total):
+    """Cria uma base inicial para as leituras terem o que varrer"""
+    conn = db.get_connection()
+    try:
+        rnd = random.Random(42)
+        conn.executemany(
+            "INSERT INTO cotacoes (data, fornecedor, valor_nf, transportadora_ganhadora_id) VALUES (?, ?, ?, 1)",
+            ((f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+              f"Fornecedor {rnd.randint(1, 500)}", rnd.uniform(100, 50000)) for _ in range(total)),
+        )
+        conn.execute("""
+            INSERT INTO cotacoes_transportadoras (cotacao_id, transportadora_id, valor_frete, selecionada)
+            SELECT id, 1, valor_nf * 0.15, 1 FROM cotacoes
+        """)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def escritor(db, parar, tempos):
+    """Replica salvar_cotacao: uma transação e um commit por cotação"""
+    rnd = random.Random(7)
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        conn = db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO cotacoes (data, fornecedor, valor_nf, transportadora_ganhadora_id) VALUES (?, ?, ?, 1)",
+                ("2024-06-15", f"Fornecedor {rnd.randint(1, 500)}", rnd.uniform(100, 50000)),
+            )
+            cotacao_id = cursor.lastrowid
+            for transp_id in (1, 1, 1):
+                cursor.execute(
+                    "INSERT INTO cotacoes_transportadoras (cotacao_id, transportadora_id, valor_frete, selecionada) VALUES (?, ?, ?, ?)",
+                    (cotacao_id, transp_id, rnd.uniform(10, 900), transp_id == 1),
+                )
+            conn.commit()
+        finally:
+            conn.close()
+        tempos.append(time.perf_counter() - inicio)
+
+
+def leitor(db, parar, tempos):
+    """Replica aplicar_filtros do histórico"""
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        conn = db.get_connection()
+        try:
+            conn.execute(HISTORICO_SQL, ("2024-01-01", "2024-12-31")).fetchall()
+        finally:
+            conn.close()
+        tempos.append(time.perf_counter() - inicio)
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def medir(profile, segundos, leitores, linhas):
+    """Roda escritor e leitores em paralelo sobre um banco novo"""
+    with tempfile.TemporaryDirectory() as pasta:
+        db = Database(os.path.join(pasta, "bench.db"), profile, pool_size=leitores + 1)
+        popular(db, linhas)
+
+        parar = threading.Event()
+        tempos_escrita, tempos_leitura = [], []
+        threads = [threading.Thread(target=escritor, args=(db, parar, tempos_escrita))]
+        threads += [threading.Thread(target=leitor, args=(db, parar, tempos_leitura))
+                    for _ in range(leitores)]
+        for t in threads:
+            t.start()
+        time.sleep(segundos)
+        parar.set()
+        for t in threads:
+            t.join()
+        db.close()
+
+    return {
+        "perfil": profile.name,
+        "escritas_s": len(tempos_escrita) / segundos,
+        "leituras_s": len(tempos_leitura) / segundos,
+        "leitura_p50_ms": statistics.median(tempos_leitura) * 1000 if tempos_leitura else 0.0,
+        "leitura_p95_ms": percentil(tempos_leitura, 0.95) * 1000,
+        "leitura_max_ms": max(tempos_leitura, default=0.0) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de contenção leitor/escritor")
+    parser.add_argument("--segundos", type=float, default=5.0)
+    parser.add_argument("--leitores", type=int, default=3)
+    parser.add_argument("--linhas", type=int, default=20000)
+    args = parser.parse_args()
+
+    resultados = [medir(p, args.segundos, args.leitores, args.linhas)
+                  for p in (LEGACY, PROFILES["fast"], PROFILES["safe"])]
+
+    print(f"{'perfil':<10}{'escritas/s':>12}{'leituras/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'máx ms':>10}")
+    for r in resultados:
+        print(f"{r['perfil']:<10}{r['escritas_s']:>12.1f}{r['leituras_s']:>12.1f}"
+              f"{r['leitura_p50_ms']:>10.2f}{r['leitura_p95_ms']:>10.2f}{r['leitura_max_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
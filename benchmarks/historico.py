@@ -0,0 +1,155 @@
+# historico.py - BENCHMARK DAS PÁGINAS FILTRADAS DO HISTÓRICO
+"""Mede a latência das páginas do histórico com filtros de texto.
+
+Roda, direto no banco e sem Qt, o mesmo caminho do HistoricoModel: a
+primeira página de cada filtro (FiltroHistorico.primeira_pagina, que decide
+entre seguir a chave e materializar os ids pelo índice FTS) e as páginas
+seguintes (chave ou pagina_por_ids). Cenários:
+
+    sem_filtro            só o período
+    fornecedor_curto      termo de 2 letras (LIKE na coluna, sem FTS)
+    fornecedor_comum      "Ltda", presente em boa parte dos fornecedores
+    fornecedor_raro       nome completo do fornecedor com menos cotações
+    fornecedor_ausente    termo que não existe
+    transportadora_comum  "Transportes"
+    combinado             "Ltda" + "Cargas"
+
+Cada cenário roda nos últimos 30 e 365 dias dos bancos sintéticos do
+benchmark de inicialização (mesma pasta, reaproveitados). Mostra a mediana
+da primeira página e o p95 das seguintes, em ms, e termina com código 1 se
+algum valor passar do orçamento. Uso:
+
+    python -m benchmarks.historico --tamanhos 1000000
+    python -m benchmarks.historico --orcamento-pagina 5 --orcamento-primeira 100
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from benchmarks.inicializacao import _RAIZ, banco_sintetico
+from database.database import Database
+from database.filtros import FiltroHistorico
+
+TAMANHOS_PADRAO = (100_000, 1_000_000)
+PERIODOS = (30, 365)
+
+# Limites padrão (ms): as páginas seguintes são o que a rolagem sente; a
+# primeira paga uma vez por filtro a busca no índice FTS, que num nome raro
+# feito de palavras comuns lê listas de trigramas enormes (~100 ms com 1M)
+ORCAMENTO_PAGINA = 10
+ORCAMENTO_PRIMEIRA = 150
+
+TAMANHO_PAGINA = 200
+PAGINAS = 20
+
+
+def cenarios(conn):
+    """{nome: (fornecedor, transportadora)}"""
+    raro = conn.execute("""
+        SELECT fornecedor FROM cotacoes GROUP BY fornecedor ORDER BY COUNT(*), fornecedor LIMIT 1
+    """).fetchone()[0]
+    return {
+        "sem_filtro": ("", ""),
+        "fornecedor_curto": ("Lt", ""),
+        "fornecedor_comum": ("Ltda", ""),
+        "fornecedor_raro": (raro, ""),
+        "fornecedor_ausente": ("Inexistente", ""),
+        "transportadora_comum": ("", "Transportes"),
+        "combinado": ("Ltda", "Cargas"),
+    }
+
+
+def percorrer(conn, filtro):
+    """Tempos (ms) da primeira página e das seguintes, até PAGINAS páginas"""
+    chave = (filtro.dia_fim + 1, 0)
+    inicio = time.perf_counter()
+    linhas, ids = filtro.primeira_pagina(conn, chave, TAMANHO_PAGINA)
+    primeira = (time.perf_counter() - inicio) * 1000
+
+    query, params = filtro.consulta(paginada=True)
+    seguintes = []
+    for _ in range(PAGINAS - 1):
+        if ids == [] or (ids is None and len(linhas) < TAMANHO_PAGINA):
+            break
+        inicio = time.perf_counter()
+        if ids is not None:
+            linhas, ids = filtro.pagina_por_ids(conn, ids[:TAMANHO_PAGINA]), ids[TAMANHO_PAGINA:]
+        else:
+            ultima = linhas[-1]
+            chave = (ultima[-1], ultima[0])
+            linhas = conn.execute(query, (*params, *chave, TAMANHO_PAGINA)).fetchall()
+        seguintes.append((time.perf_counter() - inicio) * 1000)
+    return primeira, seguintes
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def medir(caminho, repeticoes):
+    """{(cenário, dias): (mediana da primeira, p95 das seguintes)}"""
+    db = Database(caminho)
+    resultados = {}
+    try:
+        with db.connection() as conn:
+            ultimo = conn.execute("SELECT MAX(data_dia) FROM cotacoes").fetchone()[0]
+            for nome, (fornecedor, transportadora) in cenarios(conn).items():
+                for dias in PERIODOS:
+                    filtro = FiltroHistorico(ultimo - dias + 1, ultimo, fornecedor, transportadora)
+                    primeiras, seguintes = [], []
+                    for _ in range(repeticoes):
+                        primeira, paginas = percorrer(conn, filtro)
+                        primeiras.append(primeira)
+                        seguintes.extend(paginas)
+                    resultados[(nome, dias)] = (statistics.median(primeiras), percentil(seguintes, 0.95))
+    finally:
+        db.close()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das páginas filtradas do histórico")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=list(TAMANHOS_PADRAO),
+                        help="Quantidade de cotações de cada banco sintético")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--pasta", default=os.path.join(_RAIZ, "data", "benchmarks"),
+                        help="Onde guardar os bancos sintéticos")
+    parser.add_argument("--orcamento-pagina", type=float, default=ORCAMENTO_PAGINA,
+                        help="Limite em ms do p95 das páginas seguintes")
+    parser.add_argument("--orcamento-primeira", type=float, default=ORCAMENTO_PRIMEIRA,
+                        help="Limite em ms da mediana da primeira página")
+    args = parser.parse_args()
+
+    os.makedirs(args.pasta, exist_ok=True)
+    estouros = []
+    for total in args.tamanhos:
+        caminho = banco_sintetico(args.pasta, total)
+        resultados = medir(caminho, args.repeticoes)
+
+        print(f"\n{f'{total} cotações':<24}" + "".join(f"{f'{d}d 1ª':>10}{f'{d}d p95':>10}" for d in PERIODOS))
+        for nome in dict.fromkeys(nome for nome, _dias in resultados):
+            print(f"{nome:<24}" + "".join(f"{resultados[(nome, d)][0]:>10.2f}{resultados[(nome, d)][1]:>10.2f}"
+                                          for d in PERIODOS))
+        for (nome, dias), (primeira, pagina) in resultados.items():
+            if primeira > args.orcamento_primeira:
+                estouros.append(f"{nome} ({dias}d, {total} cotações): 1ª página {primeira:.1f} ms "
+                                f"(orçamento {args.orcamento_primeira:g} ms)")
+            if pagina > args.orcamento_pagina:
+                estouros.append(f"{nome} ({dias}d, {total} cotações): p95 das páginas {pagina:.1f} ms "
+                                f"(orçamento {args.orcamento_pagina:g} ms)")
+
+    if estouros:
+        for estouro in estouros:
+            print(f"❌ {estouro}")
+        return 1
+    print("✅ Todas as páginas dentro do orçamento")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
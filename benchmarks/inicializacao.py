@@ -0,0 +1,230 @@
+# inicializacao.py - BENCHMARK DA ABERTURA DO SISTEMA
+"""Mede cada etapa da abertura da janela principal contra bancos sintéticos.
+
+Cada medição roda num processo Python novo (imports frios) com
+QT_QPA_PLATFORM=offscreen, então funciona sem tela. Etapas medidas:
+
+    imports           import main (PyQt5, banco, dashboard)
+    qapplication      QApplication()
+    banco             Database(): migrações pendentes e restauração de índices
+    dashboard         DashboardService.snapshot() com o cache frio
+    janela            MainWindow(db), que também carrega o dashboard
+    primeira_pintura  show() + processamento dos eventos de pintura
+    pagina_<nome>     primeira visita a cada página do menu
+    historico_dados   do clique no histórico até a primeira página da lista
+
+Os bancos (1k, 100k e 1M cotações por padrão) ficam em --pasta e são
+reaproveitados entre execuções. O resultado vai para um JSON (mediana das
+repetições, em ms) e o processo termina com código 1 se alguma etapa passar
+do orçamento. Uso:
+
+    python -m benchmarks.inicializacao --tamanhos 1000 100000 --saida inicio.json
+    python -m benchmarks.inicializacao --orcamento orcamento.json
+
+O arquivo de orçamento tem limites em ms por etapa, para todos os tamanhos
+ou por tamanho: {"janela": 300, "1000000": {"dashboard": 150}}.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+TAMANHOS_PADRAO = (1_000, 100_000, 1_000_000)
+
+# Limites padrão (ms), folgados para máquinas lentas de CI
+ORCAMENTO_PADRAO = {
+    "imports": 800,
+    "qapplication": 300,
+    "banco": 500,
+    "dashboard": 200,
+    "janela": 500,
+    "primeira_pintura": 300,
+    "pagina_transportadoras": 300,
+    "pagina_cotacao": 300,
+    "pagina_calculadora": 300,
+    "pagina_historico": 500,
+    "historico_dados": 500,
+}
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bancos de 3 anos terminando hoje, para o mês corrente ter dados
+_DIAS = 3 * 365
+
+
+def banco_sintetico(pasta, total):
+    """Caminho do banco com `total` cotações, gerando-o se ainda não existir
+
+    Gerado por database.gerador com a semente padrão: o mesmo tamanho gera
+    sempre o mesmo banco (as datas são relativas ao dia da geração).
+    """
+    from database.gerador import ConfiguracaoGerador, gerar
+
+    caminho = os.path.join(pasta, f"inicializacao_{total}.db")
+    if not os.path.exists(caminho):
+        print(f"🛠️ Gerando banco com {total} cotações em {caminho}...", flush=True)
+        config = ConfiguracaoGerador(cotacoes=total, inicio=date.today() - timedelta(days=_DIAS - 1),
+                                     dias=_DIAS)
+        resultado = gerar(caminho, config, log=None)
+        print(f"   pronto em {resultado.segundos:.1f}s", flush=True)
+    return caminho
+
+
+def medir_processo(caminho, espera_max=30.0):
+    """Executado no processo filho: mede as etapas e devolve {etapa: ms}"""
+    tempos = {}
+    marca = [time.perf_counter()]
+
+    def etapa(nome):
+        agora = time.perf_counter()
+        tempos[nome] = (agora - marca[0]) * 1000
+        marca[0] = agora
+
+    import main
+    etapa("imports")
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication([sys.argv[0]])
+    etapa("qapplication")
+
+    db = main.Database(caminho)
+    etapa("banco")
+
+    main.DashboardService(db).snapshot()
+    etapa("dashboard")
+
+    janela = main.MainWindow(db)
+    etapa("janela")
+
+    janela.show()
+    app.processEvents()
+    etapa("primeira_pintura")
+
+    # A lista do histórico chega em segundo plano pelo executor; o sinal
+    # carregado marca quando a primeira página ficou visível
+    dados = []
+    for nome in main.PAGINAS:
+        if nome == "historico":
+            aberta = time.perf_counter()
+        pagina = janela.pagina(nome)
+        if nome == "historico":
+            pagina.modelo_cotacoes.carregado.connect(lambda _total: dados.append(time.perf_counter()))
+        janela.stacked_widget.setCurrentWidget(pagina)
+        app.processEvents()
+        etapa(f"pagina_{nome}")
+
+    limite = time.perf_counter() + espera_max
+    while not dados and time.perf_counter() < limite:
+        app.processEvents()
+        time.sleep(0.001)
+    # Medido desde o clique no menu (inclui pagina_historico)
+    tempos["historico_dados"] = ((dados[0] if dados else limite) - aberta) * 1000
+
+    for pagina in janela.paginas.values():
+        executor = getattr(pagina, "executor", None)
+        if executor is not None:
+            executor.cancelar_todas()
+            executor.aguardar()
+    db.close()
+    return tempos
+
+
+def medir(caminho, repeticoes):
+    """Mediana de `repeticoes` aberturas, cada uma num processo novo"""
+    ambiente = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    ambiente["PYTHONPATH"] = os.pathsep.join(filter(None, [_RAIZ, os.environ.get("PYTHONPATH")]))
+    execucoes = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.inicializacao", "--filho", caminho],
+            cwd=os.path.dirname(caminho), env=ambiente, capture_output=True, text=True,
+        )
+        if saida.returncode != 0:
+            raise RuntimeError(f"Medição falhou ({caminho}):\n{saida.stderr[-2000:]}")
+        # Os módulos imprimem mensagens ao abrir; o JSON é a última linha
+        execucoes.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    return {etapa: round(statistics.median(e[etapa] for e in execucoes), 2) for etapa in execucoes[0]}
+
+
+def carregar_orcamento(caminho):
+    """Orçamento padrão com os limites do arquivo por cima"""
+    orcamento = {"*": dict(ORCAMENTO_PADRAO)}
+    if caminho:
+        with open(caminho, encoding="utf-8") as arquivo:
+            for chave, valor in json.load(arquivo).items():
+                if isinstance(valor, dict):
+                    orcamento.setdefault(str(chave), {}).update(valor)
+                else:
+                    orcamento["*"][chave] = valor
+    return orcamento
+
+
+def estouros(resultados, orcamento):
+    """[(tamanho, etapa, ms, limite)] das etapas acima do orçamento"""
+    encontrados = []
+    for tamanho, tempos in resultados.items():
+        limites = dict(orcamento["*"], **orcamento.get(tamanho, {}))
+        for etapa, ms in tempos.items():
+            limite = limites.get(etapa)
+            if limite is not None and ms > limite:
+                encontrados.append((tamanho, etapa, ms, limite))
+    return encontrados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da abertura da janela principal")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=list(TAMANHOS_PADRAO),
+                        help="Quantidade de cotações de cada banco sintético")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--pasta", default=os.path.join(_RAIZ, "data", "benchmarks"),
+                        help="Onde guardar os bancos sintéticos")
+    parser.add_argument("--saida", default="inicializacao.json", help="Arquivo JSON com os resultados")
+    parser.add_argument("--orcamento", help="JSON com limites em ms (ver docstring)")
+    parser.add_argument("--filho", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        print(json.dumps(medir_processo(args.filho)))
+        return 0
+
+    orcamento = carregar_orcamento(args.orcamento)
+    os.makedirs(args.pasta, exist_ok=True)
+
+    resultados = {}
+    for total in args.tamanhos:
+        caminho = banco_sintetico(args.pasta, total)
+        resultados[str(total)] = medir(caminho, args.repeticoes)
+
+    etapas = list(next(iter(resultados.values())))
+    print(f"{'etapa (ms)':<24}" + "".join(f"{tamanho:>12}" for tamanho in resultados))
+    for etapa in etapas:
+        print(f"{etapa:<24}" + "".join(f"{tempos[etapa]:>12.1f}" for tempos in resultados.values()))
+
+    acima = estouros(resultados, orcamento)
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump({
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "repeticoes": args.repeticoes,
+            "resultados": resultados,
+            "orcamento": orcamento,
+            "estouros": [{"tamanho": t, "etapa": e, "ms": ms, "limite": lim} for t, e, ms, lim in acima],
+        }, arquivo, indent=2, ensure_ascii=False)
+    print(f"📄 Resultados em {args.saida}")
+
+    if acima:
+        for tamanho, etapa, ms, limite in acima:
+            print(f"❌ {etapa} com {tamanho} cotações: {ms:.1f} ms (orçamento {limite} ms)")
+        return 1
+    print("✅ Todas as etapas dentro do orçamento")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
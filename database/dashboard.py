@@ -0,0 +1,137 @@
+# dashboard.py - INDICADORES DO DASHBOARD COM CACHE
+"""Calcula os indicadores da tela inicial e guarda o resultado em cache.
+
+Os indicadores saem de duas consultas agregadas (queries.DASHBOARD_RESUMO e
+queries.DASHBOARD_FRETES_VENCEDORES) mais a lista das cotações recentes. O
+resultado é um DashboardSnapshot imutável, reaproveitado enquanto o contador
+da tabela versao_dados (gatilhos da migração v004) e o mês corrente não
+mudarem.
+"""
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Optional, Tuple
+
+from database import queries
+from utils.datas import intervalo_mes
+
+# Economia estimada: 10% do valor total do mês
+FATOR_ECONOMIA = 0.10
+
+
+def _dia_mes(data):
+    """'AAAA-MM-DD[ HH:MM:SS]' -> 'DD/MM'"""
+    return f"{data[8:10]}/{data[5:7]}"
+
+
+@dataclass(frozen=True)
+class CotacaoRecente:
+    data: str
+    fornecedor: str
+    valor_nf: float
+    valor_frete: Optional[float]
+    transportadora: Optional[str]
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    total_cotacoes_mes: int = 0
+    total_transportadoras: int = 0
+    valor_total_mes: float = 0
+    maior_valor_nf: float = 0
+    ultima_cotacao_data: str = "Nenhuma"
+    transp_mais_usada: str = "Nenhuma"
+    taxa_media_frete: float = 0.0
+    cotacoes_recentes: Tuple[CotacaoRecente, ...] = ()
+    economia_estimada: float = 0
+    versao: int = field(default=-1, compare=False)
+
+    def como_dict(self):
+        """Formato de dicionário usado pela tela inicial"""
+        dados = asdict(self)
+        dados.pop("versao")
+        return dados
+
+
+class DashboardService:
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._chave = None
+        self.hits = 0
+        self.misses = 0
+
+    def snapshot(self):
+        """Retorna o snapshot atual, recalculando só se os dados mudaram"""
+        with self._lock:
+            with self.db.connection() as conn:
+                # A versão é lida antes das agregações: se alguém gravar no meio,
+                # a próxima chamada vê uma versão maior e recalcula
+                versao = self._versao(conn)
+                mes = intervalo_mes()
+                chave = (versao, mes)
+                if versao is not None and self._snapshot is not None and chave == self._chave:
+                    self.hits += 1
+                    return self._snapshot
+                self.misses += 1
+                self._snapshot = self._calcular(conn, mes, versao)
+                self._chave = chave
+                return self._snapshot
+
+    def invalidate(self):
+        """Força o recálculo na próxima chamada"""
+        with self._lock:
+            self._snapshot = None
+            self._chave = None
+
+    def _versao(self, conn):
+        try:
+            return conn.execute(queries.DASHBOARD_VERSAO_DADOS).fetchone()[0]
+        except Exception:
+            # Banco sem a migração v004 (perfil somente leitura de um banco
+            # antigo): sem contador, o cache não é usado
+            return None
+
+    def _calcular(self, conn, mes, versao):
+        cursor = conn.cursor()
+
+        cursor.execute(queries.DASHBOARD_RESUMO, mes)
+        total_transportadoras, total_mes, valor_total_mes, maior_valor_nf = cursor.fetchone()
+
+        cursor.execute(queries.DASHBOARD_FRETES_VENCEDORES)
+        transp_mais_usada = "Nenhuma"
+        maior_total = 0
+        soma_taxa = 0.0
+        qtd_taxa = 0
+        for nome, total, soma, qtd in cursor.fetchall():
+            if total > maior_total:
+                transp_mais_usada, maior_total = nome, total
+            soma_taxa += soma or 0
+            qtd_taxa += qtd or 0
+        taxa_media = round(soma_taxa / qtd_taxa, 1) if qtd_taxa else 0.0
+
+        cursor.execute(queries.DASHBOARD_COTACOES_RECENTES)
+        recentes = tuple(
+            CotacaoRecente(
+                data=_dia_mes(row[0]),
+                fornecedor=row[1],
+                valor_nf=row[2] or 0,
+                valor_frete=row[3],
+                transportadora=row[4],
+            )
+            for row in cursor.fetchall()
+        )
+
+        return DashboardSnapshot(
+            total_cotacoes_mes=total_mes or 0,
+            total_transportadoras=total_transportadoras or 0,
+            valor_total_mes=valor_total_mes or 0,
+            maior_valor_nf=maior_valor_nf or 0,
+            # A lista de recentes já vem ordenada por data: a primeira é a última cotação
+            ultima_cotacao_data=recentes[0].data if recentes else "Nenhuma",
+            transp_mais_usada=transp_mais_usada,
+            taxa_media_frete=taxa_media,
+            cotacoes_recentes=recentes,
+            economia_estimada=(valor_total_mes or 0) * FATOR_ECONOMIA,
+            versao=versao if versao is not None else -1,
+        )
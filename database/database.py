@@ -1,103 +1,67 @@
-import sqlite3
 import os
 from datetime import datetime
+from database.importador import restaurar_indices
+from database.migrator import Migrator
+from database.pool import ConnectionPool
+from database.storage import resolve_settings
 
 class Database:
-    def __init__(self):
-        self.db_path = "data/transportadora.db"
+    def __init__(self, db_path=None, profile=None, pool_size=5):
+        self.db_path, self.profile = resolve_settings(db_path, profile)
         self._create_database()
-        self._create_tables()
+        self.pool = self._create_pool(pool_size)
+        if not self.profile.read_only:
+            self._create_tables()
     
     def _create_database(self):
-        """Cria a pasta data se não existir"""
-        os.makedirs("data", exist_ok=True)
+        """Cria a pasta do banco se não existir"""
+        if self.profile.read_only:
+            if not os.path.exists(self.db_path):
+                raise FileNotFoundError(f"Banco não encontrado para leitura: {self.db_path}")
+            return
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+    
+    def _create_pool(self, pool_size):
+        """Cria o pool; no perfil somente leitura o arquivo é aberto com mode=ro"""
+        if self.profile.read_only:
+            # urllib.request puxa http/email (~30ms): só no perfil somente leitura
+            from urllib.request import pathname2url
+            uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+            return ConnectionPool(uri, max_size=pool_size, uri=True,
+                                  setup=self._configure_connection)
+        return ConnectionPool(self.db_path, max_size=pool_size,
+                              setup=self._configure_connection)
     
     def _create_tables(self):
-        """Cria todas as tabelas do sistema"""
+        """Cria/atualiza o schema aplicando as migrações pendentes"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
         try:
-            # Tabela de transportadoras
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS transportadoras (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nome TEXT NOT NULL,
-                    cnpj TEXT UNIQUE,
-                    percentual_base REAL DEFAULT 0,
-                    icms REAL DEFAULT 0,
-                    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Tabela de cotações
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cotacoes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    data TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    fornecedor TEXT NOT NULL,
-                    num_pedido TEXT,
-                    valor_nf REAL NOT NULL,
-                    peso REAL,
-                    volume INTEGER,
-                    cubagem REAL,
-                    transportadora_ganhadora_id INTEGER,
-                    FOREIGN KEY (transportadora_ganhadora_id) REFERENCES transportadoras (id)
-                )
-            ''')
-            
-            # Tabela de cotações por transportadora
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cotacoes_transportadoras (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cotacao_id INTEGER NOT NULL,
-                    transportadora_id INTEGER NOT NULL,
-                    valor_frete REAL NOT NULL,
-                    selecionada BOOLEAN DEFAULT FALSE,
-                    FOREIGN KEY (cotacao_id) REFERENCES cotacoes (id),
-                    FOREIGN KEY (transportadora_id) REFERENCES transportadoras (id)
-                )
-            ''')
-            
-            # Tabela de cálculos de cubagem
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS calculos_cubagem (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    data TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    itens_json TEXT NOT NULL,
-                    cubagem_total REAL NOT NULL
-                )
-            ''')
-            
-            # Tabela de contatos das transportadoras
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS transportadora_contatos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    transportadora_id INTEGER NOT NULL,
-                    tipo TEXT NOT NULL,  -- 'telefone' ou 'email'
-                    valor TEXT NOT NULL,
-                    contato TEXT,        -- nome do contato (opcional)
-                    FOREIGN KEY (transportadora_id) REFERENCES transportadoras (id)
-                )
-            ''')
-            
-            # Insere a Rodocargas como transportadora padrão
-            cursor.execute('''
-                INSERT OR IGNORE INTO transportadoras 
-                (nome, cnpj, percentual_base, icms) 
-                VALUES (?, ?, ?, ?)
-            ''', ('Rodocargas', '00.000.000/0000-00', 14.0, 7.0))
-            
-            conn.commit()
-            
+            Migrator(conn).migrate()
+            # Importação em lote interrompida com os índices removidos
+            restaurar_indices(conn, log=print)
         except Exception as e:
-            print(f"Erro ao criar tabelas: {e}")
-            conn.rollback()
+            print(f"Erro ao aplicar migrações: {e}")
         finally:
             conn.close()
     
+    def _configure_connection(self, conn):
+        """Aplica os PRAGMAs do perfil uma única vez por conexão física do pool"""
+        for pragma in self.profile.pragmas():
+            conn.execute(pragma)
+    
     def get_connection(self):
-        """Retorna uma conexão com o banco com timeout aumentado"""
-        conn = sqlite3.connect(self.db_path, timeout=20)
-        conn.execute("PRAGMA busy_timeout = 30000")  # 30 segundos de timeout
-        return conn
\ No newline at end of file
+        """Retorna uma conexão do pool; conn.close() a devolve ao pool"""
+        return self.pool.acquire()
+    
+    def connection(self):
+        """Context manager que empresta e devolve uma conexão do pool"""
+        return self.pool.connection()
+    
+    def pool_stats(self):
+        """Estatísticas de uso do pool (checkouts, esperas, conexões abertas)"""
+        return self.pool.stats()
+    
+    def close(self):
+        """Fecha todas as conexões do pool"""
+        self.pool.close()
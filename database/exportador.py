@@ -0,0 +1,359 @@
+# exportador.py - EXPORTAÇÃO EM STREAMING DE CONSULTAS
+"""Grava o resultado de uma consulta em arquivo sem montar tudo em memória.
+
+O cursor é lido em blocos (fetchmany) e cada bloco vai direto para o
+arquivo; a planilha usa o modo write_only do openpyxl, que escreve as
+linhas num arquivo temporário em vez de manter o modelo de células. O pico
+de memória fica no tamanho de um bloco, qualquer que seja o número de
+linhas. O arquivo é gerado com outro nome e só substitui o destino no fim,
+então uma exportação cancelada não deixa planilha pela metade.
+
+Para análise (BI) há também CSV, Parquet e Arrow IPC com as colunas de
+queries.HISTORICO_COLUNAS_ANALITICAS e tipos preservados: data como date32,
+dinheiro como decimal128(14, 2) exato ao centavo e ids como int64. O Parquet
+é gravado em row groups de TAMANHO_GRUPO linhas com zstd; o Arrow em lotes
+do mesmo tamanho, também com zstd. Parquet/Arrow precisam do pyarrow
+(opcional, importado só quando usado).
+
+Linha de comando, com os mesmos filtros da tela do histórico:
+
+    python -m database.exportador --db cotacoes.db --formato parquet \\
+        --inicio 2024-01-01 --fim 2024-12-31 cotacoes_2024.parquet
+"""
+import argparse
+import csv
+import math
+import os
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+
+from database import queries
+from utils.datas import data_de_dia_epoch, dia_epoch
+
+TAMANHO_BLOCO = 5000
+# Linhas por row group (Parquet) / record batch (Arrow)
+TAMANHO_GRUPO = 65536
+
+# Tipo de cada coluna de HISTORICO_COLUNAS_ANALITICAS; colunas fora daqui
+# têm o tipo inferido pelo pyarrow
+TIPOS_ANALITICOS = {
+    "id": "inteiro",
+    "data": "dia",
+    "fornecedor": "texto",
+    "num_pedido": "texto",
+    "valor_nf": "dinheiro",
+    "peso": "real",
+    "volume": "inteiro",
+    "cubagem": "real",
+    "transportadora_id": "inteiro",
+    "transportadora": "texto",
+    "valor_frete": "dinheiro",
+    "percentual_frete": "real",
+}
+
+
+class ErroExportacao(Exception):
+    """Formato desconhecido ou dependência ausente"""
+
+
+def _linhas_em_blocos(cursor, tamanho_bloco):
+    while True:
+        bloco = cursor.fetchmany(tamanho_bloco)
+        if not bloco:
+            return
+        yield bloco
+
+
+def exportar_xlsx(conn, query, params, caminho, progresso=None, total=0,
+                  titulo="Cotações", tamanho_bloco=TAMANHO_BLOCO):
+    """Exporta a consulta para .xlsx; retorna o número de linhas gravadas
+
+    progresso(atual, total) é chamado a cada bloco; total 0 = desconhecido.
+    Uma exceção levantada por progresso (cancelamento) descarta o arquivo.
+    """
+    from openpyxl import Workbook
+
+    cursor = conn.execute(query, params)
+    cabecalho = [coluna[0] for coluna in cursor.description]
+
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet(title=titulo)
+    planilha.append(cabecalho)
+
+    gravadas = 0
+    temporario = f"{caminho}.parcial"
+    try:
+        for bloco in _linhas_em_blocos(cursor, tamanho_bloco):
+            for linha in bloco:
+                planilha.append(linha)
+            gravadas += len(bloco)
+            if progresso:
+                progresso(gravadas, max(total, gravadas))
+        livro.save(temporario)
+        os.replace(temporario, caminho)
+    except BaseException:
+        # Fecha o XML pendente; o openpyxl apaga os temporários ao sair
+        if not planilha.closed:
+            planilha.close()
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    finally:
+        cursor.close()
+    return gravadas
+
+
+def exportar_csv(conn, query, params, caminho, progresso=None, total=0,
+                 tamanho_bloco=TAMANHO_BLOCO):
+    """Exporta a consulta para CSV (UTF-8, vírgula, ponto decimal)
+
+    Datas (dia epoch) saem em ISO e dinheiro com duas casas, no formato que
+    pandas, Power BI e bancos de dados leem sem configuração regional.
+    """
+    cursor = conn.execute(query, params)
+    colunas = [coluna[0] for coluna in cursor.description]
+    tipos = [TIPOS_ANALITICOS.get(coluna) for coluna in colunas]
+    conversores = [_CONVERSORES_CSV.get(tipo) for tipo in tipos]
+    if not any(conversores):
+        conversores = None
+
+    gravadas = 0
+    temporario = f"{caminho}.parcial"
+    try:
+        with open(temporario, "w", newline="", encoding="utf-8") as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(colunas)
+            for bloco in _linhas_em_blocos(cursor, tamanho_bloco):
+                if conversores:
+                    bloco = [[valor if conversor is None or valor is None else conversor(valor)
+                              for conversor, valor in zip(conversores, linha)]
+                             for linha in bloco]
+                escritor.writerows(bloco)
+                gravadas += len(bloco)
+                if progresso:
+                    progresso(gravadas, max(total, gravadas))
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    finally:
+        cursor.close()
+    return gravadas
+
+
+@lru_cache(maxsize=None)
+def _dia_iso(dia):
+    # Poucos dias distintos por exportação: converte cada um uma vez
+    return data_de_dia_epoch(dia).isoformat()
+
+
+def _dinheiro_csv(valor):
+    # Mesmo arredondamento do Parquet/Arrow (centavo, meio para cima)
+    return f"{math.floor(round(valor * 100.0, 6) + 0.5) / 100.0:.2f}"
+
+
+_CONVERSORES_CSV = {
+    "dia": _dia_iso,
+    "dinheiro": _dinheiro_csv,
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ErroExportacao("Exportar Parquet/Arrow requer o pacote pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+def _coluna_arrow(pa, valores, tipo):
+    """Lista de valores do SQLite -> array do pyarrow no tipo da coluna"""
+    import numpy as np
+    import pyarrow.compute as pc
+
+    if tipo == "dia":
+        return pa.array(valores, type=pa.int32()).cast(pa.date32())
+    if tipo == "dinheiro":
+        # float -> centavos inteiros (meio para cima, como pricing) -> decimal;
+        # o cast direto de float para decimal trunca 1.005 em 1.00
+        reais = np.array(valores, dtype=np.float64)
+        nulos = np.isnan(reais)
+        centavos = np.floor(np.round(reais * 100.0, 6) + 0.5)
+        inteiros = pa.array(centavos, mask=nulos).cast(pa.int64()).cast(pa.decimal128(19, 0))
+        return pc.multiply(inteiros, pa.scalar(Decimal("0.01"), pa.decimal128(3, 2))).cast(pa.decimal128(14, 2))
+    if tipo == "inteiro":
+        return pa.array(valores, type=pa.int64())
+    if tipo == "real":
+        return pa.array(valores, type=pa.float64())
+    if tipo == "texto":
+        return pa.array(valores, type=pa.string())
+    return pa.array(valores)
+
+
+def _lotes_arrow(pa, cursor, tamanho_bloco, progresso, total):
+    """(esquema, gerador de RecordBatch) para o resultado do cursor"""
+    colunas = [coluna[0] for coluna in cursor.description]
+    tipos = [TIPOS_ANALITICOS.get(coluna) for coluna in colunas]
+
+    primeiro = cursor.fetchmany(tamanho_bloco)
+    lote = _lote_arrow(pa, colunas, tipos, primeiro)
+    esquema = lote.schema
+
+    def lotes():
+        gravadas = 0
+        bloco, atual = primeiro, lote
+        while bloco:
+            yield atual
+            gravadas += len(bloco)
+            if progresso:
+                progresso(gravadas, max(total, gravadas))
+            bloco = cursor.fetchmany(tamanho_bloco)
+            if bloco:
+                atual = _lote_arrow(pa, colunas, tipos, bloco, esquema)
+
+    return esquema, lotes()
+
+
+def _lote_arrow(pa, colunas, tipos, bloco, esquema=None):
+    valores = list(zip(*bloco)) if bloco else [[] for _ in colunas]
+    arrays = [_coluna_arrow(pa, list(coluna), tipo) for coluna, tipo in zip(valores, tipos)]
+    if esquema is not None:
+        # Colunas de tipo inferido seguem o tipo do primeiro lote
+        arrays = [array if array.type == campo.type else array.cast(campo.type)
+                  for array, campo in zip(arrays, esquema)]
+        return pa.RecordBatch.from_arrays(arrays, schema=esquema)
+    return pa.RecordBatch.from_arrays(arrays, names=colunas)
+
+
+def exportar_parquet(conn, query, params, caminho, progresso=None, total=0,
+                     tamanho_bloco=TAMANHO_GRUPO):
+    """Exporta a consulta para Parquet (zstd, um row group por bloco)"""
+    pa = _pyarrow()
+    import pyarrow.parquet as pq
+
+    def abrir(destino, esquema):
+        # Dicionário para colunas repetitivas (texto, datas, ids de
+        # transportadora); o id da cotação cresce dentro de cada dia e
+        # comprime melhor por diferença; valores monetários ficam no zstd
+        dicionario = [coluna for coluna in esquema.names if coluna != "id"
+                      and TIPOS_ANALITICOS.get(coluna) in ("texto", "dia", "inteiro")]
+        codificacao = {"id": "DELTA_BINARY_PACKED"} if "id" in esquema.names else None
+        return pq.ParquetWriter(destino, esquema, compression="zstd", use_dictionary=dicionario,
+                                column_encoding=codificacao)
+
+    return _exportar_arrow(pa, conn, query, params, caminho, progresso, total, tamanho_bloco, abrir)
+
+
+def exportar_arrow(conn, query, params, caminho, progresso=None, total=0,
+                   tamanho_bloco=TAMANHO_GRUPO):
+    """Exporta a consulta para Arrow IPC (formato de arquivo / Feather v2, zstd)"""
+    pa = _pyarrow()
+
+    def abrir(destino, esquema):
+        opcoes = pa.ipc.IpcWriteOptions(compression="zstd")
+        return pa.ipc.new_file(destino, esquema, options=opcoes)
+
+    return _exportar_arrow(pa, conn, query, params, caminho, progresso, total, tamanho_bloco, abrir)
+
+
+def _exportar_arrow(pa, conn, query, params, caminho, progresso, total, tamanho_bloco, abrir):
+    cursor = conn.execute(query, params)
+    gravadas = 0
+    temporario = f"{caminho}.parcial"
+    try:
+        esquema, lotes = _lotes_arrow(pa, cursor, tamanho_bloco, progresso, total)
+        with abrir(temporario, esquema) as escritor:
+            for lote in lotes:
+                escritor.write_batch(lote)
+                gravadas += lote.num_rows
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    finally:
+        cursor.close()
+    return gravadas
+
+
+# formato: (função, colunas da consulta, extensão)
+FORMATOS = {
+    "xlsx": (exportar_xlsx, queries.HISTORICO_COLUNAS_EXPORTACAO, ".xlsx"),
+    "csv": (exportar_csv, queries.HISTORICO_COLUNAS_ANALITICAS, ".csv"),
+    "parquet": (exportar_parquet, queries.HISTORICO_COLUNAS_ANALITICAS, ".parquet"),
+    "arrow": (exportar_arrow, queries.HISTORICO_COLUNAS_ANALITICAS, ".arrow"),
+}
+
+
+def exportar_historico(conn, filtro, formato, caminho, progresso=None):
+    """Exporta as cotações de um FiltroHistorico (database.filtros)
+
+    Retorna o número de linhas gravadas.
+    """
+    if formato not in FORMATOS:
+        raise ErroExportacao(f"Formato desconhecido: {formato} (use {', '.join(FORMATOS)})")
+    funcao, colunas, _extensao = FORMATOS[formato]
+    query, params = filtro.consulta(colunas)
+    return funcao(conn, query, params, caminho, progresso=progresso, total=filtro.estimar_total(conn))
+
+
+def main():
+    from database.database import Database
+    from database.filtros import FiltroHistorico
+
+    parser = argparse.ArgumentParser(description="Exporta o histórico de cotações")
+    parser.add_argument("saida", help="Arquivo de destino")
+    parser.add_argument("--db", dest="db_path", help="Caminho do banco SQLite")
+    parser.add_argument("--formato", choices=list(FORMATOS),
+                        help="Padrão: pela extensão do arquivo de destino")
+    parser.add_argument("--inicio", type=date.fromisoformat, default=date(1970, 1, 1), help="AAAA-MM-DD")
+    parser.add_argument("--fim", type=date.fromisoformat, default=date(9999, 12, 31), help="AAAA-MM-DD")
+    parser.add_argument("--fornecedor", default="", help="Trecho do nome do fornecedor")
+    parser.add_argument("--transportadora", default="", help="Trecho do nome da transportadora ganhadora")
+    parser.add_argument("--busca", default="", help="Busca geral (fornecedor, pedido, transportadora)")
+    args = parser.parse_args()
+
+    formato = args.formato
+    if formato is None:
+        extensao = os.path.splitext(args.saida)[1].lower()
+        formato = next((nome for nome, (_f, _c, ext) in FORMATOS.items() if ext == extensao), None)
+        if formato is None:
+            print(f"❌ Extensão desconhecida: {extensao or args.saida}; informe --formato")
+            return 1
+
+    if args.busca and len(args.busca) < queries.BUSCA_MINIMO_CARACTERES:
+        print(f"❌ A busca geral precisa de pelo menos {queries.BUSCA_MINIMO_CARACTERES} caracteres")
+        return 1
+
+    filtro = FiltroHistorico(dia_epoch(args.inicio), dia_epoch(args.fim), args.fornecedor,
+                             args.transportadora, args.busca)
+
+    # Somente leitura: pode rodar com o sistema aberto gravando cotações
+    db = Database(args.db_path, profile="analytics")
+    conn = db.get_connection()
+    try:
+        def progresso(atual, total):
+            print(f"\r   {atual}/{total} linhas", end="", flush=True)
+
+        inicio = time.perf_counter()
+        try:
+            gravadas = exportar_historico(conn, filtro, formato, args.saida, progresso)
+        except ErroExportacao as e:
+            print(f"❌ {e}")
+            return 1
+        print()
+        tamanho = os.path.getsize(args.saida) / 1024 / 1024
+        print(f"✅ {gravadas} cotações exportadas para {args.saida} ({tamanho:.1f} MB) "
+              f"em {time.perf_counter() - inicio:.2f}s")
+    finally:
+        conn.close()
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+# filtros.py - FILTROS DO HISTÓRICO SEM INTERFACE
+"""Filtro do histórico (período, fornecedor, transportadora, busca geral).
+
+Fica fora de gui/ para que a tela e a linha de comando (exportador) montem
+exatamente a mesma consulta sem depender do Qt.
+"""
+import json
+from dataclasses import dataclass
+
+from database import queries
+
+# Posições em queries.HISTORICO_COLUNAS usadas por FiltroHistorico.aceita
+_FORNECEDOR, _TRANSPORTADORA = 2, 7
+
+
+# Paginação com filtro de texto (FiltroHistorico.primeira_pagina): percorrer
+# o índice de data testando a coluna custa por linha lida, então serve quando
+# o período cabe em LINHAS_VARREDURA ou quando o termo é comum (uma
+# ocorrência a cada LINHAS_POR_OCORRENCIA cotações enche a página em poucos
+# milhares de linhas). Termo raro em período grande vai pelo índice FTS, com
+# os ids do resultado materializados uma vez
+LINHAS_VARREDURA = 25_000
+LINHAS_POR_OCORRENCIA = 100
+
+
+# LIKE do SQLite ignora maiúsculas/minúsculas só no ASCII
+_ASCII_MINUSCULO = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def _contem(valor, trecho):
+    """Equivalente em Python a valor LIKE '%trecho%'"""
+    if not trecho:
+        return True
+    if valor is None:
+        return False
+    return trecho.translate(_ASCII_MINUSCULO) in valor.translate(_ASCII_MINUSCULO)
+
+
+@dataclass(frozen=True)
+class FiltroHistorico:
+    dia_inicio: int
+    dia_fim: int
+    fornecedor: str = ""
+    transportadora: str = ""
+    busca: str = ""
+
+    @property
+    def paginado(self):
+        """A busca geral é ranqueada e não pagina por (data_dia, id)"""
+        return not self.busca
+
+    def consulta(self, colunas=queries.HISTORICO_COLUNAS, paginada=False, limite=None):
+        """SQL e parâmetros de queries.historico_query para este filtro
+
+        Na busca geral devolve queries.busca_query; limite corta o ranking
+        (a exportação passa None e leva todas as ocorrências).
+        """
+        if self.busca:
+            params = [queries.termo_busca(self.busca)]
+            if limite is not None:
+                params.append(limite)
+            return queries.busca_query(colunas, limitada=limite is not None), params
+
+        params = [self.dia_inicio]
+        if not paginada:
+            params.append(self.dia_fim)
+        params.extend(self._padroes())
+        if paginada:
+            # Página a página o FTS refaria a busca inteira a cada chave: a
+            # paginação por chave filtra a coluna e os termos seletivos vão
+            # por primeira_pagina/pagina_por_ids
+            modos = bool(self.fornecedor), bool(self.transportadora)
+        else:
+            modos = self._modo(self.fornecedor), self._modo(self.transportadora)
+        return queries.historico_query(colunas, *modos, paginada), params
+
+    def primeira_pagina(self, conn, chave, tamanho):
+        """Primeira página depois da chave (data_dia, id) e como seguir
+
+        Com período grande (ver LINHAS_VARREDURA), busca no índice FTS as
+        ocorrências de cada filtro de texto. Se algum termo for raro,
+        materializa uma vez os ids de todo o resultado e devolve (linhas, ids
+        restantes) para as próximas páginas irem por pagina_por_ids; senão
+        devolve (linhas, None) e as próximas seguem a chave com
+        consulta(paginada=True).
+        """
+        candidatos = self._candidatos(conn)
+        if candidatos is None:
+            query, params = self.consulta(paginada=True)
+            return conn.execute(query, (*params, *chave, tamanho)).fetchall(), None
+
+        query = queries.historico_ids_query(bool(self.fornecedor), bool(self.transportadora))
+        params = (candidatos, self.dia_inicio, *self._padroes(), *chave)
+        ids = [linha[0] for linha in conn.execute(query, params)]
+        return self.pagina_por_ids(conn, ids[:tamanho]), ids[tamanho:]
+
+    @staticmethod
+    def pagina_por_ids(conn, ids):
+        """Linhas das cotações materializadas por primeira_pagina, na ordem da lista"""
+        return conn.execute(queries.HISTORICO_PAGINA_IDS, (json.dumps(ids),)).fetchall()
+
+    def _candidatos(self, conn):
+        """Ids (lista JSON) que podem passar nos filtros de texto, ou None para seguir a chave
+
+        O MATCH do trigram ignora maiúsculas também fora do ASCII, então
+        devolve tudo o que o LIKE aceitaria e talvez mais; o LIKE de
+        historico_ids_query decide. Termos com curingas ficam de fora (o
+        MATCH não os interpreta) e seguem pela chave.
+        """
+        termos = [(campo, termo)
+                  for campo, termo in (("fornecedor", self.fornecedor), ("transportadora", self.transportadora))
+                  if self._modo(termo) == queries.FILTRO_FTS and not any(c in termo for c in "%_\\")]
+        if not termos or self.estimar_total(conn) <= LINHAS_VARREDURA:
+            return None
+
+        limite = conn.execute(queries.COTACOES_MAIOR_ID).fetchone()[0] // LINHAS_POR_OCORRENCIA
+        candidatos = None
+        for campo, termo in termos:
+            total, ids = conn.execute(queries.BUSCA_CANDIDATOS,
+                                      (queries.termo_coluna(campo, termo), limite)).fetchone()
+            if total >= limite:
+                continue
+            if candidatos is None:
+                candidatos = ids
+            else:
+                candidatos = json.dumps(sorted(set(json.loads(candidatos)) & set(json.loads(ids))))
+        return candidatos
+
+    def _padroes(self):
+        return [f"%{termo}%" for termo in (self.fornecedor, self.transportadora) if termo]
+
+    def estimar_total(self, conn):
+        """Total de linhas para barras de progresso (0 = desconhecido)"""
+        if self.busca:
+            return 0
+        return conn.execute(queries.HISTORICO_TOTAL_PERIODO, (self.dia_inicio, self.dia_fim)).fetchone()[0]
+
+    @staticmethod
+    def _modo(termo):
+        if not termo:
+            return False
+        if len(termo) >= queries.BUSCA_MINIMO_CARACTERES:
+            return queries.FILTRO_FTS
+        return True
+
+    def restringe(self, anterior):
+        """True se todo resultado deste filtro também está no resultado do anterior"""
+        if anterior is None or (self.dia_inicio, self.dia_fim) != (anterior.dia_inicio, anterior.dia_fim):
+            return False
+        # O ranking da busca geral é cortado no limite: sempre reconsulta
+        if self.busca or anterior.busca:
+            return False
+        for novo, velho in ((self.fornecedor, anterior.fornecedor),
+                            (self.transportadora, anterior.transportadora)):
+            # % e _ digitados são curingas no LIKE; nesses casos vale a consulta
+            if any(c in novo for c in "%_\\"):
+                return False
+            if not _contem(novo, velho):
+                return False
+        return True
+
+    def aceita(self, cotacao):
+        """Aplica os filtros de texto a uma linha já carregada"""
+        return (_contem(cotacao[_FORNECEDOR], self.fornecedor)
+                and _contem(cotacao[_TRANSPORTADORA], self.transportadora))
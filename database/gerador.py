@@ -0,0 +1,478 @@
+# gerador.py - BANCOS SINTÉTICOS PARA TESTES DE CARGA
+"""Gera bancos com cara de produção para medir escala.
+
+Tudo sai de uma semente (NumPy PCG64): a mesma configuração gera sempre o
+mesmo banco, bloco a bloco, independentemente de quantos blocos já foram
+gravados. O que o gerador imita:
+
+- fornecedores com distribuição Zipf (poucos concentram a maioria das NFs);
+- 20 a 200 transportadoras com popularidade desigual e tarifas próprias,
+  além da Rodocargas com a regra automática do motor de preços;
+- 3 a 15 fretes por cotação, o menor é o selecionado e define a ganhadora;
+- volume sazonal: pico de fim de ano, fins de semana fracos e crescimento
+  ao longo do período; ids crescem com a data, como no uso real;
+- cálculos de cubagem com 1 a 20 itens, como a calculadora grava (cm).
+
+O schema é o das migrações (Migrator). Durante a carga os índices e
+gatilhos de cotacoes/cotacoes_transportadoras ficam removidos; no fim os
+índices são recriados, a busca FTS e os resumos do dashboard são
+preenchidos com as mesmas cargas das migrações v005/v006 e os gatilhos
+voltam. O arquivo é gerado com outro nome e só aparece no destino pronto.
+
+    python -m database.gerador dados/carga_10m.db --cotacoes 10000000 --transportadoras 120
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from database import queries
+from database.migrations import v005_resumos_dashboard, v006_busca_fts
+from database.migrator import Migrator
+from pricing.lote import TarifaLote, centavos
+from pricing.motor import ICMS_PADRAO, PERCENTUAL_BASE_PADRAO
+from utils.datas import data_de_dia_epoch, dia_epoch
+
+TAMANHO_BLOCO = 20_000
+
+# Tabelas cujos índices e gatilhos são removidos durante a carga
+TABELAS_CARGA = ("cotacoes", "cotacoes_transportadoras")
+
+_SOBRENOMES = (
+    "Silva", "Souza", "Oliveira", "Santos", "Pereira", "Costa", "Rodrigues", "Almeida",
+    "Nascimento", "Lima", "Araújo", "Fernandes", "Carvalho", "Gomes", "Martins", "Rocha",
+    "Ribeiro", "Alves", "Monteiro", "Mendes", "Barros", "Freitas", "Barbosa", "Pinto",
+    "Moura", "Cavalcanti", "Dias", "Castro", "Campos", "Cardoso",
+)
+_RAMOS = (
+    "Comercial", "Distribuidora", "Indústria", "Atacadista", "Metalúrgica", "Têxtil",
+    "Alimentos", "Papelaria", "Autopeças", "Eletro", "Farma", "Agro",
+)
+_PREFIXOS_TRANSPORTADORA = ("Transportes", "Expresso", "Logística", "Rodoviário", "Cargas", "TransLog")
+_SUFIXOS = ("Ltda", "S.A.", "EIRELI", "ME")
+
+# Faixas de um banco parecido com o de produção
+FAIXA_TRANSPORTADORAS = (20, 200)
+FAIXA_FRETES = (3, 15)
+
+# Fluxos independentes derivados da semente
+_FLUXO_CADASTROS, _FLUXO_DIAS, _FLUXO_COTACOES, _FLUXO_CUBAGEM = range(4)
+
+
+@dataclass(frozen=True)
+class ConfiguracaoGerador:
+    cotacoes: int = 100_000
+    # Inclui a Rodocargas criada pela migração v001
+    transportadoras: int = 50
+    fornecedores: int = 5_000
+    fretes_min: int = 3
+    fretes_max: int = 15
+    # None: um cálculo de cubagem a cada 10 cotações
+    calculos_cubagem: int = None
+    inicio: date = date(2023, 1, 1)
+    dias: int = 3 * 365
+    # Expoente da distribuição Zipf dos fornecedores (maior = mais concentrado)
+    concentracao_fornecedores: float = 1.3
+    semente: int = 42
+
+    def validar(self):
+        if self.cotacoes < 0 or self.dias < 1:
+            raise ValueError("cotacoes deve ser >= 0 e dias >= 1")
+        minimo, maximo = FAIXA_TRANSPORTADORAS
+        if not minimo <= self.transportadoras <= maximo:
+            raise ValueError(f"transportadoras deve ficar entre {minimo} e {maximo}")
+        if self.fornecedores < 1:
+            raise ValueError("É preciso ao menos um fornecedor")
+        minimo, maximo = FAIXA_FRETES
+        if not minimo <= self.fretes_min <= self.fretes_max <= maximo:
+            raise ValueError(f"Esperado {minimo} <= fretes_min <= fretes_max <= {maximo}")
+        if self.concentracao_fornecedores <= 1:
+            raise ValueError("concentracao_fornecedores deve ser maior que 1")
+
+
+@dataclass
+class ResultadoGeracao:
+    cotacoes: int = 0
+    fretes: int = 0
+    transportadoras: int = 0
+    calculos_cubagem: int = 0
+    segundos: float = 0.0
+    etapas: dict = field(default_factory=dict)
+
+
+def _rng(config, fluxo, bloco=0):
+    return np.random.default_rng([config.semente, fluxo, bloco])
+
+
+def _nomes_unicos(rng, quantidade, montar):
+    """quantidade nomes distintos; colisões ganham um número no fim"""
+    nomes, vistos = [], set()
+    for i in range(quantidade):
+        nome = montar(rng)
+        if nome in vistos:
+            nome = f"{nome} {i}"
+        vistos.add(nome)
+        nomes.append(nome)
+    return nomes
+
+
+def _escolha(rng, opcoes):
+    return opcoes[rng.integers(len(opcoes))]
+
+
+@dataclass(frozen=True)
+class _Cadastros:
+    transportadora_ids: np.ndarray
+    # Por transportadora, alinhados com transportadora_ids
+    popularidade: np.ndarray
+    taxa: np.ndarray
+    minimo: np.ndarray
+    indice_automatica: int
+    fornecedores: list
+
+
+def _gravar_cadastros(conn, config):
+    rng = _rng(config, _FLUXO_CADASTROS)
+    automatica = conn.execute(
+        "SELECT id, percentual_base, icms FROM transportadoras WHERE lower(nome) = 'rodocargas'").fetchone()
+
+    novas = config.transportadoras - (1 if automatica else 0)
+    nomes = _nomes_unicos(rng, novas, lambda r: f"{_escolha(r, _PREFIXOS_TRANSPORTADORA)} "
+                                                f"{_escolha(r, _SOBRENOMES)} {_escolha(r, _SUFIXOS)}")
+    linhas = []
+    for i, nome in enumerate(nomes, 1):
+        raiz = f"{config.semente % 100:02d}{i:06d}"
+        linhas.append((nome, f"{raiz[:2]}.{raiz[2:5]}.{raiz[5:8]}/0001-{i % 100:02d}"))
+    conn.executemany("INSERT INTO transportadoras (nome, cnpj) VALUES (?, ?)", linhas)
+    # Data fixa em vez de CURRENT_TIMESTAMP: mesma semente, mesmo banco
+    conn.execute("UPDATE transportadoras SET data_criacao = ?", (f"{config.inicio.isoformat()} 00:00:00",))
+
+    ids = [linha[0] for linha in conn.execute("SELECT id FROM transportadoras ORDER BY id")]
+    contatos = []
+    for transportadora_id, (nome, _cnpj) in zip(ids[-len(linhas):] if linhas else [], linhas):
+        dominio = nome.split()[1].lower().encode("ascii", "ignore").decode() or "transp"
+        contatos.append((transportadora_id, "telefone", f"(11) 9{rng.integers(1000, 9999)}-"
+                         f"{rng.integers(1000, 9999)}", None))
+        if rng.random() < 0.7:
+            contatos.append((transportadora_id, "email", f"comercial{transportadora_id}@{dominio}.com.br",
+                             _escolha(rng, _SOBRENOMES)))
+    conn.executemany(
+        "INSERT INTO transportadora_contatos (transportadora_id, tipo, valor, contato) VALUES (?, ?, ?, ?)",
+        contatos)
+
+    ids = np.asarray(ids, dtype=np.int64)
+    # Popularidade desigual (lei de potência) em ordem aleatória
+    popularidade = 1.0 / np.arange(1, len(ids) + 1) ** 0.8
+    popularidade = rng.permutation(popularidade).astype(np.float32)
+    taxa = rng.uniform(0.025, 0.09, len(ids))
+    minimo = np.round(rng.uniform(20.0, 80.0, len(ids)), 2)
+    indice_automatica = -1
+    if automatica:
+        indice_automatica = int(np.flatnonzero(ids == automatica[0])[0])
+
+    fornecedores = _nomes_unicos(rng, config.fornecedores, lambda r: f"{_escolha(r, _RAMOS)} "
+                                 f"{_escolha(r, _SOBRENOMES)} {_escolha(r, _SOBRENOMES)} {_escolha(r, _SUFIXOS)}")
+    return _Cadastros(ids, popularidade, taxa, minimo, indice_automatica, fornecedores), automatica
+
+
+def _cotacoes_por_dia(config):
+    """Quantidade de cotações em cada dia do período (sazonal, soma exata)"""
+    dias = dia_epoch(config.inicio) + np.arange(config.dias)
+    dia_do_ano = np.array([data_de_dia_epoch(int(d)).timetuple().tm_yday for d in dias])
+    # Pico em meados de novembro, vale no meio do ano
+    sazonal = 1.0 + 0.3 * np.cos(2 * np.pi * (dia_do_ano - 320) / 365.25)
+    # 1970-01-01 foi quinta-feira: (dia + 3) % 7 dá 0 = segunda
+    semana = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 0.35, 0.1])[(dias + 3) % 7]
+    crescimento = 1.0 + 0.25 * np.arange(config.dias) / config.dias
+    peso = sazonal * semana * crescimento
+    contagem = _rng(config, _FLUXO_DIAS).multinomial(config.cotacoes, peso / peso.sum())
+    return dias, np.cumsum(contagem)
+
+
+@lru_cache(maxsize=None)
+def _dia_iso(dia):
+    return data_de_dia_epoch(dia).isoformat()
+
+
+def _sem_valor(valores, ausentes):
+    """Lista do array com None nas posições ausentes"""
+    lista = valores.tolist()
+    for i in np.flatnonzero(ausentes).tolist():
+        lista[i] = None
+    return lista
+
+
+def _gerar_bloco(config, cadastros, dias, acumulado, bloco, inicio, fim, tarifa_automatica):
+    """Linhas de cotacoes e cotacoes_transportadoras para os ids inicio+1..fim"""
+    rng = _rng(config, _FLUXO_COTACOES, bloco)
+    n = fim - inicio
+    ids = np.arange(inicio + 1, fim + 1, dtype=np.int64)
+
+    data_dia = dias[np.searchsorted(acumulado, np.arange(inicio, fim), side="right")]
+    # Horário comercial, em ordem dentro do dia para os ids seguirem o relógio
+    segundos = rng.integers(7 * 3600, 19 * 3600, n)
+    segundos = segundos[np.lexsort((segundos, data_dia))]
+    datas = [f"{_dia_iso(d)} {s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}"
+             for d, s in zip(data_dia.tolist(), segundos.tolist())]
+
+    fornecedor = (rng.zipf(config.concentracao_fornecedores, n) - 1) % len(cadastros.fornecedores)
+    nomes_fornecedores = cadastros.fornecedores
+    sem_pedido = rng.random(n) < 0.1
+
+    valor_nf = np.round(np.maximum(rng.lognormal(7.6, 1.0, n), 10.0), 2)
+    peso = np.round(valor_nf / rng.lognormal(3.3, 0.5, n), 3)
+    volume = 1 + np.minimum(rng.poisson(peso / 40.0), 499)
+    cubagem = np.round(peso / rng.uniform(120.0, 450.0, n), 4)
+    sem_peso = rng.random(n) < 0.08
+    sem_cubagem = rng.random(n) < 0.08
+
+    # Transportadoras distintas por cotação, ponderadas pela popularidade
+    # (amostragem sem reposição por "corrida exponencial": as k menores
+    # chegadas Exp(1) / popularidade)
+    total_transportadoras = len(cadastros.transportadora_ids)
+    maximo = min(config.fretes_max, total_transportadoras)
+    quantidade = np.minimum(rng.integers(config.fretes_min, config.fretes_max + 1, n), maximo)
+    chegadas = rng.standard_exponential((n, total_transportadoras), dtype=np.float32) / cadastros.popularidade
+    if maximo < total_transportadoras:
+        candidatas = np.argpartition(chegadas, maximo - 1, axis=1)[:, :maximo]
+    else:
+        candidatas = np.broadcast_to(np.arange(total_transportadoras), (n, total_transportadoras))
+    ordem = np.argsort(np.take_along_axis(chegadas, candidatas, axis=1), axis=1)
+    escolhidas = np.take_along_axis(candidatas, ordem, axis=1)
+    cotadas = np.arange(maximo) < quantidade[:, None]
+
+    fretes = valor_nf[:, None] * cadastros.taxa[escolhidas] * rng.lognormal(0.0, 0.12, (n, maximo))
+    fretes = centavos(np.maximum(fretes, cadastros.minimo[escolhidas]))
+    if tarifa_automatica is not None:
+        automatica = escolhidas == cadastros.indice_automatica
+        valores = tarifa_automatica.calcular(valor_nf, None, None)
+        fretes = np.where(automatica, valores[:, None], fretes)
+    ganhadora = np.where(cotadas, fretes, np.inf).argmin(axis=1)
+    ganhadora_id = cadastros.transportadora_ids[escolhidas[np.arange(n), ganhadora]]
+
+    cotacoes = zip(
+        ids.tolist(), datas, data_dia.tolist(),
+        [nomes_fornecedores[i] for i in fornecedor.tolist()],
+        [None if sem else f"PED{id_:08d}" for id_, sem in zip(ids.tolist(), sem_pedido.tolist())],
+        valor_nf.tolist(), _sem_valor(peso, sem_peso), volume.tolist(),
+        _sem_valor(cubagem, sem_cubagem), ganhadora_id.tolist(),
+    )
+
+    linha, coluna = np.nonzero(cotadas)
+    fretes_linhas = zip(
+        ids[linha].tolist(),
+        cadastros.transportadora_ids[escolhidas[linha, coluna]].tolist(),
+        fretes[linha, coluna].tolist(),
+        (coluna == ganhadora[linha]).astype(np.int64).tolist(),
+    )
+    return cotacoes, fretes_linhas, len(linha)
+
+
+def _gerar_calculos(config, quantidade):
+    """Blocos (calculos, itens) no formato salvo pela calculadora (cm)
+
+    calculos: (id, data, data_dia, cubagem_total, unidade); itens: linhas de
+    calculos_cubagem_itens. Os ids começam em 1 (banco novo).
+    """
+    rng = _rng(config, _FLUXO_CUBAGEM)
+    dia_inicial = dia_epoch(config.inicio)
+    for primeiro in range(0, quantidade, TAMANHO_BLOCO):
+        n = min(TAMANHO_BLOCO, quantidade - primeiro)
+        # 1 a 20 itens por cálculo, quase sempre poucos
+        itens_por_calculo = np.minimum(rng.geometric(0.35, n), 20)
+        total_itens = int(itens_por_calculo.sum())
+        quantidades = rng.integers(1, 21, total_itens)
+        medidas = np.round(rng.uniform((10.0, 10.0, 5.0), (120.0, 200.0, 150.0), (total_itens, 3)), 1)
+        cubagens = np.round(quantidades * medidas.prod(axis=1) / 1_000_000, 4)
+        dias = dia_inicial + rng.integers(config.dias, size=n)
+        segundos = rng.integers(7 * 3600, 19 * 3600, n)
+
+        ids = np.arange(primeiro + 1, primeiro + n + 1)
+        inicios = np.cumsum(itens_por_calculo) - itens_por_calculo
+        totais = np.round(np.add.reduceat(cubagens, inicios), 4)
+        datas = [f"{_dia_iso(dia)} {segundo // 3600:02d}:{segundo // 60 % 60:02d}:{segundo % 60:02d}"
+                 for dia, segundo in zip(dias.tolist(), segundos.tolist())]
+        calculos = zip(ids.tolist(), datas, dias.tolist(), totais.tolist(), ["cm"] * n)
+
+        posicoes = np.arange(total_itens) - np.repeat(inicios, itens_por_calculo)
+        itens = zip(np.repeat(ids, itens_por_calculo).tolist(), posicoes.tolist(), quantidades.tolist(),
+                    *medidas.T.tolist(), cubagens.tolist())
+        yield calculos, itens
+
+
+def _remover_objetos(conn):
+    """Remove índices e gatilhos das tabelas de carga; retorna o DDL para recriar"""
+    marcadores = ", ".join("?" for _ in TABELAS_CARGA)
+    objetos = conn.execute(
+        f"SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') "
+        f"AND tbl_name IN ({marcadores}) AND sql IS NOT NULL", TABELAS_CARGA).fetchall()
+    for tipo, nome, _sql in objetos:
+        conn.execute(f'DROP {tipo.upper()} "{nome}"')
+    return objetos
+
+
+def gerar(caminho, config=None, progresso=None, log=print, substituir=False):
+    """Cria um banco sintético em caminho e retorna o ResultadoGeracao
+
+    progresso(atual, total) é chamado a cada bloco de cotações.
+    """
+    config = config or ConfiguracaoGerador()
+    config.validar()
+    log = log or (lambda *_: None)
+    if os.path.exists(caminho) and not substituir:
+        raise FileExistsError(f"Banco já existe: {caminho}")
+
+    resultado = ResultadoGeracao()
+    inicio = time.perf_counter()
+    marca = [inicio]
+
+    def etapa(nome):
+        agora = time.perf_counter()
+        resultado.etapas[nome] = agora - marca[0]
+        marca[0] = agora
+
+    temporario = f"{caminho}.parcial"
+    for sufixo in ("", "-journal", "-wal", "-shm"):
+        if os.path.exists(temporario + sufixo):
+            os.remove(temporario + sufixo)
+
+    conn = sqlite3.connect(temporario, isolation_level=None)
+    try:
+        # Arquivo temporário: sem journal nem fsync até o fim da carga
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        Migrator(conn, log=None).migrate()
+        etapa("schema")
+
+        conn.execute("BEGIN")
+        cadastros, automatica = _gravar_cadastros(conn, config)
+        objetos = _remover_objetos(conn)
+        conn.execute("COMMIT")
+        resultado.transportadoras = len(cadastros.transportadora_ids)
+        tarifa_automatica = None
+        if automatica:
+            tarifa_automatica = TarifaLote(percentual_nf=float(automatica[1] or PERCENTUAL_BASE_PADRAO),
+                                           icms=float(automatica[2] or ICMS_PADRAO))
+        etapa("cadastros")
+
+        dias, acumulado = _cotacoes_por_dia(config)
+        for bloco, primeiro in enumerate(range(0, config.cotacoes, TAMANHO_BLOCO)):
+            ultimo = min(primeiro + TAMANHO_BLOCO, config.cotacoes)
+            cotacoes, fretes, quantidade = _gerar_bloco(config, cadastros, dias, acumulado, bloco,
+                                                        primeiro, ultimo, tarifa_automatica)
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO cotacoes (id, data, data_dia, fornecedor, num_pedido, valor_nf, peso, "
+                "volume, cubagem, transportadora_ganhadora_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                cotacoes)
+            conn.executemany(
+                "INSERT INTO cotacoes_transportadoras (cotacao_id, transportadora_id, valor_frete, selecionada) "
+                "VALUES (?, ?, ?, ?)", fretes)
+            conn.execute("COMMIT")
+            resultado.cotacoes = ultimo
+            resultado.fretes += quantidade
+            if progresso:
+                progresso(ultimo, config.cotacoes)
+        etapa("cotacoes")
+
+        calculos = config.calculos_cubagem
+        if calculos is None:
+            calculos = config.cotacoes // 10
+        conn.execute("BEGIN")
+        for linhas_calculos, linhas_itens in _gerar_calculos(config, calculos):
+            conn.executemany("INSERT INTO calculos_cubagem (id, data, data_dia, cubagem_total, unidade) "
+                             "VALUES (?, ?, ?, ?, ?)", linhas_calculos)
+            conn.executemany(queries.CUBAGEM_INSERIR_ITENS, linhas_itens)
+        conn.execute("COMMIT")
+        resultado.calculos_cubagem = calculos
+        etapa("calculos_cubagem")
+
+        # Índices primeiro (as cargas abaixo usam), gatilhos por último
+        conn.execute("BEGIN")
+        for tipo, _nome, sql in objetos:
+            if tipo == "index":
+                conn.execute(sql)
+        etapa("indices")
+        # Sem merges do FTS5 durante a carga; um optimize no fim junta os
+        # segmentos e os parâmetros voltam ao padrão para os gatilhos
+        conn.execute("INSERT INTO cotacoes_busca (cotacoes_busca, rank) VALUES ('automerge', 0)")
+        conn.execute("INSERT INTO cotacoes_busca (cotacoes_busca, rank) VALUES ('crisismerge', 64)")
+        conn.execute(v006_busca_fts.CARGA, (0, config.cotacoes))
+        conn.execute("INSERT INTO cotacoes_busca (cotacoes_busca, rank) VALUES ('automerge', 4)")
+        conn.execute("INSERT INTO cotacoes_busca (cotacoes_busca, rank) VALUES ('crisismerge', 16)")
+        conn.execute("INSERT INTO cotacoes_busca (cotacoes_busca) VALUES ('optimize')")
+        for carga in v005_resumos_dashboard.CARGA_INICIAL:
+            conn.execute(carga)
+        conn.execute("UPDATE versao_dados SET versao = versao + 1")
+        for tipo, _nome, sql in objetos:
+            if tipo == "trigger":
+                conn.execute(sql)
+        conn.execute("COMMIT")
+        etapa("busca_e_resumos")
+
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA journal_mode = DELETE")
+    except BaseException:
+        conn.close()
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    conn.close()
+    os.replace(temporario, caminho)
+    resultado.segundos = time.perf_counter() - inicio
+    log(f"✅ {resultado.cotacoes} cotações, {resultado.fretes} fretes, {resultado.transportadoras} "
+        f"transportadoras e {resultado.calculos_cubagem} cálculos de cubagem em {resultado.segundos:.1f}s")
+    return resultado
+
+
+def main():
+    padrao = ConfiguracaoGerador()
+    parser = argparse.ArgumentParser(description="Gera um banco sintético para testes de carga")
+    parser.add_argument("saida", help="Arquivo .db a criar")
+    parser.add_argument("--cotacoes", type=int, default=padrao.cotacoes)
+    parser.add_argument("--transportadoras", type=int, default=padrao.transportadoras)
+    parser.add_argument("--fornecedores", type=int, default=padrao.fornecedores)
+    parser.add_argument("--fretes-min", type=int, default=padrao.fretes_min)
+    parser.add_argument("--fretes-max", type=int, default=padrao.fretes_max)
+    parser.add_argument("--calculos-cubagem", type=int, help="Padrão: 1 a cada 10 cotações")
+    parser.add_argument("--inicio", type=date.fromisoformat, default=padrao.inicio, help="AAAA-MM-DD")
+    parser.add_argument("--dias", type=int, default=padrao.dias)
+    parser.add_argument("--ate-hoje", action="store_true",
+                        help="Termina o período hoje (o dashboard do mês atual fica com dados)")
+    parser.add_argument("--semente", type=int, default=padrao.semente)
+    parser.add_argument("--substituir", action="store_true", help="Sobrescreve o arquivo se existir")
+    args = parser.parse_args()
+
+    inicio = args.inicio
+    if args.ate_hoje:
+        inicio = date.today() - timedelta(days=args.dias - 1)
+    config = ConfiguracaoGerador(
+        cotacoes=args.cotacoes, transportadoras=args.transportadoras, fornecedores=args.fornecedores,
+        fretes_min=args.fretes_min, fretes_max=args.fretes_max, calculos_cubagem=args.calculos_cubagem,
+        inicio=inicio, dias=args.dias, semente=args.semente,
+    )
+
+    def progresso(atual, total):
+        print(f"\r   {atual}/{total} cotações ({atual / max(total, 1):.0%})", end="", flush=True)
+
+    try:
+        resultado = gerar(args.saida, config, progresso=progresso, substituir=args.substituir,
+                          log=lambda mensagem: print("\n" + mensagem))
+    except (ValueError, FileExistsError) as e:
+        print(f"❌ {e}")
+        return 1
+    for nome, segundos in resultado.etapas.items():
+        print(f"   {nome:<18} {segundos:7.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
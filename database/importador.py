@@ -0,0 +1,491 @@
+# importador.py - IMPORTAÇÃO EM LOTE DE COTAÇÕES (CSV/XLSX)
+"""Carrega planilhas antigas de cotações direto no banco.
+
+O arquivo é lido em streaming (csv ou openpyxl em modo read_only), as
+linhas são validadas com as mesmas regras de número da tela
+(Formatters.parse_decimal) e gravadas com executemany em lotes grandes,
+cada lote numa transação. O checkpoint em importacoes é atualizado no mesmo
+commit do lote, então uma importação interrompida continua do ponto onde
+parou. Com adiar_indices=True os índices secundários de cotacoes e
+cotacoes_transportadoras são removidos durante a carga e recriados no fim,
+e o gatilho da busca textual dá lugar a um INSERT ... SELECT por lote no
+índice FTS (uma linha por vez pelo gatilho custa ~4x mais).
+
+Colunas reconhecidas (cabeçalho sem diferença de maiúsculas/acentos; é o
+mesmo formato da exportação do histórico):
+
+    Data, Fornecedor, Pedido, Valor NF, Peso, Volume, Cubagem,
+    Transportadora Ganhadora, Frete, Frete <nome da transportadora>...
+
+"Frete" é o valor da ganhadora; cada coluna "Frete <nome>" vira uma
+proposta daquela transportadora. Uso:
+
+    python -m database.importador planilha.xlsx --db cotacoes.db --adiar-indices
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from database.migrations.v006_busca_fts import CARGA as CARGA_BUSCA
+from utils.datas import dia_epoch
+from utils.formatters import Formatters
+from utils.planilhas import ErroArquivo, abrir_arquivo, normalizar
+
+TAMANHO_LOTE = 5000
+MAX_ERROS_GUARDADOS = 200
+
+TABELAS_INDICES_ADIADOS = ("cotacoes", "cotacoes_transportadoras")
+GATILHO_BUSCA = "trg_busca_cotacoes_ins"
+
+# Cotações gravadas pela tela enquanto o gatilho da busca estava adiado
+_CARGA_BUSCA_PENDENTE = """
+    INSERT INTO cotacoes_busca (rowid, fornecedor, num_pedido, transportadora)
+    SELECT c.id, c.fornecedor, c.num_pedido, t.nome
+    FROM cotacoes c
+    LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
+    WHERE NOT EXISTS (SELECT 1 FROM cotacoes_busca b WHERE b.rowid = c.id)
+"""
+
+_CAMPOS = {
+    "data": "data",
+    "fornecedor": "fornecedor",
+    "pedido": "num_pedido",
+    "num pedido": "num_pedido",
+    "numero pedido": "num_pedido",
+    "valor nf": "valor_nf",
+    "peso": "peso",
+    "volume": "volume",
+    "cubagem": "cubagem",
+    "transportadora ganhadora": "transportadora",
+    "transportadora": "transportadora",
+    "frete": "valor_frete",
+    "valor frete": "valor_frete",
+}
+# Colunas da exportação que não voltam para o banco
+_IGNORADAS = {"id", "percentual do frete"}
+_PREFIXO_FRETE = "frete "
+_OBRIGATORIOS = ("data", "fornecedor", "valor_nf")
+
+
+class ErroImportacao(Exception):
+    """Arquivo que não pode ser importado (formato, cabeçalho)"""
+
+
+@dataclass
+class ResultadoImportacao:
+    arquivo: str
+    lidas: int = 0
+    importadas: int = 0
+    rejeitadas: int = 0
+    retomada_em: int = 0
+    segundos: float = 0.0
+    ja_importado: bool = False
+    # (número da linha no arquivo, mensagem)
+    erros: list = field(default_factory=list)
+
+
+# Conversão das células ------------------------------------------------------
+
+def _vazio(valor):
+    return valor is None or (isinstance(valor, str) and not valor.strip())
+
+
+def _numero(valor):
+    if _vazio(valor):
+        return None
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    return Formatters.parse_number(valor)
+
+
+def _data(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = str(valor).strip()[:10]
+    if len(texto) == 10 and texto[2] == "/" and texto[5] == "/":
+        return date(int(texto[6:]), int(texto[3:5]), int(texto[:2]))
+    return date.fromisoformat(texto)
+
+
+def _texto(valor):
+    if _vazio(valor):
+        return None
+    # Pedido numérico no Excel chega como 12345.0
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor).strip()
+
+
+class Importador:
+    def __init__(self, conn, criar_transportadoras=False, adiar_indices=False,
+                 tamanho_lote=TAMANHO_LOTE, progresso=None, log=None):
+        self.conn = conn
+        self.criar_transportadoras = criar_transportadoras
+        self.adiar_indices = adiar_indices
+        self.tamanho_lote = tamanho_lote
+        self.progresso = progresso
+        self.log = log or (lambda *_: None)
+        self._transportadoras = {}
+        self._por_texto = {}
+        self._busca_adiada = False
+
+    # API --------------------------------------------------------------------
+
+    def importar(self, caminho, reiniciar=False):
+        """Importa o arquivo (ou continua uma importação interrompida)"""
+        inicio = time.perf_counter()
+        caminho = os.path.abspath(caminho)
+        chave = self._chave(caminho)
+        resultado = ResultadoImportacao(arquivo=caminho)
+
+        try:
+            cabecalho, linhas, total = abrir_arquivo(caminho)
+        except ErroArquivo as e:
+            raise ErroImportacao(str(e)) from e
+        try:
+            colunas, fretes_extras = self._mapear_cabecalho(cabecalho)
+            checkpoint = self._checkpoint(chave, caminho, reiniciar)
+            if checkpoint["concluida"]:
+                resultado.ja_importado = True
+                resultado.lidas = checkpoint["linhas_lidas"]
+                resultado.importadas = checkpoint["importadas"]
+                resultado.rejeitadas = checkpoint["rejeitadas"]
+                return resultado
+
+            resultado.retomada_em = checkpoint["linhas_lidas"]
+            resultado.importadas = checkpoint["importadas"]
+            resultado.rejeitadas = checkpoint["rejeitadas"]
+            self._carregar_transportadoras()
+            if self.adiar_indices:
+                self._remover_indices(chave)
+
+            lidas = 0
+            lote = []
+            for numero, linha in enumerate(linhas, start=2):
+                lidas += 1
+                if lidas <= resultado.retomada_em:
+                    # Já gravada numa execução anterior
+                    continue
+                if all(_vazio(v) for v in linha):
+                    lote.append(None)
+                else:
+                    lote.append((numero, linha))
+                if len(lote) >= self.tamanho_lote:
+                    self._gravar_lote(chave, lote, colunas, fretes_extras, lidas, resultado)
+                    lote = []
+                    if self.progresso:
+                        self.progresso(lidas, None if total is None else max(total, lidas))
+            self._gravar_lote(chave, lote, colunas, fretes_extras, lidas, resultado, concluir=True)
+            resultado.lidas = lidas
+            if self.progresso:
+                self.progresso(lidas, lidas)
+        finally:
+            linhas.close()
+
+        restaurar_indices(self.conn, log=self.log)
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+
+    # Cabeçalho e checkpoint -------------------------------------------------
+
+    @staticmethod
+    def _chave(caminho):
+        info = os.stat(caminho)
+        return f"{caminho}|{info.st_size}|{int(info.st_mtime)}"
+
+    @staticmethod
+    def _mapear_cabecalho(cabecalho):
+        colunas = {}
+        fretes_extras = []
+        for posicao, titulo in enumerate(cabecalho):
+            nome = normalizar(titulo)
+            if not nome or nome in _IGNORADAS:
+                continue
+            if nome in _CAMPOS:
+                colunas.setdefault(_CAMPOS[nome], posicao)
+            elif nome.startswith(_PREFIXO_FRETE):
+                fretes_extras.append((posicao, nome[len(_PREFIXO_FRETE):]))
+        faltando = [c for c in _OBRIGATORIOS if c not in colunas]
+        if faltando:
+            raise ErroImportacao(f"Colunas obrigatórias ausentes: {', '.join(faltando)}")
+        return colunas, fretes_extras
+
+    def _checkpoint(self, chave, caminho, reiniciar):
+        conn = self.conn
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if reiniciar:
+                conn.execute(
+                    "UPDATE importacoes SET linhas_lidas = 0, importadas = 0, rejeitadas = 0, "
+                    "concluida = 0 WHERE chave = ?", (chave,))
+            conn.execute("INSERT OR IGNORE INTO importacoes (chave, arquivo) VALUES (?, ?)",
+                         (chave, caminho))
+            linha = conn.execute(
+                "SELECT linhas_lidas, importadas, rejeitadas, concluida FROM importacoes WHERE chave = ?",
+                (chave,)).fetchone()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return dict(zip(("linhas_lidas", "importadas", "rejeitadas", "concluida"), linha))
+
+    def _carregar_transportadoras(self):
+        # Nomes resolvidos em memória: uma consulta por importação, não por linha
+        self._transportadoras = {
+            normalizar(nome): id_ for id_, nome in self.conn.execute("SELECT id, nome FROM transportadoras")
+        }
+        self._por_texto = {}
+
+    def _transportadora_id(self, nome):
+        # Os mesmos poucos nomes se repetem em todas as linhas
+        try:
+            return self._por_texto[nome]
+        except KeyError:
+            pass
+        id_ = self._resolver_transportadora(nome)
+        self._por_texto[nome] = id_
+        return id_
+
+    def _resolver_transportadora(self, nome):
+        chave = normalizar(nome)
+        if not chave:
+            return None
+        id_ = self._transportadoras.get(chave)
+        if id_ is None and self.criar_transportadoras:
+            cursor = self.conn.execute("INSERT INTO transportadoras (nome) VALUES (?)", (str(nome).strip(),))
+            id_ = self._transportadoras[chave] = cursor.lastrowid
+            self.log(f"   Transportadora criada: {str(nome).strip()}")
+        if id_ is None:
+            raise ValueError(f"Transportadora não cadastrada: {nome}")
+        return id_
+
+    # Índices ----------------------------------------------------------------
+
+    def _remover_indices(self, chave):
+        conn = self.conn
+        marcadores = ", ".join("?" for _ in TABELAS_INDICES_ADIADOS)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            objetos = conn.execute(
+                f"SELECT type, name, sql FROM sqlite_master "
+                f"WHERE ((type = 'index' AND tbl_name IN ({marcadores})) OR (type = 'trigger' AND name = ?)) "
+                f"AND sql IS NOT NULL",
+                TABELAS_INDICES_ADIADOS + (GATILHO_BUSCA,)).fetchall()
+            pendentes = conn.execute(
+                "SELECT indices_adiados FROM importacoes WHERE chave = ?", (chave,)).fetchone()[0]
+            adiados = {(tipo, nome): sql for tipo, nome, sql in json.loads(pendentes or "[]")}
+            # O DDL fica salvo antes do DROP: uma queda no meio não perde o índice
+            adiados.update(((tipo, nome), sql) for tipo, nome, sql in objetos)
+            conn.execute("UPDATE importacoes SET indices_adiados = ? WHERE chave = ?",
+                         (json.dumps([[t, n, sql] for (t, n), sql in sorted(adiados.items())]), chave))
+            for tipo, nome, _sql in objetos:
+                conn.execute(f'DROP {tipo.upper()} "{nome}"')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        self._busca_adiada = any(nome == GATILHO_BUSCA for tipo, nome in adiados)
+        if objetos:
+            self.log(f"   {len(objetos)} índice(s)/gatilho(s) adiado(s) até o fim da carga")
+
+    # Gravação ---------------------------------------------------------------
+
+    def _converter(self, linha, colunas, fretes_extras):
+        """Linha do arquivo -> (valores da cotação, [(transportadora_id, frete, selecionada)])"""
+        def celula(campo):
+            posicao = colunas.get(campo)
+            if posicao is None or posicao >= len(linha):
+                return None
+            return linha[posicao]
+
+        fornecedor = _texto(celula("fornecedor"))
+        if not fornecedor:
+            raise ValueError("Fornecedor vazio")
+        try:
+            data = _data(celula("data"))
+        except (TypeError, ValueError):
+            raise ValueError(f"Data inválida: {celula('data')}")
+        valor_nf = _numero(celula("valor_nf")) or 0.0
+        if valor_nf <= 0:
+            raise ValueError(f"Valor NF inválido: {celula('valor_nf')}")
+        volume = _numero(celula("volume"))
+
+        ganhadora_id = self._transportadora_id(celula("transportadora"))
+        fretes = {}
+        valor_frete = _numero(celula("valor_frete"))
+        if ganhadora_id is not None and valor_frete and valor_frete > 0:
+            fretes[ganhadora_id] = (valor_frete, True)
+        for posicao, nome in fretes_extras:
+            valor = _numero(linha[posicao]) if posicao < len(linha) else None
+            if not valor or valor <= 0:
+                continue
+            transportadora_id = self._transportadora_id(nome)
+            if transportadora_id not in fretes:
+                fretes[transportadora_id] = (valor, transportadora_id == ganhadora_id)
+
+        cotacao = (
+            data.isoformat(), dia_epoch(data), fornecedor, _texto(celula("num_pedido")), valor_nf,
+            _numero(celula("peso")) or None,
+            int(volume) if volume and volume > 0 else None,
+            _numero(celula("cubagem")) or None,
+            ganhadora_id,
+        )
+        return cotacao, [(tid, valor, selecionada) for tid, (valor, selecionada) in fretes.items()]
+
+    def _gravar_lote(self, chave, lote, colunas, fretes_extras, lidas, resultado, concluir=False):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cotacoes = []
+            fretes = []
+            rejeitadas = 0
+            proximo_id = conn.execute("""
+                SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'cotacoes'), 0),
+                           COALESCE((SELECT MAX(id) FROM cotacoes), 0)) + 1
+            """).fetchone()[0]
+            for item in lote:
+                if item is None:
+                    continue
+                numero, linha = item
+                try:
+                    cotacao, propostas = self._converter(linha, colunas, fretes_extras)
+                except ValueError as e:
+                    rejeitadas += 1
+                    if len(resultado.erros) < MAX_ERROS_GUARDADOS:
+                        resultado.erros.append((numero, str(e)))
+                    continue
+                # Ids atribuídos aqui para ligar os fretes sem um SELECT por linha
+                cotacoes.append((proximo_id,) + cotacao)
+                fretes.extend((proximo_id, tid, valor, selecionada) for tid, valor, selecionada in propostas)
+                proximo_id += 1
+
+            # data_dia já vai preenchido: o gatilho de data_dia não precisa do UPDATE
+            conn.executemany("""
+                INSERT INTO cotacoes
+                (id, data, data_dia, fornecedor, num_pedido, valor_nf, peso, volume, cubagem,
+                 transportadora_ganhadora_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, cotacoes)
+            conn.executemany("""
+                INSERT INTO cotacoes_transportadoras
+                (cotacao_id, transportadora_id, valor_frete, selecionada)
+                VALUES (?, ?, ?, ?)
+            """, fretes)
+            if self._busca_adiada and cotacoes:
+                conn.execute(CARGA_BUSCA, (cotacoes[0][0] - 1, cotacoes[-1][0]))
+            conn.execute("""
+                UPDATE importacoes SET
+                    linhas_lidas = ?, importadas = importadas + ?, rejeitadas = rejeitadas + ?,
+                    concluida = ?, atualizado_em = CURRENT_TIMESTAMP
+                WHERE chave = ?
+            """, (lidas, len(cotacoes), rejeitadas, int(concluir), chave))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        resultado.importadas += len(cotacoes)
+        resultado.rejeitadas += rejeitadas
+        self.log(f"   {lidas} linhas lidas, {resultado.importadas} cotações importadas")
+
+
+def restaurar_indices(conn, log=None):
+    """Recria índices e gatilhos adiados por importações (inclusive as interrompidas)"""
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'importacoes'").fetchone()
+    if not existe:
+        return 0
+    pendentes = conn.execute(
+        "SELECT chave, indices_adiados FROM importacoes WHERE indices_adiados IS NOT NULL"
+    ).fetchall()
+    if not pendentes:
+        return 0
+    if conn.in_transaction:
+        conn.commit()
+    recriados = 0
+    inicio = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for chave, adiados in pendentes:
+            for tipo, nome, sql in json.loads(adiados):
+                existe = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?", (tipo, nome)).fetchone()
+                if existe:
+                    continue
+                if nome == GATILHO_BUSCA:
+                    conn.execute(_CARGA_BUSCA_PENDENTE)
+                conn.execute(sql)
+                recriados += 1
+            conn.execute("UPDATE importacoes SET indices_adiados = NULL WHERE chave = ?", (chave,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if log:
+        log(f"   {recriados} índice(s)/gatilho(s) recriado(s) em {time.perf_counter() - inicio:.2f}s")
+    return recriados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa cotações de planilhas CSV/XLSX")
+    parser.add_argument("arquivos", nargs="+", help="Arquivos .csv ou .xlsx")
+    parser.add_argument("--db", dest="db_path", help="Caminho do banco SQLite")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Linhas por transação")
+    parser.add_argument("--adiar-indices", action="store_true",
+                        help="Remove os índices durante a carga e recria no fim")
+    parser.add_argument("--criar-transportadoras", action="store_true",
+                        help="Cadastra transportadoras que não existem no banco")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="Ignora o checkpoint e importa o arquivo do início")
+    args = parser.parse_args()
+
+    from database.database import Database
+
+    db = Database(args.db_path)
+    conn = db.get_connection()
+    codigo = 0
+    try:
+        def progresso(atual, total):
+            if total is None:
+                print(f"\r   {atual} linhas", end="", flush=True)
+            else:
+                print(f"\r   {atual}/{total} ({atual / max(total, 1):.0%})", end="", flush=True)
+
+        importador = Importador(conn, criar_transportadoras=args.criar_transportadoras,
+                                adiar_indices=args.adiar_indices, tamanho_lote=args.lote,
+                                progresso=progresso)
+        for arquivo in args.arquivos:
+            print(f"📥 {arquivo}")
+            try:
+                resultado = importador.importar(arquivo, reiniciar=args.reiniciar)
+            except (ErroImportacao, OSError) as e:
+                print(f"❌ {e}")
+                codigo = 1
+                continue
+            print()
+            if resultado.ja_importado:
+                print(f"   Já importado ({resultado.importadas} cotações); use --reiniciar para importar de novo")
+                continue
+            if resultado.retomada_em:
+                print(f"   Retomado a partir da linha {resultado.retomada_em + 1}")
+            print(f"✅ {resultado.importadas} cotações importadas, {resultado.rejeitadas} rejeitadas "
+                  f"em {resultado.segundos:.2f}s")
+            for numero, mensagem in resultado.erros[:20]:
+                print(f"   linha {numero}: {mensagem}")
+            if len(resultado.erros) > 20:
+                print(f"   ... e mais {resultado.rejeitadas - 20} linha(s) rejeitada(s)")
+    finally:
+        conn.close()
+        db.close()
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Schema inicial: as tabelas que antes eram criadas em Database._create_tables"""
+
+VERSION = 1
+DESCRIPTION = "Schema inicial e transportadora padrão"
+
+
+def upgrade(conn):
+    # IF NOT EXISTS: bancos anteriores ao controle de versão já têm as tabelas
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS transportadoras (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            cnpj TEXT UNIQUE,
+            percentual_base REAL DEFAULT 0,
+            icms REAL DEFAULT 0,
+            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS cotacoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            fornecedor TEXT NOT NULL,
+            num_pedido TEXT,
+            valor_nf REAL NOT NULL,
+            peso REAL,
+            volume INTEGER,
+            cubagem REAL,
+            transportadora_ganhadora_id INTEGER,
+            FOREIGN KEY (transportadora_ganhadora_id) REFERENCES transportadoras (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS cotacoes_transportadoras (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cotacao_id INTEGER NOT NULL,
+            transportadora_id INTEGER NOT NULL,
+            valor_frete REAL NOT NULL,
+            selecionada BOOLEAN DEFAULT FALSE,
+            FOREIGN KEY (cotacao_id) REFERENCES cotacoes (id),
+            FOREIGN KEY (transportadora_id) REFERENCES transportadoras (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS calculos_cubagem (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            itens_json TEXT NOT NULL,
+            cubagem_total REAL NOT NULL
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS transportadora_contatos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transportadora_id INTEGER NOT NULL,
+            tipo TEXT NOT NULL,  -- 'telefone' ou 'email'
+            valor TEXT NOT NULL,
+            contato TEXT,        -- nome do contato (opcional)
+            FOREIGN KEY (transportadora_id) REFERENCES transportadoras (id)
+        )
+    ''')
+
+    # Rodocargas como transportadora padrão
+    conn.execute('''
+        INSERT OR IGNORE INTO transportadoras
+        (nome, cnpj, percentual_base, icms)
+        VALUES (?, ?, ?, ?)
+    ''', ('Rodocargas', '00.000.000/0000-00', 14.0, 7.0))
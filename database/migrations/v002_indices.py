@@ -0,0 +1,26 @@
+"""Índices secundários das consultas de histórico e dashboard"""
+
+VERSION = 2
+DESCRIPTION = "Índices secundários de cotações e fretes"
+
+INDEXES = [
+    # Histórico: WHERE data BETWEEN + ORDER BY data DESC, id DESC
+    "CREATE INDEX IF NOT EXISTS idx_cotacoes_data ON cotacoes (data, id)",
+    # Dashboard: MAX(valor_nf) direto no índice
+    "CREATE INDEX IF NOT EXISTS idx_cotacoes_valor_nf ON cotacoes (valor_nf)",
+    "CREATE INDEX IF NOT EXISTS idx_cotacoes_ganhadora ON cotacoes (transportadora_ganhadora_id)",
+    # Fretes de uma cotação e o LEFT JOIN com selecionada = 1
+    "CREATE INDEX IF NOT EXISTS idx_ct_cotacao_selecionada "
+    "ON cotacoes_transportadoras (cotacao_id, selecionada)",
+    # Parcial e cobrindo: só os fretes vencedores (transportadora mais usada, taxa média)
+    "CREATE INDEX IF NOT EXISTS idx_ct_selecionadas "
+    "ON cotacoes_transportadoras (transportadora_id, cotacao_id, valor_frete, selecionada) "
+    "WHERE selecionada = 1",
+    "CREATE INDEX IF NOT EXISTS idx_contatos_transportadora "
+    "ON transportadora_contatos (transportadora_id)",
+]
+
+
+def upgrade(conn):
+    for ddl in INDEXES:
+        conn.execute(ddl)
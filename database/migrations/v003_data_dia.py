@@ -0,0 +1,60 @@
+"""Coluna data_dia (dias desde 1970-01-01) para filtros de data indexáveis
+
+A coluna data tem formatos mistos ("2024-05-03" gravado pela tela e
+"2024-05-03 10:11:12" do DEFAULT CURRENT_TIMESTAMP). data_dia guarda só o
+dia como inteiro, é mantida pelos gatilhos abaixo e permite BETWEEN
+direto no índice em vez de strftime() sobre a coluna.
+"""
+from database.migrator import backfill_in_batches
+
+VERSION = 3
+DESCRIPTION = "Coluna data_dia normalizada e índice por dia"
+TRANSACTIONAL = False
+
+DATA_DIA_SQL = "CAST(julianday(date({coluna})) - 2440587.5 AS INTEGER)"
+
+TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_cotacoes_data_dia_ins
+    AFTER INSERT ON cotacoes
+    WHEN NEW.data_dia IS NOT {DATA_DIA_SQL.format(coluna="NEW.data")}
+    BEGIN
+        UPDATE cotacoes SET data_dia = {DATA_DIA_SQL.format(coluna="NEW.data")}
+        WHERE id = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_cotacoes_data_dia_upd
+    AFTER UPDATE OF data, data_dia ON cotacoes
+    WHEN NEW.data_dia IS NOT {DATA_DIA_SQL.format(coluna="NEW.data")}
+    BEGIN
+        UPDATE cotacoes SET data_dia = {DATA_DIA_SQL.format(coluna="NEW.data")}
+        WHERE id = NEW.id;
+    END
+    """,
+]
+
+
+def upgrade(conn):
+    colunas = [row[1] for row in conn.execute("PRAGMA table_info(cotacoes)")]
+
+    # Coluna e gatilhos primeiro: cotações salvas durante o backfill já entram certas
+    conn.execute("BEGIN IMMEDIATE")
+    if "data_dia" not in colunas:
+        conn.execute("ALTER TABLE cotacoes ADD COLUMN data_dia INTEGER")
+    for ddl in TRIGGERS:
+        conn.execute(ddl)
+    conn.commit()
+
+    backfill_in_batches(
+        conn, "cotacoes",
+        f"data_dia = {DATA_DIA_SQL.format(coluna='data')}",
+        where="data_dia IS NULL",
+        task="backfill:cotacoes.data_dia",
+    )
+
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_cotacoes_data_dia ON cotacoes (data_dia, id)")
+    # O índice por texto deixou de ser usado pelas consultas
+    conn.execute("DROP INDEX IF EXISTS idx_cotacoes_data")
+    conn.commit()
@@ -0,0 +1,29 @@
+"""Contador de versão dos dados, incrementado por gatilhos
+
+Serve para saber se o cache do dashboard ainda vale sem reexecutar as
+agregações: basta comparar o contador com o da última leitura.
+"""
+
+VERSION = 4
+DESCRIPTION = "Contador de versão dos dados para cache do dashboard"
+
+TABELAS = ("cotacoes", "cotacoes_transportadoras", "transportadoras")
+
+
+def upgrade(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS versao_dados (
+            tabela TEXT PRIMARY KEY,
+            versao INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    for tabela in TABELAS:
+        conn.execute("INSERT OR IGNORE INTO versao_dados (tabela, versao) VALUES (?, 0)", (tabela,))
+        for evento in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_versao_{tabela}_{evento.lower()}
+                AFTER {evento} ON {tabela}
+                BEGIN
+                    UPDATE versao_dados SET versao = versao + 1 WHERE tabela = '{tabela}';
+                END
+            """)
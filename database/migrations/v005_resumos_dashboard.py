@@ -0,0 +1,190 @@
+"""Agregados do dashboard mantidos por gatilhos
+
+O dashboard somava todos os fretes vencedores a cada atualização (uma
+passada por milhões de linhas em bancos grandes). Com estas duas tabelas
+cada gravação ajusta só o próprio resumo e a leitura do dashboard passa a
+ler algumas dezenas de linhas:
+
+    resumo_cotacoes_dia           total e soma de valor_nf por data_dia
+    resumo_fretes_transportadora  fretes vencedores por transportadora
+                                  (quantidade e soma dos percentuais)
+
+Os fretes só contam enquanto a cotação existe, igual ao JOIN das consultas
+antigas.
+"""
+
+VERSION = 5
+DESCRIPTION = "Resumos do dashboard mantidos por gatilhos"
+
+# Contribuição de um frete vencedor para a taxa média
+_TAXA = "CASE WHEN c.valor_nf > 0 THEN {frete}.valor_frete / c.valor_nf * 100 ELSE 0 END"
+_QTD_TAXA = "(c.valor_nf > 0)"
+
+_SOMA_FRETE = """
+    INSERT INTO resumo_fretes_transportadora (transportadora_id, total, soma_taxa, qtd_taxa)
+    SELECT {frete}.transportadora_id, 1, {taxa}, {qtd}
+    FROM cotacoes c WHERE {condicao} AND c.id = {frete}.cotacao_id
+    ON CONFLICT (transportadora_id) DO UPDATE SET
+        total = total + excluded.total,
+        soma_taxa = soma_taxa + excluded.soma_taxa,
+        qtd_taxa = qtd_taxa + excluded.qtd_taxa;
+"""
+
+_SUBTRAI_FRETE = """
+    UPDATE resumo_fretes_transportadora SET
+        total = total - 1,
+        soma_taxa = soma_taxa - (SELECT {taxa} FROM cotacoes c WHERE c.id = {frete}.cotacao_id),
+        qtd_taxa = qtd_taxa - (SELECT {qtd} FROM cotacoes c WHERE c.id = {frete}.cotacao_id)
+    WHERE {condicao} AND transportadora_id = {frete}.transportadora_id
+      AND EXISTS (SELECT 1 FROM cotacoes c WHERE c.id = {frete}.cotacao_id);
+"""
+
+
+def _soma_frete(frete, condicao="1"):
+    return _SOMA_FRETE.format(frete=frete, condicao=condicao,
+                              taxa=_TAXA.format(frete=frete), qtd=_QTD_TAXA)
+
+
+def _subtrai_frete(frete, condicao="1"):
+    return _SUBTRAI_FRETE.format(frete=frete, condicao=condicao,
+                                 taxa=_TAXA.format(frete=frete), qtd=_QTD_TAXA)
+
+
+def _fretes_da_cotacao(cotacao, sinal):
+    """Soma (sinal=+1) ou retira (sinal=-1) os fretes vencedores de uma cotação
+
+    cotacao é NEW ou OLD de um gatilho em cotacoes; o valor_nf usado é o dela.
+    """
+    taxa = f"CASE WHEN {cotacao}.valor_nf > 0 THEN ct.valor_frete / {cotacao}.valor_nf * 100 ELSE 0 END"
+    return f"""
+        UPDATE resumo_fretes_transportadora SET
+            total = total + {sinal} * (
+                SELECT COUNT(*) FROM cotacoes_transportadoras ct
+                WHERE ct.cotacao_id = {cotacao}.id AND ct.selecionada = 1
+                  AND ct.transportadora_id = resumo_fretes_transportadora.transportadora_id),
+            soma_taxa = soma_taxa + {sinal} * (
+                SELECT COALESCE(SUM({taxa}), 0) FROM cotacoes_transportadoras ct
+                WHERE ct.cotacao_id = {cotacao}.id AND ct.selecionada = 1
+                  AND ct.transportadora_id = resumo_fretes_transportadora.transportadora_id),
+            qtd_taxa = qtd_taxa + {sinal} * ({cotacao}.valor_nf > 0) * (
+                SELECT COUNT(*) FROM cotacoes_transportadoras ct
+                WHERE ct.cotacao_id = {cotacao}.id AND ct.selecionada = 1
+                  AND ct.transportadora_id = resumo_fretes_transportadora.transportadora_id)
+        WHERE transportadora_id IN (
+            SELECT transportadora_id FROM cotacoes_transportadoras
+            WHERE cotacao_id = {cotacao}.id AND selecionada = 1);
+    """
+
+
+_SOMA_DIA = """
+    INSERT INTO resumo_cotacoes_dia (data_dia, total, valor_total)
+    SELECT NEW.data_dia, 1, NEW.valor_nf WHERE NEW.data_dia IS NOT NULL
+    ON CONFLICT (data_dia) DO UPDATE SET
+        total = total + 1,
+        valor_total = valor_total + excluded.valor_total;
+"""
+
+_SUBTRAI_DIA = """
+    UPDATE resumo_cotacoes_dia SET
+        total = total - 1,
+        valor_total = valor_total - OLD.valor_nf
+    WHERE data_dia = OLD.data_dia;
+"""
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS resumo_cotacoes_dia (
+        data_dia INTEGER PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0,
+        valor_total REAL NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS resumo_fretes_transportadora (
+        transportadora_id INTEGER PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0,
+        soma_taxa REAL NOT NULL DEFAULT 0,
+        qtd_taxa INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+TRIGGERS = [
+    # data_dia normalmente chega pelo UPDATE do gatilho da v003, não no INSERT
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_resumo_cotacoes_ins
+    AFTER INSERT ON cotacoes
+    BEGIN {_SOMA_DIA} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_resumo_cotacoes_upd
+    AFTER UPDATE OF data_dia, valor_nf ON cotacoes
+    WHEN OLD.data_dia IS NOT NEW.data_dia OR OLD.valor_nf IS NOT NEW.valor_nf
+    BEGIN
+        {_SUBTRAI_DIA}
+        {_SOMA_DIA}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_resumo_cotacoes_del
+    AFTER DELETE ON cotacoes
+    BEGIN {_SUBTRAI_DIA} END
+    """,
+    # Mudança de valor_nf altera o percentual de todos os fretes da cotação
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_resumo_fretes_cotacao_upd
+    AFTER UPDATE OF valor_nf ON cotacoes
+    WHEN OLD.valor_nf IS NOT NEW.valor_nf
+    BEGIN
+        {_fretes_da_cotacao("OLD", -1)}
+        {_fretes_da_cotacao("NEW", +1)}
+    END
+    """,
+    # Cotação excluída antes dos fretes: os fretes deixam de contar agora
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_resumo_fretes_cotacao_del
+    AFTER DELETE ON cotacoes
+    BEGIN {_fretes_da_cotacao("OLD", -1)} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_resumo_fretes_ins
+    AFTER INSERT ON cotacoes_transportadoras WHEN NEW.selecionada = 1
+    BEGIN {_soma_frete("NEW")} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_resumo_fretes_upd
+    AFTER UPDATE ON cotacoes_transportadoras
+    WHEN OLD.selecionada = 1 OR NEW.selecionada = 1
+    BEGIN
+        {_subtrai_frete("OLD", condicao="OLD.selecionada = 1")}
+        {_soma_frete("NEW", condicao="NEW.selecionada = 1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_resumo_fretes_del
+    AFTER DELETE ON cotacoes_transportadoras WHEN OLD.selecionada = 1
+    BEGIN {_subtrai_frete("OLD")} END
+    """,
+]
+
+CARGA_INICIAL = [
+    """
+    INSERT OR REPLACE INTO resumo_cotacoes_dia (data_dia, total, valor_total)
+    SELECT data_dia, COUNT(*), SUM(valor_nf)
+    FROM cotacoes WHERE data_dia IS NOT NULL
+    GROUP BY data_dia
+    """,
+    f"""
+    INSERT OR REPLACE INTO resumo_fretes_transportadora (transportadora_id, total, soma_taxa, qtd_taxa)
+    SELECT ct.transportadora_id, COUNT(*), SUM({_TAXA.format(frete="ct")}), SUM({_QTD_TAXA})
+    FROM cotacoes_transportadoras ct
+    JOIN cotacoes c ON ct.cotacao_id = c.id
+    WHERE ct.selecionada = 1
+    GROUP BY ct.transportadora_id
+    """,
+]
+
+
+def upgrade(conn):
+    for ddl in TABLES + TRIGGERS + CARGA_INICIAL:
+        conn.execute(ddl)
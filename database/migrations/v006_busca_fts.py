@@ -0,0 +1,85 @@
+"""Índice FTS5 (trigramas) para busca por fornecedor, pedido e transportadora
+
+LIKE '%texto%' nas colunas não usa índice nenhum. A tabela cotacoes_busca
+guarda, por cotação (rowid = cotacoes.id), o fornecedor, o número do pedido
+e o nome da transportadora ganhadora. O tokenizer trigram atende tanto
+MATCH (busca geral com ranking) quanto LIKE '%texto%' com 3+ caracteres.
+Os gatilhos mantêm a tabela em dia; a carga inicial é feita em lotes.
+"""
+from database.migrator import copy_in_batches
+
+VERSION = 6
+DESCRIPTION = "Busca textual FTS5 em cotações"
+TRANSACTIONAL = False
+
+_NOME_GANHADORA = "(SELECT nome FROM transportadoras WHERE id = NEW.transportadora_ganhadora_id)"
+
+DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS cotacoes_busca USING fts5(
+        fornecedor, num_pedido, transportadora,
+        tokenize = 'trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_busca_cotacoes_ins
+    AFTER INSERT ON cotacoes
+    BEGIN
+        INSERT OR REPLACE INTO cotacoes_busca (rowid, fornecedor, num_pedido, transportadora)
+        VALUES (NEW.id, NEW.fornecedor, NEW.num_pedido, {_NOME_GANHADORA});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_busca_cotacoes_upd
+    AFTER UPDATE OF fornecedor, num_pedido, transportadora_ganhadora_id ON cotacoes
+    BEGIN
+        UPDATE cotacoes_busca SET
+            fornecedor = NEW.fornecedor,
+            num_pedido = NEW.num_pedido,
+            transportadora = {_NOME_GANHADORA}
+        WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_busca_cotacoes_del
+    AFTER DELETE ON cotacoes
+    BEGIN
+        DELETE FROM cotacoes_busca WHERE rowid = OLD.id;
+    END
+    """,
+    # Renomear/excluir transportadora muda o texto das cotações que ela ganhou
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_busca_transportadoras_upd
+    AFTER UPDATE OF nome ON transportadoras
+    BEGIN
+        UPDATE cotacoes_busca SET transportadora = NEW.nome
+        WHERE rowid IN (SELECT id FROM cotacoes WHERE transportadora_ganhadora_id = NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_busca_transportadoras_del
+    AFTER DELETE ON transportadoras
+    BEGIN
+        UPDATE cotacoes_busca SET transportadora = NULL
+        WHERE rowid IN (SELECT id FROM cotacoes WHERE transportadora_ganhadora_id = OLD.id);
+    END
+    """,
+]
+
+CARGA = """
+    INSERT OR REPLACE INTO cotacoes_busca (rowid, fornecedor, num_pedido, transportadora)
+    SELECT c.id, c.fornecedor, c.num_pedido, t.nome
+    FROM cotacoes c
+    LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
+    WHERE c.id > ? AND c.id <= ?
+"""
+
+
+def upgrade(conn):
+    # Gatilhos antes da carga: cotações salvas durante a migração já entram
+    conn.execute("BEGIN IMMEDIATE")
+    for ddl in DDL:
+        conn.execute(ddl)
+    conn.commit()
+
+    copy_in_batches(conn, "cotacoes", CARGA, task="fts:cotacoes_busca")
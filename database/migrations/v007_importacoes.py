@@ -0,0 +1,28 @@
+"""Checkpoint das importações em lote de planilhas/CSV
+
+Cada arquivo (identificado por caminho, tamanho e data de modificação)
+tem uma linha com quantas linhas de dados já foram gravadas. O importador
+atualiza o checkpoint na mesma transação de cada lote, então uma
+importação interrompida recomeça exatamente do primeiro lote não gravado.
+indices_adiados guarda o DDL dos índices (e do gatilho da busca textual)
+removidos durante a carga para recriá-los mesmo que o processo tenha
+caído no meio.
+"""
+
+VERSION = 7
+DESCRIPTION = "Checkpoint de importação em lote"
+
+
+def upgrade(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS importacoes (
+            chave TEXT PRIMARY KEY,
+            arquivo TEXT NOT NULL,
+            linhas_lidas INTEGER NOT NULL DEFAULT 0,
+            importadas INTEGER NOT NULL DEFAULT 0,
+            rejeitadas INTEGER NOT NULL DEFAULT 0,
+            indices_adiados TEXT,
+            concluida INTEGER NOT NULL DEFAULT 0,
+            atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
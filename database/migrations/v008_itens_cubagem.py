@@ -0,0 +1,123 @@
+"""Itens dos cálculos de cubagem em tabela própria
+
+calculos_cubagem.itens_json guardava a lista de volumes como texto; qualquer
+relatório precisava ler e interpretar todos os JSONs em Python. Os itens
+passam para calculos_cubagem_itens (uma linha por item, colunas numéricas)
+e o cálculo ganha data_dia (dias epoch, mesmo esquema de cotacoes.data_dia)
+e a unidade das medidas (NULL nos cálculos antigos, que não a registravam).
+
+A migração é online: os JSONs existentes são explodidos com json_each em
+lotes retomáveis e a tabela calculos_cubagem é reconstruída sem itens_json.
+Enquanto isso um gatilho explode o JSON de cálculos gravados por versões
+antigas do sistema; ele some junto com a tabela antiga na troca.
+"""
+from database.migrations.v003_data_dia import DATA_DIA_SQL
+from database.migrator import copy_in_batches, rebuild_table_in_batches
+
+VERSION = 8
+DESCRIPTION = "Itens de cubagem normalizados e data_dia nos cálculos"
+TRANSACTIONAL = False
+
+TABELA_ITENS = """
+    CREATE TABLE IF NOT EXISTS calculos_cubagem_itens (
+        calculo_id INTEGER NOT NULL REFERENCES calculos_cubagem (id),
+        posicao INTEGER NOT NULL,
+        quantidade REAL NOT NULL,
+        largura REAL NOT NULL,
+        comprimento REAL NOT NULL,
+        altura REAL NOT NULL,
+        total REAL NOT NULL,
+        PRIMARY KEY (calculo_id, posicao)
+    ) WITHOUT ROWID
+"""
+
+INDICES_ITENS = [
+    # Maiores itens (ORDER BY total DESC LIMIT n)
+    "CREATE INDEX IF NOT EXISTS idx_calculos_itens_total ON calculos_cubagem_itens (total)",
+]
+
+# {table} é trocado por rebuild_table_in_batches
+TABELA_CALCULOS = """
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        data TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        cubagem_total REAL NOT NULL,
+        unidade TEXT,
+        data_dia INTEGER
+    )
+"""
+
+# Depois da troca de tabelas: índice coberto para totais por período e
+# gatilhos de data_dia como em cotacoes (v003)
+APOS_TROCA = [
+    "CREATE INDEX IF NOT EXISTS idx_calculos_cubagem_data_dia ON calculos_cubagem (data_dia, cubagem_total)",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_calculos_cubagem_data_dia_ins
+    AFTER INSERT ON calculos_cubagem
+    WHEN NEW.data_dia IS NOT {DATA_DIA_SQL.format(coluna="NEW.data")}
+    BEGIN
+        UPDATE calculos_cubagem SET data_dia = {DATA_DIA_SQL.format(coluna="NEW.data")}
+        WHERE id = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_calculos_cubagem_data_dia_upd
+    AFTER UPDATE OF data, data_dia ON calculos_cubagem
+    WHEN NEW.data_dia IS NOT {DATA_DIA_SQL.format(coluna="NEW.data")}
+    BEGIN
+        UPDATE calculos_cubagem SET data_dia = {DATA_DIA_SQL.format(coluna="NEW.data")}
+        WHERE id = NEW.id;
+    END
+    """,
+]
+
+_ITENS_DO_JSON = """
+    SELECT c.id, j.key,
+           COALESCE(json_extract(j.value, '$.quantidade'), 1),
+           COALESCE(json_extract(j.value, '$.largura'), 0),
+           COALESCE(json_extract(j.value, '$.comprimento'), 0),
+           COALESCE(json_extract(j.value, '$.altura'), 0),
+           COALESCE(json_extract(j.value, '$.total'), 0)
+    FROM {origem} c, json_each(c.itens_json) j
+    WHERE json_valid(c.itens_json) AND json_type(c.itens_json) = 'array'
+"""
+
+_INSERIR_ITENS = ("INSERT OR REPLACE INTO calculos_cubagem_itens "
+                  "(calculo_id, posicao, quantidade, largura, comprimento, altura, total) ")
+
+# Faixa de rowid (exclusivo, inclusivo), para copy_in_batches
+CARGA_ITENS = (_INSERIR_ITENS + _ITENS_DO_JSON.format(origem="calculos_cubagem")
+               + " AND c.rowid > ? AND c.rowid <= ?")
+
+GATILHO_JSON = f"""
+    CREATE TRIGGER IF NOT EXISTS trg_calculos_cubagem_itens_json
+    AFTER INSERT ON calculos_cubagem
+    BEGIN
+        {_INSERIR_ITENS}
+        {_ITENS_DO_JSON.format(origem="(SELECT NEW.id AS id, NEW.itens_json AS itens_json)")};
+    END
+"""
+
+
+def upgrade(conn):
+    colunas = [row[1] for row in conn.execute("PRAGMA table_info(calculos_cubagem)")]
+
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(TABELA_ITENS)
+    for ddl in INDICES_ITENS:
+        conn.execute(ddl)
+    if "itens_json" in colunas:
+        conn.execute(GATILHO_JSON)
+    conn.commit()
+
+    if "itens_json" not in colunas:
+        return
+
+    copy_in_batches(conn, "calculos_cubagem", CARGA_ITENS, task="copy:calculos_cubagem_itens")
+
+    rebuild_table_in_batches(
+        conn, "calculos_cubagem", TABELA_CALCULOS,
+        columns=["id", "data", "cubagem_total", "unidade", "data_dia"],
+        select_exprs=["id", "data", "cubagem_total", "NULL", DATA_DIA_SQL.format(coluna="data")],
+        after_swap=APOS_TROCA,
+    )
@@ -0,0 +1,365 @@
+# migrator.py - MIGRAÇÕES VERSIONADAS DO SCHEMA
+"""Aplica os scripts de database/migrations/ em ordem usando PRAGMA user_version.
+
+Cada script é um módulo vNNN_descricao.py com:
+
+    VERSION = 3
+    DESCRIPTION = "texto curto"
+    TRANSACTIONAL = True      # opcional; False para migrações online em lotes
+
+    def upgrade(conn): ...
+
+Migrações transacionais rodam dentro de um BEGIN/COMMIT junto com a troca
+do user_version. As não transacionais controlam os próprios commits (veja
+backfill_in_batches e rebuild_table_in_batches) e podem ser retomadas se
+o processo for interrompido.
+
+Uso pela linha de comando:
+
+    python -m database.migrator --dry-run
+    python -m database.migrator --db data/transportadora.db --target 2
+"""
+import argparse
+import importlib
+import pkgutil
+import re
+import sys
+import time
+from dataclasses import dataclass
+
+from database import migrations as migrations_package
+
+_MODULE_RE = re.compile(r"^v(\d+)_\w+$")
+
+PROGRESS_TABLE = "_migration_progress"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: object
+    transactional: bool = True
+
+
+@dataclass(frozen=True)
+class MigrationResult:
+    version: int
+    description: str
+    seconds: float
+    dry_run: bool = False
+
+
+def discover_migrations(package=migrations_package):
+    """Carrega os scripts do pacote em ordem de versão"""
+    found = []
+    for info in pkgutil.iter_modules(package.__path__):
+        if not _MODULE_RE.match(info.name):
+            continue
+        module = importlib.import_module(f"{package.__name__}.{info.name}")
+        found.append(Migration(
+            version=module.VERSION,
+            description=module.DESCRIPTION,
+            upgrade=module.upgrade,
+            transactional=getattr(module, "TRANSACTIONAL", True),
+        ))
+    found.sort(key=lambda m: m.version)
+
+    for expected, migration in enumerate(found, start=1):
+        if migration.version != expected:
+            raise RuntimeError(
+                f"Migrações fora de sequência: esperava v{expected}, encontrei v{migration.version}"
+            )
+    return found
+
+
+class Migrator:
+    def __init__(self, conn, migrations=None, log=print):
+        self.conn = conn
+        self.migrations = discover_migrations() if migrations is None else migrations
+        self.log = log or (lambda *_: None)
+
+    def current_version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def latest_version(self):
+        return self.migrations[-1].version if self.migrations else 0
+
+    def pending(self, target=None):
+        """Migrações ainda não aplicadas até a versão alvo"""
+        current = self.current_version()
+        target = self.latest_version() if target is None else target
+        return [m for m in self.migrations if current < m.version <= target]
+
+    def migrate(self, target=None, dry_run=False):
+        """Aplica as migrações pendentes e retorna o tempo de cada uma"""
+        results = []
+        for migration in self.pending(target):
+            label = f"v{migration.version:03d} {migration.description}"
+            if dry_run:
+                modo = "transacional" if migration.transactional else "online em lotes"
+                self.log(f"[dry-run] {label} ({modo})")
+                results.append(MigrationResult(migration.version, migration.description, 0.0, True))
+                continue
+
+            start = time.perf_counter()
+            if migration.transactional:
+                self._apply_transactional(migration)
+            else:
+                self._apply_online(migration)
+            seconds = time.perf_counter() - start
+
+            self.log(f"✅ Migração {label} aplicada em {seconds:.3f}s")
+            results.append(MigrationResult(migration.version, migration.description, seconds))
+        return results
+
+    def _apply_transactional(self, migration):
+        """Script e user_version no mesmo BEGIN/COMMIT"""
+        conn = self.conn
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migration.upgrade(conn)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _apply_online(self, migration):
+        """O script faz os próprios commits; a versão só muda no final"""
+        conn = self.conn
+        if conn.in_transaction:
+            conn.commit()
+        migration.upgrade(conn)
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+        conn.commit()
+
+
+# Ferramentas para migrações online ------------------------------------------
+
+def _ensure_progress_table(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} (
+            task TEXT PRIMARY KEY,
+            last_rowid INTEGER NOT NULL
+        )
+    """)
+    if conn.in_transaction:
+        conn.commit()
+
+
+def _load_progress(conn, task):
+    row = conn.execute(f"SELECT last_rowid FROM {PROGRESS_TABLE} WHERE task = ?", (task,)).fetchone()
+    return row[0] if row else 0
+
+
+def _save_progress(conn, task, last_rowid):
+    conn.execute(
+        f"INSERT OR REPLACE INTO {PROGRESS_TABLE} (task, last_rowid) VALUES (?, ?)",
+        (task, last_rowid),
+    )
+
+
+def _clear_progress(conn, task):
+    conn.execute(f"DELETE FROM {PROGRESS_TABLE} WHERE task = ?", (task,))
+
+
+def backfill_in_batches(conn, table, set_clause, where="1", batch_size=20000,
+                        task=None, pause=0.005, log=None):
+    """UPDATE em lotes por faixa de rowid, com commit entre os lotes
+
+    Cada lote segura o lock de escrita só por alguns milissegundos, então o
+    sistema continua salvando cotações durante a migração. O progresso fica
+    em _migration_progress e a tarefa recomeça de onde parou.
+    """
+    task = task or f"backfill:{table}"
+    _ensure_progress_table(conn)
+    last = _load_progress(conn, task)
+    max_rowid = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+    total = 0
+
+    while last < max_rowid:
+        upper = min(last + batch_size, max_rowid)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                f"UPDATE {table} SET {set_clause} WHERE rowid > ? AND rowid <= ? AND ({where})",
+                (last, upper),
+            )
+            total += cursor.rowcount
+            _save_progress(conn, task, upper)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        last = upper
+        if log:
+            log(f"   {table}: {last}/{max_rowid}")
+        # Dá a vez para quem estiver esperando o lock de escrita
+        time.sleep(pause)
+
+    conn.execute("BEGIN IMMEDIATE")
+    _clear_progress(conn, task)
+    conn.commit()
+    return total
+
+
+def copy_in_batches(conn, table, insert_sql, batch_size=20000, task=None,
+                    pause=0.005, log=None):
+    """Executa insert_sql por faixas de rowid de table, com commit entre os lotes
+
+    insert_sql recebe dois parâmetros, o rowid inicial (exclusivo) e o final
+    (inclusivo), ex.: "INSERT OR REPLACE INTO x SELECT ... WHERE rowid > ?
+    AND rowid <= ?". Serve para popular índices auxiliares (FTS, resumos)
+    enquanto gatilhos já cuidam das linhas novas. Retomável como
+    backfill_in_batches.
+    """
+    task = task or f"copy:{table}"
+    _ensure_progress_table(conn)
+    last = _load_progress(conn, task)
+    max_rowid = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+
+    while last < max_rowid:
+        upper = min(last + batch_size, max_rowid)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(insert_sql, (last, upper))
+            _save_progress(conn, task, upper)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        last = upper
+        if log:
+            log(f"   {table}: {last}/{max_rowid}")
+        # Dá a vez para quem estiver esperando o lock de escrita
+        time.sleep(pause)
+
+    conn.execute("BEGIN IMMEDIATE")
+    _clear_progress(conn, task)
+    conn.commit()
+
+
+def rebuild_table_in_batches(conn, table, create_sql, columns, select_exprs=None,
+                             batch_size=20000, after_swap=(), pause=0.005, log=None):
+    """Reconstrói uma tabela grande sem bloquear o sistema por minutos
+
+    create_sql usa {table} no lugar do nome (ex.: "CREATE TABLE {table} (...)")
+    e columns deve incluir a chave INTEGER PRIMARY KEY para preservar os ids.
+    As linhas são copiadas em lotes por rowid para {table}__rebuild; gatilhos
+    temporários replicam INSERT/UPDATE/DELETE feitos durante a cópia. No fim,
+    uma transação curta troca as tabelas e executa after_swap (índices e
+    gatilhos da tabela nova).
+    """
+    new_table = f"{table}__rebuild"
+    task = f"rebuild:{table}"
+    select_exprs = select_exprs or columns
+    column_list = ", ".join(columns)
+    select_list = ", ".join(select_exprs)
+
+    _ensure_progress_table(conn)
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (new_table,)
+    ).fetchone()
+
+    if not exists:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(create_sql.format(table=new_table))
+            copy_row = (f"INSERT OR REPLACE INTO {new_table} ({column_list}) "
+                        f"SELECT {select_list} FROM {table} WHERE rowid = NEW.rowid;")
+            conn.execute(f"""
+                CREATE TRIGGER {new_table}_ai AFTER INSERT ON {table}
+                BEGIN {copy_row} END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER {new_table}_au AFTER UPDATE ON {table}
+                BEGIN
+                    DELETE FROM {new_table} WHERE rowid = OLD.rowid;
+                    {copy_row}
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER {new_table}_ad AFTER DELETE ON {table}
+                BEGIN DELETE FROM {new_table} WHERE rowid = OLD.rowid; END
+            """)
+            _save_progress(conn, task, 0)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    last = _load_progress(conn, task)
+    max_rowid = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+
+    # Linhas novas depois deste ponto chegam pelos gatilhos
+    while last < max_rowid:
+        upper = min(last + batch_size, max_rowid)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {new_table} ({column_list}) "
+                f"SELECT {select_list} FROM {table} WHERE rowid > ? AND rowid <= ?",
+                (last, upper),
+            )
+            _save_progress(conn, task, upper)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        last = upper
+        if log:
+            log(f"   {table}: {last}/{max_rowid}")
+        # Dá a vez para quem estiver esperando o lock de escrita
+        time.sleep(pause)
+
+    # Troca rápida; legacy_alter_table evita reescrever gatilhos de outras tabelas
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        for ddl in after_swap:
+            conn.execute(ddl)
+        _clear_progress(conn, task)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aplica as migrações do banco de cotações")
+    parser.add_argument("--db", dest="db_path", help="Caminho do banco SQLite")
+    parser.add_argument("--target", type=int, help="Versão alvo (padrão: a mais recente)")
+    parser.add_argument("--dry-run", action="store_true", help="Só lista o que seria aplicado")
+    args = parser.parse_args()
+
+    import sqlite3
+    from database.storage import resolve_settings
+
+    db_path, _profile = resolve_settings(args.db_path)
+    conn = sqlite3.connect(db_path, timeout=20)
+    try:
+        migrator = Migrator(conn)
+        print(f"Banco: {db_path} (versão {migrator.current_version()} de {migrator.latest_version()})")
+        results = migrator.migrate(args.target, dry_run=args.dry_run)
+        if not results:
+            print("Nenhuma migração pendente")
+        elif not args.dry_run:
+            total = sum(r.seconds for r in results)
+            print(f"{len(results)} migração(ões) aplicada(s) em {total:.3f}s")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,5 +38,15 @@ class CotacaoTransportadora:
 class CalculoCubagem:
     id: Optional[int]
     data: datetime
-    itens_json: str
-    cubagem_total: float
\ No newline at end of file
+    cubagem_total: float
+    unidade: Optional[str] = None
+
+@dataclass
+class CalculoCubagemItem:
+    calculo_id: int
+    posicao: int
+    quantidade: float
+    largura: float
+    comprimento: float
+    altura: float
+    total: float
\ No newline at end of file
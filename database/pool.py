@@ -0,0 +1,214 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolExhaustedError(Exception):
+    """Nenhuma conexão ficou livre dentro do tempo de espera"""
+
+
+class PooledConnection(sqlite3.Connection):
+    """Conexão SQLite que volta para o pool quando close() é chamado"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = None
+        self._owner = None
+        self._refs = 0
+        self._last_used = time.monotonic()
+
+    def close(self):
+        """Devolve a conexão ao pool (ou fecha, se não pertencer a um)"""
+        if self._pool is None:
+            super().close()
+        else:
+            self._pool.release(self)
+
+    def _close_physical(self):
+        """Fecha de fato a conexão com o arquivo"""
+        self._pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """Pool limitado de conexões SQLite reaproveitadas entre as telas
+
+    Cada thread recebe sempre a mesma conexão enquanto ainda estiver com
+    ela emprestada (checkouts aninhados só incrementam um contador), o que
+    evita deadlock quando um método chama outro que também abre conexão.
+    """
+
+    def __init__(self, db_path, max_size=5, wait_timeout=30.0, setup=None,
+                 health_check_interval=30.0, **connect_kwargs):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.wait_timeout = wait_timeout
+        self.health_check_interval = health_check_interval
+        self._setup = setup
+        self._connect_kwargs = dict(connect_kwargs)
+        self._connect_kwargs.setdefault("timeout", 20)
+        self._connect_kwargs["check_same_thread"] = False
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._by_thread = {}
+        self._open = 0
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "reentrant_checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "created": 0,
+            "discarded": 0,
+        }
+
+    def _connect(self):
+        """Abre uma conexão física e aplica a configuração uma única vez"""
+        conn = sqlite3.connect(self.db_path, factory=PooledConnection, **self._connect_kwargs)
+        try:
+            if self._setup:
+                self._setup(conn)
+        except Exception:
+            conn._close_physical()
+            raise
+        conn._pool = self
+        with self._cond:
+            self._stats["created"] += 1
+        return conn
+
+    def _is_healthy(self, conn):
+        """Testa conexões que ficaram muito tempo paradas"""
+        if time.monotonic() - conn._last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        """Empresta uma conexão para a thread atual"""
+        ident = threading.get_ident()
+        with self._cond:
+            if self._closed:
+                raise PoolExhaustedError("Pool de conexões já foi fechado")
+
+            conn = self._by_thread.get(ident)
+            if conn is not None:
+                conn._refs += 1
+                self._stats["checkouts"] += 1
+                self._stats["reentrant_checkouts"] += 1
+                return conn
+
+            deadline = time.monotonic() + self.wait_timeout
+            waited = False
+            wait_start = time.monotonic()
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        f"Nenhuma das {self.max_size} conexões foi liberada em {self.wait_timeout}s"
+                    )
+                if not waited:
+                    waited = True
+                    self._stats["waits"] += 1
+                self._cond.wait(remaining)
+                if self._closed:
+                    raise PoolExhaustedError("Pool de conexões já foi fechado")
+
+            if waited:
+                self._stats["wait_time"] += time.monotonic() - wait_start
+            self._stats["checkouts"] += 1
+
+        # Abertura e health check ficam fora do lock
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                conn._close_physical()
+                with self._cond:
+                    self._stats["discarded"] += 1
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            conn._owner = ident
+            conn._refs = 1
+            self._by_thread[ident] = conn
+        return conn
+
+    def release(self, conn):
+        """Recebe a conexão de volta; só devolve ao pool no último close()"""
+        with self._cond:
+            if conn._refs <= 0:
+                return
+            conn._refs -= 1
+            if conn._refs > 0:
+                return
+            self._by_thread.pop(conn._owner, None)
+            conn._owner = None
+
+        # Nunca devolve conexão com transação pendente (segura locks do arquivo)
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn._close_physical()
+            with self._cond:
+                self._open -= 1
+                self._stats["discarded"] += 1
+                self._cond.notify()
+            return
+
+        conn._last_used = time.monotonic()
+        with self._cond:
+            if self._closed:
+                conn._close_physical()
+                self._open -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Uso com with: a conexão volta ao pool ao sair do bloco"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Retorna as estatísticas de uso do pool"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["open"] = self._open
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._open - len(self._idle)
+            stats["max_size"] = self.max_size
+        return stats
+
+    def close(self):
+        """Fecha as conexões livres; as emprestadas fecham ao serem devolvidas"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn._close_physical()
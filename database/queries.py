@@ -0,0 +1,358 @@
+# queries.py - CONSULTAS DE PRODUÇÃO SOBRE AS TABELAS GRANDES
+"""SQL usado pelas telas sobre cotacoes/cotacoes_transportadoras.
+
+Ficam centralizadas aqui para que database/query_plans.py consiga rodar
+EXPLAIN QUERY PLAN em todas elas e acusar qualquer SCAN de tabela grande.
+"""
+
+# Dashboard (database/dashboard.py) ----------------------------------------
+
+# Indicadores escalares. O mês sai de resumo_cotacoes_dia (um registro por
+# dia, mantido por gatilhos da migração v005) filtrado por data_dia com
+# BETWEEN; os limites vêm de utils.datas.intervalo_mes()
+DASHBOARD_RESUMO = """
+    SELECT
+        (SELECT COUNT(*) FROM transportadoras),
+        COALESCE(SUM(r.total), 0),
+        COALESCE(SUM(r.valor_total), 0),
+        (SELECT COALESCE(MAX(valor_nf), 0) FROM cotacoes)
+    FROM resumo_cotacoes_dia r
+    WHERE r.data_dia BETWEEN ? AND ?
+"""
+
+# Fretes vencedores por transportadora: contagem (mais usada) e soma dos
+# percentuais (taxa média), já agregados em resumo_fretes_transportadora
+DASHBOARD_FRETES_VENCEDORES = """
+    SELECT
+        t.nome,
+        SUM(r.total) AS total,
+        SUM(r.soma_taxa) AS soma_taxa,
+        SUM(r.qtd_taxa) AS qtd_taxa
+    FROM resumo_fretes_transportadora r
+    JOIN transportadoras t ON r.transportadora_id = t.id
+    WHERE r.total > 0
+    GROUP BY t.nome
+"""
+
+DASHBOARD_VERSAO_DADOS = "SELECT COALESCE(SUM(versao), 0) FROM versao_dados"
+
+DASHBOARD_COTACOES_RECENTES = """
+    SELECT
+        c.data,
+        c.fornecedor,
+        c.valor_nf,
+        ct.valor_frete,
+        t.nome as transportadora
+    FROM cotacoes c
+    LEFT JOIN cotacoes_transportadoras ct ON c.id = ct.cotacao_id AND ct.selecionada = 1
+    LEFT JOIN transportadoras t ON ct.transportadora_id = t.id
+    ORDER BY c.data_dia DESC, c.id DESC
+    LIMIT 5
+"""
+
+# Histórico (gui/historico_window.py) --------------------------------------
+
+HISTORICO_COLUNAS = """
+    c.id,
+    c.data,
+    c.fornecedor,
+    c.valor_nf,
+    c.peso,
+    c.volume,
+    c.cubagem,
+    t.nome as transportadora_ganhadora,
+    ct.valor_frete,
+    c.data_dia
+"""
+
+HISTORICO_COLUNAS_EXPORTACAO = """
+    c.id as "ID",
+    c.data as "Data",
+    c.fornecedor as "Fornecedor",
+    c.num_pedido as "Pedido",
+    c.valor_nf as "Valor NF",
+    c.peso as "Peso",
+    c.volume as "Volume",
+    c.cubagem as "Cubagem",
+    t.nome as "Transportadora Ganhadora",
+    ct.valor_frete as "Frete",
+    (ct.valor_frete / c.valor_nf * 100) as "Percentual do Frete"
+"""
+
+# Exportações para análise (CSV/Parquet/Arrow): nomes estáveis em
+# snake_case, a data como dia epoch e o id da transportadora junto do nome
+HISTORICO_COLUNAS_ANALITICAS = """
+    c.id as id,
+    c.data_dia as data,
+    c.fornecedor as fornecedor,
+    c.num_pedido as num_pedido,
+    c.valor_nf as valor_nf,
+    c.peso as peso,
+    c.volume as volume,
+    c.cubagem as cubagem,
+    c.transportadora_ganhadora_id as transportadora_id,
+    t.nome as transportadora,
+    ct.valor_frete as valor_frete,
+    (ct.valor_frete / c.valor_nf * 100) as percentual_frete
+"""
+
+
+# Termos com 3+ caracteres usam o índice de trigramas (migração v006);
+# abaixo disso o trigram não ajuda e o filtro vai direto na coluna
+BUSCA_MINIMO_CARACTERES = 3
+FILTRO_FTS = "fts"
+
+_FILTRO_COLUNA = {
+    "fornecedor": ("c.fornecedor", "fornecedor"),
+    "transportadora": ("t.nome", "transportadora"),
+}
+
+
+def _filtro_texto(campo, modo):
+    coluna, coluna_busca = _FILTRO_COLUNA[campo]
+    if modo == FILTRO_FTS:
+        return f" AND c.id IN (SELECT rowid FROM cotacoes_busca WHERE {coluna_busca} LIKE ?)"
+    return f" AND {coluna} LIKE ?"
+
+
+def historico_query(colunas=HISTORICO_COLUNAS, fornecedor=False, transportadora=False,
+                    paginada=False):
+    """Monta a consulta filtrada do histórico
+
+    fornecedor/transportadora: False (sem filtro), True (LIKE na coluna) ou
+    FILTRO_FTS (LIKE no índice cotacoes_busca). Parâmetros na ordem:
+    dia_inicio, dia_fim (dias epoch, ver utils.datas), [fornecedor],
+    [transportadora].
+
+    Com paginada=True a consulta devolve uma página depois da chave
+    (data_dia, id) da última linha já carregada, sem OFFSET. Parâmetros:
+    dia_inicio, [fornecedor], [transportadora], chave_dia, chave_id, limite.
+    A primeira página usa a chave (dia_fim + 1, 0). O fim do período fica
+    só na chave para o índice começar a busca direto no ponto de parada.
+    """
+    query = f"""
+        SELECT {colunas}
+        FROM cotacoes c
+        LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
+        LEFT JOIN cotacoes_transportadoras ct ON c.id = ct.cotacao_id AND ct.selecionada = 1
+    """
+    if paginada:
+        query += " WHERE c.data_dia >= ?"
+    else:
+        query += " WHERE c.data_dia BETWEEN ? AND ?"
+    if fornecedor:
+        query += _filtro_texto("fornecedor", fornecedor)
+    if transportadora:
+        query += _filtro_texto("transportadora", transportadora)
+    if paginada:
+        query += " AND (c.data_dia, c.id) < (?, ?)"
+    query += " ORDER BY c.data_dia DESC, c.id DESC"
+    if paginada:
+        query += " LIMIT ?"
+    return query
+
+
+def historico_ids_query(fornecedor=False, transportadora=False):
+    """Ids de todo o resultado do filtro depois de uma chave, na ordem da lista
+
+    Materializa de uma vez o resultado quando algum termo é raro: os
+    candidatos vêm do índice cotacoes_busca (BUSCA_CANDIDATOS, lista JSON)
+    e o LIKE nas colunas confirma cada um. As páginas seguintes saem de
+    HISTORICO_PAGINA_IDS sem repetir a busca. Parâmetros: candidatos,
+    dia_inicio, [fornecedor], [transportadora], chave_dia, chave_id.
+    """
+    query = "SELECT c.id FROM cotacoes c"
+    if transportadora:
+        query += " LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id"
+    query += " WHERE c.id IN (SELECT value FROM json_each(?)) AND c.data_dia >= ?"
+    if fornecedor:
+        query += _filtro_texto("fornecedor", True)
+    if transportadora:
+        query += _filtro_texto("transportadora", True)
+    query += " AND (c.data_dia, c.id) < (?, ?) ORDER BY c.data_dia DESC, c.id DESC"
+    return query
+
+
+# Uma página a partir dos ids materializados por historico_ids_query
+# (lista JSON), na mesma ordem e com as mesmas colunas da paginação por chave
+HISTORICO_PAGINA_IDS = f"""
+    SELECT {HISTORICO_COLUNAS}
+    FROM cotacoes c
+    LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
+    LEFT JOIN cotacoes_transportadoras ct ON c.id = ct.cotacao_id AND ct.selecionada = 1
+    WHERE c.id IN (SELECT value FROM json_each(?))
+    ORDER BY c.data_dia DESC, c.id DESC
+"""
+
+# Quantas e quais (lista JSON) cotações têm o termo na coluna (ver
+# termo_coluna), até o limite: o MATCH lê as listas de trigramas aos poucos
+# e para no limite, e a lista não passa linha a linha pelo Python
+BUSCA_CANDIDATOS = """
+    SELECT COUNT(*), json_group_array(rowid) FROM (
+        SELECT rowid FROM cotacoes_busca WHERE cotacoes_busca MATCH ? LIMIT ?
+    )
+"""
+
+COTACOES_MAIOR_ID = "SELECT COALESCE(MAX(id), 0) FROM cotacoes"
+
+
+def termo_busca(texto):
+    """Texto digitado -> expressão MATCH de uma frase (aspas escapadas)"""
+    return '"' + texto.replace('"', '""') + '"'
+
+
+def termo_coluna(campo, texto):
+    """Expressão MATCH de uma frase restrita à coluna do campo (ver _FILTRO_COLUNA)"""
+    return f"{_FILTRO_COLUNA[campo][1]} : {termo_busca(texto)}"
+
+
+def busca_query(colunas=HISTORICO_COLUNAS, limitada=True):
+    """Busca geral ranqueada em fornecedor, pedido e transportadora ganhadora
+
+    Parâmetros: termo (ver termo_busca) e, se limitada, o limite de linhas.
+    """
+    limite = "LIMIT ?" if limitada else ""
+    return f"""
+        SELECT {colunas}
+        FROM (
+            SELECT rowid AS id, rank FROM cotacoes_busca
+            WHERE cotacoes_busca MATCH ?
+            ORDER BY rank {limite}
+        ) b
+        JOIN cotacoes c ON c.id = b.id
+        LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
+        LEFT JOIN cotacoes_transportadoras ct ON c.id = ct.cotacao_id AND ct.selecionada = 1
+        ORDER BY b.rank
+    """
+
+
+# Quantas cotações há no período, pelo resumo diário mantido por gatilhos.
+# Exato sem filtros de texto; com filtros é um limite superior (progresso).
+HISTORICO_TOTAL_PERIODO = """
+    SELECT COALESCE(SUM(total), 0) FROM resumo_cotacoes_dia
+    WHERE data_dia BETWEEN ? AND ?
+"""
+
+HISTORICO_DETALHE_COTACAO = """
+    SELECT
+        c.data, c.fornecedor, c.num_pedido, c.valor_nf,
+        c.peso, c.volume, c.cubagem, t.nome as transportadora_ganhadora
+    FROM cotacoes c
+    LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
+    WHERE c.id = ?
+"""
+
+HISTORICO_DETALHE_FRETES = """
+    SELECT
+        t.nome, ct.valor_frete, ct.selecionada,
+        (ct.valor_frete / c.valor_nf * 100) as percentual
+    FROM cotacoes_transportadoras ct
+    JOIN transportadoras t ON ct.transportadora_id = t.id
+    JOIN cotacoes c ON ct.cotacao_id = c.id
+    WHERE ct.cotacao_id = ?
+    ORDER BY ct.valor_frete
+"""
+
+EXPORTAR_COTACAO = """
+    SELECT
+        c.id as "ID",
+        c.data as "Data",
+        c.fornecedor as "Fornecedor",
+        c.num_pedido as "Pedido",
+        c.valor_nf as "Valor NF",
+        c.peso as "Peso",
+        c.volume as "Volume",
+        c.cubagem as "Cubagem",
+        t.nome as "Transportadora Ganhadora"
+    FROM cotacoes c
+    LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
+    WHERE c.id = ?
+"""
+
+EXPORTAR_COTACAO_FRETES = """
+    SELECT
+        t.nome as "Transportadora",
+        ct.valor_frete as "Valor Frete",
+        CASE WHEN ct.selecionada THEN 'Sim' ELSE 'Não' END as "Selecionada",
+        (ct.valor_frete / c.valor_nf * 100) as "Percentual do Frete"
+    FROM cotacoes_transportadoras ct
+    JOIN transportadoras t ON ct.transportadora_id = t.id
+    JOIN cotacoes c ON ct.cotacao_id = c.id
+    WHERE ct.cotacao_id = ?
+    ORDER BY ct.valor_frete
+"""
+
+# Edição/exclusão de cotação ----------------------------------------------
+
+EDITAR_CARREGAR_COTACAO = """
+    SELECT data, fornecedor, num_pedido, valor_nf, peso, volume, cubagem, transportadora_ganhadora_id
+    FROM cotacoes WHERE id = ?
+"""
+
+EDITAR_CARREGAR_FRETES = """
+    SELECT ct.transportadora_id, t.nome, ct.valor_frete, ct.selecionada
+    FROM cotacoes_transportadoras ct
+    JOIN transportadoras t ON ct.transportadora_id = t.id
+    WHERE ct.cotacao_id = ?
+"""
+
+EXCLUIR_FRETES_COTACAO = "DELETE FROM cotacoes_transportadoras WHERE cotacao_id = ?"
+
+EXCLUIR_COTACAO = "DELETE FROM cotacoes WHERE id = ?"
+
+# Calculadora de cubagem (gui/calculadora_window.py) -----------------------
+
+CUBAGEM_INSERIR_CALCULO = "INSERT INTO calculos_cubagem (cubagem_total, unidade) VALUES (?, ?)"
+
+# Um executemany por cálculo; parâmetros: calculo_id, posicao e as colunas
+# de pricing.cubagem.ItensCubagem.como_linhas()
+CUBAGEM_INSERIR_ITENS = """
+    INSERT INTO calculos_cubagem_itens
+        (calculo_id, posicao, quantidade, largura, comprimento, altura, total)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+CUBAGEM_CARREGAR_CALCULO = "SELECT cubagem_total, unidade FROM calculos_cubagem WHERE id = ?"
+
+CUBAGEM_CARREGAR_ITENS = """
+    SELECT quantidade, largura, comprimento, altura, total
+    FROM calculos_cubagem_itens
+    WHERE calculo_id = ?
+    ORDER BY posicao
+"""
+
+# Relatórios de cubagem (database/relatorio_cubagem.py); períodos em dias
+# epoch como no histórico
+
+# Cálculos e m³ por mês, só pelo índice (data_dia, cubagem_total): agrupa
+# por dia na ordem do índice e converte só os dias distintos em mês
+CUBAGEM_POR_MES = """
+    SELECT strftime('%Y-%m', d.data_dia * 86400, 'unixepoch') AS mes,
+           SUM(d.calculos) AS calculos,
+           SUM(d.cubagem) AS cubagem
+    FROM (
+        SELECT c.data_dia, COUNT(*) AS calculos, SUM(c.cubagem_total) AS cubagem
+        FROM calculos_cubagem c
+        WHERE c.data_dia BETWEEN ? AND ?
+        GROUP BY c.data_dia
+    ) d
+    GROUP BY mes
+    ORDER BY mes
+"""
+
+# Itens do período: linhas, volumes (soma das quantidades) e m³
+CUBAGEM_ITENS_PERIODO = """
+    SELECT COUNT(*), COALESCE(SUM(i.quantidade), 0), COALESCE(SUM(i.total), 0)
+    FROM calculos_cubagem c
+    JOIN calculos_cubagem_itens i ON i.calculo_id = c.id
+    WHERE c.data_dia BETWEEN ? AND ?
+"""
+
+# Maiores linhas de item (m³ da linha) de todo o histórico
+CUBAGEM_MAIORES_ITENS = """
+    SELECT i.calculo_id, c.data, c.unidade, i.quantidade, i.largura, i.comprimento, i.altura, i.total
+    FROM calculos_cubagem_itens i
+    JOIN calculos_cubagem c ON c.id = i.calculo_id
+    ORDER BY i.total DESC
+    LIMIT ?
+"""
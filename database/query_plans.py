@@ -0,0 +1,144 @@
+# query_plans.py - REGRESSÃO DE PLANOS DE CONSULTA
+"""Roda EXPLAIN QUERY PLAN em todas as consultas de produção.
+
+Falha quando alguma consulta volta a fazer SCAN em uma tabela grande. Só
+passam SEARCH (busca por índice ou rowid) e o SCAN por índice que percorre
+o ORDER BY de uma consulta com LIMIT (para depois de LIMIT linhas); um SCAN
+USING INDEX sem restrição lê a tabela inteira como um SCAN comum. Uso
+(retorna código 1 se houver regressão):
+
+    python -m database.query_plans              # banco temporário com o schema atual
+    python -m database.query_plans --db data/transportadora.db
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+from database import queries
+
+# Tabelas que crescem com o uso; as demais (transportadoras, contatos) são pequenas
+LARGE_TABLES = {"cotacoes", "cotacoes_transportadoras", "calculos_cubagem", "calculos_cubagem_itens"}
+
+# "SCAN c" / "SCAN cotacoes" / "SCAN ct USING COVERING INDEX ..."
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(.*)$")
+_ORDER_LIMIT_RE = re.compile(r"\bORDER\s+BY\b.*\bLIMIT\b", re.IGNORECASE | re.DOTALL)
+
+
+def production_queries():
+    """Lista (nome, sql, parâmetros de exemplo) de todas as consultas"""
+    periodo = (19723, 20088)  # 2024-01-01 a 2024-12-31 em dias epoch
+    checks = [
+        ("dashboard_resumo", queries.DASHBOARD_RESUMO, periodo),
+        ("dashboard_fretes_vencedores", queries.DASHBOARD_FRETES_VENCEDORES, ()),
+        ("dashboard_cotacoes_recentes", queries.DASHBOARD_COTACOES_RECENTES, ()),
+        ("historico_total_periodo", queries.HISTORICO_TOTAL_PERIODO, periodo),
+        ("historico_detalhe_cotacao", queries.HISTORICO_DETALHE_COTACAO, (1,)),
+        ("historico_detalhe_fretes", queries.HISTORICO_DETALHE_FRETES, (1,)),
+        ("exportar_cotacao", queries.EXPORTAR_COTACAO, (1,)),
+        ("exportar_cotacao_fretes", queries.EXPORTAR_COTACAO_FRETES, (1,)),
+        ("editar_carregar_cotacao", queries.EDITAR_CARREGAR_COTACAO, (1,)),
+        ("editar_carregar_fretes", queries.EDITAR_CARREGAR_FRETES, (1,)),
+        ("excluir_fretes_cotacao", queries.EXCLUIR_FRETES_COTACAO, (1,)),
+        ("excluir_cotacao", queries.EXCLUIR_COTACAO, (1,)),
+        ("cubagem_carregar_calculo", queries.CUBAGEM_CARREGAR_CALCULO, (1,)),
+        ("cubagem_carregar_itens", queries.CUBAGEM_CARREGAR_ITENS, (1,)),
+        ("cubagem_por_mes", queries.CUBAGEM_POR_MES, periodo),
+        ("cubagem_itens_periodo", queries.CUBAGEM_ITENS_PERIODO, periodo),
+        ("cubagem_maiores_itens", queries.CUBAGEM_MAIORES_ITENS, (20,)),
+    ]
+    modos = ((False, ""), (True, "_like"), (queries.FILTRO_FTS, "_fts"))
+    for fornecedor, sufixo_f in modos:
+        for transportadora, sufixo_t in modos:
+            sufixo = sufixo_f.replace("_", "_fornecedor_", 1) + sufixo_t.replace("_", "_transportadora_", 1)
+            filtros = (("%x%",) if fornecedor else ()) + (("%x%",) if transportadora else ())
+            for colunas, nome in ((queries.HISTORICO_COLUNAS, "historico"),
+                                  (queries.HISTORICO_COLUNAS_EXPORTACAO, "historico_exportacao")):
+                sql = queries.historico_query(colunas, fornecedor, transportadora)
+                checks.append((nome + sufixo, sql, periodo + filtros))
+            sql = queries.historico_query(queries.HISTORICO_COLUNAS, fornecedor, transportadora, paginada=True)
+            checks.append(("historico_pagina" + sufixo, sql, periodo[:1] + filtros + (periodo[1] + 1, 0, 200)))
+    for fornecedor, transportadora in ((True, False), (False, True), (True, True)):
+        sufixo = "_fornecedor" * fornecedor + "_transportadora" * transportadora
+        filtros = ("%x%",) * (fornecedor + transportadora)
+        checks.append(("historico_ids" + sufixo, queries.historico_ids_query(fornecedor, transportadora),
+                       ("[1, 2, 3]", periodo[0]) + filtros + (periodo[1] + 1, 0)))
+    checks.append(("historico_pagina_ids", queries.HISTORICO_PAGINA_IDS, ("[1, 2, 3]",)))
+    checks.append(("busca_candidatos", queries.BUSCA_CANDIDATOS,
+                   (queries.termo_coluna("fornecedor", "abc"), 1000)))
+    checks.append(("busca_geral", queries.busca_query(), (queries.termo_busca("abc"), 200)))
+    checks.append(("busca_geral_exportacao",
+                   queries.busca_query(queries.HISTORICO_COLUNAS_EXPORTACAO, limitada=False),
+                   (queries.termo_busca("abc"),)))
+    return checks
+
+
+def full_scans(conn, sql, params=()):
+    """Retorna as linhas do plano que varrem uma tabela grande"""
+    plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    # O índice só substitui a ordenação se não houver B-tree temporária
+    # para o ORDER BY; com LIMIT a varredura para nas primeiras linhas
+    ordered_walk = (_ORDER_LIMIT_RE.search(sql) is not None
+                    and not any("TEMP B-TREE FOR ORDER BY" in row[-1] for row in plan))
+    problems = []
+    for row in plan:
+        detail = row[-1]
+        match = _SCAN_RE.match(detail)
+        if not match:
+            continue
+        table, _alias, rest = match.groups()
+        # O plano mostra o alias ("c", "ct"); resolve pelo FROM/JOIN da consulta
+        real_table = _resolve_alias(sql, table)
+        if real_table in LARGE_TABLES and not (ordered_walk and "USING" in rest and "INDEX" in rest):
+            problems.append(detail)
+    return problems
+
+
+def _resolve_alias(sql, name):
+    """Converte o alias usado no plano para o nome da tabela"""
+    match = re.search(r"\b(\w+)\s+(?:AS\s+)?" + re.escape(name) + r"\b(?!\s*\.)", sql, re.IGNORECASE)
+    if match and match.group(1).lower() in LARGE_TABLES:
+        return match.group(1).lower()
+    return name.lower()
+
+
+def check_plans(conn):
+    """Verifica todas as consultas; retorna {nome: [linhas problemáticas]}"""
+    failures = {}
+    for name, sql, params in production_queries():
+        problems = full_scans(conn, sql, params)
+        if problems:
+            failures[name] = problems
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica os planos das consultas de produção")
+    parser.add_argument("--db", help="Banco a verificar (padrão: banco temporário novo)")
+    args = parser.parse_args()
+
+    from database.database import Database
+
+    with tempfile.TemporaryDirectory() as pasta:
+        db_path = args.db or os.path.join(pasta, "planos.db")
+        db = Database(db_path)
+        try:
+            with db.connection() as conn:
+                failures = check_plans(conn)
+        finally:
+            db.close()
+
+    total = len(production_queries())
+    if failures:
+        for name, problems in failures.items():
+            for detail in problems:
+                print(f"❌ {name}: {detail}")
+        print(f"{len(failures)} de {total} consultas fazem SCAN em tabela grande")
+        return 1
+    print(f"✅ {total} consultas verificadas, nenhum SCAN em tabela grande")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# relatorio_cubagem.py - RELATÓRIO DOS CÁLCULOS DE CUBAGEM
+"""Totais de cubagem por período, calculados no SQLite.
+
+Desde a migração v008 os itens de cada cálculo ficam em
+calculos_cubagem_itens com colunas numéricas, então os totais saem de
+agregações (queries.CUBAGEM_*) sobre índices em vez de ler e interpretar o
+JSON de cada cálculo em Python. carregar_calculo devolve os itens de um
+cálculo salvo para o plano de carregamento (pricing.carregamento).
+
+Linha de comando:
+
+    python -m database.relatorio_cubagem --db cotacoes.db --inicio 2024-01-01 --fim 2024-12-31
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Tuple
+
+from database import queries
+from pricing.cubagem import ItensCubagem
+from utils.datas import dia_epoch
+
+
+@dataclass(frozen=True)
+class CubagemMes:
+    mes: str  # 'AAAA-MM'
+    calculos: int
+    cubagem: float
+
+
+@dataclass(frozen=True)
+class ItemCubagem:
+    calculo_id: int
+    data: str
+    unidade: Optional[str]
+    quantidade: float
+    largura: float
+    comprimento: float
+    altura: float
+    total: float
+
+
+@dataclass(frozen=True)
+class RelatorioCubagem:
+    meses: Tuple[CubagemMes, ...] = ()
+    linhas_itens: int = 0
+    volumes: float = 0
+    cubagem_itens: float = 0
+    maiores_itens: Tuple[ItemCubagem, ...] = ()
+
+    @property
+    def calculos(self):
+        return sum(m.calculos for m in self.meses)
+
+    @property
+    def cubagem(self):
+        return sum(m.cubagem for m in self.meses)
+
+
+def relatorio(conn, dia_inicio, dia_fim, maiores=10):
+    """Relatório do período [dia_inicio, dia_fim] (dias epoch, inclusivos)
+
+    Os maiores itens são os de todo o histórico.
+    """
+    meses = tuple(CubagemMes(*linha) for linha in
+                  conn.execute(queries.CUBAGEM_POR_MES, (dia_inicio, dia_fim)))
+    linhas_itens, volumes, cubagem_itens = conn.execute(
+        queries.CUBAGEM_ITENS_PERIODO, (dia_inicio, dia_fim)).fetchone()
+    maiores_itens = tuple(ItemCubagem(*linha) for linha in
+                          conn.execute(queries.CUBAGEM_MAIORES_ITENS, (maiores,)))
+    return RelatorioCubagem(meses, linhas_itens, volumes, cubagem_itens, maiores_itens)
+
+
+def carregar_calculo(conn, calculo_id):
+    """Itens de um cálculo salvo como ItensCubagem (None se o id não existe)
+
+    Cálculos anteriores à coluna unidade ficam em cm, como na calculadora.
+    """
+    calculo = conn.execute(queries.CUBAGEM_CARREGAR_CALCULO, (calculo_id,)).fetchone()
+    if calculo is None:
+        return None
+    itens = ItensCubagem(calculo[1] or "cm")
+    linhas = conn.execute(queries.CUBAGEM_CARREGAR_ITENS, (calculo_id,)).fetchall()
+    if linhas:
+        # total é derivado: ItensCubagem recalcula a partir das medidas
+        itens.adicionar_lote(*list(zip(*linhas))[:4])
+    return itens
+
+
+def main():
+    from database.database import Database
+
+    parser = argparse.ArgumentParser(description="Totais dos cálculos de cubagem por mês")
+    parser.add_argument("--db", dest="db_path", help="Caminho do banco SQLite")
+    parser.add_argument("--inicio", type=date.fromisoformat, default=date(1970, 1, 1), help="AAAA-MM-DD")
+    parser.add_argument("--fim", type=date.fromisoformat, default=date(9999, 12, 31), help="AAAA-MM-DD")
+    parser.add_argument("--maiores", type=int, default=10, help="Quantos maiores itens listar")
+    args = parser.parse_args()
+
+    db = Database(args.db_path, profile="analytics")
+    conn = db.get_connection()
+    try:
+        inicio = time.perf_counter()
+        dados = relatorio(conn, dia_epoch(args.inicio), dia_epoch(args.fim), args.maiores)
+        segundos = time.perf_counter() - inicio
+    finally:
+        conn.close()
+        db.close()
+
+    for mes in dados.meses:
+        print(f"   {mes.mes}  {mes.calculos:8d} cálculos  {mes.cubagem:14.3f} m³")
+    print(f"📦 {dados.calculos} cálculos, {dados.cubagem:.3f} m³, "
+          f"{dados.volumes:.0f} volumes em {dados.linhas_itens} linhas de item")
+    if dados.maiores_itens:
+        print("🔝 Maiores itens:")
+        for item in dados.maiores_itens:
+            medidas = f"{item.largura:g} x {item.comprimento:g} x {item.altura:g} {item.unidade or ''}"
+            print(f"   cálculo {item.calculo_id} ({item.data[:10]}): "
+                  f"{item.quantidade:g} x {medidas.strip()} = {item.total:.3f} m³")
+    print(f"✅ Relatório em {segundos * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
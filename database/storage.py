@@ -0,0 +1,94 @@
+import os
+import configparser
+from dataclasses import dataclass
+
+DEFAULT_DB_PATH = "data/transportadora.db"
+DEFAULT_PROFILE = "fast"
+CONFIG_FILE = "cotacoes.ini"
+
+ENV_DB_PATH = "COTACOES_DB_PATH"
+ENV_PROFILE = "COTACOES_STORAGE_PROFILE"
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    name: str
+    description: str
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = -64000        # negativo = KiB (64 MB)
+    mmap_size: int = 268435456      # 256 MB
+    temp_store: str = "MEMORY"
+    busy_timeout: int = 30000
+    read_only: bool = False
+
+    def pragmas(self):
+        """Lista de PRAGMAs aplicados em cada conexão nova"""
+        pragmas = [f"PRAGMA busy_timeout = {self.busy_timeout}"]
+        if not self.read_only:
+            pragmas.append(f"PRAGMA journal_mode = {self.journal_mode}")
+        pragmas += [
+            f"PRAGMA synchronous = {self.synchronous}",
+            f"PRAGMA cache_size = {self.cache_size}",
+            f"PRAGMA mmap_size = {self.mmap_size}",
+            f"PRAGMA temp_store = {self.temp_store}",
+        ]
+        if self.read_only:
+            pragmas.append("PRAGMA query_only = ON")
+        return pragmas
+
+
+PROFILES = {
+    # WAL deixa o histórico ler enquanto salvar_cotacao grava
+    "fast": StorageProfile(
+        name="fast",
+        description="WAL + synchronous NORMAL (padrão do sistema)",
+    ),
+    # Cada commit vai para o disco antes de retornar
+    "safe": StorageProfile(
+        name="safe",
+        description="WAL + synchronous FULL, sem mmap",
+        synchronous="FULL",
+        cache_size=-16000,
+        mmap_size=0,
+    ),
+    # Somente leitura para consultas pesadas/relatórios
+    "analytics": StorageProfile(
+        name="analytics",
+        description="Somente leitura, cache e mmap grandes",
+        cache_size=-256000,
+        mmap_size=1073741824,
+        read_only=True,
+    ),
+}
+
+
+def get_profile(name):
+    """Retorna o perfil pelo nome, com erro claro se não existir"""
+    try:
+        return PROFILES[name.strip().lower()]
+    except KeyError:
+        validos = ", ".join(sorted(PROFILES))
+        raise ValueError(f"Perfil de armazenamento desconhecido: {name!r} (use: {validos})")
+
+
+def load_config(config_file=CONFIG_FILE):
+    """Lê a seção [database] do arquivo de configuração, se existir"""
+    parser = configparser.ConfigParser()
+    if os.path.exists(config_file):
+        parser.read(config_file, encoding="utf-8")
+    if parser.has_section("database"):
+        return dict(parser.items("database"))
+    return {}
+
+
+def resolve_settings(db_path=None, profile=None, config_file=CONFIG_FILE):
+    """Resolve caminho e perfil: argumento > variável de ambiente > arquivo > padrão"""
+    config = load_config(config_file)
+    db_path = (db_path or os.environ.get(ENV_DB_PATH)
+               or config.get("path") or DEFAULT_DB_PATH)
+    profile = (profile or os.environ.get(ENV_PROFILE)
+               or config.get("profile") or DEFAULT_PROFILE)
+    if isinstance(profile, str):
+        profile = get_profile(profile)
+    return db_path, profile
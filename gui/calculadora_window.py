@@ -1,19 +1,27 @@
 # calculadora_window.py - DESIGN PREMIUM
+import os
 import sqlite3
-import json
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QLabel, QLineEdit, QTableWidget, QTableWidgetItem,
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
+                             QLabel, QTableView, QAbstractItemView, QShortcut,
                              QHeaderView, QMessageBox, QGroupBox, QFormLayout,
                              QDoubleSpinBox, QComboBox, QScrollArea, QRadioButton,
-                             QButtonGroup, QFrame)
+                             QButtonGroup, QFrame, QFileDialog)
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
+from PyQt5.QtGui import QFont, QKeySequence
+
+from database import queries
+from gui.cubagem_model import CubagemModel, CubagemDelegate
+from pricing.carregamento import ROTACOES, VEICULOS, planejar, planejar_frota, resumo
+from pricing.cubagem import ItensCubagem, ler_arquivo, ler_numero, ler_texto
+
+_NOMES_UNIDADE = {"cm": "centímetros", "m": "metros"}
 
 class CalculadoraWindow(QWidget):
     def __init__(self, db):
         super().__init__()
         self.db = db
-        self.itens = []
+        # Valores numéricos das linhas; a tabela só exibe
+        self.itens = ItensCubagem("cm")
         self.setup_ui()
     
     def setup_ui(self):
@@ -143,9 +151,8 @@ class CalculadoraWindow(QWidget):
         # Configura CM como padrão
         self.radio_cm.setChecked(True)
         
-        # Conecta mudança de unidade
+        # Conecta mudança de unidade (um sinal basta: os dois mudam juntos)
         self.radio_cm.toggled.connect(self.recalcular_tudo)
-        self.radio_metros.toggled.connect(self.recalcular_tudo)
         
         config_layout.addWidget(label)
         config_layout.addWidget(self.radio_cm)
@@ -180,16 +187,25 @@ class CalculadoraWindow(QWidget):
         group_layout = QVBoxLayout()
         group_layout.setSpacing(15)
         
-        # Tabela premium
-        self.tabela = QTableWidget()
-        self.tabela.setColumnCount(6)
-        self.tabela.setHorizontalHeaderLabels([
-            "Item", "Quantidade", "Largura", "Comprimento", "Altura", "Total (m³)"
-        ])
+        # Tabela premium: modelo sobre os arrays de ItensCubagem, sem widget
+        # por célula (o editor só existe na célula em edição)
+        self.tabela = QTableView()
+        self.modelo = CubagemModel(self.itens, self)
+        self.modelo.total_alterado.connect(self.calcular_total)
+        self.tabela.setModel(self.modelo)
+        self.tabela.setItemDelegate(CubagemDelegate(self.tabela))
+        self.tabela.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked
+                                    | QAbstractItemView.EditKeyPressed | QAbstractItemView.AnyKeyPressed)
+        
+        # Ctrl+V com a tabela em foco cola o bloco a partir da célula atual
+        # (dentro de um editor aberto o Ctrl+V continua sendo do editor)
+        atalho_colar = QShortcut(QKeySequence.Paste, self.tabela)
+        atalho_colar.setContext(Qt.WidgetShortcut)
+        atalho_colar.activated.connect(self.colar)
         
         # Estilo premium da tabela
         self.tabela.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background: white;
                 border: 2px solid #bdc3c7;
                 border-radius: 8px;
@@ -203,14 +219,20 @@ class CalculadoraWindow(QWidget):
                 border: none;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
                 border-bottom: 1px solid #ecf0f1;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3498db;
                 color: white;
             }
+            QLineEdit {
+                padding: 2px 6px;
+                border: 1px solid #3498db;
+                border-radius: 4px;
+                font-size: 11px;
+            }
         """)
         
         # Configura larguras das colunas
@@ -221,6 +243,9 @@ class CalculadoraWindow(QWidget):
         header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
+        # Larguras medidas só nas linhas visíveis (com milhares de linhas o
+        # padrão mede 1000 a cada alteração)
+        header.setResizeContentsPrecision(0)
         
         group_layout.addWidget(self.tabela)
         
@@ -242,7 +267,37 @@ class CalculadoraWindow(QWidget):
             }
         """)
         btn_adicionar.clicked.connect(self.adicionar_linha)
-        group_layout.addWidget(btn_adicionar)
+        
+        # Listas inteiras: colar do Excel/e-mail ou abrir CSV/XLSX
+        btn_colar_lista = QPushButton("📋 COLAR LISTA")
+        btn_colar_lista.setFixedHeight(45)
+        btn_colar_lista.setToolTip("Cola uma lista de volumes copiada de uma planilha (com ou sem cabeçalho)")
+        btn_importar = QPushButton("📂 IMPORTAR CSV/XLSX")
+        btn_importar.setFixedHeight(45)
+        for btn in (btn_colar_lista, btn_importar):
+            btn.setStyleSheet("""
+                QPushButton {
+                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #2980b9, stop:1 #3498db);
+                    color: white;
+                    border: none;
+                    border-radius: 8px;
+                    font-weight: bold;
+                    font-size: 14px;
+                }
+                QPushButton:hover {
+                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #3498db, stop:1 #2980b9);
+                    border: 2px solid rgba(255,255,255,0.3);
+                }
+            """)
+        btn_colar_lista.clicked.connect(self.colar_lista)
+        btn_importar.clicked.connect(self.importar_arquivo)
+        
+        botoes_tabela = QHBoxLayout()
+        botoes_tabela.setSpacing(15)
+        botoes_tabela.addWidget(btn_adicionar, 2)
+        botoes_tabela.addWidget(btn_colar_lista, 1)
+        botoes_tabela.addWidget(btn_importar, 1)
+        group_layout.addLayout(botoes_tabela)
         
         group.setLayout(group_layout)
         layout.addWidget(group)
@@ -293,6 +348,70 @@ class CalculadoraWindow(QWidget):
         result_item_layout.addStretch()
         
         result_layout.addLayout(result_item_layout)
+        
+        # Plano de carregamento (pricing.carregamento)
+        carga_layout = QHBoxLayout()
+        label_veiculo = QLabel("VEÍCULO:")
+        label_veiculo.setFont(QFont("Arial", 12, QFont.Bold))
+        label_veiculo.setStyleSheet("color: #2c3e50;")
+        
+        self.combo_veiculo = QComboBox()
+        self.combo_veiculo.addItem("🚚 Automático (menor frota)", None)
+        for chave, perfil in VEICULOS.items():
+            self.combo_veiculo.addItem(
+                f"{perfil.nome} ({perfil.comprimento:.2f} × {perfil.largura:.2f} × {perfil.altura:.2f} m)"
+                .replace('.', ','), chave)
+        
+        self.combo_rotacao = QComboBox()
+        for chave, nome in ROTACOES.items():
+            self.combo_rotacao.addItem(f"Rotação: {nome}", chave)
+        
+        for combo in (self.combo_veiculo, self.combo_rotacao):
+            combo.setFont(QFont("Arial", 11))
+            combo.setStyleSheet("""
+                QComboBox {
+                    color: #2c3e50;
+                    background: #f8f9fa;
+                    border: 2px solid #bdc3c7;
+                    border-radius: 6px;
+                    padding: 6px;
+                }
+                QComboBox QAbstractItemView {
+                    background: white;
+                    color: #2c3e50;
+                }
+            """)
+        
+        btn_planejar = QPushButton("📦 PLANEJAR CARGA")
+        btn_planejar.setFixedHeight(35)
+        btn_planejar.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #8e44ad, stop:1 #9b59b6);
+                color: white;
+                border: none;
+                border-radius: 6px;
+                font-weight: bold;
+                font-size: 12px;
+                padding: 0 15px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #9b59b6, stop:1 #8e44ad);
+            }
+        """)
+        btn_planejar.clicked.connect(self.planejar_carga)
+        
+        carga_layout.addWidget(label_veiculo)
+        carga_layout.addWidget(self.combo_veiculo)
+        carga_layout.addWidget(self.combo_rotacao)
+        carga_layout.addWidget(btn_planejar)
+        carga_layout.addStretch()
+        result_layout.addLayout(carga_layout)
+        
+        self.label_carga = QLabel("")
+        self.label_carga.setFont(QFont("Arial", 11))
+        self.label_carga.setStyleSheet("color: #2c3e50; padding: 5px;")
+        self.label_carga.setWordWrap(True)
+        result_layout.addWidget(self.label_carga)
         group.setLayout(result_layout)
         layout.addWidget(group)
     
@@ -367,137 +486,69 @@ class CalculadoraWindow(QWidget):
     # MÉTODOS DE FUNCIONALIDADE
     def adicionar_linha(self):
         """Adiciona uma nova linha na tabela"""
-        row = self.tabela.rowCount()
-        self.tabela.insertRow(row)
-        
-        # Coluna 0: Número do item
-        item_num = QTableWidgetItem(str(row + 1))
-        item_num.setFlags(item_num.flags() & ~Qt.ItemIsEditable)
-        item_num.setBackground(Qt.lightGray)
-        self.tabela.setItem(row, 0, item_num)
-        
-        # Coluna 1: Quantidade
-        quantidade_input = QLineEdit()
-        quantidade_input.setPlaceholderText("1")
-        quantidade_input.setText("1")
-        quantidade_input.setStyleSheet("""
-            QLineEdit {
-                padding: 8px;
-                border: 1px solid #bdc3c7;
-                border-radius: 4px;
-                font-size: 11px;
-            }
-            QLineEdit:focus {
-                border-color: #3498db;
-            }
-        """)
-        quantidade_input.textChanged.connect(self.recalcular_linha)
-        self.tabela.setCellWidget(row, 1, quantidade_input)
-        
-        # Coluna 2: Largura
-        largura_input = QLineEdit()
-        largura_input.setPlaceholderText("0")
-        largura_input.setStyleSheet("""
-            QLineEdit {
-                padding: 8px;
-                border: 1px solid #bdc3c7;
-                border-radius: 4px;
-                font-size: 11px;
-            }
-            QLineEdit:focus {
-                border-color: #3498db;
-            }
-        """)
-        largura_input.textChanged.connect(self.recalcular_linha)
-        self.tabela.setCellWidget(row, 2, largura_input)
-        
-        # Coluna 3: Comprimento
-        comprimento_input = QLineEdit()
-        comprimento_input.setPlaceholderText("0")
-        comprimento_input.setStyleSheet("""
-            QLineEdit {
-                padding: 8px;
-                border: 1px solid #bdc3c7;
-                border-radius: 4px;
-                font-size: 11px;
-            }
-            QLineEdit:focus {
-                border-color: #3498db;
-            }
-        """)
-        comprimento_input.textChanged.connect(self.recalcular_linha)
-        self.tabela.setCellWidget(row, 3, comprimento_input)
-        
-        # Coluna 4: Altura
-        altura_input = QLineEdit()
-        altura_input.setPlaceholderText("0")
-        altura_input.setStyleSheet("""
-            QLineEdit {
-                padding: 8px;
-                border: 1px solid #bdc3c7;
-                border-radius: 4px;
-                font-size: 11px;
-            }
-            QLineEdit:focus {
-                border-color: #3498db;
-            }
-        """)
-        altura_input.textChanged.connect(self.recalcular_linha)
-        self.tabela.setCellWidget(row, 4, altura_input)
-        
-        # Coluna 5: Total (readonly)
-        total_item = QTableWidgetItem("0,000 m³")
-        total_item.setFlags(total_item.flags() & ~Qt.ItemIsEditable)
-        total_item.setBackground(Qt.lightGray)
-        self.tabela.setItem(row, 5, total_item)
+        self.modelo.adicionar_linha()
     
-    def parse_number(self, text):
-        """Converte texto para número, aceita . ou , como separador decimal"""
-        if not text:
-            return 0.0
-        
-        text = str(text).replace(',', '.').strip()
+    def colar(self):
+        """Cola da área de transferência (colunas separadas por tabulação)"""
+        atual = self.tabela.currentIndex()
+        linha = atual.row() if atual.isValid() else 0
+        coluna = atual.column() if atual.isValid() else 1
+        self.modelo.colar(QApplication.clipboard().text(), linha, coluna)
+    
+    def colar_lista(self):
+        """Cola uma lista de volumes inteira (cabeçalho e unidade detectados)"""
+        self.importar_lista(ler_texto(QApplication.clipboard().text()), "área de transferência")
+    
+    def importar_arquivo(self, caminho=None):
+        """Carrega os volumes de um CSV ou XLSX"""
+        if not caminho:
+            caminho, _ = QFileDialog.getOpenFileName(
+                self, "Importar volumes", "", "Planilhas (*.xlsx *.xlsm *.csv *.txt);;Todos os arquivos (*)")
+            if not caminho:
+                return
         try:
-            return float(text) if text else 0.0
-        except:
-            return 0.0
+            lista = ler_arquivo(caminho)
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao ler o arquivo: {e}")
+            return
+        self.importar_lista(lista, os.path.basename(caminho))
     
-    def recalcular_linha(self):
-        """Recalcula uma linha específica quando os valores mudam"""
-        for row in range(self.tabela.rowCount()):
-            quantidade_input = self.tabela.cellWidget(row, 1)
-            largura_input = self.tabela.cellWidget(row, 2)
-            comprimento_input = self.tabela.cellWidget(row, 3)
-            altura_input = self.tabela.cellWidget(row, 4)
-            
-            if (quantidade_input and largura_input and 
-                comprimento_input and altura_input):
-                
-                # Pega os valores
-                quantidade = self.parse_number(quantidade_input.text()) or 1
-                largura = self.parse_number(largura_input.text())
-                comprimento = self.parse_number(comprimento_input.text())
-                altura = self.parse_number(altura_input.text())
-                
-                # Calcula o volume
-                volume_unitario = largura * comprimento * altura
-                volume_total = volume_unitario * quantidade
-                
-                # Converte para m³ se estiver em cm
-                if self.radio_cm.isChecked():
-                    volume_total /= 1000000  # cm³ para m³
-                
-                # Atualiza o total da linha
-                total_item = self.tabela.item(row, 5)
-                if total_item:
-                    total_item.setText(f"{volume_total:.3f} m³")
-        
-        self.calcular_total()
+    def importar_lista(self, lista, origem):
+        """Põe uma ListaCubagem na tabela de uma vez
+        
+        Com a tabela ainda em branco a lista a substitui e a unidade da
+        tela passa a ser a detectada; senão as linhas são acrescentadas e,
+        se a unidade detectada for outra, o usuário é avisado.
+        """
+        if not len(lista):
+            QMessageBox.warning(self, "Aviso", f"Nenhum volume com medidas encontrado em {origem}.")
+            return
+        
+        mensagem = f"{len(lista)} volume(s) importado(s) de {origem}."
+        unidade_tela = "cm" if self.radio_cm.isChecked() else "m"
+        if self.modelo.vazio():
+            self.modelo.limpar()
+            if lista.unidade and lista.unidade != unidade_tela:
+                # Troca o radio (e a unidade do modelo) antes de inserir
+                (self.radio_cm if lista.unidade == "cm" else self.radio_metros).setChecked(True)
+            if lista.unidade:
+                detectada = "pelo cabeçalho" if lista.origem_unidade == "cabecalho" else "pelos valores"
+                mensagem += f"\nUnidade: {_NOMES_UNIDADE[lista.unidade]} (detectada {detectada})."
+        elif lista.unidade and lista.unidade != unidade_tela:
+            mensagem += (f"\n⚠️ A lista parece estar em {_NOMES_UNIDADE[lista.unidade]}, mas a tabela "
+                         f"está em {_NOMES_UNIDADE[unidade_tela]}. Confira a unidade antes de salvar.")
+        self.modelo.adicionar_lista(lista)
+        if lista.ignoradas:
+            mensagem += f"\n{lista.ignoradas} linha(s) sem medidas ignorada(s)."
+        QMessageBox.information(self, "Importação", mensagem)
+    
+    def parse_number(self, text):
+        """Converte texto para número, aceita . ou , como separador decimal"""
+        return ler_numero(text)
     
     def recalcular_tudo(self):
-        """Recalcula tudo quando a unidade muda"""
-        for row in range(self.tabela.rowCount()):
-            self.recalcular_linha()
+        """Recalcula tudo quando a unidade muda (uma conta vetorizada)"""
+        self.modelo.definir_unidade("cm" if self.radio_cm.isChecked() else "m")
     
     def calcular_tudo(self):
         """Força o cálculo de todas as linhas"""
@@ -505,19 +556,23 @@ class CalculadoraWindow(QWidget):
         QMessageBox.information(self, "Cálculo", "Cubagem calculada com sucesso!")
     
     def calcular_total(self):
-        """Calcula o total geral de cubagem"""
-        total_geral = 0.0
-        
-        for row in range(self.tabela.rowCount()):
-            total_item = self.tabela.item(row, 5)
-            if total_item and total_item.text():
-                try:
-                    valor = float(total_item.text().replace(' m³', '').replace(',', '.'))
-                    total_geral += valor
-                except:
-                    pass
-        
-        self.label_total_valor.setText(f"{total_geral:.3f} m³")
+        """Mostra o total geral de cubagem (mantido por ItensCubagem)"""
+        self.label_total_valor.setText(f"{self.itens.total:.3f} m³")
+        # Plano de carga anterior deixa de valer com a lista alterada
+        self.label_carga.clear()
+    
+    def planejar_carga(self):
+        """Quantos veículos a lista ocupa, no perfil escolhido ou no melhor deles"""
+        rotacao = self.combo_rotacao.currentData()
+        veiculo = self.combo_veiculo.currentData()
+        if veiculo:
+            plano = planejar(self.itens, VEICULOS[veiculo], rotacao)
+        else:
+            plano = planejar_frota(self.itens, rotacao=rotacao)[0]
+        if not plano.caixas and not plano.sem_lugar:
+            QMessageBox.warning(self, "Aviso", "Não há volumes com medidas para carregar!")
+            return
+        self.label_carga.setText(f"🚚 {resumo(plano)}")
     
     def limpar_tudo(self):
         """Limpa toda a tabela"""
@@ -528,43 +583,18 @@ class CalculadoraWindow(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            self.tabela.setRowCount(0)
-            self.label_total_valor.setText("0,000 m³")
+            self.modelo.limpar()
             # Adiciona uma linha vazia
             self.adicionar_linha()
     
     def salvar_calculo(self):
         """Salva o cálculo no banco de dados"""
         try:
-            # Coleta todos os itens
-            itens_data = []
-            for row in range(self.tabela.rowCount()):
-                quantidade_input = self.tabela.cellWidget(row, 1)
-                largura_input = self.tabela.cellWidget(row, 2)
-                comprimento_input = self.tabela.cellWidget(row, 3)
-                altura_input = self.tabela.cellWidget(row, 4)
-                total_item = self.tabela.item(row, 5)
-                
-                if (quantidade_input and largura_input and 
-                    comprimento_input and altura_input and total_item):
-                    
-                    quantidade = self.parse_number(quantidade_input.text()) or 1
-                    largura = self.parse_number(largura_input.text())
-                    comprimento = self.parse_number(comprimento_input.text())
-                    altura = self.parse_number(altura_input.text())
-                    total = self.parse_number(total_item.text().replace(' m³', ''))
-                    
-                    itens_data.append({
-                        'quantidade': quantidade,
-                        'largura': largura,
-                        'comprimento': comprimento,
-                        'altura': altura,
-                        'total': total
-                    })
-            
-            cubagem_total = self.parse_number(self.label_total_valor.text().replace(' m³', ''))
+            # Itens e total vêm do armazenamento numérico
+            linhas = self.itens.como_linhas()
+            cubagem_total = round(self.itens.total, 3)
             
-            if not itens_data:
+            if not linhas:
                 QMessageBox.warning(self, "Aviso", "Não há dados para salvar!")
                 return
             
@@ -572,13 +602,13 @@ class CalculadoraWindow(QWidget):
             cursor = conn.cursor()
             
             try:
-                cursor.execute('''
-                    INSERT INTO calculos_cubagem (itens_json, cubagem_total)
-                    VALUES (?, ?)
-                ''', (
-                    json.dumps(itens_data),
-                    cubagem_total
-                ))
+                # Cálculo e itens na mesma transação; itens num único executemany
+                cursor.execute(queries.CUBAGEM_INSERIR_CALCULO, (cubagem_total, self.itens.unidade))
+                calculo_id = cursor.lastrowid
+                cursor.executemany(
+                    queries.CUBAGEM_INSERIR_ITENS,
+                    ((calculo_id, posicao) + linha for posicao, linha in enumerate(linhas))
+                )
                 
                 conn.commit()
                 QMessageBox.information(self, "Sucesso", "Cálculo salvo com sucesso!")
@@ -7,13 +7,50 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QDoubleSpinBox, QComboBox, QDateEdit, QScrollArea)
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
+from gui.workers import ExecutorBanco
+from pricing import motor
+from pricing.motor import RegraTransportadora
+from utils.formatters import Formatters
+
+
+def gravar_cotacao(conn, tarefa, dados, fretes_data):
+    """Roda no executor: grava a cotação e os fretes numa única transação"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            INSERT INTO cotacoes 
+            (data, fornecedor, num_pedido, valor_nf, peso, volume, cubagem, transportadora_ganhadora_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', dados)
+        
+        cotacao_id = cursor.lastrowid
+        
+        for frete in fretes_data:
+            cursor.execute('''
+                INSERT INTO cotacoes_transportadoras 
+                (cotacao_id, transportadora_id, valor_frete, selecionada)
+                VALUES (?, ?, ?, ?)
+            ''', (cotacao_id, frete['transportadora_id'], frete['valor_frete'], frete['selecionada']))
+        
+        conn.commit()
+        return cotacao_id
+    except Exception:
+        conn.rollback()
+        raise
+
 
 class CotacaoWindow(QWidget):
     def __init__(self, db):
         super().__init__()
         self.db = db
+        self.executor = ExecutorBanco(db, self, max_threads=1)
         self.transportadoras = []
+        self.regras = []
         self.cotacao_data = []
+        # Valores numéricos mantidos a cada digitação; os cálculos não relêem
+        # o texto formatado das células
+        self.valor_nf = motor.ZERO
+        self.valores_informados = {}
         self.setup_ui()
         self.carregar_transportadoras()
     
@@ -334,6 +371,7 @@ class CotacaoWindow(QWidget):
         btn_limpar.clicked.connect(self.limpar_formulario)
         
         btn_salvar = QPushButton("💾 SALVAR COTAÇÃO")
+        self.btn_salvar = btn_salvar
         btn_salvar.setFixedHeight(50)
         btn_salvar.setStyleSheet("""
             QPushButton {
@@ -373,6 +411,7 @@ class CotacaoWindow(QWidget):
     def on_valor_nf_changed(self, texto):
         """Formata qualquer valor digitado e calcula Rodocargas"""
         if not texto:
+            self.valor_nf = motor.ZERO
             self.limpar_rodocargas()
             return
         
@@ -383,44 +422,27 @@ class CotacaoWindow(QWidget):
             self.valor_nf_input.setCursorPosition(len(texto_formatado))
             self.valor_nf_input.blockSignals(False)
         
+        self.valor_nf = Formatters.parse_decimal(texto_formatado or texto)
         self.calcular_rodocargas_automatico()
 
-    def parse_number(self, text):
-        """Converte texto para número"""
-        if not text:
-            return 0.0
-        
-        try:
-            text = str(text).replace('R$', '').replace(' ', '').strip()
-            
-            if '.' in text and text.count('.') == 1:
-                partes = text.split('.')
-                if len(partes) == 2 and partes[1].isdigit():
-                    return float(text)
-            
-            text = text.replace('.', '').replace(',', '.')
-            return float(text) if text else 0.0
-        except:
-            return 0.0
-
     def get_valor_nf_numerico(self):
         """Retorna o valor da NF como número"""
-        return self.parse_number(self.valor_nf_input.text())
+        return float(self.valor_nf)
     
     def get_peso_numerico(self):
-        return self.parse_number(self.peso_input.text())
+        return Formatters.parse_number(self.peso_input.text())
     
     def get_cubagem_numerico(self):
-        return self.parse_number(self.cubagem_input.text())
+        return Formatters.parse_number(self.cubagem_input.text())
 
     def carregar_transportadoras(self):
         """Carrega transportadoras do banco"""
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT id, nome, cnpj, percentual_base, icms FROM transportadoras ORDER BY nome')
-            self.transportadoras = cursor.fetchall()
-            conn.close()
+            with self.db.connection() as conn:
+                self.transportadoras = conn.execute(
+                    'SELECT id, nome, cnpj, percentual_base, icms FROM transportadoras ORDER BY nome').fetchall()
+            self.regras = [RegraTransportadora.de_linha(t) for t in self.transportadoras]
+            self.valores_informados = {}
             self.atualizar_tabela_transportadoras()
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar transportadoras: {e}")
@@ -497,7 +519,9 @@ class CotacaoWindow(QWidget):
 
     def on_valor_frete_changed(self, texto, row):
         """Formata qualquer valor digitado nos campos de frete"""
+        transportadora_id = self.regras[row].id
         if not texto:
+            self.valores_informados.pop(transportadora_id, None)
             self.atualizar_calculos(row)
             return
         
@@ -510,6 +534,7 @@ class CotacaoWindow(QWidget):
                 valor_input.setCursorPosition(len(texto_formatado))
                 valor_input.blockSignals(False)
         
+        self.valores_informados[transportadora_id] = Formatters.parse_decimal(texto_formatado or texto)
         self.atualizar_calculos(row)
 
     def limpar_rodocargas(self):
@@ -526,72 +551,51 @@ class CotacaoWindow(QWidget):
 
     def calcular_rodocargas_automatico(self):
         """Calcula Rodocargas automaticamente"""
-        valor_nf = self.get_valor_nf_numerico()
-        
-        if valor_nf <= 0:
+        if self.valor_nf <= 0:
             self.limpar_rodocargas()
             return
         
-        for row, transp in enumerate(self.transportadoras):
-            if transp[1].lower() == "rodocargas":
-                percentual_base = transp[3] or 14.0
-                icms = transp[4] or 7.0
-                
-                valor_percentual = valor_nf * (percentual_base / 100)
-                valor_icms = valor_percentual * (icms / 100)
-                valor_total = valor_percentual + valor_icms
+        for row, regra in enumerate(self.regras):
+            if regra.automatica:
+                resultado = motor.calcular_frete(self.valor_nf, regra)
                 
                 valor_label = self.table_transportadoras.cellWidget(row, 1)
                 if valor_label:
-                    valor_formatado = f"R$ {valor_total:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                    valor_label.setText(valor_formatado)
+                    valor_label.setText(Formatters.format_moeda(resultado.valor_frete))
                 
-                self.atualizar_calculos(row)
+                self.mostrar_resultado(row, resultado)
                 break
 
     def atualizar_calculos(self, row):
         """Atualiza os cálculos"""
         try:
-            valor_nf = self.get_valor_nf_numerico()
-            
-            if valor_nf <= 0:
-                self.table_transportadoras.item(row, 2).setText("0,00%")
-                self.table_transportadoras.item(row, 3).setText("")
-                return
-            
-            transportadora = self.transportadoras[row]
-            valor_frete = 0.0
-            
-            if transportadora[1].lower() == "rodocargas":
-                valor_label = self.table_transportadoras.cellWidget(row, 1)
-                if valor_label and valor_label.text():
-                    valor_frete = self.parse_number(valor_label.text())
-            else:
-                valor_input = self.table_transportadoras.cellWidget(row, 1)
-                if valor_input and valor_input.text():
-                    valor_frete = self.parse_number(valor_input.text())
-            
-            if valor_frete <= 0:
-                self.table_transportadoras.item(row, 2).setText("0,00%")
-                self.table_transportadoras.item(row, 3).setText("")
-                return
-            
-            percentual = (valor_frete / valor_nf) * 100
-            self.table_transportadoras.item(row, 2).setText(f"{percentual:.2f}%".replace('.', ','))
-            
-            detalhes = f"({valor_frete:.2f} / {valor_nf:.2f}) × 100 = {percentual:.2f}%"
-            detalhes = detalhes.replace('.', ',')
-            self.table_transportadoras.item(row, 3).setText(detalhes)
-            
-            if transportadora[1].lower() == "rodocargas":
-                info_text = f"Rodocargas: {transportadora[3] or 14}% + {transportadora[4] or 7}% ICMS = R$ {valor_frete:.2f}"
-                info_text = info_text.replace('.', ',')
-                self.rodocargas_info.setText(info_text)
-                self.rodocargas_info.setVisible(True)
-                    
+            regra = self.regras[row]
+            resultado = motor.calcular_frete(self.valor_nf, regra, self.valores_informados.get(regra.id))
+            self.mostrar_resultado(row, resultado)
         except Exception as e:
             self.table_transportadoras.item(row, 2).setText("Erro")
 
+    def mostrar_resultado(self, row, resultado):
+        """Escreve percentual e memória de cálculo de um ResultadoFrete"""
+        if self.valor_nf <= 0 or resultado.valor_frete <= 0:
+            self.table_transportadoras.item(row, 2).setText("0,00%")
+            self.table_transportadoras.item(row, 3).setText("")
+            return
+        
+        percentual = resultado.percentual_nf
+        self.table_transportadoras.item(row, 2).setText(f"{percentual:.2f}%".replace('.', ','))
+        
+        detalhes = f"({resultado.valor_frete:.2f} / {self.valor_nf:.2f}) × 100 = {percentual:.2f}%"
+        detalhes = detalhes.replace('.', ',')
+        self.table_transportadoras.item(row, 3).setText(detalhes)
+        
+        if resultado.automatico:
+            regra = self.regras[row]
+            info_text = f"{regra.nome}: {regra.percentual_base}% + {regra.icms}% ICMS = R$ {resultado.valor_frete:.2f}"
+            info_text = info_text.replace('.', ',')
+            self.rodocargas_info.setText(info_text)
+            self.rodocargas_info.setVisible(True)
+
     def selecionar_transportadora(self, row):
         """Seleciona transportadora"""
         for i in range(self.table_transportadoras.rowCount()):
@@ -649,32 +653,20 @@ class CotacaoWindow(QWidget):
                 QMessageBox.warning(self, "Aviso", "Informe o fornecedor!")
                 return
             
-            valor_nf = self.get_valor_nf_numerico()
-            if valor_nf <= 0:
+            if self.valor_nf <= 0:
                 QMessageBox.warning(self, "Aviso", "Informe o valor da NF!")
                 return
             
             fretes_data = []
-            for row in range(self.table_transportadoras.rowCount()):
-                transportadora = self.transportadoras[row]
-                valor_frete = 0.0
-                
-                if transportadora[1].lower() == "rodocargas":
-                    valor_label = self.table_transportadoras.cellWidget(row, 1)
-                    if valor_label and valor_label.text():
-                        valor_frete = self.parse_number(valor_label.text())
-                else:
-                    valor_input = self.table_transportadoras.cellWidget(row, 1)
-                    if valor_input and valor_input.text():
-                        valor_frete = self.parse_number(valor_input.text())
-                
-                if valor_frete > 0:
+            for resultado in motor.cotar(self.valor_nf, self.regras, self.valores_informados):
+                if resultado.informado:
                     selecionada = (hasattr(self, 'transportadora_selecionada_id') and 
-                                 self.transportadora_selecionada_id == transportadora[0])
+                                 self.transportadora_selecionada_id == resultado.transportadora_id)
                     
                     fretes_data.append({
-                        'transportadora_id': transportadora[0],
-                        'valor_frete': valor_frete,
+                        'transportadora_id': resultado.transportadora_id,
+                        # Colunas REAL no SQLite; o valor já vem arredondado ao centavo
+                        'valor_frete': float(resultado.valor_frete),
                         'selecionada': selecionada
                     })
             
@@ -682,47 +674,37 @@ class CotacaoWindow(QWidget):
                 QMessageBox.warning(self, "Aviso", "Informe pelo menos um valor de frete!")
                 return
             
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
+            dados = (
+                self.data_input.date().toString("yyyy-MM-dd"),
+                fornecedor,
+                self.pedido_input.text() or None,
+                float(self.valor_nf),
+                self.get_peso_numerico(),
+                int(self.volume_input.text()) if self.volume_input.text().isdigit() else None,
+                self.get_cubagem_numerico(),
+                self.transportadora_selecionada_id if hasattr(self, 'transportadora_selecionada_id') else None
+            )
             
-            try:
-                cursor.execute('''
-                    INSERT INTO cotacoes 
-                    (data, fornecedor, num_pedido, valor_nf, peso, volume, cubagem, transportadora_ganhadora_id)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    self.data_input.date().toString("yyyy-MM-dd"),
-                    fornecedor,
-                    self.pedido_input.text() or None,
-                    valor_nf,
-                    self.get_peso_numerico(),
-                    int(self.volume_input.text()) if self.volume_input.text().isdigit() else None,
-                    self.get_cubagem_numerico(),
-                    self.transportadora_selecionada_id if hasattr(self, 'transportadora_selecionada_id') else None
-                ))
-                
-                cotacao_id = cursor.lastrowid
-                
-                for frete in fretes_data:
-                    cursor.execute('''
-                        INSERT INTO cotacoes_transportadoras 
-                        (cotacao_id, transportadora_id, valor_frete, selecionada)
-                        VALUES (?, ?, ?, ?)
-                    ''', (cotacao_id, frete['transportadora_id'], frete['valor_frete'], frete['selecionada']))
-                
-                conn.commit()
-                QMessageBox.information(self, "Sucesso", "Cotação salva com sucesso!")
-                self.limpar_formulario()
-                
-            except Exception as e:
-                conn.rollback()
-                QMessageBox.critical(self, "Erro", f"Erro ao salvar: {e}")
-            finally:
-                conn.close()
+            # Gravação em segundo plano; o botão fica travado até terminar
+            self.btn_salvar.setEnabled(False)
+            self.executor.executar(
+                gravar_cotacao, dados, fretes_data,
+                ao_concluir=self.cotacao_salva,
+                ao_erro=self.erro_ao_salvar,
+            )
                 
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro: {e}")
 
+    def cotacao_salva(self, cotacao_id):
+        self.btn_salvar.setEnabled(True)
+        QMessageBox.information(self, "Sucesso", "Cotação salva com sucesso!")
+        self.limpar_formulario()
+
+    def erro_ao_salvar(self, erro):
+        self.btn_salvar.setEnabled(True)
+        QMessageBox.critical(self, "Erro", f"Erro ao salvar: {erro}")
+
     def limpar_formulario(self):
         """Limpa todo o formulário"""
         self.data_input.setDate(QDate.currentDate())
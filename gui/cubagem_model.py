@@ -0,0 +1,193 @@
+# cubagem_model.py - MODELO DA TABELA DA CALCULADORA DE CUBAGEM
+"""Tabela da calculadora como QAbstractTableModel sobre ItensCubagem.
+
+Os valores ficam só nos arrays de pricing.cubagem; a view pede o texto de
+cada célula em data() quando vai desenhá-la, então uma lista com 10 mil
+volumes não cria nenhum widget por linha. O editor (um QLineEdit) só existe
+enquanto uma célula está sendo editada, e o delegate grava a cada tecla
+para o total continuar acompanhando a digitação.
+
+Colar (colar()) recebe o texto da área de transferência separado por
+tabulação, como sai do Excel, e grava o bloco inteiro de uma vez a partir
+da célula atual, criando as linhas que faltarem.
+"""
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtWidgets import QLineEdit, QStyledItemDelegate
+
+from pricing.cubagem import COLUNAS as COLUNAS_ITENS, ler_numero
+
+COLUNAS = ["Item", "Quantidade", "Largura", "Comprimento", "Altura", "Total (m³)"]
+
+# Colunas da tabela que são editáveis (1..4) -> coluna em ItensCubagem
+_PRIMEIRA_MEDIDA = 1
+_TOTAL = 5
+
+
+def _numero(valor):
+    """Valor guardado -> texto da célula (vírgula decimal; zero fica vazio)"""
+    if not valor:
+        return ""
+    return f"{valor:.10g}".replace('.', ',')
+
+
+def _valor_celula(coluna, texto):
+    valor = ler_numero(texto)
+    if coluna == "quantidade":
+        # Quantidade vazia ou zero conta como 1, como sempre na calculadora
+        return valor or 1.0
+    return valor
+
+
+class CubagemModel(QAbstractTableModel):
+    # Cubagem total em m³ depois de cada alteração
+    total_alterado = pyqtSignal(float)
+
+    def __init__(self, itens, parent=None):
+        super().__init__(parent)
+        self.itens = itens
+
+    # Alterações ------------------------------------------------------------
+
+    def adicionar_linha(self):
+        linha = len(self.itens)
+        self.beginInsertRows(QModelIndex(), linha, linha)
+        self.itens.adicionar()
+        self.endInsertRows()
+        return linha
+
+    def limpar(self):
+        self.beginResetModel()
+        self.itens.limpar()
+        self.endResetModel()
+        self.total_alterado.emit(self.itens.total)
+
+    def definir_unidade(self, unidade):
+        """Troca cm/m: uma conta vetorizada e um único dataChanged dos totais"""
+        self.itens.definir_unidade(unidade)
+        if len(self.itens):
+            self.dataChanged.emit(self.index(0, _TOTAL), self.index(len(self.itens) - 1, _TOTAL))
+        self.total_alterado.emit(self.itens.total)
+
+    def adicionar_lista(self, lista):
+        """Acrescenta uma ListaCubagem inteira (uma inserção, uma soma do total)"""
+        if not len(lista):
+            return
+        inicio = len(self.itens)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(lista) - 1)
+        self.itens.adicionar_lote(*lista.colunas())
+        self.endInsertRows()
+        self.total_alterado.emit(self.itens.total)
+
+    def vazio(self):
+        """Nenhuma linha tem medida preenchida (só a linha inicial em branco)"""
+        return not any(self.itens.coluna(nome).any() for nome in COLUNAS_ITENS[1:])
+
+    def colar(self, texto, linha=0, coluna=_PRIMEIRA_MEDIDA):
+        """Grava um bloco colado (linhas por \\n, colunas por tabulação)
+
+        Colunas além de Altura são ignoradas; células que faltam numa linha
+        ficam vazias (medida zero, quantidade 1). Devolve quantas linhas o
+        bloco ocupou.
+        """
+        coluna = max(coluna, _PRIMEIRA_MEDIDA)
+        if coluna >= _TOTAL:
+            return 0
+        linhas = [l.split('\t') for l in texto.splitlines()]
+        # O Excel termina a cópia com uma quebra de linha; linhas vazias no
+        # fim não viram volumes
+        while linhas and not any(c.strip() for c in linhas[-1]):
+            linhas.pop()
+        if not linhas:
+            return 0
+        nomes = COLUNAS_ITENS[coluna - _PRIMEIRA_MEDIDA:]
+        largura = min(len(nomes), max(len(l) for l in linhas))
+        nomes = nomes[:largura]
+        valores = [
+            [_valor_celula(nome, celulas[i] if i < len(celulas) else "") for i, nome in enumerate(nomes)]
+            for celulas in linhas
+        ]
+
+        linha = min(max(linha, 0), len(self.itens))
+        fim = linha + len(valores) - 1
+        existentes = len(self.itens)
+        if fim >= existentes:
+            self.beginInsertRows(QModelIndex(), existentes, fim)
+        self.itens.definir_bloco(linha, nomes[0], valores)
+        if fim >= existentes:
+            self.endInsertRows()
+        if linha < existentes:
+            self.dataChanged.emit(self.index(linha, coluna), self.index(min(fim, existentes - 1), _TOTAL))
+        self.total_alterado.emit(self.itens.total)
+        return len(valores)
+
+    # QAbstractTableModel ---------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.itens)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUNAS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        coluna = index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            linha = index.row()
+            if coluna == 0:
+                return str(linha + 1)
+            if coluna == _TOTAL:
+                return f"{self.itens.volume(linha):.3f} m³"
+            return _numero(self.itens.valor(linha, COLUNAS_ITENS[coluna - _PRIMEIRA_MEDIDA]))
+        if role == Qt.BackgroundRole and coluna in (0, _TOTAL):
+            return Qt.lightGray
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole or not self._editavel(index.column()):
+            return False
+        linha, coluna = index.row(), index.column()
+        nome = COLUNAS_ITENS[coluna - _PRIMEIRA_MEDIDA]
+        self.itens.definir(linha, nome, _valor_celula(nome, value))
+        self.dataChanged.emit(index, index)
+        total = self.index(linha, _TOTAL)
+        self.dataChanged.emit(total, total)
+        self.total_alterado.emit(self.itens.total)
+        return True
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and self._editavel(index.column()):
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    @staticmethod
+    def _editavel(coluna):
+        return _PRIMEIRA_MEDIDA <= coluna < _TOTAL
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUNAS[section]
+        return str(section + 1)
+
+
+class CubagemDelegate(QStyledItemDelegate):
+    """Editor de texto só para a célula em edição, gravando a cada tecla"""
+
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        editor.setPlaceholderText("1" if index.column() == _PRIMEIRA_MEDIDA else "0")
+        # Total da linha e geral acompanham a digitação (setData é O(1))
+        editor.textEdited.connect(lambda _texto: self.commitData.emit(editor))
+        return editor
+
+    def setEditorData(self, editor, index):
+        # O dataChanged de cada tecla volta para cá: não reescrever o que o
+        # usuário está digitando ("40," viraria "40")
+        if not editor.isModified():
+            editor.setText(index.data(Qt.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.text(), Qt.EditRole)
@@ -0,0 +1,130 @@
+# dashboard_model.py - MODELO DE DADOS DO DASHBOARD
+"""Liga o DashboardSnapshot aos widgets da tela inicial.
+
+Os widgets são criados uma única vez e registrados com vincular() /
+vincular_tabela(). A cada atualizar() o modelo compara o snapshot novo com o
+anterior e só mexe nos textos e linhas que mudaram. Quando o contador de
+versão do banco não mudou o DashboardService devolve o mesmo snapshot e a
+atualização termina sem tocar em nenhum widget, então o timer de
+atualização automática custa uma leitura de uma linha por ciclo.
+"""
+import time
+from collections import deque
+from dataclasses import fields
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QTableWidgetItem
+
+from database.dashboard import DashboardSnapshot
+
+# Uma atualização não deve segurar a tela por mais de um quadro (60 fps)
+ORCAMENTO_QUADRO_MS = 16.0
+
+_CAMPOS = tuple(f.name for f in fields(DashboardSnapshot) if f.name != "versao")
+
+
+class DashboardModel(QObject):
+    # snapshot novo, frozenset com os campos alterados
+    atualizado = pyqtSignal(object, object)
+
+    def __init__(self, service, parent=None):
+        super().__init__(parent)
+        self.service = service
+        self.snapshot = None
+        self.latencias_ms = deque(maxlen=200)
+        self._vinculos = {}
+        self._tabelas = []
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.atualizar)
+
+    def vincular(self, campo, label, formatar=str):
+        """Mantém label.text() igual a formatar(snapshot.<campo>)"""
+        self._vinculos.setdefault(campo, []).append((label, formatar))
+        label.setText(formatar(getattr(self.snapshot or DashboardSnapshot(), campo)))
+
+    def vincular_tabela(self, tabela, formatar_linha):
+        """Mantém a tabela com uma linha por cotação recente
+
+        formatar_linha recebe uma CotacaoRecente e devolve os textos das colunas.
+        """
+        self._tabelas.append((tabela, formatar_linha))
+        recentes = self.snapshot.cotacoes_recentes if self.snapshot else ()
+        self._atualizar_tabela(tabela, (), recentes, formatar_linha)
+
+    def atualizar(self):
+        """Busca o snapshot e aplica só as diferenças; retorna os campos alterados"""
+        inicio = time.perf_counter()
+        try:
+            novo = self.service.snapshot()
+        except Exception as e:
+            print(f"Erro ao buscar dados do dashboard: {e}")
+            return frozenset()
+
+        anterior = self.snapshot
+        alterados = self._campos_alterados(anterior, novo)
+        self.snapshot = novo
+
+        for campo in alterados:
+            for label, formatar in self._vinculos.get(campo, ()):
+                label.setText(formatar(getattr(novo, campo)))
+
+        if "cotacoes_recentes" in alterados:
+            antigas = anterior.cotacoes_recentes if anterior else ()
+            for tabela, formatar_linha in self._tabelas:
+                self._atualizar_tabela(tabela, antigas, novo.cotacoes_recentes, formatar_linha)
+
+        latencia = (time.perf_counter() - inicio) * 1000
+        self.latencias_ms.append(latencia)
+        if latencia > ORCAMENTO_QUADRO_MS:
+            print(f"⚠️ Atualização do dashboard levou {latencia:.1f} ms "
+                  f"(orçamento de {ORCAMENTO_QUADRO_MS:.0f} ms)")
+
+        if alterados:
+            self.atualizado.emit(novo, alterados)
+        return alterados
+
+    def iniciar_auto_atualizacao(self, intervalo_ms=5000):
+        """Consulta o banco periodicamente; sem mudanças nada é redesenhado"""
+        self._timer.start(intervalo_ms)
+
+    def parar_auto_atualizacao(self):
+        self._timer.stop()
+
+    def auto_atualizacao_ativa(self):
+        return self._timer.isActive()
+
+    def estatisticas_latencia(self):
+        """Latência das últimas atualizações em milissegundos"""
+        if not self.latencias_ms:
+            return {"atualizacoes": 0, "ultima": 0.0, "media": 0.0, "maxima": 0.0,
+                    "acima_orcamento": 0}
+        return {
+            "atualizacoes": len(self.latencias_ms),
+            "ultima": self.latencias_ms[-1],
+            "media": sum(self.latencias_ms) / len(self.latencias_ms),
+            "maxima": max(self.latencias_ms),
+            "acima_orcamento": sum(1 for l in self.latencias_ms if l > ORCAMENTO_QUADRO_MS),
+        }
+
+    @staticmethod
+    def _campos_alterados(anterior, novo):
+        if anterior is novo:
+            return frozenset()
+        if anterior is None:
+            return frozenset(_CAMPOS)
+        return frozenset(c for c in _CAMPOS if getattr(anterior, c) != getattr(novo, c))
+
+    @staticmethod
+    def _atualizar_tabela(tabela, antigas, novas, formatar_linha):
+        """Reescreve só as linhas cujo conteúdo mudou"""
+        if tabela.rowCount() != len(novas):
+            tabela.setRowCount(len(novas))
+        for row, cotacao in enumerate(novas):
+            if row < len(antigas) and antigas[row] == cotacao and tabela.item(row, 0) is not None:
+                continue
+            for col, texto in enumerate(formatar_linha(cotacao)):
+                item = tabela.item(row, col)
+                if item is None:
+                    tabela.setItem(row, col, QTableWidgetItem(texto))
+                elif item.text() != texto:
+                    item.setText(texto)
@@ -0,0 +1,241 @@
+# historico_model.py - MODELO VIRTUALIZADO DA LISTA DO HISTÓRICO
+"""Lista do histórico carregada por páginas sob demanda.
+
+A view pede mais linhas (canFetchMore/fetchMore) conforme a rolagem chega
+ao fim do que já foi carregado; cada página é buscada no ExecutorBanco com
+paginação por chave (data_dia, id), então a página 1000 custa o mesmo que
+a primeira. As linhas ficam guardadas cruas (tuplas do SQLite) e só viram
+texto em data() quando a view desenha a célula.
+
+Filtros de texto raros no índice FTS5 (cotacoes_busca) não vão pela chave:
+a primeira página materializa os ids de todo o resultado numa consulta só
+(FiltroHistorico.primeira_pagina) e as seguintes buscam as linhas por id,
+sem repetir a busca a cada página.
+
+Quando o filtro novo só restringe o anterior (o usuário continuou digitando
+"TRANSP" -> "TRANSPO"), refinar() descarta em memória as linhas que não
+passam mais e continua a paginação com a consulta nova a partir da mesma
+chave, sem voltar ao SQLite para o que já estava carregado.
+
+Com a busca geral preenchida o filtro vira uma consulta ranqueada no índice
+FTS5 (cotacoes_busca): uma única página com as melhores ocorrências em
+fornecedor, pedido e transportadora, sem olhar o período.
+"""
+from PyQt5.QtCore import QAbstractTableModel, QDate, QModelIndex, Qt, pyqtSignal
+
+from database.filtros import FiltroHistorico
+from gui.workers import consultar
+
+COLUNAS = [
+    "ID", "Data", "Fornecedor", "Valor NF", "Peso", "Volume", "Cubagem",
+    "Transportadora", "Frete", "Percentual do Frete"
+]
+
+# Posições em queries.HISTORICO_COLUNAS
+_ID, _DATA, _FORNECEDOR, _VALOR_NF, _PESO, _VOLUME, _CUBAGEM, _TRANSPORTADORA, _FRETE, _DATA_DIA = range(10)
+
+
+def _moeda(valor):
+    return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+def formatar_celula(cotacao, coluna):
+    """Texto de uma célula, igual ao que a tabela antiga mostrava"""
+    if coluna == 0:
+        return str(cotacao[_ID])
+    if coluna == 1:
+        return QDate.fromString(cotacao[_DATA][:10], "yyyy-MM-dd").toString("dd/MM/yyyy")
+    if coluna == 2:
+        return cotacao[_FORNECEDOR]
+    if coluna == 3:
+        return _moeda(cotacao[_VALOR_NF])
+    if coluna == 4:
+        return f"{cotacao[_PESO]:.3f} kg".replace('.', ',') if cotacao[_PESO] else "-"
+    if coluna == 5:
+        return str(cotacao[_VOLUME]) if cotacao[_VOLUME] else "-"
+    if coluna == 6:
+        return f"{cotacao[_CUBAGEM]:.3f} m³".replace('.', ',') if cotacao[_CUBAGEM] else "-"
+    if coluna == 7:
+        return cotacao[_TRANSPORTADORA] if cotacao[_TRANSPORTADORA] else "Nenhuma"
+    if coluna == 8:
+        return _moeda(cotacao[_FRETE]) if cotacao[_FRETE] else "-"
+    if coluna == 9:
+        if cotacao[_FRETE] and cotacao[_VALOR_NF] and cotacao[_VALOR_NF] > 0:
+            return f"{cotacao[_FRETE] / cotacao[_VALOR_NF] * 100:.2f}%"
+        return "-"
+    return None
+
+
+# Tarefas do ExecutorBanco: todas devolvem (linhas, ids materializados
+# restantes ou None quando as páginas seguem pela chave)
+
+def buscar_primeira_pagina(conn, tarefa, filtro, chave, tamanho):
+    return filtro.primeira_pagina(conn, chave, tamanho)
+
+
+def buscar_pagina_por_ids(conn, tarefa, ids, tamanho):
+    return FiltroHistorico.pagina_por_ids(conn, ids[:tamanho]), ids[tamanho:]
+
+
+def buscar_pagina(conn, tarefa, sql, params):
+    return consultar(conn, tarefa, sql, params), None
+
+
+class HistoricoModel(QAbstractTableModel):
+    TAMANHO_PAGINA = 200
+    LIMITE_BUSCA = 500
+
+    # Sinais para a tela: primeira página pronta (total carregado) e erros
+    carregado = pyqtSignal(int)
+    erro = pyqtSignal(str)
+
+    def __init__(self, executor, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self._linhas = []
+        self.filtro = None
+        self._sql = None
+        self._params = ()
+        self._chave = None
+        self._ids = None
+        self._primeira = False
+        self._fim = True
+        self._carregando = False
+        self._geracao = 0
+        self.consultas = 0
+        self.refinamentos = 0
+
+    # Consulta -------------------------------------------------------------
+
+    def consultar(self, filtro):
+        """Troca o filtro e recarrega a partir da primeira página"""
+        self._geracao += 1
+        self.consultas += 1
+        self.beginResetModel()
+        self._linhas = []
+        self.filtro = filtro
+        if filtro.paginado:
+            self._sql, params = filtro.consulta(paginada=True)
+        else:
+            self._sql, params = filtro.consulta(limite=self.LIMITE_BUSCA)
+        self._params = tuple(params)
+        self._chave = (filtro.dia_fim + 1, 0)
+        self._ids = None
+        self._primeira = filtro.paginado
+        self._fim = False
+        self._carregando = False
+        self.endResetModel()
+        self._buscar_pagina()
+
+    def pode_refinar(self, filtro):
+        """O filtro novo pode ser respondido a partir das linhas em memória?"""
+        return not self._carregando and filtro.restringe(self.filtro)
+
+    def refinar(self, filtro):
+        """Aplica um filtro mais restrito sem reler o que já foi carregado
+
+        As linhas carregadas são todas as do filtro anterior até a chave
+        atual; como o filtro novo é um subconjunto, filtrá-las em memória dá
+        exatamente o resultado novo até a mesma chave. As próximas páginas
+        continuam dali com a consulta do filtro novo.
+        """
+        self._geracao += 1
+        self.refinamentos += 1
+        self.beginResetModel()
+        self._linhas = [linha for linha in self._linhas if filtro.aceita(linha)]
+        self.filtro = filtro
+        self._sql, params = filtro.consulta(paginada=True)
+        self._params = tuple(params)
+        # Os ids materializados eram do filtro anterior: a próxima página
+        # decide de novo, a partir da mesma chave, como seguir
+        self._ids = None
+        self._primeira = True
+        self.endResetModel()
+        self.carregado.emit(len(self._linhas))
+        # Com menos de uma página sobrando a view pode ficar sem barra de
+        # rolagem e nunca pedir fetchMore: a próxima página vem já
+        if not self._fim and len(self._linhas) < self.TAMANHO_PAGINA:
+            self._buscar_pagina()
+
+    def cotacao_id(self, row):
+        return self._linhas[row][_ID]
+
+    def linha(self, row):
+        return self._linhas[row]
+
+    def carregando(self):
+        return self._carregando
+
+    def todas_carregadas(self):
+        return self._fim
+
+    def _buscar_pagina(self):
+        self._carregando = True
+        geracao = self._geracao
+        if self._primeira:
+            tarefa = (buscar_primeira_pagina, self.filtro, self._chave, self.TAMANHO_PAGINA)
+        elif self._ids is not None:
+            tarefa = (buscar_pagina_por_ids, self._ids, self.TAMANHO_PAGINA)
+        elif self.filtro.paginado:
+            tarefa = (buscar_pagina, self._sql, self._params + self._chave + (self.TAMANHO_PAGINA,))
+        else:
+            tarefa = (buscar_pagina, self._sql, self._params)
+        # Mesma chave do filtro: uma consulta nova cancela a página pendente
+        self.executor.executar(
+            *tarefa,
+            chave="historico",
+            ao_concluir=lambda resultado: self._pagina_recebida(geracao, *resultado),
+            ao_erro=self._erro_pagina,
+        )
+
+    def _pagina_recebida(self, geracao, linhas, ids):
+        if geracao != self._geracao:
+            return
+        self._carregando = False
+        self._primeira = False
+        self._ids = ids
+        if ids is not None:
+            self._fim = not ids
+        elif len(linhas) < self.TAMANHO_PAGINA or not self.filtro.paginado:
+            self._fim = True
+        if linhas:
+            ultima = linhas[-1]
+            self._chave = (ultima[_DATA_DIA], ultima[_ID])
+            inicio = len(self._linhas)
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(linhas) - 1)
+            self._linhas.extend(linhas)
+            self.endInsertRows()
+        if len(self._linhas) == len(linhas):
+            self.carregado.emit(len(self._linhas))
+
+    def _erro_pagina(self, mensagem):
+        self._carregando = False
+        self._fim = True
+        self.erro.emit(mensagem)
+
+    # QAbstractTableModel ---------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._linhas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUNAS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return formatar_celula(self._linhas[index.row()], index.column())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUNAS[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._fim and not self._carregando
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._buscar_pagina()
@@ -2,15 +2,20 @@
 import sqlite3
 import os
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QLabel, QLineEdit, QTableWidget, QTableWidgetItem,
+                             QLabel, QLineEdit, QTableWidget, QTableWidgetItem, QTableView,
                              QHeaderView, QMessageBox, QGroupBox, QFormLayout,
                              QDateEdit, QScrollArea, QFrame, QSplitter, QComboBox,
                              QDialog, QDialogButtonBox, QTabWidget, QTextEdit,
-                             QInputDialog)
-from PyQt5.QtCore import Qt, QDate
+                             QInputDialog, QFileDialog, QProgressDialog)
+from PyQt5.QtCore import Qt, QDate, QTimer
 from PyQt5.QtGui import QFont
 from PyQt5.QtPrintSupport import QPrintDialog, QPrinter
-import pandas as pd
+from database import exportador, queries
+from utils.datas import dia_epoch
+from database.importador import Importador
+from gui.workers import ExecutorBanco
+from database.filtros import FiltroHistorico
+from gui.historico_model import HistoricoModel
 
 class EditarCotacaoDialog(QDialog):
     def __init__(self, db, cotacao_id, parent=None):
@@ -211,30 +216,20 @@ class EditarCotacaoDialog(QDialog):
     def carregar_dados(self):
         """Carrega os dados da cotação para edição"""
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT data, fornecedor, num_pedido, valor_nf, peso, volume, cubagem, transportadora_ganhadora_id
-                FROM cotacoes WHERE id = ?
-            ''', (self.cotacao_id,))
-            cotacao = cursor.fetchone()
-            
-            cursor.execute('SELECT id, nome FROM transportadoras ORDER BY nome')
-            todas_transportadoras = cursor.fetchall()
-            
-            cursor.execute('''
-                SELECT ct.transportadora_id, t.nome, ct.valor_frete, ct.selecionada
-                FROM cotacoes_transportadoras ct
-                JOIN transportadoras t ON ct.transportadora_id = t.id
-                WHERE ct.cotacao_id = ?
-            ''', (self.cotacao_id,))
-            self.transportadoras_originais = cursor.fetchall()
-            
-            conn.close()
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(queries.EDITAR_CARREGAR_COTACAO, (self.cotacao_id,))
+                cotacao = cursor.fetchone()
+                
+                cursor.execute('SELECT id, nome FROM transportadoras ORDER BY nome')
+                todas_transportadoras = cursor.fetchall()
+                
+                cursor.execute(queries.EDITAR_CARREGAR_FRETES, (self.cotacao_id,))
+                self.transportadoras_originais = cursor.fetchall()
             
             if cotacao:
-                self.data_input.setDate(QDate.fromString(cotacao[0], "yyyy-MM-dd"))
+                self.data_input.setDate(QDate.fromString(cotacao[0][:10], "yyyy-MM-dd"))
                 self.fornecedor_input.setText(cotacao[1])
                 self.pedido_input.setText(cotacao[2] if cotacao[2] else "")
                 self.valor_nf_input.setText(f"R$ {cotacao[3]:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
@@ -300,11 +295,8 @@ class EditarCotacaoDialog(QDialog):
         layout = QVBoxLayout()
         
         combo = QComboBox()
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, nome FROM transportadoras ORDER BY nome')
-        transportadoras = cursor.fetchall()
-        conn.close()
+        with self.db.connection() as conn:
+            transportadoras = conn.execute('SELECT id, nome FROM transportadoras ORDER BY nome').fetchall()
         
         for transp_id, nome in transportadoras:
             if nome not in [t[1] for t in self.transportadoras_originais]:
@@ -395,7 +387,7 @@ class EditarCotacaoDialog(QDialog):
                     self.cotacao_id
                 ))
                 
-                cursor.execute('DELETE FROM cotacoes_transportadoras WHERE cotacao_id = ?', (self.cotacao_id,))
+                cursor.execute(queries.EXCLUIR_FRETES_COTACAO, (self.cotacao_id,))
                 
                 for row in range(self.tabela_transportadoras.rowCount()):
                     nome = self.tabela_transportadoras.item(row, 0).text()
@@ -428,11 +420,42 @@ class EditarCotacaoDialog(QDialog):
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro: {e}")
 
+def buscar_detalhes_cotacao(conn, tarefa, cotacao_id):
+    """Roda no executor: dados da cotação e fretes de todas as transportadoras"""
+    cursor = conn.cursor()
+    cursor.execute(queries.HISTORICO_DETALHE_COTACAO, (cotacao_id,))
+    cotacao = cursor.fetchone()
+    cursor.execute(queries.HISTORICO_DETALHE_FRETES, (cotacao_id,))
+    return cotacao_id, cotacao, cursor.fetchall()
+
+
+def exportar_consulta(conn, tarefa, filtro, formato, filename):
+    """Roda no executor: grava o arquivo em blocos, sem DataFrame"""
+    exportador.exportar_historico(conn, filtro, formato, filename, progresso=tarefa.progresso)
+    return filename
+
+
+def importar_planilha(conn, tarefa, caminho):
+    """Roda no executor: importa em lotes; cancelar mantém os lotes gravados"""
+    importador = Importador(conn, progresso=tarefa.progresso)
+    return importador.importar(caminho)
+
+
 class HistoricoWindow(QWidget):  
-    def __init__(self, db):
+    # Espera depois da última tecla antes de consultar
+    ATRASO_FILTRO_MS = 250
+    
+    def __init__(self, db, atraso_filtro_ms=None):
         super().__init__()
         self.db = db
+        self.executor = ExecutorBanco(db, self)
         self.cotacao_selecionada_id = None
+        
+        # Digitação rápida vira uma única consulta quando o usuário para
+        self.timer_filtro = QTimer(self)
+        self.timer_filtro.setSingleShot(True)
+        self.timer_filtro.setInterval(self.ATRASO_FILTRO_MS if atraso_filtro_ms is None else atraso_filtro_ms)
+        self.timer_filtro.timeout.connect(self.aplicar_filtros)
         self.setup_ui()
         self.carregar_cotacoes()
     
@@ -497,16 +520,16 @@ class HistoricoWindow(QWidget):
         layout_inferior.setSpacing(15)
         
         # Tabela de cotações premium
-        self.tabela_cotacoes = QTableWidget()
-        self.tabela_cotacoes.setColumnCount(10)
-        self.tabela_cotacoes.setHorizontalHeaderLabels([
-            "ID", "Data", "Fornecedor", "Valor NF", "Peso", "Volume", "Cubagem", 
-            "Transportadora", "Frete", "Percentual do Frete"
-        ])
+        # Lista virtualizada: as linhas chegam por página conforme a rolagem
+        self.modelo_cotacoes = HistoricoModel(self.executor, self)
+        self.modelo_cotacoes.erro.connect(
+            lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao aplicar filtros: {erro}"))
+        self.tabela_cotacoes = QTableView()
+        self.tabela_cotacoes.setModel(self.modelo_cotacoes)
         
         # Estilo premium da tabela
         self.tabela_cotacoes.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background: white;
                 border: 2px solid #bdc3c7;
                 border-radius: 8px;
@@ -520,11 +543,11 @@ class HistoricoWindow(QWidget):
                 border: none;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
                 border-bottom: 1px solid #ecf0f1;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3498db;
                 color: white;
             }
@@ -541,9 +564,13 @@ class HistoricoWindow(QWidget):
         header.setSectionResizeMode(7, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(8, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(9, QHeaderView.ResizeToContents)
+        # Larguras medidas só nas linhas visíveis: o padrão formata até 1000
+        # linhas a cada página inserida, anulando a formatação sob demanda
+        header.setResizeContentsPrecision(0)
         
-        self.tabela_cotacoes.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tabela_cotacoes.cellClicked.connect(self.carregar_detalhes_cotacao)
+        self.tabela_cotacoes.setSelectionBehavior(QTableView.SelectRows)
+        self.tabela_cotacoes.clicked.connect(
+            lambda index: self.carregar_detalhes_cotacao(index.row(), index.column()))
         layout_inferior.addWidget(self.tabela_cotacoes)
         
         # Botões de ação
@@ -581,7 +608,13 @@ class HistoricoWindow(QWidget):
         """)
         btn_limpar_filtros.clicked.connect(self.limpar_filtros)
         
-        btn_exportar = QPushButton("📊 EXPORTAR EXCEL")
+        # Excel para leitura; CSV/Parquet/Arrow com tipos para ferramentas de BI
+        self.formato_exportacao = QComboBox()
+        for texto, formato in (("Excel (.xlsx)", "xlsx"), ("CSV (.csv)", "csv"),
+                               ("Parquet (.parquet)", "parquet"), ("Arrow (.arrow)", "arrow")):
+            self.formato_exportacao.addItem(texto, formato)
+        
+        btn_exportar = QPushButton("📊 EXPORTAR")
         btn_exportar.setStyleSheet("""
             QPushButton {
                 background: #27ae60;
@@ -597,9 +630,27 @@ class HistoricoWindow(QWidget):
         """)
         btn_exportar.clicked.connect(self.exportar_excel)
         
+        btn_importar = QPushButton("📥 IMPORTAR")
+        btn_importar.setStyleSheet("""
+            QPushButton {
+                background: #8e44ad;
+                color: white;
+                border: none;
+                border-radius: 6px;
+                padding: 10px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #9b59b6;
+            }
+        """)
+        btn_importar.clicked.connect(self.importar_planilha)
+        
         btn_layout.addWidget(btn_atualizar)
         btn_layout.addWidget(btn_limpar_filtros)
+        btn_layout.addWidget(self.formato_exportacao)
         btn_layout.addWidget(btn_exportar)
+        btn_layout.addWidget(btn_importar)
         
         layout_inferior.addLayout(btn_layout)
         
@@ -642,13 +693,13 @@ class HistoricoWindow(QWidget):
         self.filtro_data_inicio.setDate(QDate.currentDate().addDays(-30))
         self.filtro_data_inicio.setDisplayFormat("dd/MM/yyyy")
         self.filtro_data_inicio.setStyleSheet("padding: 8px; border: 1px solid #bdc3c7; border-radius: 4px;")
-        self.filtro_data_inicio.dateChanged.connect(self.aplicar_filtros)
+        self.filtro_data_inicio.dateChanged.connect(self.agendar_filtros)
         
         self.filtro_data_fim = QDateEdit()
         self.filtro_data_fim.setDate(QDate.currentDate())
         self.filtro_data_fim.setDisplayFormat("dd/MM/yyyy")
         self.filtro_data_fim.setStyleSheet("padding: 8px; border: 1px solid #bdc3c7; border-radius: 4px;")
-        self.filtro_data_fim.dateChanged.connect(self.aplicar_filtros)
+        self.filtro_data_fim.dateChanged.connect(self.agendar_filtros)
         
         linha_data.addWidget(self.filtro_data_inicio)
         linha_data.addWidget(QLabel("até"))
@@ -661,13 +712,13 @@ class HistoricoWindow(QWidget):
         self.filtro_fornecedor_input = QLineEdit()
         self.filtro_fornecedor_input.setPlaceholderText("Buscar fornecedor...")
         self.filtro_fornecedor_input.setStyleSheet("padding: 8px; border: 1px solid #bdc3c7; border-radius: 4px;")
-        self.filtro_fornecedor_input.textChanged.connect(self.aplicar_filtros)
+        self.filtro_fornecedor_input.textChanged.connect(self.agendar_filtros)
         
         label_transportadora = QLabel("🚛 Transportadora:")
         self.filtro_transportadora_input = QLineEdit()
         self.filtro_transportadora_input.setPlaceholderText("Buscar transportadora...")
         self.filtro_transportadora_input.setStyleSheet("padding: 8px; border: 1px solid #bdc3c7; border-radius: 4px;")
-        self.filtro_transportadora_input.textChanged.connect(self.aplicar_filtros)
+        self.filtro_transportadora_input.textChanged.connect(self.agendar_filtros)
         
         linha_busca.addWidget(label_fornecedor)
         linha_busca.addWidget(self.filtro_fornecedor_input)
@@ -675,8 +726,20 @@ class HistoricoWindow(QWidget):
         linha_busca.addWidget(self.filtro_transportadora_input)
         linha_busca.addStretch()
         
+        linha_geral = QHBoxLayout()
+        label_geral = QLabel("🔎 Busca geral:")
+        self.busca_geral_input = QLineEdit()
+        self.busca_geral_input.setPlaceholderText(
+            f"Fornecedor, pedido ou transportadora em todo o histórico "
+            f"(mín. {queries.BUSCA_MINIMO_CARACTERES} caracteres)...")
+        self.busca_geral_input.setStyleSheet("padding: 8px; border: 1px solid #bdc3c7; border-radius: 4px;")
+        self.busca_geral_input.textChanged.connect(self.agendar_filtros)
+        linha_geral.addWidget(label_geral)
+        linha_geral.addWidget(self.busca_geral_input)
+        
         layout_filtros.addLayout(linha_data)
         layout_filtros.addLayout(linha_busca)
+        layout_filtros.addLayout(linha_geral)
         
         group_filtros.setLayout(layout_filtros)
         layout.addWidget(group_filtros)
@@ -835,155 +898,67 @@ class HistoricoWindow(QWidget):
     def carregar_cotacoes(self):
         """Carrega as cotações do banco"""
         try:
-            self.aplicar_filtros()
+            self.aplicar_filtros(forcar=True)
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar cotações: {e}")
 
-    def aplicar_filtros(self):
-        """Aplica os filtros na lista de cotações"""
-        try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT 
-                    c.id, 
-                    c.data, 
-                    c.fornecedor, 
-                    c.valor_nf,
-                    c.peso,
-                    c.volume,
-                    c.cubagem,
-                    t.nome as transportadora_ganhadora,
-                    ct.valor_frete
-                FROM cotacoes c
-                LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
-                LEFT JOIN cotacoes_transportadoras ct ON c.id = ct.cotacao_id AND ct.selecionada = 1
-                WHERE 1=1
-            """
-            params = []
-            
-            data_inicio = self.filtro_data_inicio.date().toString("yyyy-MM-dd")
-            data_fim = self.filtro_data_fim.date().toString("yyyy-MM-dd")
-            query += " AND c.data BETWEEN ? AND ?"
-            params.extend([data_inicio, data_fim])
-            
-            fornecedor_filtro = self.filtro_fornecedor_input.text().strip()
-            if fornecedor_filtro:
-                query += " AND c.fornecedor LIKE ?"
-                params.append(f"%{fornecedor_filtro}%")
-            
-            transportadora_filtro = self.filtro_transportadora_input.text().strip()
-            if transportadora_filtro:
-                query += " AND t.nome LIKE ?"
-                params.append(f"%{transportadora_filtro}%")
-            
-            query += " ORDER BY c.data DESC, c.id DESC"
-            
-            cursor.execute(query, params)
-            cotacoes = cursor.fetchall()
-            conn.close()
-            
-            self.tabela_cotacoes.setRowCount(len(cotacoes))
-            
-            for row, cotacao in enumerate(cotacoes):
-                # ID
-                self.tabela_cotacoes.setItem(row, 0, QTableWidgetItem(str(cotacao[0])))
-                
-                # Data
-                data_obj = QDate.fromString(cotacao[1], "yyyy-MM-dd")
-                data_formatada = data_obj.toString("dd/MM/yyyy")
-                self.tabela_cotacoes.setItem(row, 1, QTableWidgetItem(data_formatada))
-                
-                # Fornecedor
-                self.tabela_cotacoes.setItem(row, 2, QTableWidgetItem(cotacao[2]))
-                
-                # Valor NF
-                valor_nf = f"R$ {cotacao[3]:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                self.tabela_cotacoes.setItem(row, 3, QTableWidgetItem(valor_nf))
-                
-                # Peso
-                if cotacao[4]:
-                    peso = f"{cotacao[4]:.3f} kg".replace('.', ',')
-                    self.tabela_cotacoes.setItem(row, 4, QTableWidgetItem(peso))
-                else:
-                    self.tabela_cotacoes.setItem(row, 4, QTableWidgetItem("-"))
-                
-                # Volume
-                if cotacao[5]:
-                    self.tabela_cotacoes.setItem(row, 5, QTableWidgetItem(str(cotacao[5])))
-                else:
-                    self.tabela_cotacoes.setItem(row, 5, QTableWidgetItem("-"))
-                
-                # Cubagem
-                if cotacao[6]:
-                    cubagem = f"{cotacao[6]:.3f} m³".replace('.', ',')
-                    self.tabela_cotacoes.setItem(row, 6, QTableWidgetItem(cubagem))
-                else:
-                    self.tabela_cotacoes.setItem(row, 6, QTableWidgetItem("-"))
-                
-                # Transportadora
-                transportadora = cotacao[7] if cotacao[7] else "Nenhuma"
-                self.tabela_cotacoes.setItem(row, 7, QTableWidgetItem(transportadora))
-                
-                # Frete
-                if cotacao[8]:
-                    valor_frete = f"R$ {cotacao[8]:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                    self.tabela_cotacoes.setItem(row, 8, QTableWidgetItem(valor_frete))
-                else:
-                    self.tabela_cotacoes.setItem(row, 8, QTableWidgetItem("-"))
-                
-                # Percentual do Frete
-                if cotacao[8] and cotacao[3] and cotacao[3] > 0:
-                    percentual = (cotacao[8] / cotacao[3] * 100)
-                    percentual_texto = f"{percentual:.2f}%"
-                else:
-                    percentual_texto = "-"
-                
-                self.tabela_cotacoes.setItem(row, 9, QTableWidgetItem(percentual_texto))
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao aplicar filtros: {e}")
+    def filtro_atual(self):
+        """Filtros da tela como FiltroHistorico"""
+        return FiltroHistorico(
+            dia_inicio=dia_epoch(self.filtro_data_inicio.date().toPyDate()),
+            dia_fim=dia_epoch(self.filtro_data_fim.date().toPyDate()),
+            fornecedor=self.filtro_fornecedor_input.text().strip(),
+            transportadora=self.filtro_transportadora_input.text().strip(),
+            busca=self.busca_geral_atual(),
+        )
+
+    def busca_geral_atual(self):
+        """Texto da busca geral; termos curtos demais para o trigram são ignorados"""
+        texto = self.busca_geral_input.text().strip()
+        return texto if len(texto) >= queries.BUSCA_MINIMO_CARACTERES else ""
+
+    def agendar_filtros(self):
+        """Reinicia a espera a cada tecla/data alterada"""
+        self.timer_filtro.start()
+
+    def aplicar_filtros(self, forcar=False):
+        """Aplica os filtros na lista de cotações (páginas buscadas em segundo plano)"""
+        self.timer_filtro.stop()
+        filtro = self.filtro_atual()
+        modelo = self.modelo_cotacoes
+        
+        if not forcar and filtro == modelo.filtro:
+            return
+        if not forcar and modelo.pode_refinar(filtro):
+            # Só restringe o filtro anterior: responde com as linhas em memória
+            modelo.refinar(filtro)
+        else:
+            modelo.consultar(filtro)
 
     def carregar_detalhes_cotacao(self, row, column):
         """Carrega os detalhes da cotação selecionada"""
         try:
-            cotacao_id = int(self.tabela_cotacoes.item(row, 0).text())
-            self.cotacao_selecionada_id = cotacao_id
-            
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT 
-                    c.data, c.fornecedor, c.num_pedido, c.valor_nf, 
-                    c.peso, c.volume, c.cubagem, t.nome as transportadora_ganhadora
-                FROM cotacoes c
-                LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
-                WHERE c.id = ?
-            ''', (cotacao_id,))
-            cotacao = cursor.fetchone()
-            
-            cursor.execute('''
-                SELECT 
-                    t.nome, ct.valor_frete, ct.selecionada,
-                    (ct.valor_frete / c.valor_nf * 100) as percentual
-                FROM cotacoes_transportadoras ct
-                JOIN transportadoras t ON ct.transportadora_id = t.id
-                JOIN cotacoes c ON ct.cotacao_id = c.id
-                WHERE ct.cotacao_id = ?
-                ORDER BY ct.valor_frete
-            ''', (cotacao_id,))
-            transportadoras = cursor.fetchall()
-            
-            conn.close()
-            
-            if cotacao:
-                self.mostrar_detalhes_cotacao(cotacao, transportadoras)
-                self.setup_botoes_acao()
-                
+            cotacao_id = self.modelo_cotacoes.cotacao_id(row)
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar detalhes: {e}")
+            return
+        self.carregar_detalhes_por_id(cotacao_id)
+
+    def carregar_detalhes_por_id(self, cotacao_id):
+        """Busca os detalhes em segundo plano; cliques rápidos cancelam a busca anterior"""
+        self.cotacao_selecionada_id = cotacao_id
+        self.executor.executar(
+            buscar_detalhes_cotacao, cotacao_id,
+            chave="detalhes",
+            ao_concluir=self.exibir_detalhes_carregados,
+            ao_erro=lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao carregar detalhes: {erro}"),
+        )
+
+    def exibir_detalhes_carregados(self, resultado):
+        cotacao_id, cotacao, transportadoras = resultado
+        if cotacao and cotacao_id == self.cotacao_selecionada_id:
+            self.mostrar_detalhes_cotacao(cotacao, transportadoras)
+            self.setup_botoes_acao()
 
     def mostrar_detalhes_cotacao(self, cotacao, transportadoras):
         """Mostra os detalhes da cotação selecionada com design premium"""
@@ -997,7 +972,7 @@ class HistoricoWindow(QWidget):
         self.limpar_conteudo_detalhes()
         
         # Atualiza título
-        data_obj = QDate.fromString(cotacao[0], "yyyy-MM-dd")
+        data_obj = QDate.fromString(cotacao[0][:10], "yyyy-MM-dd")
         data_formatada = data_obj.toString("dd/MM/yyyy")
         self.titulo_detalhes.setText(f"👀 COTAÇÃO #{self.cotacao_selecionada_id} - {data_formatada}")
         self.titulo_detalhes.setStyleSheet("""
@@ -1167,7 +1142,7 @@ class HistoricoWindow(QWidget):
         if self.cotacao_selecionada_id:
             dialog = EditarCotacaoDialog(self.db, self.cotacao_selecionada_id, self)
             if dialog.exec_() == QDialog.Accepted:
-                self.carregar_detalhes_cotacao(0, 0)
+                self.carregar_detalhes_por_id(self.cotacao_selecionada_id)
                 self.carregar_cotacoes()
 
     def imprimir_cotacao(self):
@@ -1197,38 +1172,15 @@ class HistoricoWindow(QWidget):
             return
         
         try:
-            conn = self.db.get_connection()
-            
-            df_cotacao = pd.read_sql(f'''
-                SELECT 
-                    c.id as "ID",
-                    c.data as "Data",
-                    c.fornecedor as "Fornecedor",
-                    c.num_pedido as "Pedido",
-                    c.valor_nf as "Valor NF",
-                    c.peso as "Peso",
-                    c.volume as "Volume",
-                    c.cubagem as "Cubagem",
-                    t.nome as "Transportadora Ganhadora"
-                FROM cotacoes c
-                LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
-                WHERE c.id = {self.cotacao_selecionada_id}
-            ''', conn)
-            
-            df_transportadoras = pd.read_sql(f'''
-                SELECT 
-                    t.nome as "Transportadora",
-                    ct.valor_frete as "Valor Frete",
-                    CASE WHEN ct.selecionada THEN 'Sim' ELSE 'Não' END as "Selecionada",
-                    (ct.valor_frete / c.valor_nf * 100) as "Percentual do Frete"
-                FROM cotacoes_transportadoras ct
-                JOIN transportadoras t ON ct.transportadora_id = t.id
-                JOIN cotacoes c ON ct.cotacao_id = c.id
-                WHERE ct.cotacao_id = {self.cotacao_selecionada_id}
-                ORDER BY ct.valor_frete
-            ''', conn)
+            # pandas só é carregado quando alguém exporta (~0,4s de import)
+            import pandas as pd
             
-            conn.close()
+            with self.db.connection() as conn:
+                df_cotacao = pd.read_sql(queries.EXPORTAR_COTACAO, conn,
+                                         params=(self.cotacao_selecionada_id,))
+                
+                df_transportadoras = pd.read_sql(queries.EXPORTAR_COTACAO_FRETES, conn,
+                                                 params=(self.cotacao_selecionada_id,))
             
             from datetime import datetime
             filename = f"cotacao_{self.cotacao_selecionada_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
@@ -1243,60 +1195,93 @@ class HistoricoWindow(QWidget):
             QMessageBox.critical(self, "Erro", f"Erro ao exportar Excel: {e}")
 
     def exportar_excel(self):
-        """Exporta todas as cotações para Excel"""
-        try:
-            conn = self.db.get_connection()
-            
-            query = """
-                SELECT 
-                    c.id as "ID",
-                    c.data as "Data",
-                    c.fornecedor as "Fornecedor",
-                    c.num_pedido as "Pedido",
-                    c.valor_nf as "Valor NF",
-                    c.peso as "Peso",
-                    c.volume as "Volume",
-                    c.cubagem as "Cubagem",
-                    t.nome as "Transportadora Ganhadora",
-                    ct.valor_frete as "Frete",
-                    (ct.valor_frete / c.valor_nf * 100) as "Percentual do Frete"
-                FROM cotacoes c
-                LEFT JOIN transportadoras t ON c.transportadora_ganhadora_id = t.id
-                LEFT JOIN cotacoes_transportadoras ct ON c.id = ct.cotacao_id AND ct.selecionada = 1
-                WHERE 1=1
-            """
-            params = []
-            
-            data_inicio = self.filtro_data_inicio.date().toString("yyyy-MM-dd")
-            data_fim = self.filtro_data_fim.date().toString("yyyy-MM-dd")
-            query += " AND c.data BETWEEN ? AND ?"
-            params.extend([data_inicio, data_fim])
-            
-            fornecedor_filtro = self.filtro_fornecedor_input.text().strip()
-            if fornecedor_filtro:
-                query += " AND c.fornecedor LIKE ?"
-                params.append(f"%{fornecedor_filtro}%")
-            
-            transportadora_filtro = self.filtro_transportadora_input.text().strip()
-            if transportadora_filtro:
-                query += " AND t.nome LIKE ?"
-                params.append(f"%{transportadora_filtro}%")
-            
-            query += " ORDER BY c.data DESC, c.id DESC"
-            
-            df_cotacoes = pd.read_sql(query, conn, params=params)
-            
-            conn.close()
-            
-            from datetime import datetime
-            filename = f"cotações_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            
-            df_cotacoes.to_excel(filename, index=False)
-            
-            QMessageBox.information(self, "Sucesso", f"Dados exportados para:\n{filename}")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao exportar Excel: {e}")
+        """Exporta as cotações filtradas no formato escolhido (em segundo plano)"""
+        if self.executor.ocupado("exportar"):
+            QMessageBox.warning(self, "Aviso", "Já existe uma exportação em andamento!")
+            return
+        
+        from datetime import datetime
+        formato = self.formato_exportacao.currentData()
+        extensao = exportador.FORMATOS[formato][2]
+        filename = f"cotações_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extensao}"
+        
+        self.progresso_exportacao = QProgressDialog("Exportando cotações...", "Cancelar", 0, 0, self)
+        self.progresso_exportacao.setWindowTitle("Exportação")
+        self.progresso_exportacao.setMinimumDuration(500)
+        self.progresso_exportacao.canceled.connect(lambda: self.executor.cancelar("exportar"))
+        
+        self.executor.executar(
+            exportar_consulta, self.filtro_atual(), formato, filename,
+            chave="exportar",
+            ao_progresso=self.progresso_exportacao_atualizado,
+            ao_concluir=self.exportacao_concluida,
+            ao_erro=self.erro_exportacao,
+        )
+    
+    def progresso_exportacao_atualizado(self, atual, total):
+        self.progresso_exportacao.setMaximum(total)
+        self.progresso_exportacao.setValue(atual)
+        self.progresso_exportacao.setLabelText(f"Exportando cotações... {atual} linhas")
+    
+    def exportacao_concluida(self, arquivo):
+        self.progresso_exportacao.reset()
+        QMessageBox.information(self, "Sucesso", f"Dados exportados para:\n{arquivo}")
+    
+    def erro_exportacao(self, erro):
+        self.progresso_exportacao.reset()
+        QMessageBox.critical(self, "Erro", f"Erro ao exportar: {erro}")
+
+    def importar_planilha(self, caminho=None):
+        """Importa cotações de uma planilha CSV/XLSX (em segundo plano)"""
+        if self.executor.ocupado("importar"):
+            QMessageBox.warning(self, "Aviso", "Já existe uma importação em andamento!")
+            return
+        
+        if not caminho:
+            caminho, _ = QFileDialog.getOpenFileName(
+                self, "Importar cotações", "", "Planilhas (*.xlsx *.csv);;Todos os arquivos (*)")
+            if not caminho:
+                return
+        
+        self.progresso_importacao = QProgressDialog("Importando cotações...", "Cancelar", 0, 0, self)
+        self.progresso_importacao.setWindowTitle("Importação")
+        self.progresso_importacao.setMinimumDuration(0)
+        self.progresso_importacao.canceled.connect(lambda: self.executor.cancelar("importar"))
+        
+        self.executor.executar(
+            importar_planilha, caminho,
+            chave="importar",
+            ao_progresso=self.progresso_importacao_atualizado,
+            ao_concluir=self.importacao_concluida,
+            ao_erro=self.erro_importacao,
+        )
+    
+    def progresso_importacao_atualizado(self, atual, total):
+        self.progresso_importacao.setMaximum(total)
+        self.progresso_importacao.setValue(atual)
+        if not total:
+            # Planilha sem total conhecido: barra indeterminada com a contagem
+            self.progresso_importacao.setLabelText(f"Importando cotações... {atual} linhas")
+    
+    def importacao_concluida(self, resultado):
+        self.progresso_importacao.reset()
+        if resultado.ja_importado:
+            QMessageBox.information(
+                self, "Importação",
+                f"Este arquivo já foi importado ({resultado.importadas} cotações).")
+            return
+        
+        mensagem = f"{resultado.importadas} cotações importadas, {resultado.rejeitadas} linhas rejeitadas."
+        if resultado.retomada_em:
+            mensagem += f"\nImportação retomada a partir da linha {resultado.retomada_em + 1}."
+        if resultado.erros:
+            mensagem += "\n\n" + "\n".join(f"Linha {n}: {erro}" for n, erro in resultado.erros[:10])
+        QMessageBox.information(self, "Importação", mensagem)
+        self.carregar_cotacoes()
+    
+    def erro_importacao(self, erro):
+        self.progresso_importacao.reset()
+        QMessageBox.critical(self, "Erro", f"Erro ao importar: {erro}")
 
     def excluir_cotacao(self):
         """Exclui a cotação selecionada"""
@@ -1316,8 +1301,8 @@ class HistoricoWindow(QWidget):
                 cursor = conn.cursor()
                 
                 try:
-                    cursor.execute('DELETE FROM cotacoes_transportadoras WHERE cotacao_id = ?', (self.cotacao_selecionada_id,))
-                    cursor.execute('DELETE FROM cotacoes WHERE id = ?', (self.cotacao_selecionada_id,))
+                    cursor.execute(queries.EXCLUIR_FRETES_COTACAO, (self.cotacao_selecionada_id,))
+                    cursor.execute(queries.EXCLUIR_COTACAO, (self.cotacao_selecionada_id,))
                     
                     conn.commit()
                     QMessageBox.information(self, "Sucesso", f"Cotação #{self.cotacao_selecionada_id} excluída com sucesso!")
@@ -1363,4 +1348,5 @@ class HistoricoWindow(QWidget):
         self.filtro_data_inicio.setDate(QDate.currentDate().addDays(-30))
         self.filtro_data_fim.setDate(QDate.currentDate())
         self.filtro_fornecedor_input.clear()
-        self.filtro_transportadora_input.clear()
\ No newline at end of file
+        self.filtro_transportadora_input.clear()
+        self.busca_geral_input.clear()
\ No newline at end of file
@@ -0,0 +1,250 @@
+# tema.py - PALETA E FOLHA DE ESTILO DO DASHBOARD
+"""Cores e estilos da janela principal num único lugar.
+
+Em vez de cada card, botão e grupo receber a própria folha de estilo (cada
+setStyleSheet força o Qt a interpretar o texto e repolir o widget e seus
+filhos), a aplicação recebe uma só folha, montada uma vez, e os widgets só
+ganham objectName ou as propriedades "papel" e "cor" que os seletores usam:
+
+    card = QFrame()
+    card.setProperty("papel", "card")
+    card.setProperty("cor", "azul")
+
+As variações de cada cor (mais clara/escura em HLS) são calculadas uma vez
+por (cor, percentual). Os seletores são todos por nome ou propriedade, então
+a folha não afeta as telas que ainda usam estilos próprios.
+"""
+import colorsys
+from functools import lru_cache
+
+from PyQt5.QtWidgets import QApplication
+
+# Cores dos cards de métricas e dos botões de ação rápida
+PALETA = {
+    "azul": "#3498db",
+    "verde": "#2ecc71",
+    "vermelho": "#e74c3c",
+    "laranja": "#f39c12",
+    "verde_escuro": "#27ae60",
+    "azul_escuro": "#2980b9",
+    "roxo": "#8e44ad",
+    "abobora": "#e67e22",
+}
+
+
+@lru_cache(maxsize=None)
+def _hls(cor):
+    cor = cor.lstrip('#')
+    r, g, b = (int(cor[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    return colorsys.rgb_to_hls(r, g, b)
+
+
+@lru_cache(maxsize=None)
+def ajustar_luminosidade(cor, percentual):
+    """Cor HEX com a luminosidade (HLS) deslocada em `percentual` pontos"""
+    h, l, s = _hls(cor)
+    r, g, b = colorsys.hls_to_rgb(h, min(1, max(0, l + percentual / 100)), s)
+    return '#{:02x}{:02x}{:02x}'.format(int(r * 255), int(g * 255), int(b * 255))
+
+
+def escurecer(cor, percentual):
+    """Escurece uma cor HEX"""
+    return ajustar_luminosidade(cor, -percentual)
+
+
+def clarear(cor, percentual):
+    """Clareia uma cor HEX"""
+    return ajustar_luminosidade(cor, percentual)
+
+
+def _gradiente(x2, y2, inicio, fim):
+    return (f"qlineargradient(x1:0, y1:0, x2:{x2}, y2:{y2}, "
+            f"stop:0 {inicio}, stop:1 {fim})")
+
+
+def _regras_card(nome, cor):
+    # Os rótulos do card (QLabel é um QFrame) recebem o mesmo fundo e
+    # borda, como acontecia com a folha "QFrame { ... }" de cada card
+    card = f'QFrame[papel="card"][cor="{nome}"]'
+    return f"""
+        {card}, {card} QFrame {{
+            background: {_gradiente(1, 1, cor, escurecer(cor, 15))};
+            border: 1px solid {escurecer(cor, 10)};
+        }}
+        {card}:hover, {card} QFrame:hover {{
+            background: {_gradiente(1, 1, clarear(cor, 5), cor)};
+            border: 2px solid {clarear(cor, 20)};
+        }}
+    """
+
+
+def _regras_acao(nome, cor):
+    botao = f'QPushButton[papel="acao"][cor="{nome}"]'
+    return f"""
+        {botao} {{
+            background: {_gradiente(1, 0, cor, clarear(cor, 15))};
+        }}
+        {botao}:hover {{
+            background: {_gradiente(1, 0, clarear(cor, 5), clarear(cor, 20))};
+        }}
+        {botao}:pressed {{
+            background: {_gradiente(1, 0, escurecer(cor, 5), cor)};
+        }}
+    """
+
+
+_FOLHA_BASE = """
+    /* Menu lateral */
+    #barraLateral, #barraLateral QFrame {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #2c3e50, stop:1 #34495e);
+    }
+    #logoIcone { font-size: 40px; }
+    #logoTexto { color: white; }
+    #logoSubtitulo { color: #bdc3c7; font-size: 10px; }
+    #rodapeLateral { color: #7f8c8d; font-size: 10px; padding: 10px; }
+    QPushButton[papel="menu"] {
+        background-color: rgba(255,255,255,0.1);
+        color: white;
+        border: none;
+        text-align: left;
+        padding-left: 20px;
+        font-weight: bold;
+        font-size: 13px;
+        border-radius: 5px;
+        margin: 2px 10px;
+    }
+    QPushButton[papel="menu"]:hover {
+        background-color: rgba(52, 152, 219, 0.3);
+        border-left: 3px solid #3498db;
+    }
+
+    /* Barra superior do dashboard */
+    #barraTopo, #barraTopo QFrame {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #2c3e50, stop:1 #3498db);
+        border-bottom: 3px solid #2980b9;
+    }
+    #boasVindas { color: white; }
+    #dataHora { color: rgba(255,255,255,0.9); font-size: 12px; }
+    #atualizarDashboard {
+        background-color: rgba(255,255,255,0.2);
+        color: white;
+        border: 2px solid rgba(255,255,255,0.3);
+        border-radius: 8px;
+        font-weight: bold;
+        font-size: 11px;
+    }
+    #atualizarDashboard:hover { background-color: rgba(255,255,255,0.3); }
+
+    /* Conteúdo */
+    #rolagemInicio { border: none; background: transparent; }
+    #areaConteudo {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #ecf0f1, stop:1 #bdc3c7);
+    }
+    QGroupBox#visaoGeral {
+        font-weight: bold;
+        font-size: 16px;
+        color: #2c3e50;
+        border: 2px solid #95a5a6;
+        border-radius: 12px;
+        margin-top: 15px;
+        padding-top: 15px;
+        background: white;
+    }
+    QGroupBox#visaoGeral::title {
+        subcontrol-origin: margin;
+        left: 15px;
+        padding: 0 10px 0 10px;
+        background: white;
+    }
+    QGroupBox[papel="secao"] {
+        font-weight: bold;
+        font-size: 14px;
+        color: #2c3e50;
+        border: 2px solid #bdc3c7;
+        border-radius: 10px;
+        margin-top: 10px;
+        padding-top: 10px;
+        background: white;
+    }
+    QGroupBox[papel="secao"]::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 5px 0 5px;
+    }
+
+    /* Cards de métricas (cores em _regras_card) */
+    QFrame[papel="card"], QFrame[papel="card"] QFrame { border-radius: 12px; }
+    QLabel[papel="card-icone"] { font-size: 24px; }
+    QLabel[papel="card-titulo"] { color: white; font-size: 12px; font-weight: bold; }
+    QLabel[papel="card-valor"] { color: white; font-size: 28px; font-weight: bold; }
+    QLabel[papel="card-subtitulo"] { color: rgba(255,255,255,0.9); font-size: 11px; font-style: italic; }
+
+    /* Botões de ação rápida (cores em _regras_acao) */
+    QPushButton[papel="acao"] {
+        color: white;
+        border: none;
+        border-radius: 10px;
+        font-weight: bold;
+        font-size: 13px;
+        padding: 15px;
+    }
+    QPushButton[papel="acao"]:hover { border: 2px solid rgba(255,255,255,0.3); }
+
+    /* Itens de estatística */
+    QWidget[papel="estatistica"], QWidget[papel="estatistica"] QWidget {
+        background: rgba(255,255,255,0.8);
+        border-radius: 8px;
+        margin: 2px;
+    }
+    QWidget[papel="estatistica"]:hover, QWidget[papel="estatistica"] QWidget:hover {
+        background: rgba(255,255,255,0.95);
+        border: 1px solid #3498db;
+    }
+    QLabel[papel="estatistica-rotulo"] { color: #2c3e50; font-size: 12px; font-weight: bold; }
+    QLabel[papel="estatistica-valor"] { color: #27ae60; font-size: 12px; font-weight: bold; }
+
+    /* Cotações recentes */
+    QTableWidget#cotacoesRecentes {
+        background-color: white;
+        border: 2px solid #bdc3c7;
+        border-radius: 10px;
+        gridline-color: #ecf0f1;
+        font-size: 11px;
+    }
+    #cotacoesRecentes QHeaderView::section {
+        background-color: #34495e;
+        color: white;
+        padding: 12px;
+        border: none;
+        font-weight: bold;
+        font-size: 11px;
+    }
+    QTableWidget#cotacoesRecentes::item {
+        padding: 10px;
+        border-bottom: 1px solid #ecf0f1;
+    }
+    QTableWidget#cotacoesRecentes::item:selected {
+        background-color: #3498db;
+        color: white;
+    }
+"""
+
+
+@lru_cache(maxsize=None)
+def folha_de_estilo():
+    """Folha única da aplicação: base + regras de cada cor da PALETA"""
+    partes = [_FOLHA_BASE]
+    for nome, cor in PALETA.items():
+        partes.append(_regras_card(nome, cor))
+        partes.append(_regras_acao(nome, cor))
+    return "\n".join(partes)
+
+
+def aplicar(app=None):
+    """Instala a folha na aplicação, se ainda não estiver instalada"""
+    app = app or QApplication.instance()
+    folha = folha_de_estilo()
+    if app.styleSheet() != folha:
+        app.setStyleSheet(folha)
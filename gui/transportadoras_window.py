@@ -634,11 +634,8 @@ class TransportadorasWindow(QWidget):
     def load_transportadoras(self):
         """Carrega a lista de transportadoras do banco"""
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, nome, cnpj FROM transportadoras ORDER BY nome")
-            transportadoras = cursor.fetchall()
-            conn.close()
+            with self.db.connection() as conn:
+                transportadoras = conn.execute("SELECT id, nome, cnpj FROM transportadoras ORDER BY nome").fetchall()
             
             self.table.setRowCount(len(transportadoras))
             
@@ -681,26 +678,24 @@ class TransportadorasWindow(QWidget):
         try:
             transportadora_id = int(self.table.item(row, 0).text())
             
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            # Dados básicos
-            cursor.execute('''
-                SELECT id, nome, cnpj, percentual_base, icms 
-                FROM transportadoras WHERE id = ?
-            ''', (transportadora_id,))
-            transp = cursor.fetchone()
-            
-            # Contatos
-            cursor.execute('''
-                SELECT tipo, valor, contato 
-                FROM transportadora_contatos 
-                WHERE transportadora_id = ? 
-                ORDER BY tipo, id
-            ''', (transportadora_id,))
-            contatos = cursor.fetchall()
-            
-            conn.close()
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Dados básicos
+                cursor.execute('''
+                    SELECT id, nome, cnpj, percentual_base, icms 
+                    FROM transportadoras WHERE id = ?
+                ''', (transportadora_id,))
+                transp = cursor.fetchone()
+                
+                # Contatos
+                cursor.execute('''
+                    SELECT tipo, valor, contato 
+                    FROM transportadora_contatos 
+                    WHERE transportadora_id = ? 
+                    ORDER BY tipo, id
+                ''', (transportadora_id,))
+                contatos = cursor.fetchall()
             
             if transp:
                 self.current_transportadora_id = transp[0]
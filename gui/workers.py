@@ -0,0 +1,175 @@
+# workers.py - CONSULTAS AO BANCO FORA DA THREAD DA INTERFACE
+"""Executa acesso ao banco em um QThreadPool e devolve o resultado por sinais.
+
+Uso típico numa tela:
+
+    self.executor = ExecutorBanco(self.db, self)
+    self.executor.executar(buscar_cotacoes, filtros,
+                           chave="filtros",
+                           ao_concluir=self.mostrar_cotacoes,
+                           ao_erro=self.mostrar_erro)
+
+A função recebe (conn, tarefa, *args) e roda numa thread do pool com uma
+conexão própria. tarefa.progresso(atual, total) emite o sinal de progresso
+e tarefa.cancelada indica se a tarefa foi substituída. Uma nova tarefa com a
+mesma chave cancela a anterior: a consulta em andamento é abortada com
+sqlite3.Connection.interrupt() e o resultado dela nunca chega à tela.
+"""
+import sqlite3
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TarefaCancelada(Exception):
+    """Levantada dentro da tarefa quando ela foi cancelada"""
+
+
+class SinaisTarefa(QObject):
+    resultado = pyqtSignal(object)
+    erro = pyqtSignal(str)
+    progresso = pyqtSignal(int, int)
+    finalizada = pyqtSignal()
+
+
+class TarefaBanco(QRunnable):
+    def __init__(self, db, funcao, *args, **kwargs):
+        super().__init__()
+        # Quem controla a vida do objeto é o ExecutorBanco (referência Python)
+        self.setAutoDelete(False)
+        self.db = db
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        # Criado na thread da interface: os sinais chegam lá por fila
+        self.sinais = SinaisTarefa()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._cancelada = False
+
+    @property
+    def cancelada(self):
+        return self._cancelada
+
+    def cancelar(self):
+        """Marca como cancelada e aborta a consulta em andamento, se houver"""
+        with self._lock:
+            self._cancelada = True
+            # Só interrompe enquanto a conexão é desta tarefa; depois de
+            # devolvida ao pool ela pode estar servindo outra consulta
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def verificar_cancelamento(self):
+        """Para laços longos em Python dentro da tarefa"""
+        if self._cancelada:
+            raise TarefaCancelada()
+
+    def progresso(self, atual, total):
+        self.verificar_cancelamento()
+        # Total desconhecido (None) vai como 0: barra indeterminada no Qt
+        self.sinais.progresso.emit(int(atual), int(total or 0))
+
+    def run(self):
+        try:
+            if self._cancelada:
+                return
+            conn = self.db.get_connection()
+            with self._lock:
+                self._conn = conn
+            try:
+                resultado = self.funcao(conn, self, *self.args, **self.kwargs)
+            finally:
+                with self._lock:
+                    self._conn = None
+                conn.close()
+            if not self._cancelada:
+                self.sinais.resultado.emit(resultado)
+        except TarefaCancelada:
+            pass
+        except sqlite3.OperationalError as e:
+            # "interrupted" é a consulta abortada por cancelar()
+            if not self._cancelada:
+                self.sinais.erro.emit(str(e))
+        except Exception as e:
+            if not self._cancelada:
+                self.sinais.erro.emit(str(e))
+        finally:
+            self.sinais.finalizada.emit()
+
+
+def consultar(conn, tarefa, sql, params=()):
+    """Tarefa simples: executa o SELECT e devolve todas as linhas"""
+    return conn.execute(sql, params).fetchall()
+
+
+class ExecutorBanco(QObject):
+    def __init__(self, db, parent=None, max_threads=2):
+        super().__init__(parent)
+        self.db = db
+        # Poucas threads: o pool de conexões precisa sobrar para a interface
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._por_chave = {}
+        self._ativas = set()
+
+    def executar(self, funcao, *args, chave=None, ao_concluir=None, ao_erro=None,
+                 ao_progresso=None, **kwargs):
+        """Agenda funcao(conn, tarefa, *args, **kwargs) e retorna a TarefaBanco"""
+        if chave is not None:
+            self.cancelar(chave)
+
+        tarefa = TarefaBanco(self.db, funcao, *args, **kwargs)
+        if ao_concluir:
+            tarefa.sinais.resultado.connect(self._entregar(tarefa, ao_concluir))
+        if ao_erro:
+            tarefa.sinais.erro.connect(self._entregar(tarefa, ao_erro))
+        if ao_progresso:
+            tarefa.sinais.progresso.connect(self._entregar_progresso(tarefa, ao_progresso))
+        tarefa.sinais.finalizada.connect(lambda: self._finalizar(tarefa, chave))
+
+        # A referência Python mantém os sinais vivos até a tarefa terminar
+        self._ativas.add(tarefa)
+        if chave is not None:
+            self._por_chave[chave] = tarefa
+        self.pool.start(tarefa)
+        return tarefa
+
+    def cancelar(self, chave):
+        tarefa = self._por_chave.pop(chave, None)
+        if tarefa is not None:
+            tarefa.cancelar()
+
+    def cancelar_todas(self):
+        for tarefa in list(self._ativas):
+            tarefa.cancelar()
+        self._por_chave.clear()
+
+    def ocupado(self, chave=None):
+        if chave is None:
+            return bool(self._ativas)
+        return chave in self._por_chave
+
+    def aguardar(self, msecs=-1):
+        """Espera as tarefas terminarem (fechamento da janela)"""
+        return self.pool.waitForDone(msecs)
+
+    @staticmethod
+    def _entregar(tarefa, callback):
+        # O sinal pode já estar na fila quando a tarefa é cancelada
+        def entregar(valor):
+            if not tarefa.cancelada:
+                callback(valor)
+        return entregar
+
+    @staticmethod
+    def _entregar_progresso(tarefa, callback):
+        def entregar(atual, total):
+            if not tarefa.cancelada:
+                callback(atual, total)
+        return entregar
+
+    def _finalizar(self, tarefa, chave):
+        self._ativas.discard(tarefa)
+        if chave is not None and self._por_chave.get(chave) is tarefa:
+            del self._por_chave[chave]
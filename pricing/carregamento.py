@@ -0,0 +1,416 @@
+# carregamento.py - PLANO DE CARREGAMENTO 3D DOS VOLUMES
+"""Quantos veículos a lista da calculadora ocupa e onde vai cada volume.
+
+Heurística de blocos com cortes de guilhotina, sem otimização exata: os
+tipos de volume entram do maior para o menor; cada um ocupa o espaço livre
+mais ao fundo do veículo (o mais perto da cabine, depois o mais baixo e o
+mais à esquerda) e, de uma vez, o maior bloco de caixas iguais que couber
+nele (empilha até o teto, depois na largura, depois no comprimento). O
+espaço usado é cortado em três espaços livres que não se sobrepõem:
+
+- acima do bloco (apoiado inteiro no topo dele);
+- ao lado do bloco, no mesmo piso;
+- à frente do bloco, com a largura e a altura do espaço original.
+
+Como os espaços livres nunca se sobrepõem, não há teste de colisão entre
+caixas: escolher o espaço é uma conta vetorizada sobre o array de espaços
+× orientações permitidas. Quando nenhum espaço serve, abre-se mais um
+veículo; os anteriores continuam aceitando volumes menores.
+
+Eixos: x no comprimento do baú (0 na cabine), y na largura e z na altura,
+tudo em metros. O volume "em pé" tem a altura da calculadora no eixo z.
+
+    plano = planejar(itens, VEICULOS["truck"], rotacao=ROTACAO_VERTICAL)
+    plano.veiculos, plano.taxa_ocupacao, plano.posicoes()[:3]
+
+Linha de comando, com a lista num CSV/XLSX (mesmo leitor da calculadora)
+ou um cálculo salvo no banco:
+
+    python -m pricing.carregamento volumes.xlsx --veiculo truck --rotacao livre
+    python -m pricing.carregamento --db cotacoes.db --calculo 42
+"""
+import argparse
+import math
+import sys
+import time
+from dataclasses import dataclass
+from itertools import permutations
+
+import numpy as np
+
+from pricing.cubagem import ItensCubagem, ler_arquivo
+
+# Folga nas comparações de medidas (m): 0,0001 mm
+EPS = 1e-7
+
+ROTACAO_FIXA = "fixa"          # só como foi informado
+ROTACAO_VERTICAL = "vertical"  # gira no piso (este lado para cima)
+ROTACAO_LIVRE = "livre"        # qualquer face para baixo
+
+# Medidas do volume na ordem dos eixos: (comprimento, largura, altura)
+_ORIENTACOES = {
+    ROTACAO_FIXA: ((0, 1, 2),),
+    ROTACAO_VERTICAL: ((0, 1, 2), (1, 0, 2)),
+    ROTACAO_LIVRE: tuple(permutations(range(3))),
+}
+
+ROTACOES = {
+    ROTACAO_VERTICAL: "Este lado para cima",
+    ROTACAO_LIVRE: "Livre",
+    ROTACAO_FIXA: "Sem girar",
+}
+
+# Medida linear da calculadora -> metros
+METROS_POR_UNIDADE = {"cm": 0.01, "m": 1.0}
+
+_CAPACIDADE_INICIAL = 256
+_SEM_LUGAR = np.iinfo(np.int64).max
+
+
+@dataclass(frozen=True)
+class PerfilVeiculo:
+    """Baú do veículo, medidas internas em metros"""
+    nome: str
+    comprimento: float
+    largura: float
+    altura: float
+
+    @property
+    def volume(self):
+        return self.comprimento * self.largura * self.altura
+
+    @property
+    def medidas(self):
+        return np.array([self.comprimento, self.largura, self.altura])
+
+
+# Medidas internas típicas; ajuste conforme a frota contratada
+VEICULOS = {
+    "fiorino": PerfilVeiculo("Fiorino", 1.85, 1.25, 1.20),
+    "vuc": PerfilVeiculo("VUC", 4.50, 2.20, 2.20),
+    "tres_quartos": PerfilVeiculo("3/4", 5.50, 2.30, 2.40),
+    "toco": PerfilVeiculo("Toco", 7.00, 2.50, 2.60),
+    "truck": PerfilVeiculo("Truck", 8.50, 2.50, 2.70),
+    "carreta": PerfilVeiculo("Carreta", 14.60, 2.50, 2.70),
+}
+
+
+@dataclass(frozen=True)
+class Posicao:
+    veiculo: int  # 0, 1, ... na ordem de abertura
+    linha: int    # linha da calculadora
+    x: float
+    y: float
+    z: float
+    comprimento: float
+    largura: float
+    altura: float
+
+
+@dataclass(frozen=True)
+class PlanoCarga:
+    perfil: PerfilVeiculo
+    veiculos: int
+    # Uma posição por caixa: veículo, linha de origem, canto (x, y, z) e
+    # medidas já giradas (comprimento, largura, altura), em arrays
+    caixa_veiculo: np.ndarray
+    caixa_linha: np.ndarray
+    origem: np.ndarray
+    dimensoes: np.ndarray
+    # (linha, quantidade) dos volumes maiores que o baú
+    sem_lugar: tuple = ()
+
+    @property
+    def caixas(self):
+        return len(self.caixa_linha)
+
+    @property
+    def volume_carregado(self):
+        """m³ das caixas posicionadas"""
+        return float(self.dimensoes.prod(axis=1).sum())
+
+    @property
+    def taxa_ocupacao(self):
+        """Fração do volume dos veículos usados que está ocupada"""
+        if not self.veiculos:
+            return 0.0
+        return self.volume_carregado / (self.veiculos * self.perfil.volume)
+
+    def ocupacao_por_veiculo(self):
+        """Fração ocupada de cada veículo"""
+        volumes = np.bincount(self.caixa_veiculo, weights=self.dimensoes.prod(axis=1),
+                              minlength=self.veiculos)
+        return volumes / self.perfil.volume
+
+    def posicoes(self):
+        """Lista de Posicao, na ordem em que as caixas foram posicionadas"""
+        return [
+            Posicao(v, l, x, y, z, c, lg, a)
+            for v, l, (x, y, z), (c, lg, a) in zip(self.caixa_veiculo.tolist(), self.caixa_linha.tolist(),
+                                                  self.origem.tolist(), self.dimensoes.tolist())
+        ]
+
+
+class _Espacos:
+    """Espaços livres em arrays; remover troca com o último (ordem não importa)
+
+    Cada espaço guarda uma chave inteira com a ordem de preferência
+    (veículo, x, z, y em mm), então escolher o espaço é um argmin.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.origem = np.zeros((_CAPACIDADE_INICIAL, 3))
+        # Por eixo (3, capacidade): cada comparação lê uma fatia contígua
+        self.tamanho = np.zeros((3, _CAPACIDADE_INICIAL))
+        self.veiculo = np.zeros(_CAPACIDADE_INICIAL, dtype=np.int64)
+        self.chave = np.zeros(_CAPACIDADE_INICIAL, dtype=np.int64)
+
+    def adicionar(self, origem, tamanho, veiculo):
+        if self.n == self.veiculo.shape[0]:
+            capacidade = 2 * self.n
+            self.origem = np.resize(self.origem, (capacidade, 3))
+            self.tamanho = np.concatenate((self.tamanho, np.zeros((3, self.n))), axis=1)
+            self.veiculo = np.resize(self.veiculo, capacidade)
+            self.chave = np.resize(self.chave, capacidade)
+        x, y, z = (int(round(v * 1000)) for v in origem)
+        self.origem[self.n] = origem
+        self.tamanho[:, self.n] = tamanho
+        self.veiculo[self.n] = veiculo
+        # 15 bits para x (até 32 m), 14 para z e y (até 16 m)
+        self.chave[self.n] = (((veiculo << 15) | x) << 28) | (z << 14) | y
+        self.n += 1
+
+    def remover(self, indice):
+        self.n -= 1
+        if indice != self.n:
+            self.origem[indice] = self.origem[self.n]
+            self.tamanho[:, indice] = self.tamanho[:, self.n]
+            self.veiculo[indice] = self.veiculo[self.n]
+            self.chave[indice] = self.chave[self.n]
+
+    def escolher(self, orientacoes):
+        """Espaço mais ao fundo onde cabe alguma orientação e a máscara delas
+
+        Ordem: veículo, x (da cabine para a porta), z (de baixo para cima), y.
+        """
+        if not self.n:
+            return None, None
+        c, l, a = self.tamanho[:, :self.n] + EPS
+        # Um teste por orientação (no máximo 6) em vez de reduzir um array
+        # (espaços, orientações, 3): reduções em eixos curtos são lentas
+        cabe = None
+        for oc, ol, oa in orientacoes.tolist():
+            teste = (c >= oc) & (l >= ol) & (a >= oa)
+            cabe = teste if cabe is None else cabe | teste
+        chaves = np.where(cabe, self.chave[:self.n], _SEM_LUGAR)
+        melhor = int(chaves.argmin())
+        if chaves[melhor] == _SEM_LUGAR:
+            return None, None
+        return melhor, (self.tamanho[:, melhor] + EPS >= orientacoes).all(axis=1)
+
+
+def _bloco(cabem, quantidade):
+    """Caixas por eixo (x, y, z) do maior bloco completo com até `quantidade`
+
+    Empilha primeiro (z), depois preenche a largura (y) e por último o
+    comprimento (x).
+    """
+    nz = min(cabem[2], quantidade)
+    ny = min(cabem[1], quantidade // nz)
+    nx = min(cabem[0], quantidade // (nz * ny))
+    return nx, ny, nz
+
+
+def planejar_caixas(quantidades, dimensoes, perfil, rotacao=ROTACAO_VERTICAL):
+    """Plano para volumes em arrays
+
+    quantidades: inteiros por linha; dimensoes: (linhas, 3) em metros na
+    ordem (comprimento, largura, altura); rotacao: uma para todas as linhas
+    ou uma por linha. Linhas com quantidade ou alguma medida zero são
+    ignoradas.
+    """
+    quantidades = np.rint(np.asarray(quantidades, dtype=np.float64)).astype(np.int64)
+    dimensoes = np.asarray(dimensoes, dtype=np.float64).reshape(-1, 3)
+    if quantidades.shape[0] != dimensoes.shape[0]:
+        raise ValueError(f"{quantidades.shape[0]} quantidades para {dimensoes.shape[0]} linhas de medidas")
+    rotacoes = [rotacao] * len(quantidades) if isinstance(rotacao, str) else list(rotacao)
+    if len(rotacoes) != len(quantidades):
+        raise ValueError(f"{len(rotacoes)} rotações para {len(quantidades)} linhas")
+    for r in set(rotacoes):
+        if r not in _ORIENTACOES:
+            raise ValueError(f"Rotação desconhecida: {r!r} (use {', '.join(_ORIENTACOES)})")
+
+    bau = perfil.medidas
+    if bau[0] > 32 or max(bau[1:]) > 16:
+        raise ValueError(f"Baú {perfil.nome} fora da faixa (até 32 m de comprimento e 16 m de largura/altura)")
+    validas = np.flatnonzero((quantidades > 0) & (dimensoes > 0).all(axis=1))
+    ordem = validas[np.argsort(-dimensoes[validas].prod(axis=1), kind="stable")]
+    # Menor lado entre os volumes que ainda vão entrar: espaços mais
+    # estreitos que isso não servem para mais nada
+    menor_lado = np.minimum.accumulate(dimensoes[ordem].min(axis=1)[::-1])[::-1]
+
+    espacos = _Espacos()
+    veiculos = 0
+    blocos = []  # (veiculo, linha, origem, orientação, nx, ny, nz)
+    sem_lugar = []
+    for posicao, linha in enumerate(ordem.tolist()):
+        orientacoes = dimensoes[linha][np.array(_ORIENTACOES[rotacoes[linha]])]
+        if not (orientacoes <= bau + EPS).all(axis=1).any():
+            sem_lugar.append((linha, int(quantidades[linha])))
+            continue
+        limite = menor_lado[posicao] - EPS
+        restantes = int(quantidades[linha])
+        while restantes:
+            indice, cabe = espacos.escolher(orientacoes)
+            if indice is None:
+                espacos.adicionar((0.0, 0.0, 0.0), bau, veiculos)
+                veiculos += 1
+                continue
+            origem = espacos.origem[indice].copy()
+            tamanho = espacos.tamanho[:, indice].copy()
+            veiculo = int(espacos.veiculo[indice])
+
+            # Orientação que põe mais caixas no espaço; empate fica com a
+            # que usa menos comprimento do baú
+            opcoes = orientacoes[cabe]
+            cabem = np.floor((tamanho + EPS) / opcoes).astype(np.int64)
+            escolhas = [_bloco(c, restantes) for c in cabem.tolist()]
+            contagens = [nx * ny * nz for nx, ny, nz in escolhas]
+            comprimentos = [nx * o for (nx, _ny, _nz), o in zip(escolhas, opcoes[:, 0].tolist())]
+            melhor = min(range(len(opcoes)), key=lambda i: (-contagens[i], comprimentos[i]))
+            orientacao = opcoes[melhor]
+            n = escolhas[melhor]
+            usado = orientacao * n
+            blocos.append((veiculo, linha, origem, orientacao, *n))
+            restantes -= contagens[melhor]
+
+            espacos.remover(indice)
+            for novo_origem, novo_tamanho in (
+                (origem + (0.0, 0.0, usado[2]), (usado[0], usado[1], tamanho[2] - usado[2])),
+                (origem + (0.0, usado[1], 0.0), (usado[0], tamanho[1] - usado[1], tamanho[2])),
+                (origem + (usado[0], 0.0, 0.0), (tamanho[0] - usado[0], tamanho[1], tamanho[2])),
+            ):
+                if min(novo_tamanho) >= limite:
+                    espacos.adicionar(novo_origem, novo_tamanho, veiculo)
+
+    return PlanoCarga(perfil, veiculos, *_expandir(blocos), sem_lugar=tuple(sem_lugar))
+
+
+def _expandir(blocos):
+    """Blocos -> uma linha por caixa (veículo, linha, origem, dimensões)"""
+    if not blocos:
+        return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                np.zeros((0, 3)), np.zeros((0, 3)))
+    veiculo, linha, origem, orientacao, nx, ny, nz = (np.array(coluna) for coluna in zip(*blocos))
+    por_bloco = nx * ny * nz
+    bloco = np.repeat(np.arange(len(blocos)), por_bloco)
+    local = np.arange(por_bloco.sum()) - np.repeat(np.cumsum(por_bloco) - por_bloco, por_bloco)
+    altura, largura = nz[bloco], ny[bloco]
+    grade = np.column_stack((local // (altura * largura), local // altura % largura, local % altura))
+    dimensoes = orientacao[bloco]
+    return veiculo[bloco], linha[bloco], origem[bloco] + grade * dimensoes, dimensoes
+
+
+def planejar(itens, perfil, rotacao=ROTACAO_VERTICAL):
+    """Plano de carga das linhas de um ItensCubagem num tipo de veículo"""
+    metros = METROS_POR_UNIDADE[itens.unidade]
+    dimensoes = np.column_stack([itens.coluna(nome) for nome in ("comprimento", "largura", "altura")]) * metros
+    return planejar_caixas(itens.coluna("quantidade"), dimensoes, perfil, rotacao)
+
+
+def planejar_frota(itens, perfis=None, rotacao=ROTACAO_VERTICAL):
+    """Planos dos perfis, do mais indicado para o menos
+
+    Primeiro os perfis em que tudo cabe; entre eles, o que leva a carga em
+    menos veículos e, no empate, o de baú menor. Perfis que nem no limite
+    teórico (cubagem total / volume do baú, arredondado para cima) bateriam
+    o melhor plano já feito não são planejados e ficam fora da lista.
+    """
+    perfis = list(VEICULOS.values() if perfis is None else perfis)
+
+    def minimo(perfil):
+        return max(math.ceil(itens.total / perfil.volume - EPS), 1), perfil.volume
+
+    def ordem(plano):
+        return bool(plano.sem_lugar), plano.veiculos, plano.perfil.volume
+
+    planos = []
+    for perfil in sorted(perfis, key=minimo):
+        melhor = min(planos, key=ordem, default=None)
+        if melhor and not melhor.sem_lugar and minimo(perfil) >= ordem(melhor)[1:]:
+            continue
+        planos.append(planejar(itens, perfil, rotacao))
+    return sorted(planos, key=ordem)
+
+
+def resumo(plano):
+    """Texto de uma linha: veículos, ocupação e volumes sem lugar"""
+    texto = f"{plano.veiculos} × {plano.perfil.nome}"
+    if plano.veiculos:
+        texto += f" — ocupação {plano.taxa_ocupacao:.1%}"
+        ocupacoes = plano.ocupacao_por_veiculo()
+        if 1 < plano.veiculos <= 6:
+            texto += " (" + " / ".join(f"{o:.0%}" for o in ocupacoes) + ")"
+        elif plano.veiculos > 6:
+            texto += f" (de {ocupacoes.min():.0%} a {ocupacoes.max():.0%} por veículo)"
+    if plano.sem_lugar:
+        texto += f" — {sum(q for _l, q in plano.sem_lugar)} volume(s) maior(es) que o baú"
+    return texto.replace('.', ',')
+
+
+def _itens_do_banco(db_path, calculo_id):
+    # Só a linha de comando lê do banco; o planejador não depende dele
+    from database.database import Database
+    from database.relatorio_cubagem import carregar_calculo
+
+    db = Database(db_path, profile="analytics")
+    try:
+        with db.connection() as conn:
+            return carregar_calculo(conn, calculo_id)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plano de carregamento de uma lista de volumes")
+    parser.add_argument("arquivo", nargs="?", help="CSV/XLSX com quantidade, largura, comprimento e altura")
+    parser.add_argument("--calculo", type=int, help="Id de um cálculo salvo pela calculadora (em vez do arquivo)")
+    parser.add_argument("--db", dest="db_path", help="Caminho do banco SQLite (com --calculo)")
+    parser.add_argument("--veiculo", choices=list(VEICULOS), help="Padrão: compara todos os perfis")
+    parser.add_argument("--rotacao", choices=list(ROTACOES), default=ROTACAO_VERTICAL)
+    parser.add_argument("--unidade", choices=list(METROS_POR_UNIDADE), help="Padrão: a detectada na lista")
+    args = parser.parse_args()
+    if (args.arquivo is None) == (args.calculo is None):
+        parser.error("informe o arquivo ou --calculo")
+
+    if args.calculo is not None:
+        itens = _itens_do_banco(args.db_path, args.calculo)
+        if itens is None:
+            print(f"❌ Cálculo {args.calculo} não encontrado")
+            return 1
+        if args.unidade:
+            itens.definir_unidade(args.unidade)
+    else:
+        lista = ler_arquivo(args.arquivo)
+        itens = ItensCubagem(args.unidade or lista.unidade or "cm")
+        itens.adicionar_lote(*lista.colunas())
+    if not len(itens):
+        print(f"❌ Nenhum volume com medidas em {args.arquivo or f'cálculo {args.calculo}'}")
+        return 1
+    print(f"📦 {int(itens.coluna('quantidade').sum())} volumes em {len(itens)} linhas, {itens.total:.3f} m³")
+
+    inicio = time.perf_counter()
+    if args.veiculo:
+        planos = [planejar(itens, VEICULOS[args.veiculo], args.rotacao)]
+    else:
+        planos = planejar_frota(itens, rotacao=args.rotacao)
+    segundos = time.perf_counter() - inicio
+    for plano in planos:
+        print(f"   {resumo(plano)}")
+    print(f"✅ {len(planos)} plano(s) em {segundos:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
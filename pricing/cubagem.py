@@ -0,0 +1,356 @@
+# cubagem.py - ITENS DA CALCULADORA DE CUBAGEM EM ARRAYS
+"""Armazenamento numérico dos itens da calculadora de cubagem.
+
+Cada coluna (quantidade, largura, comprimento, altura) é um array NumPy;
+o volume de cada linha em m³ fica guardado ao lado e o total é mantido por
+diferença. Editar uma célula custa O(1): recalcula o volume daquela linha
+e soma ao total só a variação. Trocar a unidade (cm/m) é uma única conta
+vetorizada sobre todas as linhas.
+
+    itens = ItensCubagem("cm")
+    linha = itens.adicionar(quantidade=2, largura=50, comprimento=40, altura=30)
+    itens.definir(linha, "altura", 35)    # -> volume da linha em m³
+    itens.total                           # cubagem total em m³
+
+Listas de volumes coladas (tabulação) ou lidas de CSV/XLSX passam por
+ler_lista(), que acha o cabeçalho, converte os números com a mesma regra da
+calculadora (ler_numero) e detecta a unidade; o resultado entra de uma vez
+com ItensCubagem.adicionar_lote.
+"""
+import re
+from dataclasses import dataclass
+from itertools import chain
+
+import numpy as np
+
+from utils.planilhas import abrir_arquivo, normalizar
+
+COLUNAS = ("quantidade", "largura", "comprimento", "altura")
+
+# Fator do produto das três medidas para m³
+FATORES_UNIDADE = {"cm": 1e-6, "m": 1.0}
+
+_CAPACIDADE_INICIAL = 64
+
+
+def ler_numero(texto):
+    """Converte texto para número, aceita . ou , como separador decimal
+
+    Texto vazio ou inválido vale 0.
+    """
+    if not texto:
+        return 0.0
+    texto = str(texto).replace(',', '.').strip()
+    try:
+        return float(texto) if texto else 0.0
+    except ValueError:
+        return 0.0
+
+
+class ItensCubagem:
+    """Linhas da calculadora em arrays paralelos, com volume e total em m³
+
+    A quantidade guardada é a efetiva: a tela converte vazio/zero em 1
+    antes de chamar definir/adicionar.
+    """
+
+    def __init__(self, unidade="cm"):
+        self._fator = self._fator_da(unidade)
+        self.unidade = unidade
+        self._tamanho = 0
+        self._colunas = {nome: np.zeros(_CAPACIDADE_INICIAL) for nome in COLUNAS}
+        self._volumes = np.zeros(_CAPACIDADE_INICIAL)
+        self._total = 0.0
+
+    @staticmethod
+    def _fator_da(unidade):
+        try:
+            return FATORES_UNIDADE[unidade]
+        except KeyError:
+            raise ValueError(f"Unidade desconhecida: {unidade!r} (use cm ou m)") from None
+
+    def __len__(self):
+        return self._tamanho
+
+    @property
+    def total(self):
+        """Cubagem total em m³"""
+        return self._total
+
+    def coluna(self, nome):
+        """Valores de uma coluna (visão somente leitura, sem cópia)"""
+        valores = self._colunas[nome][:self._tamanho]
+        valores.flags.writeable = False
+        return valores
+
+    @property
+    def volumes(self):
+        """Volume de cada linha em m³ (visão somente leitura, sem cópia)"""
+        valores = self._volumes[:self._tamanho]
+        valores.flags.writeable = False
+        return valores
+
+    def volume(self, linha):
+        return float(self._volumes[self._indice(linha)])
+
+    def valor(self, linha, coluna):
+        return float(self._colunas[coluna][self._indice(linha)])
+
+    def _indice(self, linha):
+        if not 0 <= linha < self._tamanho:
+            raise IndexError(f"Linha {linha} fora da faixa (0..{self._tamanho - 1})")
+        return linha
+
+    def _reservar(self, tamanho):
+        capacidade = self._volumes.shape[0]
+        if tamanho <= capacidade:
+            return
+        while capacidade < tamanho:
+            capacidade *= 2
+        for nome, valores in self._colunas.items():
+            self._colunas[nome] = np.resize(valores, capacidade)
+        self._volumes = np.resize(self._volumes, capacidade)
+
+    def adicionar(self, quantidade=1.0, largura=0.0, comprimento=0.0, altura=0.0):
+        """Acrescenta uma linha e devolve o índice dela"""
+        linha = self._tamanho
+        self._reservar(linha + 1)
+        self._tamanho += 1
+        for nome, valor in zip(COLUNAS, (quantidade, largura, comprimento, altura)):
+            self._colunas[nome][linha] = valor
+        volume = quantidade * largura * comprimento * altura * self._fator
+        self._volumes[linha] = volume
+        self._total += volume
+        return linha
+
+    def adicionar_lote(self, quantidade, largura, comprimento, altura):
+        """Acrescenta várias linhas de uma vez (sequências do mesmo tamanho)
+
+        Devolve o range dos índices criados; o total é refeito numa só soma.
+        """
+        valores = [np.asarray(v, dtype=np.float64).ravel()
+                   for v in (quantidade, largura, comprimento, altura)]
+        quantidade_linhas = valores[0].shape[0]
+        if any(v.shape[0] != quantidade_linhas for v in valores):
+            raise ValueError("As colunas do lote têm tamanhos diferentes")
+        inicio = self._tamanho
+        fim = inicio + quantidade_linhas
+        self._reservar(fim)
+        for nome, coluna in zip(COLUNAS, valores):
+            self._colunas[nome][inicio:fim] = coluna
+        self._tamanho = fim
+        self._recalcular(inicio, fim)
+        return range(inicio, fim)
+
+    def definir(self, linha, coluna, valor):
+        """Altera uma célula; devolve o novo volume da linha em m³ (O(1))"""
+        linha = self._indice(linha)
+        self._colunas[coluna][linha] = valor
+        q, l, c, a = (self._colunas[nome][linha] for nome in COLUNAS)
+        volume = float(q * l * c * a * self._fator)
+        self._total += volume - float(self._volumes[linha])
+        self._volumes[linha] = volume
+        return volume
+
+    def definir_bloco(self, linha, coluna, valores):
+        """Grava um bloco linhas × colunas a partir da célula (linha, coluna)
+
+        Linhas além do fim são criadas (quantidade 1, medidas zero). O bloco
+        pode ter menos colunas que o restante da tabela, nunca mais.
+        Devolve quantas linhas foram criadas.
+        """
+        valores = np.atleast_2d(np.asarray(valores, dtype=np.float64))
+        primeira = COLUNAS.index(coluna)
+        linhas, colunas = valores.shape
+        if primeira + colunas > len(COLUNAS):
+            raise ValueError(f"O bloco tem {colunas} colunas a partir de {coluna!r}")
+        if not 0 <= linha <= self._tamanho:
+            raise IndexError(f"Linha {linha} fora da faixa (0..{self._tamanho})")
+        fim = linha + linhas
+        criadas = max(0, fim - self._tamanho)
+        if criadas:
+            self._reservar(fim)
+            for nome in COLUNAS:
+                self._colunas[nome][self._tamanho:fim] = 1.0 if nome == "quantidade" else 0.0
+            self._tamanho = fim
+        for deslocamento in range(colunas):
+            self._colunas[COLUNAS[primeira + deslocamento]][linha:fim] = valores[:, deslocamento]
+        self._recalcular(linha, fim)
+        return criadas
+
+    def definir_unidade(self, unidade):
+        """Troca a unidade das medidas e recalcula todos os volumes"""
+        self._fator = self._fator_da(unidade)
+        self.unidade = unidade
+        self._recalcular(0, self._tamanho)
+
+    def _recalcular(self, inicio, fim):
+        q, l, c, a = (self._colunas[nome][inicio:fim] for nome in COLUNAS)
+        np.multiply(q * l * c * a, self._fator, out=self._volumes[inicio:fim])
+        # Soma completa em vez de diferença: zera o erro acumulado das edições
+        self._total = float(self._volumes[:self._tamanho].sum())
+
+    def limpar(self):
+        self._tamanho = 0
+        self._total = 0.0
+
+    def como_linhas(self):
+        """Tuplas (quantidade, largura, comprimento, altura, total) por linha
+
+        Formato de calculos_cubagem_itens (total em m³, 3 casas), pronto para
+        o executemany de queries.CUBAGEM_INSERIR_ITENS.
+        """
+        colunas = [self._colunas[nome][:self._tamanho].tolist() for nome in COLUNAS]
+        totais = np.round(self._volumes[:self._tamanho], 3).tolist()
+        return list(zip(*colunas, totais))
+
+
+# Leitura de listas de volumes (colar/CSV/XLSX) ------------------------------
+
+# Primeira palavra do cabeçalho (normalizado) -> coluna
+_NOMES_CABECALHO = {
+    "quantidade": "quantidade", "qtd": "quantidade", "qtde": "quantidade", "quant": "quantidade",
+    "qde": "quantidade", "volumes": "quantidade",
+    "largura": "largura", "larg": "largura",
+    "comprimento": "comprimento", "comp": "comprimento", "profundidade": "comprimento",
+    "altura": "altura", "alt": "altura",
+}
+_UNIDADE_CABECALHO = (
+    (re.compile(r"\bmm\b|milimetro"), "mm"),
+    (re.compile(r"\bcm\b|centimetro"), "cm"),
+    (re.compile(r"\bm\b|\bmetros?\b"), "m"),
+)
+
+# Linhas não vazias (título, cliente...) aceitas acima do cabeçalho
+LINHAS_ANTES_DO_CABECALHO = 10
+
+# Sem unidade no cabeçalho: mediana das medidas abaixo disso é metro
+# (caixas com mediana de 3,5 cm não existem; volumes de 3,5 m quase nunca)
+LIMITE_MEDIANA_METROS = 3.5
+
+
+@dataclass
+class ListaCubagem:
+    """Volumes lidos de uma lista, prontos para ItensCubagem.adicionar_lote"""
+    quantidade: np.ndarray
+    largura: np.ndarray
+    comprimento: np.ndarray
+    altura: np.ndarray
+    # "cm" ou "m"; None quando não havia medida para decidir
+    unidade: str = None
+    # "cabecalho" ou "valores"
+    origem_unidade: str = None
+    ignoradas: int = 0
+
+    def __len__(self):
+        return self.quantidade.shape[0]
+
+    def colunas(self):
+        return self.quantidade, self.largura, self.comprimento, self.altura
+
+
+def _vazia(celula):
+    return celula is None or (isinstance(celula, str) and not celula.strip())
+
+
+def _celula_numero(valor):
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    return ler_numero(valor)
+
+
+def _ler_cabecalho(linha):
+    """{coluna: posição} e unidade indicada, ou (None, None) se não é cabeçalho"""
+    posicoes, unidades = {}, set()
+    for posicao, celula in enumerate(linha):
+        if not isinstance(celula, str):
+            continue
+        texto = normalizar(celula)
+        palavras = re.split(r"[^a-z0-9]+", texto)
+        nome = _NOMES_CABECALHO.get(palavras[0] if palavras else "")
+        if nome is None or nome in posicoes:
+            continue
+        posicoes[nome] = posicao
+        if nome != "quantidade":
+            for padrao, unidade in _UNIDADE_CABECALHO:
+                if padrao.search(texto):
+                    unidades.add(unidade)
+                    break
+    if len(posicoes) < 2:
+        return None, None
+    return posicoes, (unidades.pop() if len(unidades) == 1 else None)
+
+
+def ler_lista(linhas):
+    """Lista de volumes a partir de linhas de células (texto ou número)
+
+    Com cabeçalho (Quantidade, Largura, Comprimento, Altura e abreviações,
+    em qualquer ordem, até LINHAS_ANTES_DO_CABECALHO linhas abaixo do
+    início) as colunas vêm pelo nome e o que estiver acima dele é
+    descartado; sem cabeçalho, 4 colunas
+    são quantidade, largura, comprimento e altura e 3 colunas só as medidas.
+    Linhas sem nenhuma medida (em branco, totais) são ignoradas.
+
+    A unidade vem do cabeçalho ("Largura (cm)", "Altura m"; mm vira cm) ou,
+    sem indicação, da mediana das medidas (LIMITE_MEDIANA_METROS).
+    """
+    iterador = iter(linhas)
+    posicoes = unidade = None
+    # Linhas não vazias lidas procurando o cabeçalho (título, cliente e
+    # data costumam vir acima dele)
+    lidas = []
+    for linha in iterador:
+        if all(_vazia(c) for c in linha):
+            continue
+        posicoes, unidade = _ler_cabecalho(linha)
+        if posicoes is not None:
+            break
+        lidas.append(linha)
+        if len(lidas) == LINHAS_ANTES_DO_CABECALHO + 1:
+            break
+    if posicoes is None:
+        if not lidas:
+            vazio = np.zeros(0)
+            return ListaCubagem(vazio, vazio.copy(), vazio.copy(), vazio.copy())
+        # Sem cabeçalho: colunas por posição, pela primeira linha com medidas
+        iterador = chain(lidas, iterador)
+        primeira = next((l for l in lidas if any(_celula_numero(c) for c in l[1:] if not _vazia(c))),
+                        lidas[0])
+        largura = len([c for c in primeira if not _vazia(c)])
+        nomes = COLUNAS if largura >= 4 else COLUNAS[1:]
+        posicoes = dict(zip(nomes, range(len(nomes))))
+
+    indices = [posicoes.get(nome) for nome in COLUNAS]
+    valores = []
+    ignoradas = 0
+    for linha in iterador:
+        q, l, c, a = (_celula_numero(linha[i]) if i is not None and i < len(linha) else 0.0
+                      for i in indices)
+        if not (l or c or a):
+            ignoradas += not all(_vazia(celula) for celula in linha)
+            continue
+        valores.append((q or 1.0, l, c, a))
+
+    tabela = np.array(valores, dtype=np.float64).reshape(-1, 4)
+    origem = "cabecalho" if unidade else None
+    if unidade == "mm":
+        tabela[:, 1:] /= 10.0
+        unidade = "cm"
+    if unidade is None:
+        medidas = tabela[:, 1:][tabela[:, 1:] > 0]
+        if medidas.size:
+            unidade = "m" if np.median(medidas) < LIMITE_MEDIANA_METROS else "cm"
+            origem = "valores"
+    return ListaCubagem(*(tabela[:, i].copy() for i in range(4)),
+                        unidade=unidade, origem_unidade=origem, ignoradas=ignoradas)
+
+
+def ler_texto(texto):
+    """Lista colada da área de transferência (colunas por tabulação)"""
+    return ler_lista(linha.split('\t') for linha in texto.splitlines())
+
+
+def ler_arquivo(caminho):
+    """Lista de um CSV (separador detectado) ou da primeira planilha de um XLSX"""
+    cabecalho, linhas, _total = abrir_arquivo(caminho)
+    return ler_lista(chain([list(cabecalho)], (list(linha) for linha in linhas)))
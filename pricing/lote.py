@@ -0,0 +1,242 @@
+# lote.py - COTAÇÃO EM LOTE COM NUMPY
+"""Recalcula milhares/milhões de NFs contra a tabela de transportadoras.
+
+Cada tarifa vira operações de coluna do NumPy sobre os arrays de valor_nf,
+peso e cubagem; o resultado é a matriz transportadoras × cotações e o
+índice da mais barata por cotação. O cálculo é feito em blocos para que a
+memória fique limitada mesmo com 10M de cotações (com guardar_matriz=False
+só o menor frete e a transportadora escolhida são mantidos).
+
+Uso típico, simulando uma renegociação da Rodocargas:
+
+    python -m pricing.lote --db cotacoes.db --inicio 2024-01-01 --fim 2024-01-31 \\
+        --percentual-base 12.5 --icms 7
+
+Os valores são float64 arredondados ao centavo com meio-para-cima, como em
+pricing.motor; para tarifas só percentuais (a regra da Rodocargas) o
+resultado bate centavo a centavo com o motor escalar.
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, replace
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from pricing.motor import RegraTransportadora
+from utils.datas import dia_epoch
+from utils.formatters import Formatters
+
+# Fator de cubagem rodoviário (kg por m³)
+FATOR_CUBAGEM_PADRAO = 300.0
+TAMANHO_BLOCO = 1_000_000
+
+
+@dataclass(frozen=True)
+class TarifaLote:
+    """frete = max(percentual_nf% da NF + peso taxado × valor_kg, minimo) + ICMS
+
+    O peso taxado é o maior entre o peso real e cubagem × fator_cubagem.
+    """
+    percentual_nf: float = 0.0
+    icms: float = 0.0
+    valor_kg: float = 0.0
+    fator_cubagem: float = FATOR_CUBAGEM_PADRAO
+    minimo: float = 0.0
+
+    @classmethod
+    def da_regra(cls, regra):
+        """Tarifa equivalente a uma RegraTransportadora automática (None se manual)"""
+        if not regra.automatica:
+            return None
+        return cls(percentual_nf=float(regra.percentual_base), icms=float(regra.icms))
+
+    def calcular(self, valor_nf, peso, cubagem):
+        """Fretes de um bloco (arrays float64 do mesmo tamanho)"""
+        frete = valor_nf * (self.percentual_nf / 100.0)
+        if self.valor_kg:
+            peso_taxado = np.maximum(peso, cubagem * self.fator_cubagem)
+            frete = frete + peso_taxado * self.valor_kg
+        if self.minimo:
+            frete = np.maximum(frete, self.minimo)
+        if self.icms:
+            frete = frete * (1.0 + self.icms / 100.0)
+        return centavos(frete)
+
+
+def centavos(valores):
+    """Arredonda ao centavo, meio para cima
+
+    O arredondamento intermediário em 6 casas (em centavos) descarta o erro
+    binário de contas como 0.375 virando 0.37499999999999994.
+    """
+    return np.floor(np.round(valores * 100.0, 6) + 0.5) / 100.0
+
+
+@dataclass(frozen=True)
+class ResultadoLote:
+    transportadora_ids: tuple
+    nomes: tuple
+    # (transportadoras, cotações); None quando guardar_matriz=False
+    fretes: np.ndarray
+    menor_frete: np.ndarray
+    indice_mais_barato: np.ndarray
+
+    @property
+    def mais_barato_id(self):
+        """id da transportadora mais barata por cotação"""
+        return np.asarray(self.transportadora_ids, dtype=np.int64)[self.indice_mais_barato]
+
+    def percentual_nf(self, valor_nf):
+        """Menor frete como percentual da NF (NaN onde a NF é zero)"""
+        valor_nf = np.asarray(valor_nf, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(valor_nf > 0, self.menor_frete / valor_nf * 100.0, np.nan)
+
+    def vitorias(self):
+        """{nome: quantidade de cotações em que a transportadora foi a mais barata}"""
+        contagem = np.bincount(self.indice_mais_barato, minlength=len(self.nomes))
+        return dict(zip(self.nomes, contagem.tolist()))
+
+
+def _coluna(valores, tamanho):
+    if valores is None:
+        return np.zeros(tamanho, dtype=np.float64)
+    coluna = np.asarray(valores, dtype=np.float64)
+    if coluna.shape != (tamanho,):
+        raise ValueError(f"Esperado array com {tamanho} valores, recebido {coluna.shape}")
+    # NULL do banco chega como NaN: sem peso/cubagem informados
+    return np.nan_to_num(coluna, nan=0.0)
+
+
+def cotar_lote(valor_nf, tarifas, peso=None, cubagem=None, guardar_matriz=True,
+               tamanho_bloco=TAMANHO_BLOCO):
+    """Cota todas as NFs contra todas as tarifas
+
+    tarifas: sequência de (transportadora_id, nome, TarifaLote).
+    Empates ficam com a primeira transportadora da sequência.
+    """
+    if not tarifas:
+        raise ValueError("Nenhuma tarifa informada")
+    valor_nf = np.nan_to_num(np.asarray(valor_nf, dtype=np.float64), nan=0.0)
+    if valor_nf.ndim != 1:
+        raise ValueError("valor_nf deve ser um array de uma dimensão")
+    total = valor_nf.shape[0]
+    peso = _coluna(peso, total)
+    cubagem = _coluna(cubagem, total)
+
+    fretes = np.empty((len(tarifas), total), dtype=np.float64) if guardar_matriz else None
+    menor = np.empty(total, dtype=np.float64)
+    indice = np.empty(total, dtype=np.intp)
+    bloco = np.empty((len(tarifas), min(tamanho_bloco, total)), dtype=np.float64)
+
+    for inicio in range(0, total, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, total)
+        atual = bloco[:, :fim - inicio]
+        for linha, (_id, _nome, tarifa) in enumerate(tarifas):
+            atual[linha] = tarifa.calcular(valor_nf[inicio:fim], peso[inicio:fim], cubagem[inicio:fim])
+        if fretes is not None:
+            fretes[:, inicio:fim] = atual
+        indice[inicio:fim] = atual.argmin(axis=0)
+        menor[inicio:fim] = atual.min(axis=0)
+
+    return ResultadoLote(
+        transportadora_ids=tuple(t[0] for t in tarifas),
+        nomes=tuple(t[1] for t in tarifas),
+        fretes=fretes,
+        menor_frete=menor,
+        indice_mais_barato=indice,
+    )
+
+
+def tarifas_do_banco(conn, ajustes=None):
+    """Tarifas das transportadoras cadastradas
+
+    Só as de frete automático têm fórmula no cadastro; as demais entram
+    apenas se vierem em ajustes ({transportadora_id: TarifaLote}), que também
+    substitui a tarifa cadastrada (simulação de renegociação).
+    """
+    ajustes = ajustes or {}
+    tarifas = []
+    for linha in conn.execute("SELECT id, nome, cnpj, percentual_base, icms FROM transportadoras ORDER BY nome"):
+        regra = RegraTransportadora.de_linha(linha)
+        tarifa = ajustes.get(regra.id) or TarifaLote.da_regra(regra)
+        if tarifa is not None:
+            tarifas.append((regra.id, regra.nome, tarifa))
+    return tarifas
+
+
+_COLUNAS_NF = np.dtype([("id", np.int64), ("valor_nf", np.float64), ("peso", np.float64),
+                        ("cubagem", np.float64)])
+
+
+def nfs_do_periodo(conn, dia_inicio, dia_fim):
+    """(ids, valor_nf, peso, cubagem) das cotações do período em arrays
+
+    dia_inicio/dia_fim são dias epoch (utils.datas); usa o índice de data_dia.
+    Peso e cubagem não informados (NULL) viram zero.
+    """
+    cursor = conn.execute(
+        """
+        SELECT id, IFNULL(valor_nf, 0), IFNULL(peso, 0), IFNULL(cubagem, 0)
+        FROM cotacoes WHERE data_dia BETWEEN ? AND ? ORDER BY data_dia, id
+        """,
+        (dia_inicio, dia_fim),
+    )
+    dados = np.fromiter(cursor, dtype=_COLUNAS_NF)
+    return dados["id"], dados["valor_nf"], dados["peso"], dados["cubagem"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recota as NFs de um período com a tabela atual")
+    parser.add_argument("--db", required=True, help="Banco SQLite das cotações")
+    parser.add_argument("--inicio", type=date.fromisoformat, required=True, help="AAAA-MM-DD")
+    parser.add_argument("--fim", type=date.fromisoformat, required=True, help="AAAA-MM-DD")
+    parser.add_argument("--percentual-base", type=float,
+                        help="Novo percentual base das transportadoras automáticas")
+    parser.add_argument("--icms", type=float, help="Novo ICMS das transportadoras automáticas")
+    args = parser.parse_args()
+
+    # URI montada pelo pathlib: espaços, "?" e "#" no caminho não quebram o mode=ro
+    conn = sqlite3.connect(Path(args.db).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        tarifas = tarifas_do_banco(conn)
+        if args.percentual_base is not None or args.icms is not None:
+            novas = {}
+            if args.percentual_base is not None:
+                novas["percentual_nf"] = args.percentual_base
+            if args.icms is not None:
+                novas["icms"] = args.icms
+            tarifas = [(id_, nome, replace(tarifa, **novas)) for id_, nome, tarifa in tarifas]
+        if not tarifas:
+            print("❌ Nenhuma transportadora com tarifa automática cadastrada")
+            return 1
+
+        inicio = time.perf_counter()
+        _ids, valor_nf, peso, cubagem = nfs_do_periodo(conn, dia_epoch(args.inicio), dia_epoch(args.fim))
+        lido = time.perf_counter()
+    finally:
+        conn.close()
+
+    if not len(valor_nf):
+        print("Nenhuma cotação no período")
+        return 0
+
+    resultado = cotar_lote(valor_nf, tarifas, peso, cubagem, guardar_matriz=False)
+    calculado = time.perf_counter()
+
+    print(f"{len(valor_nf)} cotações lidas em {lido - inicio:.2f}s, cotadas em {calculado - lido:.2f}s")
+    for id_, nome, tarifa in tarifas:
+        print(f"  {nome}: {tarifa.percentual_nf}% + {tarifa.icms}% ICMS".replace('.', ','))
+    print(f"Frete total (mais barato): {Formatters.format_moeda(resultado.menor_frete.sum())}")
+    print(f"Percentual médio sobre NF: {np.nanmean(resultado.percentual_nf(valor_nf)):.2f}%".replace('.', ','))
+    for nome, vitorias in resultado.vitorias().items():
+        print(f"  {nome}: mais barata em {vitorias} cotações")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# motor.py - CÁLCULO DE FRETES SEM INTERFACE
+"""Regras de preço das transportadoras em Python puro.
+
+Entradas numéricas (Decimal, int, float ou texto numérico) e saídas em
+dataclasses imutáveis, sem Qt: a tela de cotação, as exportações e os
+processos em lote chamam as mesmas funções. Dinheiro é Decimal arredondado
+ao centavo (ROUND_HALF_UP), então R$ 0,10 + R$ 0,20 é exatamente R$ 0,30 e
+o valor gravado é o mesmo que aparece na tela.
+
+Transportadoras com frete automático (hoje só a Rodocargas) cobram
+percentual_base sobre a NF mais ICMS sobre esse valor; as demais usam o
+valor informado pelo usuário.
+"""
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+
+CENTAVO = Decimal("0.01")
+CEM = Decimal(100)
+ZERO = Decimal(0)
+
+# Valores usados quando a Rodocargas está cadastrada sem percentuais
+PERCENTUAL_BASE_PADRAO = Decimal("14.0")
+ICMS_PADRAO = Decimal("7.0")
+
+NOME_FRETE_AUTOMATICO = "rodocargas"
+
+
+def decimal(valor):
+    """Converte para Decimal sem herdar o erro binário de floats"""
+    if valor is None:
+        return ZERO
+    if isinstance(valor, Decimal):
+        return valor
+    if isinstance(valor, float):
+        return Decimal(repr(valor))
+    return Decimal(valor)
+
+
+def centavos(valor):
+    """Arredonda dinheiro ao centavo"""
+    return decimal(valor).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+@dataclass(frozen=True)
+class RegraTransportadora:
+    id: int
+    nome: str
+    percentual_base: Decimal = ZERO
+    icms: Decimal = ZERO
+    automatica: bool = False
+
+    @classmethod
+    def de_linha(cls, linha):
+        """Monta a regra a partir de (id, nome, cnpj, percentual_base, icms)"""
+        transportadora_id, nome, _cnpj, percentual_base, icms = linha[:5]
+        automatica = nome.lower() == NOME_FRETE_AUTOMATICO
+        if automatica:
+            # Mesmo comportamento da tela antiga: 0/NULL usa o padrão
+            percentual_base = decimal(percentual_base) or PERCENTUAL_BASE_PADRAO
+            icms = decimal(icms) or ICMS_PADRAO
+        return cls(transportadora_id, nome, decimal(percentual_base), decimal(icms), automatica)
+
+
+@dataclass(frozen=True)
+class FreteAutomatico:
+    valor_base: Decimal
+    valor_icms: Decimal
+    valor_frete: Decimal
+
+
+@dataclass(frozen=True)
+class ResultadoFrete:
+    transportadora_id: int
+    nome: str
+    valor_frete: Decimal
+    percentual_nf: Decimal
+    automatico: FreteAutomatico = None
+
+    @property
+    def informado(self):
+        return self.valor_frete > 0
+
+
+def frete_automatico(valor_nf, regra):
+    """percentual_base sobre a NF + ICMS sobre esse valor, ao centavo"""
+    valor_nf = decimal(valor_nf)
+    valor_base = valor_nf * regra.percentual_base / CEM
+    valor_icms = valor_base * regra.icms / CEM
+    return FreteAutomatico(centavos(valor_base), centavos(valor_icms),
+                           centavos(valor_base + valor_icms))
+
+
+def percentual_frete(valor_frete, valor_nf):
+    """Frete como percentual da NF (0 quando não há NF ou frete)"""
+    valor_nf = decimal(valor_nf)
+    valor_frete = decimal(valor_frete)
+    if valor_nf <= 0 or valor_frete <= 0:
+        return ZERO
+    return valor_frete / valor_nf * CEM
+
+
+def calcular_frete(valor_nf, regra, valor_informado=None):
+    """Resultado de uma transportadora para uma NF"""
+    valor_nf = decimal(valor_nf)
+    automatico = None
+    if regra.automatica:
+        if valor_nf > 0:
+            automatico = frete_automatico(valor_nf, regra)
+            valor_frete = automatico.valor_frete
+        else:
+            valor_frete = ZERO
+    else:
+        valor_frete = centavos(valor_informado)
+    return ResultadoFrete(regra.id, regra.nome, valor_frete,
+                          percentual_frete(valor_frete, valor_nf), automatico)
+
+
+def cotar(valor_nf, regras, valores_informados=None):
+    """Calcula todas as transportadoras de uma cotação
+
+    valores_informados: {transportadora_id: valor} digitados pelo usuário
+    (ignorados para as regras automáticas). Retorna uma tupla de
+    ResultadoFrete na ordem das regras.
+    """
+    valores_informados = valores_informados or {}
+    return tuple(calcular_frete(valor_nf, regra, valores_informados.get(regra.id))
+                 for regra in regras)
+
+
+def mais_barato(resultados):
+    """Menor frete informado (None se nenhum foi informado)"""
+    informados = [r for r in resultados if r.informado]
+    if not informados:
+        return None
+    return min(informados, key=lambda r: r.valor_frete)
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from database.database import Database
+from database.gerador import ConfiguracaoGerador, gerar
+
+# Pequeno o bastante para a suíte rodar em segundos, grande o bastante para
+# o planejador do SQLite preferir os índices às varreduras
+CONFIG_TESTES = ConfiguracaoGerador(cotacoes=20_000, transportadoras=20, fornecedores=500,
+                                    calculos_cubagem=5_000, dias=2 * 365)
+
+
+@pytest.fixture(scope="session")
+def banco_gerado(tmp_path_factory):
+    """Caminho de um banco com dados sintéticos (database.gerador), migrado"""
+    caminho = str(tmp_path_factory.mktemp("gerado") / "cotacoes.db")
+    gerar(caminho, CONFIG_TESTES, log=None)
+    Database(caminho).close()
+    return caminho
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Banco novo, vazio e migrado"""
+    banco = Database(str(tmp_path / "cotacoes.db"))
+    yield banco
+    banco.close()
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """QApplication sem janela para testar modelos e widgets"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
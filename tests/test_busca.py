@@ -0,0 +1,183 @@
+import pytest
+
+from database import filtros, queries
+from database.database import Database
+from database.filtros import FiltroHistorico
+from database.migrations.v006_busca_fts import CARGA
+
+TODAS = (0, 10 ** 9)
+
+
+def _indice(conn):
+    return conn.execute(
+        "SELECT rowid, fornecedor, num_pedido, transportadora FROM cotacoes_busca ORDER BY rowid").fetchall()
+
+
+def _recalculado(conn):
+    """O que a carga da migração v006 gravaria hoje para cada cotação"""
+    conn.execute("CREATE TEMP TABLE esperado (rowid INTEGER PRIMARY KEY, fornecedor, num_pedido, transportadora)")
+    try:
+        conn.execute(CARGA.replace("cotacoes_busca", "temp.esperado").replace("INSERT OR REPLACE", "INSERT"),
+                     TODAS)
+        return conn.execute("SELECT * FROM temp.esperado ORDER BY rowid").fetchall()
+    finally:
+        conn.execute("DROP TABLE temp.esperado")
+
+
+@pytest.fixture
+def conn(db):
+    with db.connection() as conn:
+        conn.execute("INSERT INTO transportadoras (nome) VALUES ('Expresso Sul'), ('Cargas Norte')")
+        conn.executemany(
+            "INSERT INTO cotacoes (data, fornecedor, num_pedido, valor_nf, transportadora_ganhadora_id) "
+            "VALUES ('2024-03-05', ?, ?, 100, ?)",
+            [("ACME Ltda", "PED-1", 2), ("Beta ME", "PED-2", 3), ("Gama S.A.", None, None)])
+        conn.commit()
+        yield conn
+
+
+def test_insercao_entra_no_indice(conn):
+    assert _indice(conn) == _recalculado(conn)
+    assert [linha[3] for linha in _indice(conn)] == ["Expresso Sul", "Cargas Norte", None]
+
+
+@pytest.mark.parametrize("alteracao", [
+    "UPDATE cotacoes SET fornecedor = 'ACME Indústria Ltda' WHERE id = 1",
+    "UPDATE cotacoes SET num_pedido = 'PED-99' WHERE id = 2",
+    "UPDATE cotacoes SET transportadora_ganhadora_id = 3 WHERE id = 1",
+    "UPDATE cotacoes SET transportadora_ganhadora_id = 2 WHERE id = 3",
+    "UPDATE cotacoes SET transportadora_ganhadora_id = NULL WHERE id = 2",
+    "UPDATE transportadoras SET nome = 'Expresso Sul Cargas' WHERE id = 2",
+    "DELETE FROM transportadoras WHERE id = 3",
+    "DELETE FROM cotacoes WHERE id = 2",
+])
+def test_gatilhos_mantem_o_indice(conn, alteracao):
+    conn.execute(alteracao)
+    conn.commit()
+    assert _indice(conn) == _recalculado(conn)
+
+
+def test_busca_acha_o_texto_alterado(conn):
+    conn.execute("UPDATE cotacoes SET fornecedor = 'Zeta Comércio' WHERE id = 1")
+    conn.execute("UPDATE cotacoes SET transportadora_ganhadora_id = 3 WHERE id = 3")
+    conn.commit()
+
+    def busca(texto):
+        return sorted(linha[0] for linha in conn.execute(queries.busca_query(), (queries.termo_busca(texto), 10)))
+
+    assert busca("Zeta") == [1]
+    assert busca("ACME") == []
+    assert busca("Norte") == [2, 3]
+    conn.execute("DELETE FROM cotacoes WHERE id = 3")
+    conn.commit()
+    assert busca("Norte") == [2]
+
+
+# Paginação com filtro de texto -------------------------------------------------
+
+@pytest.fixture
+def banco(banco_gerado):
+    banco = Database(banco_gerado)
+    yield banco
+    banco.close()
+
+
+@pytest.fixture
+def gerado(banco):
+    with banco.connection() as conn:
+        yield conn
+
+
+@pytest.fixture
+def pelo_fts(monkeypatch):
+    """Sem o atalho do período pequeno: o banco de teste cabe em LINHAS_VARREDURA"""
+    monkeypatch.setattr(filtros, "LINHAS_VARREDURA", 0)
+
+
+def _paginas(conn, filtro, tamanho=200):
+    """Percorre o filtro como o HistoricoModel; devolve (ids, materializado)"""
+    chave = (filtro.dia_fim + 1, 0)
+    linhas, ids = filtro.primeira_pagina(conn, chave, tamanho)
+    materializado = ids is not None
+    resultado = list(linhas)
+    query, params = filtro.consulta(paginada=True)
+    while ids or (ids is None and len(linhas) == tamanho):
+        if ids is not None:
+            linhas, ids = filtro.pagina_por_ids(conn, ids[:tamanho]), ids[tamanho:]
+        else:
+            chave = (linhas[-1][-1], linhas[-1][0])
+            linhas = conn.execute(query, (*params, *chave, tamanho)).fetchall()
+        resultado.extend(linhas)
+    return [linha[0] for linha in resultado], materializado
+
+
+def _esperado(conn, filtro):
+    query, params = filtro.consulta()
+    return [linha[0] for linha in conn.execute(query, params)]
+
+
+def _menos_cotado(conn):
+    return conn.execute(
+        "SELECT fornecedor FROM cotacoes GROUP BY fornecedor ORDER BY COUNT(*), fornecedor LIMIT 1").fetchone()[0]
+
+
+def _periodo(conn):
+    ultimo = conn.execute("SELECT MAX(data_dia) FROM cotacoes").fetchone()[0]
+    return ultimo - 364, ultimo
+
+
+def test_termo_raro_materializa_os_ids(gerado, pelo_fts):
+    filtro = FiltroHistorico(*TODAS, fornecedor=_menos_cotado(gerado))
+    ids, materializado = _paginas(gerado, filtro)
+    assert materializado
+    assert ids and ids == _esperado(gerado, filtro)
+
+
+def test_termo_comum_segue_a_chave(gerado, pelo_fts):
+    filtro = FiltroHistorico(*_periodo(gerado), fornecedor="Ltda")
+    ids, materializado = _paginas(gerado, filtro)
+    assert not materializado
+    assert len(ids) > 200 and ids == _esperado(gerado, filtro)
+
+
+def test_periodo_pequeno_nao_consulta_o_fts(gerado):
+    filtro = FiltroHistorico(*TODAS, fornecedor=_menos_cotado(gerado))
+    assert filtro.estimar_total(gerado) <= filtros.LINHAS_VARREDURA
+    ids, materializado = _paginas(gerado, filtro)
+    assert not materializado
+    assert ids == _esperado(gerado, filtro)
+
+
+@pytest.mark.parametrize("fornecedor, transportadora", [
+    ("", "Transportes"),
+    ("Ltda", "Cargas"),
+    ("Inexistente", ""),
+    ("Ltda", "Inexistente"),
+    ("ltd_", ""),
+    ("Lt", "Tr"),
+])
+def test_paginas_iguais_a_consulta_inteira(gerado, pelo_fts, fornecedor, transportadora):
+    filtro = FiltroHistorico(*_periodo(gerado), fornecedor, transportadora)
+    ids, _materializado = _paginas(gerado, filtro, tamanho=50)
+    assert ids == _esperado(gerado, filtro)
+
+
+def test_dois_termos_raros_se_cruzam(gerado, pelo_fts):
+    fornecedor, transportadora = gerado.execute("""
+        SELECT c.fornecedor, t.nome FROM cotacoes c JOIN transportadoras t ON t.id = c.transportadora_ganhadora_id
+        GROUP BY 1, 2 ORDER BY COUNT(*), 1, 2 LIMIT 1
+    """).fetchone()
+    filtro = FiltroHistorico(*TODAS, fornecedor, transportadora)
+    ids, materializado = _paginas(gerado, filtro)
+    assert materializado
+    assert ids and ids == _esperado(gerado, filtro)
+
+
+def test_maiusculas_fora_do_ascii_seguem_o_like(gerado, pelo_fts):
+    # O MATCH do trigram acha "AUTOPEÇAS" em "Autopeças"; o LIKE não
+    nome = gerado.execute("SELECT fornecedor FROM cotacoes WHERE fornecedor LIKE '%ç%' "
+                          "GROUP BY fornecedor ORDER BY COUNT(*) LIMIT 1").fetchone()[0]
+    filtro = FiltroHistorico(*TODAS, fornecedor=nome.upper())
+    ids, materializado = _paginas(gerado, filtro)
+    assert materializado
+    assert ids == _esperado(gerado, filtro) == []
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from pricing.carregamento import (ROTACAO_FIXA, ROTACAO_LIVRE, ROTACAO_VERTICAL, VEICULOS,
+                                  PerfilVeiculo, planejar, planejar_caixas, planejar_frota, resumo)
+from pricing.cubagem import ItensCubagem
+
+TRUCK = VEICULOS["truck"]
+
+
+def _validar(plano):
+    """Caixas dentro do baú e sem sobreposição entre si"""
+    origem, fim = plano.origem, plano.origem + plano.dimensoes
+    assert (origem >= -1e-9).all()
+    assert (fim <= plano.perfil.medidas + 1e-6).all()
+    for veiculo in range(plano.veiculos):
+        no_veiculo = plano.caixa_veiculo == veiculo
+        a, b = origem[no_veiculo], fim[no_veiculo]
+        sobrepostas = (np.minimum(b[:, None], b[None]) - np.maximum(a[:, None], a[None]) > 1e-9).all(axis=2)
+        np.fill_diagonal(sobrepostas, False)
+        assert not sobrepostas.any()
+
+
+@pytest.mark.parametrize("rotacao", [ROTACAO_FIXA, ROTACAO_VERTICAL, ROTACAO_LIVRE])
+def test_caixas_diferentes_cabem_sem_sobrepor(rotacao):
+    rng = np.random.default_rng(1)
+    dimensoes = rng.uniform(0.1, 1.2, (400, 3))
+    quantidades = rng.integers(1, 4, 400)
+    plano = planejar_caixas(quantidades, dimensoes, TRUCK, rotacao)
+    _validar(plano)
+    assert plano.caixas == quantidades.sum()
+    assert np.bincount(plano.caixa_linha, minlength=400).tolist() == quantidades.tolist()
+    assert plano.veiculos >= np.ceil((dimensoes.prod(axis=1) * quantidades).sum() / TRUCK.volume)
+
+
+def test_caixas_iguais_enchem_o_bau():
+    # 17 x 5 x 5 cubos de 0,5 m cabem num truck de 8,5 x 2,5 x 2,7
+    plano = planejar_caixas([425], [[0.5, 0.5, 0.5]], TRUCK)
+    _validar(plano)
+    assert (plano.veiculos, plano.caixas) == (1, 425)
+    plano = planejar_caixas([426], [[0.5, 0.5, 0.5]], TRUCK)
+    assert plano.veiculos == 2
+
+
+def test_rotacao_vertical_mantem_a_altura_no_eixo_z():
+    dimensoes = np.array([[0.3, 0.6, 1.0], [1.2, 0.4, 0.5]])
+    plano = planejar_caixas([30, 30], dimensoes, TRUCK, ROTACAO_VERTICAL)
+    _validar(plano)
+    assert (plano.dimensoes[:, 2] == dimensoes[plano.caixa_linha, 2]).all()
+    fixa = planejar_caixas([30, 30], dimensoes, TRUCK, ROTACAO_FIXA)
+    assert (fixa.dimensoes == dimensoes[fixa.caixa_linha]).all()
+
+
+def test_rotacao_livre_deita_volume_mais_alto_que_o_bau():
+    poste = [[0.3, 0.3, 3.0]]
+    assert planejar_caixas([2], poste, TRUCK, ROTACAO_VERTICAL).sem_lugar == ((0, 2),)
+    deitado = planejar_caixas([2], poste, TRUCK, ROTACAO_LIVRE)
+    assert (deitado.caixas, deitado.sem_lugar) == (2, ())
+    _validar(deitado)
+
+
+def test_volumes_maiores_que_o_bau_e_linhas_vazias():
+    plano = planejar_caixas([3, 2, 0, 5], [[20, 1, 1], [0.3, 0.3, 0.3], [1, 1, 1], [0, 1, 1]], TRUCK)
+    assert plano.sem_lugar == ((0, 3),)
+    assert plano.caixas == 2 and plano.caixa_linha.tolist() == [1, 1]
+    assert "3 volume(s) maior(es) que o baú" in resumo(plano)
+
+
+def test_entradas_invalidas():
+    with pytest.raises(ValueError):
+        planejar_caixas([1, 2], [[1, 1, 1]], TRUCK)
+    with pytest.raises(ValueError):
+        planejar_caixas([1], [[1, 1, 1]], TRUCK, "de_lado")
+    with pytest.raises(ValueError):
+        planejar_caixas([1], [[1, 1, 1]], PerfilVeiculo("Navio", 100, 20, 20))
+
+
+def test_planejar_converte_centimetros():
+    itens = ItensCubagem("cm")
+    itens.adicionar(4, 50, 100, 40)
+    plano = planejar(itens, VEICULOS["fiorino"])
+    _validar(plano)
+    assert plano.caixas == 4
+    assert plano.volume_carregado == pytest.approx(itens.total)
+
+
+def test_frota_prefere_menos_veiculos_e_bau_menor():
+    itens = ItensCubagem("cm")
+    itens.adicionar(10, 80, 120, 100)
+    itens.adicionar(50, 30, 40, 30)
+    planos = planejar_frota(itens)
+    melhor = planos[0]
+    assert (melhor.perfil.nome, melhor.veiculos, melhor.sem_lugar) == ("VUC", 1, ())
+    assert [p.veiculos for p in planos] == sorted(p.veiculos for p in planos)
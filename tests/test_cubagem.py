@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from pricing.cubagem import ItensCubagem, ler_lista, ler_numero, ler_texto
+
+
+def _linhas(lista):
+    return np.column_stack(lista.colunas()).tolist()
+
+
+def test_ler_numero_aceita_virgula_e_invalido_vale_zero():
+    assert ler_numero("1,5") == 1.5
+    assert ler_numero(" 2.25 ") == 2.25
+    assert ler_numero("") == 0.0
+    assert ler_numero("abc") == 0.0
+
+
+def test_cabecalho_na_primeira_linha():
+    lista = ler_texto("Qtd\tLarg\tComp\tAlt\n2\t50\t40\t30")
+    assert _linhas(lista) == [[2, 50, 40, 30]]
+    assert lista.ignoradas == 0
+
+
+def test_titulo_acima_do_cabecalho():
+    lista = ler_texto("Packing list\nQtd\tLarg\tComp\tAlt\n2\t50\t40\t30")
+    assert _linhas(lista) == [[2, 50, 40, 30]]
+    assert lista.ignoradas == 0
+
+
+def test_varias_linhas_acima_do_cabecalho_em_outra_ordem():
+    linhas = [
+        ["Romaneio 123"], [], ["Cliente", "ACME"], ["Data", "01/02/2024"],
+        ["Altura (cm)", "Descrição", "Comprimento (cm)", "Largura (cm)", "Qtde"],
+        [30, "Caixa", 40, 50, 3],
+    ]
+    lista = ler_lista(linhas)
+    assert _linhas(lista) == [[3, 50, 40, 30]]
+    assert (lista.unidade, lista.origem_unidade) == ("cm", "cabecalho")
+
+
+def test_sem_cabecalho_quatro_e_tres_colunas():
+    assert _linhas(ler_texto("2\t50\t40\t30\n1\t10\t10\t10")) == [[2, 50, 40, 30], [1, 10, 10, 10]]
+    assert _linhas(ler_texto("50\t40\t30")) == [[1, 50, 40, 30]]
+
+
+def test_sem_cabecalho_com_titulo_le_por_posicao():
+    lista = ler_texto("Lista de volumes\n2\t50\t40\t30")
+    assert _linhas(lista) == [[2, 50, 40, 30]]
+    assert lista.ignoradas == 1
+
+
+def test_milimetros_viram_centimetros():
+    lista = ler_texto("Qtd\tLargura mm\tComprimento mm\tAltura mm\n1\t500\t400\t300")
+    assert _linhas(lista) == [[1, 50, 40, 30]]
+    assert lista.unidade == "cm"
+
+
+@pytest.mark.parametrize("texto, unidade", [
+    ("1\t0,5\t0,4\t0,3", "m"),
+    ("1\t50\t40\t30", "cm"),
+])
+def test_unidade_pela_mediana(texto, unidade):
+    lista = ler_texto(texto)
+    assert (lista.unidade, lista.origem_unidade) == (unidade, "valores")
+
+
+def test_linhas_sem_medidas_sao_ignoradas_e_quantidade_vazia_vale_um():
+    lista = ler_texto("Qtd\tLarg\tComp\tAlt\n\t50\t40\t30\n\t\t\t\nTOTAL\t\t\t\n")
+    assert _linhas(lista) == [[1, 50, 40, 30]]
+    assert lista.ignoradas == 1
+
+
+def test_lista_vazia():
+    lista = ler_lista([[], ["", None]])
+    assert len(lista) == 0
+    assert lista.unidade is None
+
+
+def test_itens_total_por_diferenca_e_troca_de_unidade():
+    itens = ItensCubagem("cm")
+    linha = itens.adicionar(quantidade=2, largura=50, comprimento=40, altura=30)
+    assert itens.total == pytest.approx(0.12)
+    itens.definir(linha, "altura", 60)
+    assert itens.total == pytest.approx(0.24)
+    itens.adicionar_lote([1, 1], [100, 10], [100, 10], [100, 10])
+    assert itens.total == pytest.approx(0.24 + 1 + 0.001)
+    itens.definir_unidade("m")
+    assert itens.total == pytest.approx(0.24e6 + 1e6 + 1e3)
+    assert itens.como_linhas()[0] == (2.0, 50.0, 40.0, 60.0, 240000.0)
@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+
+import pytest
+
+from database import dashboard
+from database.dashboard import DashboardService, DashboardSnapshot
+
+
+def _cotacao(conn, data, fornecedor, valor_nf, fretes=()):
+    """fretes: (transportadora_id, valor, selecionada)"""
+    cotacao_id = conn.execute(
+        "INSERT INTO cotacoes (data, fornecedor, valor_nf) VALUES (?, ?, ?)",
+        (data.isoformat(), fornecedor, valor_nf)).lastrowid
+    for transportadora_id, valor, selecionada in fretes:
+        conn.execute("INSERT INTO cotacoes_transportadoras (cotacao_id, transportadora_id, valor_frete, "
+                     "selecionada) VALUES (?, ?, ?, ?)", (cotacao_id, transportadora_id, valor, selecionada))
+    conn.commit()
+    return cotacao_id
+
+
+@pytest.fixture
+def service(db):
+    with db.connection() as conn:
+        conn.execute("INSERT INTO transportadoras (nome) VALUES ('Expresso Sul')")
+        conn.commit()
+    return DashboardService(db)
+
+
+def test_banco_vazio(service):
+    assert service.snapshot() == DashboardSnapshot(total_transportadoras=2)
+
+
+def test_indicadores_do_mes(service, db):
+    hoje = date.today()
+    mes_passado = hoje.replace(day=1) - timedelta(days=1)
+    with db.connection() as conn:
+        _cotacao(conn, hoje, "ACME", 1000, [(1, 149.8, 1), (2, 160, 0)])
+        _cotacao(conn, hoje, "Beta", 500, [(2, 50, 1)])
+        _cotacao(conn, hoje, "Gama", 2000, [(2, 100, 1)])
+        _cotacao(conn, mes_passado, "Antiga", 9000, [(1, 900, 1)])
+
+    snap = service.snapshot()
+    assert (snap.total_cotacoes_mes, snap.valor_total_mes) == (3, 3500)
+    assert snap.maior_valor_nf == 9000
+    assert snap.economia_estimada == pytest.approx(350)
+    assert snap.transp_mais_usada == "Expresso Sul"
+    # (14,98 + 10 + 5 + 10) / 4 fretes vencedores
+    assert snap.taxa_media_frete == 10.0
+    assert [c.fornecedor for c in snap.cotacoes_recentes] == ["Gama", "Beta", "ACME", "Antiga"]
+    assert snap.ultima_cotacao_data == hoje.strftime("%d/%m")
+
+
+def test_snapshot_reaproveitado_ate_os_dados_mudarem(service, db):
+    primeiro = service.snapshot()
+    assert service.snapshot() is primeiro
+    assert (service.hits, service.misses) == (1, 1)
+
+    with db.connection() as conn:
+        _cotacao(conn, date.today(), "ACME", 100)
+    segundo = service.snapshot()
+    assert segundo is not primeiro and segundo.total_cotacoes_mes == 1
+    assert service.misses == 2
+
+    service.invalidate()
+    assert service.snapshot() is not segundo
+
+
+def test_virada_do_mes_recalcula(service, monkeypatch):
+    primeiro = service.snapshot()
+    monkeypatch.setattr(dashboard, "intervalo_mes", lambda: (0, 1))
+    assert service.snapshot() is not primeiro
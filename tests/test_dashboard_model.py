@@ -0,0 +1,147 @@
+from dataclasses import replace
+
+import pytest
+
+from database.dashboard import CotacaoRecente, DashboardSnapshot
+from database.migrations import v005_resumos_dashboard
+
+
+class ServicoFalso:
+    def __init__(self, snapshot):
+        self.atual = snapshot
+
+    def snapshot(self):
+        return self.atual
+
+
+def _recente(fornecedor, valor_nf=100.0):
+    return CotacaoRecente("01/03", fornecedor, valor_nf, 10.0, "Rodocargas")
+
+
+@pytest.fixture
+def tela(qapp):
+    from PyQt5.QtWidgets import QLabel, QTableWidget
+
+    from gui.dashboard_model import DashboardModel
+
+    class LabelContado(QLabel):
+        def __init__(self):
+            super().__init__()
+            self.escritas = 0
+
+        def setText(self, texto):
+            self.escritas += 1
+            super().setText(texto)
+
+    inicial = DashboardSnapshot(total_cotacoes_mes=3, transp_mais_usada="Rodocargas", versao=1,
+                                cotacoes_recentes=(_recente("ACME"), _recente("Beta")))
+    servico = ServicoFalso(inicial)
+    modelo = DashboardModel(servico)
+    labels = {campo: LabelContado() for campo in ("total_cotacoes_mes", "transp_mais_usada")}
+    for campo, label in labels.items():
+        modelo.vincular(campo, label)
+    tabela = QTableWidget(0, 2)
+    modelo.vincular_tabela(tabela, lambda c: (c.fornecedor, f"{c.valor_nf:.2f}"))
+    modelo.atualizar()
+    for label in labels.values():
+        label.escritas = 0
+    return servico, modelo, labels, tabela
+
+
+def _textos(tabela):
+    return [[tabela.item(r, c).text() for c in range(tabela.columnCount())] for r in range(tabela.rowCount())]
+
+
+def test_primeira_atualizacao_preenche_tudo(tela):
+    _servico, modelo, labels, tabela = tela
+    assert labels["total_cotacoes_mes"].text() == "3"
+    assert labels["transp_mais_usada"].text() == "Rodocargas"
+    assert _textos(tabela) == [["ACME", "100.00"], ["Beta", "100.00"]]
+
+
+def test_mesmo_snapshot_nao_toca_nos_widgets(tela):
+    _servico, modelo, labels, _tabela = tela
+    emitidos = []
+    modelo.atualizado.connect(lambda *a: emitidos.append(a))
+    assert modelo.atualizar() == frozenset()
+    assert all(label.escritas == 0 for label in labels.values())
+    assert emitidos == []
+
+
+def test_so_o_que_mudou_e_reescrito(tela):
+    servico, modelo, labels, tabela = tela
+    item_acme = tabela.item(0, 0)
+    servico.atual = replace(servico.atual, total_cotacoes_mes=4, versao=2,
+                            cotacoes_recentes=(_recente("ACME"), _recente("Beta", 250.0), _recente("Gama")))
+    emitidos = []
+    modelo.atualizado.connect(lambda snapshot, campos: emitidos.append(campos))
+
+    alterados = modelo.atualizar()
+
+    assert alterados == {"total_cotacoes_mes", "cotacoes_recentes"}
+    assert emitidos == [alterados]
+    assert (labels["total_cotacoes_mes"].escritas, labels["transp_mais_usada"].escritas) == (1, 0)
+    assert labels["total_cotacoes_mes"].text() == "4"
+    # Linha igual mantém o mesmo item; as outras são atualizadas/criadas
+    assert tabela.item(0, 0) is item_acme
+    assert _textos(tabela) == [["ACME", "100.00"], ["Beta", "250.00"], ["Gama", "100.00"]]
+    assert modelo.estatisticas_latencia()["atualizacoes"] == 2
+
+
+def test_erro_no_servico_mantem_a_tela(tela):
+    servico, modelo, labels, _tabela = tela
+
+    def falha():
+        raise RuntimeError("banco indisponível")
+
+    servico.snapshot = falha
+    assert modelo.atualizar() == frozenset()
+    assert labels["total_cotacoes_mes"].text() == "3"
+
+
+def _resumos(conn):
+    return (conn.execute("SELECT data_dia, total, ROUND(valor_total, 6) FROM resumo_cotacoes_dia "
+                         "WHERE total <> 0 ORDER BY data_dia").fetchall(),
+            conn.execute("SELECT transportadora_id, total, ROUND(soma_taxa, 6), qtd_taxa "
+                          "FROM resumo_fretes_transportadora WHERE total <> 0 ORDER BY 1").fetchall())
+
+
+def _recalculados(conn):
+    conn.execute("SAVEPOINT recalculo")
+    conn.execute("DELETE FROM resumo_cotacoes_dia")
+    conn.execute("DELETE FROM resumo_fretes_transportadora")
+    for carga in v005_resumos_dashboard.CARGA_INICIAL:
+        conn.execute(carga)
+    resumos = _resumos(conn)
+    conn.execute("ROLLBACK TO recalculo")
+    conn.execute("RELEASE recalculo")
+    return resumos
+
+
+def test_gatilhos_mantem_os_resumos_iguais_a_carga_completa(db):
+    with db.connection() as conn:
+        conn.execute("INSERT INTO transportadoras (nome) VALUES ('Expresso Sul')")
+        for i in range(6):
+            conn.execute("INSERT INTO cotacoes (data, fornecedor, valor_nf) VALUES (?, ?, ?)",
+                         (f"2024-03-0{1 + i % 3}", f"F{i}", 100.0 * (i + 1)))
+            conn.execute("INSERT INTO cotacoes_transportadoras (cotacao_id, transportadora_id, valor_frete, "
+                         "selecionada) VALUES (?, 1, ?, ?)", (i + 1, 10.0 + i, i % 2))
+            conn.execute("INSERT INTO cotacoes_transportadoras (cotacao_id, transportadora_id, valor_frete, "
+                         "selecionada) VALUES (?, 2, ?, ?)", (i + 1, 12.0 + i, 1 - i % 2))
+        assert _resumos(conn) == _recalculados(conn)
+
+        passos = [
+            "UPDATE cotacoes SET valor_nf = 999 WHERE id = 1",
+            "UPDATE cotacoes SET data = '2024-04-10' WHERE id = 2",
+            "UPDATE cotacoes_transportadoras SET selecionada = 1 - selecionada WHERE cotacao_id = 3",
+            "UPDATE cotacoes_transportadoras SET valor_frete = 50 WHERE cotacao_id = 4",
+            # Ordem da tela (fretes e depois a cotação) e a inversa
+            "DELETE FROM cotacoes_transportadoras WHERE cotacao_id = 5",
+            "DELETE FROM cotacoes WHERE id = 5",
+            "DELETE FROM cotacoes WHERE id = 6",
+            "DELETE FROM cotacoes_transportadoras WHERE cotacao_id = 6",
+        ]
+        for sql in passos:
+            conn.execute(sql)
+            assert _resumos(conn) == _recalculados(conn), sql
+        conn.commit()
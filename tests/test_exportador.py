@@ -0,0 +1,78 @@
+import pytest
+
+from database import queries
+from database.database import Database
+from database.exportador import ErroExportacao, exportar_historico, exportar_xlsx
+from database.filtros import FiltroHistorico
+from database.importador import Importador
+
+# Março de 2024 em dias epoch
+MARCO_2024 = FiltroHistorico(19783, 19813)
+
+_TOTAIS = """
+    SELECT COUNT(*), ROUND(SUM(c.valor_nf), 2), ROUND(SUM(ct.valor_frete), 2)
+    FROM cotacoes c
+    LEFT JOIN cotacoes_transportadoras ct
+        ON ct.cotacao_id = c.id AND ct.selecionada = 1
+    WHERE c.data_dia BETWEEN ? AND ?
+"""
+
+
+@pytest.fixture
+def gerado(banco_gerado):
+    banco = Database(banco_gerado, profile="analytics")
+    yield banco
+    banco.close()
+
+
+@pytest.mark.parametrize("formato", ["xlsx", "csv"])
+def test_exportacao_volta_igual_na_importacao(gerado, db, tmp_path, formato):
+    caminho = str(tmp_path / f"marco.{formato}")
+    periodo = (MARCO_2024.dia_inicio, MARCO_2024.dia_fim)
+    with gerado.connection() as conn:
+        exportadas = exportar_historico(conn, MARCO_2024, formato, caminho)
+        esperado = conn.execute(_TOTAIS, periodo).fetchone()
+    assert exportadas == esperado[0] > 0
+
+    with db.connection() as conn:
+        resultado = Importador(conn, criar_transportadoras=True, tamanho_lote=100).importar(caminho)
+        assert (resultado.lidas, resultado.importadas, resultado.rejeitadas) == (exportadas, exportadas, 0)
+        assert conn.execute(_TOTAIS, periodo).fetchone() == esperado
+
+
+def test_parquet_e_arrow_preservam_as_linhas(gerado, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    import pyarrow.ipc as ipc
+
+    with gerado.connection() as conn:
+        total = exportar_historico(conn, MARCO_2024, "parquet", str(tmp_path / "marco.parquet"))
+        exportar_historico(conn, MARCO_2024, "arrow", str(tmp_path / "marco.arrow"))
+        soma_nf = conn.execute(_TOTAIS, (MARCO_2024.dia_inicio, MARCO_2024.dia_fim)).fetchone()[1]
+    tabela = pq.read_table(str(tmp_path / "marco.parquet"))
+    assert tabela.num_rows == total > 0
+    assert str(tabela.schema.field("valor_nf").type) == "decimal128(14, 2)"
+    assert str(tabela.schema.field("data").type) == "date32[day]"
+    assert str(tabela.schema.field("id").type) == "int64"
+    assert float(sum(tabela.column("valor_nf").to_pylist())) == pytest.approx(soma_nf)
+    with ipc.open_file(str(tmp_path / "marco.arrow")) as leitor:
+        assert leitor.read_all().equals(tabela)
+
+
+def test_formato_desconhecido(gerado, tmp_path):
+    with gerado.connection() as conn, pytest.raises(ErroExportacao):
+        exportar_historico(conn, MARCO_2024, "ods", str(tmp_path / "marco.ods"))
+
+
+def test_cancelamento_nao_deixa_arquivo(gerado, tmp_path):
+    caminho = tmp_path / "marco.xlsx"
+    chamadas = []
+
+    def cancelar(atual, total):
+        chamadas.append((atual, total))
+        raise RuntimeError("cancelado")
+
+    query, params = MARCO_2024.consulta(queries.HISTORICO_COLUNAS_EXPORTACAO)
+    with gerado.connection() as conn, pytest.raises(RuntimeError):
+        exportar_xlsx(conn, query, params, str(caminho), progresso=cancelar, tamanho_bloco=10)
+    assert len(chamadas) == 1 and chamadas[0][0] == 10
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,108 @@
+import sqlite3
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+
+from database.gerador import FAIXA_FRETES, FAIXA_TRANSPORTADORAS, ConfiguracaoGerador, gerar
+
+CONFIG = ConfiguracaoGerador(cotacoes=2_000, transportadoras=20, fornecedores=50, calculos_cubagem=100,
+                             inicio=date(2024, 1, 1), dias=60)
+
+
+def _gerar(tmp_path, config=CONFIG, nome="gerado.db"):
+    caminho = str(tmp_path / nome)
+    resultado = gerar(caminho, config, log=None)
+    return caminho, resultado
+
+
+def _conteudo(caminho):
+    conn = sqlite3.connect(caminho)
+    try:
+        return (conn.execute("SELECT * FROM cotacoes ORDER BY id").fetchall(),
+                conn.execute("SELECT * FROM cotacoes_transportadoras ORDER BY cotacao_id, transportadora_id").fetchall())
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("alteracao", [
+    {"transportadoras": FAIXA_TRANSPORTADORAS[0] - 1},
+    {"transportadoras": FAIXA_TRANSPORTADORAS[1] + 1},
+    {"fretes_min": FAIXA_FRETES[0] - 1},
+    {"fretes_max": FAIXA_FRETES[1] + 1},
+    {"fretes_min": 8, "fretes_max": 5},
+    {"fornecedores": 0},
+    {"cotacoes": -1},
+    {"dias": 0},
+    {"concentracao_fornecedores": 1.0},
+])
+def test_validar_recusa_fora_das_faixas(alteracao):
+    with pytest.raises(ValueError):
+        replace(CONFIG, **alteracao).validar()
+
+
+def test_validar_aceita_os_limites():
+    ConfiguracaoGerador().validar()
+    for transportadoras in FAIXA_TRANSPORTADORAS:
+        replace(CONFIG, transportadoras=transportadoras, fretes_min=FAIXA_FRETES[0],
+                fretes_max=FAIXA_FRETES[1]).validar()
+
+
+def test_gerar_valida_antes_de_criar_o_arquivo(tmp_path):
+    with pytest.raises(ValueError):
+        _gerar(tmp_path, replace(CONFIG, transportadoras=5))
+    assert not list(tmp_path.iterdir())
+
+
+def test_mesma_semente_mesmo_banco(tmp_path):
+    primeiro, _ = _gerar(tmp_path, nome="a.db")
+    segundo, _ = _gerar(tmp_path, nome="b.db")
+    outro, _ = _gerar(tmp_path, replace(CONFIG, semente=7), nome="c.db")
+    assert _conteudo(primeiro) == _conteudo(segundo)
+    assert _conteudo(primeiro) != _conteudo(outro)
+
+
+def test_quantidades_e_fretes(tmp_path):
+    caminho, resultado = _gerar(tmp_path)
+    conn = sqlite3.connect(caminho)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM cotacoes").fetchone()[0] == resultado.cotacoes == 2_000
+        assert conn.execute("SELECT COUNT(*) FROM transportadoras").fetchone()[0] == resultado.transportadoras == 20
+        assert conn.execute("SELECT COUNT(*) FROM calculos_cubagem").fetchone()[0] == 100
+        assert conn.execute("SELECT COUNT(*) FROM cotacoes_transportadoras").fetchone()[0] == resultado.fretes
+
+        por_cotacao = conn.execute("""
+            SELECT COUNT(*), SUM(selecionada), MIN(valor_frete),
+                   MAX(CASE WHEN selecionada THEN valor_frete END)
+            FROM cotacoes_transportadoras GROUP BY cotacao_id
+        """).fetchall()
+        assert len(por_cotacao) == 2_000
+        for fretes, selecionadas, menor, selecionado in por_cotacao:
+            assert FAIXA_FRETES[0] <= fretes <= FAIXA_FRETES[1]
+            assert selecionadas == 1
+            assert selecionado == menor
+
+        # A ganhadora da cotação é a transportadora do frete selecionado
+        assert conn.execute("""
+            SELECT COUNT(*) FROM cotacoes c JOIN cotacoes_transportadoras ct
+              ON ct.cotacao_id = c.id AND ct.selecionada
+            WHERE ct.transportadora_id IS NOT c.transportadora_ganhadora_id
+        """).fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_datas_dentro_do_periodo(tmp_path):
+    caminho, _ = _gerar(tmp_path)
+    conn = sqlite3.connect(caminho)
+    try:
+        primeira, ultima = conn.execute("SELECT MIN(date(data)), MAX(date(data)) FROM cotacoes").fetchone()
+        # ids crescem com a data
+        fora_de_ordem = conn.execute("""
+            SELECT COUNT(*) FROM cotacoes a JOIN cotacoes b ON b.id = a.id + 1 WHERE b.data < a.data
+        """).fetchone()[0]
+    finally:
+        conn.close()
+    assert CONFIG.inicio.isoformat() <= primeira
+    assert ultima < (CONFIG.inicio + timedelta(days=CONFIG.dias)).isoformat()
+    assert fora_de_ordem == 0
@@ -0,0 +1,276 @@
+import time
+
+import pytest
+
+from database.database import Database
+from database.filtros import FiltroHistorico
+from database.queries import HISTORICO_COLUNAS
+
+COLUNA_ID = 0
+
+
+@pytest.fixture
+def banco(banco_gerado):
+    banco = Database(banco_gerado)
+    yield banco
+    banco.close()
+
+
+@pytest.fixture
+def executor(qapp, banco):
+    from gui.workers import ExecutorBanco
+
+    executor = ExecutorBanco(banco)
+    yield executor
+    executor.cancelar_todas()
+    executor.aguardar()
+
+
+@pytest.fixture
+def modelo(executor):
+    from gui.historico_model import HistoricoModel
+
+    return HistoricoModel(executor)
+
+
+@pytest.fixture
+def periodo(banco):
+    """Últimos 60 dias do banco gerado: algumas páginas de resultado"""
+    with banco.connection() as conn:
+        ultimo = conn.execute("SELECT MAX(data_dia) FROM cotacoes").fetchone()[0]
+    return ultimo - 59, ultimo
+
+
+def _aguardar(qapp, modelo):
+    """Processa eventos até a página pendente chegar (ou a próxima, pedida na chegada)"""
+    limite = time.monotonic() + 10
+    while True:
+        modelo.executor.aguardar(10000)
+        qapp.processEvents()
+        if not modelo.carregando():
+            return
+        assert time.monotonic() < limite, "página não chegou"
+
+
+def _carregar_tudo(qapp, modelo):
+    while modelo.canFetchMore():
+        modelo.fetchMore()
+        _aguardar(qapp, modelo)
+
+
+def _ids(modelo):
+    return [modelo.cotacao_id(row) for row in range(modelo.rowCount())]
+
+
+def _ids_esperados(banco, filtro):
+    query, params = filtro.consulta()
+    with banco.connection() as conn:
+        return [linha[COLUNA_ID] for linha in conn.execute(query, params)]
+
+
+def test_primeira_pagina_e_fetch_more(qapp, banco, modelo, periodo):
+    filtro = FiltroHistorico(*periodo)
+    esperados = _ids_esperados(banco, filtro)
+    assert len(esperados) > 3 * modelo.TAMANHO_PAGINA
+
+    carregados = []
+    modelo.carregado.connect(carregados.append)
+    modelo.consultar(filtro)
+    _aguardar(qapp, modelo)
+    assert modelo.rowCount() == modelo.TAMANHO_PAGINA
+    assert carregados == [modelo.TAMANHO_PAGINA]
+    assert modelo.canFetchMore()
+
+    modelo.fetchMore()
+    _aguardar(qapp, modelo)
+    assert modelo.rowCount() == 2 * modelo.TAMANHO_PAGINA
+
+    _carregar_tudo(qapp, modelo)
+    assert modelo.todas_carregadas()
+    assert not modelo.canFetchMore()
+    # A paginação por chave devolve as mesmas linhas, na mesma ordem, que a consulta inteira
+    assert _ids(modelo) == esperados
+
+
+def test_paginas_com_filtro_de_texto(qapp, banco, modelo, periodo):
+    filtro = FiltroHistorico(*periodo, fornecedor="Ltda", transportadora="Tr")
+    modelo.consultar(filtro)
+    _aguardar(qapp, modelo)
+    _carregar_tudo(qapp, modelo)
+    assert _ids(modelo) == _ids_esperados(banco, filtro)
+    assert all(filtro.aceita(modelo.linha(row)) for row in range(modelo.rowCount()))
+
+
+def test_nova_consulta_descarta_pagina_pendente(qapp, banco, modelo, periodo):
+    modelo.consultar(FiltroHistorico(*periodo))
+    filtro = FiltroHistorico(*periodo, fornecedor="Ltda")
+    modelo.consultar(filtro)
+    _aguardar(qapp, modelo)
+    _carregar_tudo(qapp, modelo)
+    assert _ids(modelo) == _ids_esperados(banco, filtro)
+
+
+def test_busca_geral_vem_numa_pagina_so(qapp, banco, modelo, periodo):
+    filtro = FiltroHistorico(*periodo, busca="Transportes")
+    modelo.consultar(filtro)
+    _aguardar(qapp, modelo)
+    assert 0 < modelo.rowCount() <= modelo.LIMITE_BUSCA
+    assert modelo.todas_carregadas()
+    assert not modelo.canFetchMore()
+
+
+def test_celulas_formatadas(qapp, modelo, periodo):
+    from gui.historico_model import formatar_celula
+
+    cotacao = (7, "2024-03-05 10:00:00", "Fornecedor A", 1234.5, 12.25, 3, 0.5,
+               "Transportes X", 61.725, 19787)
+    assert len(cotacao) == HISTORICO_COLUNAS.count(",") + 1
+    textos = [formatar_celula(cotacao, coluna) for coluna in range(10)]
+    assert textos == ["7", "05/03/2024", "Fornecedor A", "R$ 1.234,50", "12,250 kg", "3",
+                      "0,500 m³", "Transportes X", "R$ 61,73", "5.00%"]
+
+    sem_frete = (8, "2024-03-05", "Fornecedor B", 100.0, None, None, None, None, None, 19787)
+    assert [formatar_celula(sem_frete, coluna) for coluna in range(4, 10)] == ["-", "-", "-", "Nenhuma", "-", "-"]
+
+    modelo.consultar(FiltroHistorico(*periodo))
+    _aguardar(qapp, modelo)
+    index = modelo.index(0, 0)
+    assert modelo.data(index) == str(modelo.cotacao_id(0))
+    assert modelo.columnCount() == 10
+
+
+def test_refinar_filtra_em_memoria(qapp, banco, modelo, periodo):
+    modelo.consultar(FiltroHistorico(*periodo, fornecedor="Lt"))
+    _aguardar(qapp, modelo)
+    _carregar_tudo(qapp, modelo)
+    consultas = modelo.consultas
+
+    filtro = FiltroHistorico(*periodo, fornecedor="ltda", transportadora="Transportes")
+    assert modelo.pode_refinar(filtro)
+    modelo.refinar(filtro)
+    # Tudo já estava carregado: nenhuma página nova é pedida
+    assert not modelo.carregando()
+    assert modelo.consultas == consultas and modelo.refinamentos == 1
+    assert _ids(modelo) == _ids_esperados(banco, filtro)
+
+
+def test_refinar_continua_a_paginacao(qapp, banco, modelo, periodo):
+    modelo.consultar(FiltroHistorico(*periodo))
+    _aguardar(qapp, modelo)
+    assert not modelo.todas_carregadas()
+
+    filtro = FiltroHistorico(*periodo, fornecedor="Ltda")
+    modelo.refinar(filtro)
+    _aguardar(qapp, modelo)
+    _carregar_tudo(qapp, modelo)
+    assert _ids(modelo) == _ids_esperados(banco, filtro)
+
+
+def test_refinar_com_pouco_resultado_busca_a_proxima_pagina(qapp, banco, modelo, periodo):
+    modelo.consultar(FiltroHistorico(*periodo))
+    _aguardar(qapp, modelo)
+
+    # Sobra menos de uma página em memória: a view pode não ter rolagem
+    # para pedir fetchMore, então o próprio refinar busca a próxima
+    filtro = FiltroHistorico(*periodo, fornecedor="Ltda", transportadora="Cargas")
+    modelo.refinar(filtro)
+    em_memoria = modelo.rowCount()
+    assert em_memoria < modelo.TAMANHO_PAGINA
+    assert modelo.carregando()
+    _aguardar(qapp, modelo)
+    esperados = _ids_esperados(banco, filtro)
+    assert modelo.rowCount() > em_memoria
+    assert _ids(modelo) == esperados[:modelo.rowCount()]
+
+
+def test_pode_refinar(qapp, modelo, periodo):
+    anterior = FiltroHistorico(*periodo, fornecedor="Lt")
+    modelo.consultar(anterior)
+    # Página ainda a caminho: a próxima chave não está definida
+    assert not modelo.pode_refinar(FiltroHistorico(*periodo, fornecedor="Ltda"))
+    _aguardar(qapp, modelo)
+
+    assert modelo.pode_refinar(FiltroHistorico(*periodo, fornecedor="LTDA", transportadora="a"))
+    assert not modelo.pode_refinar(FiltroHistorico(*periodo, fornecedor="L"))
+    assert not modelo.pode_refinar(FiltroHistorico(periodo[0] + 1, periodo[1], fornecedor="Ltda"))
+    assert not modelo.pode_refinar(FiltroHistorico(*periodo, fornecedor="Lt_a"))
+    assert not modelo.pode_refinar(FiltroHistorico(*periodo, fornecedor="Lt%a"))
+    assert not modelo.pode_refinar(FiltroHistorico(*periodo, fornecedor="Ltda", busca="Ltda"))
+
+
+def test_aceita_segue_o_like_do_sqlite():
+    linha = (1, "2024-03-05", "Água Mineral Ltda", 100.0, None, None, None, "Transportes X", None, 19787)
+    assert FiltroHistorico(0, 1, fornecedor="ltda").aceita(linha)
+    assert FiltroHistorico(0, 1, fornecedor="Água", transportadora="x").aceita(linha)
+    # LIKE só ignora maiúsculas/minúsculas no ASCII
+    assert not FiltroHistorico(0, 1, fornecedor="água").aceita(linha)
+    assert not FiltroHistorico(0, 1, transportadora="Cargas").aceita(linha)
+    sem_transportadora = linha[:7] + (None,) + linha[8:]
+    assert not FiltroHistorico(0, 1, transportadora="X").aceita(sem_transportadora)
+
+
+def test_digitacao_vira_uma_consulta_so(qapp, banco):
+    from gui.historico_window import HistoricoWindow
+
+    janela = HistoricoWindow(banco, atraso_filtro_ms=20)
+    try:
+        modelo = janela.modelo_cotacoes
+        _aguardar(qapp, modelo)
+        assert modelo.consultas == 1
+
+        for texto in ("L", "Lt", "Ltd", "Ltda"):
+            janela.filtro_fornecedor_input.setText(texto)
+        assert janela.timer_filtro.isActive()
+        assert modelo.consultas == 1 and modelo.refinamentos == 0
+
+        limite = time.monotonic() + 5
+        while janela.timer_filtro.isActive():
+            assert time.monotonic() < limite
+            qapp.processEvents()
+            time.sleep(0.005)
+        _aguardar(qapp, modelo)
+        # As quatro teclas viram um único refinamento do filtro vazio
+        assert modelo.consultas == 1 and modelo.refinamentos == 1
+        assert modelo.filtro.fornecedor == "Ltda"
+    finally:
+        janela.executor.cancelar_todas()
+        janela.executor.aguardar()
+        janela.deleteLater()
+
+
+def _menos_cotado(banco):
+    with banco.connection() as conn:
+        return conn.execute("SELECT fornecedor FROM cotacoes GROUP BY fornecedor "
+                            "HAVING COUNT(*) > 10 ORDER BY COUNT(*), fornecedor LIMIT 1").fetchone()[0]
+
+
+def test_termo_raro_pagina_pelos_ids(qapp, banco, modelo, monkeypatch):
+    from database import filtros
+
+    monkeypatch.setattr(filtros, "LINHAS_VARREDURA", 0)
+    modelo.TAMANHO_PAGINA = 4
+    filtro = FiltroHistorico(0, 10 ** 9, fornecedor=_menos_cotado(banco))
+    modelo.consultar(filtro)
+    _aguardar(qapp, modelo)
+    assert modelo.rowCount() == 4 and modelo._ids is not None
+
+    _carregar_tudo(qapp, modelo)
+    assert modelo.todas_carregadas()
+    assert _ids(modelo) == _ids_esperados(banco, filtro)
+
+
+def test_refinar_para_termo_raro_materializa_dali(qapp, banco, modelo, monkeypatch):
+    from database import filtros
+
+    monkeypatch.setattr(filtros, "LINHAS_VARREDURA", 0)
+    modelo.TAMANHO_PAGINA = 4
+    nome = _menos_cotado(banco)
+    modelo.consultar(FiltroHistorico(0, 10 ** 9, fornecedor=nome[:3]))
+    _aguardar(qapp, modelo)
+    assert modelo._ids is None
+
+    filtro = FiltroHistorico(0, 10 ** 9, fornecedor=nome)
+    modelo.refinar(filtro)
+    _aguardar(qapp, modelo)
+    _carregar_tudo(qapp, modelo)
+    assert _ids(modelo) == _ids_esperados(banco, filtro)
@@ -0,0 +1,138 @@
+import csv
+
+import pytest
+
+from database.importador import ErroImportacao, Importador
+
+
+def _escrever_csv(caminho, linhas, separador=";"):
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        csv.writer(arquivo, delimiter=separador).writerows(linhas)
+
+
+def test_importacao_rejeita_linhas_invalidas_e_nao_repete(db, tmp_path):
+    caminho = str(tmp_path / "cotacoes.csv")
+    _escrever_csv(caminho, [
+        ["Data", "Fornecedor", "Valor NF", "Transportadora Ganhadora", "Frete"],
+        ["01/03/2024", "ACME", "1.500,00", "Rodocargas", "210,00"],
+        ["2024-03-02", "", "100,00", "", ""],
+        ["02/03/2024", "ACME", "0", "", ""],
+        ["03/03/2024", "Beta", "250,00", "Desconhecida", "30,00"],
+        ["", "", "", "", ""],
+    ])
+    with db.connection() as conn:
+        importador = Importador(conn)
+        resultado = importador.importar(caminho)
+        assert (resultado.importadas, resultado.rejeitadas) == (1, 3)
+        assert [numero for numero, _mensagem in resultado.erros] == [3, 4, 5]
+        # Transportadora sem cadastro não é criada sem criar_transportadoras
+        assert conn.execute("SELECT COUNT(*) FROM transportadoras").fetchone()[0] == 1
+        assert conn.execute("SELECT valor_nf, data_dia FROM cotacoes").fetchall() == [(1500.0, 19783)]
+
+        assert importador.importar(caminho).ja_importado
+        assert conn.execute("SELECT COUNT(*) FROM cotacoes").fetchone()[0] == 1
+
+
+def test_importacao_cria_transportadoras_das_colunas_de_frete(db, tmp_path):
+    caminho = str(tmp_path / "cotacoes.csv")
+    _escrever_csv(caminho, [
+        ["Data", "Fornecedor", "Valor NF", "Transportadora", "Frete", "Frete Expresso Sul"],
+        ["2024-03-01", "ACME", "1000", "Expresso Sul", "90", "90"],
+    ], separador=",")
+    with db.connection() as conn:
+        resultado = Importador(conn, criar_transportadoras=True).importar(caminho)
+        assert resultado.importadas == 1
+        fretes = conn.execute(
+            "SELECT t.nome, ct.valor_frete, ct.selecionada FROM cotacoes_transportadoras ct "
+            "JOIN transportadoras t ON t.id = ct.transportadora_id").fetchall()
+    assert fretes == [("Expresso Sul", 90.0, 1)]
+
+
+def test_colunas_obrigatorias_ausentes(db, tmp_path):
+    caminho = str(tmp_path / "sem_valor.csv")
+    _escrever_csv(caminho, [["Data", "Fornecedor"], ["2024-03-01", "ACME"]])
+    with db.connection() as conn, pytest.raises(ErroImportacao, match="valor_nf"):
+        Importador(conn).importar(caminho)
+
+
+def test_arquivo_vazio(db, tmp_path):
+    caminho = tmp_path / "vazio.csv"
+    caminho.write_text("")
+    with db.connection() as conn, pytest.raises(ErroImportacao):
+        Importador(conn).importar(str(caminho))
+
+
+def _xlsx_sem_dimensao(caminho, linhas):
+    """Planilha como as de alguns geradores: sem <dimension>, total desconhecido"""
+    import re
+    import zipfile
+
+    from openpyxl import Workbook
+
+    livro = Workbook()
+    for linha in linhas:
+        livro.active.append(linha)
+    livro.save(caminho)
+    with zipfile.ZipFile(caminho) as origem:
+        conteudo = {nome: origem.read(nome) for nome in origem.namelist()}
+    planilha = "xl/worksheets/sheet1.xml"
+    conteudo[planilha] = re.sub(rb"<dimension[^>]*/>", b"", conteudo[planilha])
+    with zipfile.ZipFile(caminho, "w") as destino:
+        for nome, dados in conteudo.items():
+            destino.writestr(nome, dados)
+
+
+def test_xlsx_sem_total_conhecido_informa_progresso_indeterminado(db, tmp_path):
+    caminho = str(tmp_path / "sem_dimensao.xlsx")
+    _xlsx_sem_dimensao(caminho, [["Data", "Fornecedor", "Valor NF"]] +
+                       [["2024-03-01", f"Fornecedor {i}", 100 + i] for i in range(5)])
+    chamadas = []
+    with db.connection() as conn:
+        resultado = Importador(conn, tamanho_lote=2, progresso=lambda *a: chamadas.append(a)).importar(caminho)
+    assert resultado.importadas == 5
+    assert chamadas == [(2, None), (4, None), (5, 5)]
+
+
+def _indices(conn):
+    return conn.execute("SELECT type, name FROM sqlite_master WHERE type IN ('index', 'trigger') "
+                        "AND sql IS NOT NULL ORDER BY 1, 2").fetchall()
+
+
+def test_importacao_interrompida_retoma_do_checkpoint(db, tmp_path, monkeypatch):
+    caminho = str(tmp_path / "cotacoes.csv")
+    _escrever_csv(caminho, [["Data", "Fornecedor", "Valor NF"]] +
+                  [["2024-03-01", f"Fornecedor {i}", 100 + i] for i in range(10)])
+    converter = Importador._converter
+
+    def queda_na_linha_8(self, linha, colunas, fretes_extras):
+        if linha[1] == "Fornecedor 6":
+            raise RuntimeError("queda")
+        return converter(self, linha, colunas, fretes_extras)
+
+    with db.connection() as conn:
+        monkeypatch.setattr(Importador, "_converter", queda_na_linha_8)
+        with pytest.raises(RuntimeError):
+            Importador(conn, tamanho_lote=3).importar(caminho)
+        # Os dois lotes completos ficaram gravados; o do meio foi desfeito
+        assert conn.execute("SELECT COUNT(*) FROM cotacoes").fetchone()[0] == 6
+
+        monkeypatch.setattr(Importador, "_converter", converter)
+        resultado = Importador(conn, tamanho_lote=3).importar(caminho)
+        assert resultado.retomada_em == 6
+        assert (resultado.lidas, resultado.importadas) == (10, 10)
+        fornecedores = [linha[0] for linha in conn.execute("SELECT fornecedor FROM cotacoes ORDER BY id")]
+    assert fornecedores == [f"Fornecedor {i}" for i in range(10)]
+
+
+def test_indices_adiados_voltam_e_a_busca_fica_completa(db, tmp_path):
+    caminho = str(tmp_path / "cotacoes.csv")
+    _escrever_csv(caminho, [["Data", "Fornecedor", "Valor NF", "Transportadora", "Frete"]] +
+                  [["2024-03-01", f"Fornecedor {i}", 100 + i, "Rodocargas", 10] for i in range(7)])
+    with db.connection() as conn:
+        antes = _indices(conn)
+        resultado = Importador(conn, adiar_indices=True, tamanho_lote=2).importar(caminho)
+        assert resultado.importadas == 7
+        assert _indices(conn) == antes
+        assert conn.execute("SELECT COUNT(*) FROM importacoes WHERE indices_adiados IS NOT NULL").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM cotacoes_busca WHERE cotacoes_busca MATCH 'Fornecedor'"
+                            ).fetchone()[0] == 7
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from pricing import lote
+from pricing.motor import RegraTransportadora, frete_automatico
+
+RODOCARGAS = RegraTransportadora.de_linha((1, "Rodocargas", None, 0, None))
+MANUAL = RegraTransportadora.de_linha((2, "Expresso Sul", "00.000.000/0001-00", 0, 0))
+
+
+def test_lote_igual_ao_motor_para_tarifa_automatica():
+    valores = np.random.default_rng(7).uniform(1, 50_000, 5_000).round(2)
+    valores[:4] = (0.25, 1000, 12.5, 1234.56)
+    tarifa = lote.TarifaLote.da_regra(RODOCARGAS)
+    resultado = lote.cotar_lote(valores, [(1, "Rodocargas", tarifa)])
+    esperado = [float(frete_automatico(v, RODOCARGAS).valor_frete) for v in valores.tolist()]
+    assert resultado.fretes[0].tolist() == esperado
+    assert lote.TarifaLote.da_regra(MANUAL) is None
+
+
+def test_lote_peso_taxado_minimo_e_mais_barato():
+    tarifas = [
+        (1, "Por NF", lote.TarifaLote(percentual_nf=10)),
+        (2, "Por kg", lote.TarifaLote(valor_kg=0.5, minimo=20)),
+    ]
+    resultado = lote.cotar_lote([100.0, 1000.0, 1000.0], tarifas,
+                                peso=[10.0, 10.0, 100.0], cubagem=[0.0, 0.0, 1.0])
+    assert resultado.fretes.tolist() == [[10.0, 100.0, 100.0], [20.0, 20.0, 150.0]]
+    assert resultado.mais_barato_id.tolist() == [1, 2, 1]
+    assert resultado.vitorias() == {"Por NF": 2, "Por kg": 1}
+
+
+def test_lote_centavos_meio_para_cima():
+    assert lote.centavos(np.array([0.375, 0.125, 2.675])).tolist() == [0.38, 0.13, 2.68]
+
+
+def test_lote_tamanho_errado():
+    with pytest.raises(ValueError):
+        lote.cotar_lote([1.0, 2.0], [(1, "x", lote.TarifaLote())], peso=[1.0])
+
+
+def test_lote_em_blocos_igual_ao_lote_inteiro():
+    rng = np.random.default_rng(3)
+    valores, peso = rng.uniform(1, 5_000, 1_001), rng.uniform(0, 300, 1_001)
+    tarifas = [(1, "A", lote.TarifaLote(percentual_nf=3, valor_kg=0.2)),
+               (2, "B", lote.TarifaLote(percentual_nf=5, minimo=40))]
+    inteiro = lote.cotar_lote(valores, tarifas, peso)
+    em_blocos = lote.cotar_lote(valores, tarifas, peso, guardar_matriz=False, tamanho_bloco=64)
+    assert em_blocos.fretes is None
+    assert em_blocos.menor_frete.tolist() == inteiro.menor_frete.tolist()
+    assert em_blocos.mais_barato_id.tolist() == inteiro.mais_barato_id.tolist()
+
+
+def test_tarifas_e_nfs_do_banco(db):
+    with db.connection() as conn:
+        conn.execute("INSERT INTO transportadoras (nome) VALUES ('Expresso Sul')")
+        conn.executemany("INSERT INTO cotacoes (data, fornecedor, valor_nf, peso) VALUES (?, 'X', ?, ?)",
+                         [("2024-03-05", 1000, None), ("2024-03-06", 250, 12.5), ("2024-04-01", 9, 1)])
+        conn.commit()
+
+        # Só a Rodocargas tem fórmula cadastrada; a outra entra pelos ajustes
+        assert [t[1] for t in lote.tarifas_do_banco(conn)] == ["Rodocargas"]
+        ajustes = {2: lote.TarifaLote(valor_kg=1.0)}
+        assert [t[1] for t in lote.tarifas_do_banco(conn, ajustes)] == ["Expresso Sul", "Rodocargas"]
+
+        ids, valor_nf, peso, cubagem = lote.nfs_do_periodo(conn, 19787, 19788)  # 05 e 06/03/2024
+    assert ids.tolist() == [1, 2]
+    assert valor_nf.tolist() == [1000.0, 250.0]
+    assert peso.tolist() == [0.0, 12.5]
+    assert cubagem.tolist() == [0.0, 0.0]
@@ -0,0 +1,89 @@
+import json
+import sqlite3
+
+import pytest
+
+from database.migrator import PROGRESS_TABLE, Migration, Migrator, backfill_in_batches, discover_migrations
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "migracoes.db"), isolation_level=None)
+    yield conn
+    conn.close()
+
+
+def test_versoes_em_ordem_sem_lacunas():
+    versoes = [m.version for m in discover_migrations()]
+    assert versoes == list(range(1, len(versoes) + 1))
+
+
+def test_banco_novo_chega_na_ultima_versao(conn):
+    migrator = Migrator(conn, log=None)
+    aplicadas = migrator.migrate()
+    assert [r.version for r in aplicadas] == [m.version for m in migrator.migrations]
+    assert migrator.current_version() == migrator.latest_version()
+    # Rodar de novo não faz nada
+    assert migrator.migrate() == []
+
+
+def test_dry_run_nao_altera_o_banco(conn):
+    migrator = Migrator(conn, log=None)
+    resultados = migrator.migrate(dry_run=True)
+    assert resultados and all(r.dry_run for r in resultados)
+    assert migrator.current_version() == 0
+
+
+def test_migracao_ate_versao_alvo(conn):
+    migrator = Migrator(conn, log=None)
+    migrator.migrate(target=3)
+    assert migrator.current_version() == 3
+    assert [m.version for m in migrator.pending()] == list(range(4, migrator.latest_version() + 1))
+
+
+def test_backfill_retoma_de_onde_parou(conn):
+    conn.execute("CREATE TABLE t (x INTEGER, y INTEGER)")
+    conn.executemany("INSERT INTO t (x) VALUES (?)", [(i,) for i in range(100)])
+    conn.execute(f"CREATE TABLE {PROGRESS_TABLE} (task TEXT PRIMARY KEY, last_rowid INTEGER NOT NULL)")
+    # Execução anterior interrompida depois das 40 primeiras linhas
+    conn.execute(f"INSERT INTO {PROGRESS_TABLE} VALUES ('backfill:t', 40)")
+
+    atualizadas = backfill_in_batches(conn, "t", "y = x * 2", batch_size=25, pause=0)
+
+    assert atualizadas == 60
+    assert conn.execute("SELECT COUNT(*) FROM t WHERE y IS NULL").fetchone()[0] == 40
+    assert conn.execute(f"SELECT COUNT(*) FROM {PROGRESS_TABLE}").fetchone()[0] == 0
+
+
+def test_migracao_com_erro_nao_muda_a_versao(conn):
+    def quebrada(c):
+        c.execute("CREATE TABLE parcial (x)")
+        raise RuntimeError("falhou no meio")
+
+    migracoes = discover_migrations()[:1] + [Migration(2, "quebrada", quebrada)]
+    migrator = Migrator(conn, migrations=migracoes, log=None)
+    with pytest.raises(RuntimeError):
+        migrator.migrate()
+    assert migrator.current_version() == 1
+    # A tabela criada antes do erro saiu junto com o rollback
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'parcial'").fetchone()[0] == 0
+
+
+def test_v008_normaliza_itens_json(conn):
+    Migrator(conn, migrations=discover_migrations()[:7], log=None).migrate()
+    itens = [{"quantidade": 2, "largura": 50.0, "comprimento": 40.0, "altura": 30.0, "total": 0.12},
+             {"quantidade": 1, "largura": 10.0, "comprimento": 10.0, "altura": 10.0, "total": 0.001}]
+    conn.execute("INSERT INTO calculos_cubagem (data, itens_json, cubagem_total) VALUES (?, ?, ?)",
+                 ("2024-03-10 10:00:00", json.dumps(itens), 0.121))
+    conn.execute("INSERT INTO calculos_cubagem (itens_json, cubagem_total) VALUES ('lixo', 0)")
+
+    Migrator(conn, log=None).migrate()
+
+    colunas = [linha[1] for linha in conn.execute("PRAGMA table_info(calculos_cubagem)")]
+    assert "itens_json" not in colunas and "data_dia" in colunas
+    linhas = conn.execute("SELECT calculo_id, posicao, quantidade, largura, comprimento, altura, total "
+                          "FROM calculos_cubagem_itens ORDER BY calculo_id, posicao").fetchall()
+    assert linhas == [(1, 0, 2, 50, 40, 30, 0.12), (1, 1, 1, 10, 10, 10, 0.001)]
+    assert conn.execute("SELECT data_dia FROM calculos_cubagem WHERE id = 1").fetchone()[0] == 19792
+    # JSON inválido não derruba a migração; o cálculo fica sem itens
+    assert conn.execute("SELECT COUNT(*) FROM calculos_cubagem").fetchone()[0] == 2
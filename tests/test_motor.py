@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+from pricing.motor import (RegraTransportadora, calcular_frete, centavos, cotar, decimal,
+                           frete_automatico, mais_barato, percentual_frete)
+
+RODOCARGAS = RegraTransportadora.de_linha((1, "Rodocargas", None, 0, None))
+MANUAL = RegraTransportadora.de_linha((2, "Expresso Sul", "00.000.000/0001-00", 0, 0))
+
+
+def test_decimal_sem_erro_binario():
+    assert decimal(0.1) + decimal(0.2) == Decimal("0.3")
+    assert decimal(None) == 0
+    assert centavos("0.125") == Decimal("0.13")
+    assert centavos(2.675) == Decimal("2.68")
+
+
+def test_rodocargas_sem_percentuais_usa_o_padrao():
+    assert RODOCARGAS.automatica
+    assert (RODOCARGAS.percentual_base, RODOCARGAS.icms) == (Decimal("14.0"), Decimal("7.0"))
+    assert not MANUAL.automatica
+
+
+def test_frete_automatico_percentual_mais_icms():
+    frete = frete_automatico("1000", RODOCARGAS)
+    assert (frete.valor_base, frete.valor_icms, frete.valor_frete) == (
+        Decimal("140.00"), Decimal("9.80"), Decimal("149.80"))
+
+
+def test_frete_automatico_arredonda_meio_centavo_para_cima():
+    # 14% de 0,25 = 0,035 -> 0,04
+    assert frete_automatico("0.25", RODOCARGAS).valor_base == Decimal("0.04")
+
+
+def test_calcular_frete_manual_e_percentual():
+    resultado = calcular_frete(2000, MANUAL, "150.005")
+    assert resultado.valor_frete == Decimal("150.01")
+    assert resultado.percentual_nf == percentual_frete("150.01", 2000)
+    assert calcular_frete(0, RODOCARGAS).valor_frete == 0
+    assert not calcular_frete(100, MANUAL).informado
+
+
+def test_cotar_e_mais_barato():
+    resultados = cotar(1000, [RODOCARGAS, MANUAL], {1: 1, 2: "120"})
+    # Valor informado para a automática é ignorado
+    assert [r.valor_frete for r in resultados] == [Decimal("149.80"), Decimal("120.00")]
+    assert mais_barato(resultados).nome == "Expresso Sul"
+    assert mais_barato(cotar(1000, [MANUAL])) is None
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+from database.database import Database
+from database.pool import ConnectionPool, PoolExhaustedError
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=2, wait_timeout=0.2)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+    yield pool
+    pool.close()
+
+
+def _em_outra_thread(funcao):
+    resultado = {}
+
+    def rodar():
+        try:
+            resultado["valor"] = funcao()
+        except Exception as e:
+            resultado["erro"] = e
+
+    thread = threading.Thread(target=rodar)
+    thread.start()
+    thread.join()
+    return resultado
+
+
+def test_mesma_thread_recebe_a_mesma_conexao(pool):
+    externa = pool.acquire()
+    interna = pool.acquire()
+    assert interna is externa
+    interna.close()
+    # Ainda emprestada: o close() interno só decrementa o contador
+    assert pool.stats()["in_use"] == 1
+    externa.close()
+    stats = pool.stats()
+    assert (stats["in_use"], stats["idle"], stats["reentrant_checkouts"]) == (0, 1, 1)
+
+
+def test_conexao_devolvida_e_reaproveitada(pool):
+    with pool.connection() as conn:
+        primeira = conn
+    with pool.connection() as conn:
+        assert conn is primeira
+    assert pool.stats()["created"] == 1
+
+
+def test_threads_diferentes_recebem_conexoes_diferentes(pool):
+    with pool.connection() as conn:
+        outra = _em_outra_thread(lambda: pool.acquire())["valor"]
+        assert outra is not conn
+        outra.close()
+
+
+def test_pool_esgotado_gera_erro_apos_timeout(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=1, wait_timeout=0.1)
+    try:
+        with pool.connection():
+            resultado = _em_outra_thread(pool.acquire)
+        assert isinstance(resultado.get("erro"), PoolExhaustedError)
+        assert pool.stats()["waits"] == 1
+    finally:
+        pool.close()
+
+
+def test_devolucao_desfaz_transacao_pendente(pool):
+    with pool.connection() as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+        assert conn.in_transaction
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_pool_fechado_recusa_emprestimo(pool):
+    pool.close()
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire()
+
+
+def test_excecao_dentro_do_with_devolve_a_conexao(tmp_path):
+    db = Database(str(tmp_path / "cotacoes.db"), pool_size=1)
+    try:
+        with pytest.raises(ZeroDivisionError):
+            with db.connection() as conn:
+                conn.execute("SELECT 1")
+                1 / 0
+        assert db.pool_stats()["in_use"] == 0
+        # Com pool_size=1 outra thread só consegue se a conexão voltou
+        db.pool.wait_timeout = 0.1
+        conn = _em_outra_thread(db.get_connection)["valor"]
+        conn.close()
+    finally:
+        db.close()
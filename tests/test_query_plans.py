@@ -0,0 +1,61 @@
+import pytest
+
+from database.database import Database
+from database.query_plans import LARGE_TABLES, check_plans, full_scans, production_queries
+
+
+def test_consultas_usam_indices_no_banco_vazio(db):
+    with db.connection() as conn:
+        assert check_plans(conn) == {}
+
+
+def test_consultas_usam_indices_no_banco_gerado(banco_gerado):
+    banco = Database(banco_gerado, profile="analytics")
+    try:
+        with banco.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM cotacoes").fetchone()[0] > 0
+            assert check_plans(conn) == {}
+    finally:
+        banco.close()
+
+
+CONSULTAS = production_queries()
+
+
+@pytest.mark.parametrize("nome, sql, params", CONSULTAS, ids=[nome for nome, _sql, _params in CONSULTAS])
+def test_consultas_executam_no_banco_gerado(banco_gerado, nome, sql, params):
+    banco = Database(banco_gerado, profile="analytics")
+    try:
+        with banco.connection() as conn:
+            # Só SELECT: as de escrita são validadas pelo plano acima
+            if sql.lstrip().upper().startswith(("SELECT", "WITH")):
+                conn.execute(sql, params).fetchall()
+    finally:
+        banco.close()
+
+
+def test_full_scans_detecta_varredura_de_tabela_grande(db):
+    with db.connection() as conn:
+        problemas = full_scans(conn, "SELECT id FROM cotacoes WHERE peso > ?", (10,))
+    assert problemas and "cotacoes" in problemas[0]
+    assert "cotacoes" in LARGE_TABLES
+
+
+def test_full_scans_detecta_varredura_completa_de_indice(db):
+    with db.connection() as conn:
+        # SCAN ... USING INDEX sem restrição: lê todas as linhas do índice
+        sem_restricao = full_scans(conn, "SELECT id FROM cotacoes INDEXED BY idx_cotacoes_data_dia "
+                                         "WHERE peso > ?", (10,))
+        contagem = full_scans(conn, "SELECT COUNT(*) FROM cotacoes")
+        # Mesmo com LIMIT, ordenar por outra coluna exige ler tudo
+        ordem_diferente = full_scans(conn, "SELECT id FROM cotacoes INDEXED BY idx_cotacoes_data_dia "
+                                           "ORDER BY peso LIMIT 10")
+    assert sem_restricao and "USING INDEX" in sem_restricao[0]
+    assert contagem and "COVERING INDEX" in contagem[0]
+    assert ordem_diferente
+
+
+def test_full_scans_aceita_busca_e_ordem_com_limit(db):
+    with db.connection() as conn:
+        assert full_scans(conn, "SELECT id FROM cotacoes WHERE data_dia BETWEEN ? AND ?", (1, 2)) == []
+        assert full_scans(conn, "SELECT id FROM cotacoes ORDER BY data_dia DESC, id DESC LIMIT 10") == []
@@ -0,0 +1,55 @@
+import pytest
+
+from database import queries
+from database.database import Database
+from database.relatorio_cubagem import carregar_calculo, relatorio
+from pricing.carregamento import VEICULOS, planejar
+from pricing.cubagem import ItensCubagem
+
+
+@pytest.fixture
+def gerado(banco_gerado):
+    banco = Database(banco_gerado, profile="analytics")
+    yield banco
+    banco.close()
+
+
+def test_calculo_salvo_volta_com_os_mesmos_itens(db):
+    itens = ItensCubagem("m")
+    itens.adicionar(3, 0.5, 0.4, 0.3)
+    itens.adicionar(1, 1.2, 0.8, 1.0)
+    with db.connection() as conn:
+        cursor = conn.execute(queries.CUBAGEM_INSERIR_CALCULO, (round(itens.total, 3), itens.unidade))
+        calculo_id = cursor.lastrowid
+        conn.executemany(queries.CUBAGEM_INSERIR_ITENS,
+                         ((calculo_id, posicao) + linha for posicao, linha in enumerate(itens.como_linhas())))
+        conn.commit()
+
+        carregado = carregar_calculo(conn, calculo_id)
+        assert carregar_calculo(conn, calculo_id + 1) is None
+
+    assert carregado.unidade == "m"
+    assert carregado.como_linhas() == itens.como_linhas()
+    assert planejar(carregado, VEICULOS["vuc"]).caixas == 4
+
+
+def test_calculos_gerados_batem_com_o_total_gravado(gerado):
+    with gerado.connection() as conn:
+        for calculo_id, cubagem_total in conn.execute(
+                "SELECT id, cubagem_total FROM calculos_cubagem ORDER BY id LIMIT 50").fetchall():
+            itens = carregar_calculo(conn, calculo_id)
+            assert len(itens) > 0
+            assert itens.total == pytest.approx(cubagem_total, abs=0.001 * len(itens))
+
+
+def test_relatorio_soma_o_periodo(gerado):
+    with gerado.connection() as conn:
+        dados = relatorio(conn, 19723, 20088, maiores=5)
+        calculos, cubagem = conn.execute(
+            "SELECT COUNT(*), SUM(cubagem_total) FROM calculos_cubagem "
+            "WHERE data_dia BETWEEN 19723 AND 20088").fetchone()
+    assert [m.mes for m in dados.meses] == [f"2024-{mes:02d}" for mes in range(1, 13)]
+    assert dados.calculos == calculos
+    assert dados.cubagem == pytest.approx(cubagem)
+    assert len(dados.maiores_itens) == 5
+    assert [i.total for i in dados.maiores_itens] == sorted((i.total for i in dados.maiores_itens), reverse=True)
@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+from database.database import Database
+from database.storage import (DEFAULT_DB_PATH, ENV_DB_PATH, ENV_PROFILE, PROFILES, get_profile,
+                              resolve_settings)
+
+
+@pytest.fixture
+def sem_ambiente(monkeypatch, tmp_path):
+    """Sem variáveis de ambiente e com um cotacoes.ini que não existe"""
+    monkeypatch.delenv(ENV_DB_PATH, raising=False)
+    monkeypatch.delenv(ENV_PROFILE, raising=False)
+    return str(tmp_path / "cotacoes.ini")
+
+
+def _ini(caminho, texto):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write(texto)
+
+
+def test_padrao_sem_configuracao(sem_ambiente):
+    assert resolve_settings(config_file=sem_ambiente) == (DEFAULT_DB_PATH, PROFILES["fast"])
+
+
+def test_arquivo_ambiente_e_argumento_em_ordem_de_prioridade(sem_ambiente, monkeypatch):
+    _ini(sem_ambiente, "[database]\npath = ini.db\nprofile = safe\n")
+    assert resolve_settings(config_file=sem_ambiente) == ("ini.db", PROFILES["safe"])
+
+    monkeypatch.setenv(ENV_DB_PATH, "env.db")
+    monkeypatch.setenv(ENV_PROFILE, "analytics")
+    assert resolve_settings(config_file=sem_ambiente) == ("env.db", PROFILES["analytics"])
+
+    assert resolve_settings("arg.db", "fast", config_file=sem_ambiente) == ("arg.db", PROFILES["fast"])
+
+
+def test_perfil_desconhecido(sem_ambiente):
+    assert get_profile(" SAFE ") is PROFILES["safe"]
+    with pytest.raises(ValueError, match="fast"):
+        resolve_settings(profile="turbo", config_file=sem_ambiente)
+
+
+@pytest.mark.parametrize("nome, journal, synchronous, mmap", [
+    ("fast", "wal", 1, PROFILES["fast"].mmap_size),
+    ("safe", "wal", 2, 0),
+])
+def test_pragmas_do_perfil_nas_conexoes_do_pool(tmp_path, nome, journal, synchronous, mmap):
+    db = Database(str(tmp_path / "cotacoes.db"), profile=nome)
+    try:
+        with db.connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == journal
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+            assert conn.execute("PRAGMA mmap_size").fetchone()[0] == mmap
+    finally:
+        db.close()
+
+
+def test_analytics_abre_somente_leitura(tmp_path):
+    caminho = str(tmp_path / "com espaço #1.db")
+    Database(caminho).close()
+    db = Database(caminho, profile="analytics")
+    try:
+        with db.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM cotacoes").fetchone()[0] == 0
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO transportadoras (nome) VALUES ('x')")
+    finally:
+        db.close()
+
+
+def test_analytics_nao_cria_banco(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Database(str(tmp_path / "nao_existe.db"), profile="analytics")
@@ -0,0 +1,82 @@
+import colorsys
+
+import pytest
+
+
+@pytest.fixture
+def tema(qapp):
+    from gui import tema
+
+    return tema
+
+
+def _como_antes(cor, percentual):
+    """darken_color/lighten_color que a MainWindow tinha antes do tema"""
+    cor = cor.lstrip('#')
+    h, l, s = colorsys.rgb_to_hls(*(int(cor[i:i + 2], 16) / 255 for i in (0, 2, 4)))
+    r, g, b = colorsys.hls_to_rgb(h, min(1, max(0, l + percentual / 100)), s)
+    return '#{:02x}{:02x}{:02x}'.format(int(r * 255), int(g * 255), int(b * 255))
+
+
+@pytest.mark.parametrize("percentual", [5, 10, 15, 20, 200])
+def test_variacoes_iguais_as_de_antes(tema, percentual):
+    for cor in tema.PALETA.values():
+        assert tema.clarear(cor, percentual) == _como_antes(cor, percentual)
+        assert tema.escurecer(cor, percentual) == _como_antes(cor, -percentual)
+    assert tema.clarear("#3498db", 200) == "#ffffff"
+    assert tema.escurecer("#3498db", 200) == "#000000"
+
+
+def test_variacoes_memorizadas(tema):
+    tema.ajustar_luminosidade.cache_clear()
+    for _ in range(3):
+        tema.escurecer("#e74c3c", 10)
+        tema.clarear("#e74c3c", 10)
+    info = tema.ajustar_luminosidade.cache_info()
+    assert (info.misses, info.hits) == (2, 4)
+
+
+def test_folha_montada_uma_vez(tema):
+    folha = tema.folha_de_estilo()
+    assert tema.folha_de_estilo() is folha
+    for nome, cor in tema.PALETA.items():
+        assert f'QFrame[papel="card"][cor="{nome}"]' in folha
+        assert f'QPushButton[papel="acao"][cor="{nome}"]' in folha
+        assert tema.escurecer(cor, 15) in folha
+
+
+def test_aplicar_instala_a_folha_uma_vez(qapp, tema, monkeypatch):
+    anterior = qapp.styleSheet()
+    try:
+        qapp.setStyleSheet("")
+        instalacoes = []
+        original = type(qapp).setStyleSheet
+        monkeypatch.setattr(type(qapp), "setStyleSheet",
+                            lambda app, folha: (instalacoes.append(folha), original(app, folha)))
+        tema.aplicar()
+        tema.aplicar(qapp)
+        assert instalacoes == [tema.folha_de_estilo()]
+        assert qapp.styleSheet() == tema.folha_de_estilo()
+    finally:
+        monkeypatch.undo()
+        qapp.setStyleSheet(anterior)
+
+
+def test_pagina_inicial_sem_folhas_proprias(qapp, db, tema):
+    from PyQt5.QtWidgets import QWidget
+
+    import main
+
+    anterior = qapp.styleSheet()
+    janela = main.MainWindow(db)
+    try:
+        widgets = janela.home_page.findChildren(QWidget)
+        # Só a folha da aplicação: nenhum widget do dashboard tem a sua
+        assert [w.objectName() or type(w).__name__ for w in widgets if w.styleSheet()] == []
+        cores = {w.property("cor") for w in widgets if w.property("papel") in ("card", "acao")}
+        assert cores and cores <= set(tema.PALETA)
+    finally:
+        janela.dashboard_model.parar_auto_atualizacao()
+        janela.deleteLater()
+        qapp.processEvents()
+        qapp.setStyleSheet(anterior)
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from gui.workers import consultar
+
+# Conta até 10^9 numa CTE recursiva: só termina se for interrompida
+CONSULTA_LONGA = """
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000000)
+    SELECT COUNT(*) FROM n
+"""
+
+
+@pytest.fixture
+def executor(qapp, db):
+    from gui.workers import ExecutorBanco
+
+    executor = ExecutorBanco(db)
+    yield executor
+    executor.cancelar_todas()
+    executor.aguardar()
+
+
+def _aguardar(qapp, executor):
+    """Espera as threads e entrega os sinais que ficaram na fila"""
+    assert executor.aguardar(10000)
+    qapp.processEvents()
+
+
+def _aguardar_inicio(tarefa):
+    limite = time.monotonic() + 5
+    while tarefa._conn is None:
+        assert time.monotonic() < limite, "tarefa não começou"
+        time.sleep(0.005)
+
+
+def test_resultado_chega_na_thread_da_interface(qapp, executor):
+    resultados = []
+    executor.executar(consultar, "SELECT nome FROM transportadoras", ao_concluir=resultados.append)
+    _aguardar(qapp, executor)
+    assert resultados == [[("Rodocargas",)]]
+    assert not executor.ocupado()
+
+
+def test_erro_vira_mensagem(qapp, executor):
+    erros = []
+    executor.executar(consultar, "SELECT * FROM tabela_que_nao_existe", ao_erro=erros.append)
+    _aguardar(qapp, executor)
+    assert len(erros) == 1 and "tabela_que_nao_existe" in erros[0]
+
+
+def test_cancelar_interrompe_a_consulta_em_andamento(qapp, executor, db):
+    resultados, erros = [], []
+    tarefa = executor.executar(consultar, CONSULTA_LONGA, chave="longa",
+                               ao_concluir=resultados.append, ao_erro=erros.append)
+    _aguardar_inicio(tarefa)
+    inicio = time.monotonic()
+    executor.cancelar("longa")
+    _aguardar(qapp, executor)
+
+    assert time.monotonic() - inicio < 2
+    assert tarefa.cancelada and not executor.ocupado("longa")
+    # O "interrupted" do SQLite não aparece como erro para a tela
+    assert (resultados, erros) == ([], [])
+    assert db.pool_stats()["in_use"] == 0
+
+
+def test_nova_tarefa_com_a_mesma_chave_substitui_a_anterior(qapp, executor):
+    resultados = []
+    antiga = executor.executar(consultar, CONSULTA_LONGA, chave="filtro", ao_concluir=resultados.append)
+    _aguardar_inicio(antiga)
+    executor.executar(consultar, "SELECT 42", chave="filtro", ao_concluir=resultados.append)
+    _aguardar(qapp, executor)
+    assert antiga.cancelada
+    assert resultados == [[(42,)]]
+
+
+def test_progresso_com_total_desconhecido(qapp, executor):
+    progresso = []
+
+    def contar(conn, tarefa, total):
+        for atual in range(1, total + 1):
+            tarefa.progresso(atual, None if atual < total else total)
+        return total
+
+    executor.executar(contar, 3, ao_progresso=lambda *a: progresso.append(a))
+    _aguardar(qapp, executor)
+    # None vira 0: barra indeterminada no QProgressDialog
+    assert progresso == [(1, 0), (2, 0), (3, 3)]
+
+
+def test_cancelamento_em_laco_python(qapp, executor):
+    resultados, erros, passos = [], [], []
+
+    def contar(conn, tarefa):
+        for atual in range(1, 100):
+            passos.append(atual)
+            if atual == 2:
+                tarefa.cancelar()
+            tarefa.verificar_cancelamento()
+        return "fim"
+
+    executor.executar(contar, ao_concluir=resultados.append, ao_erro=erros.append)
+    _aguardar(qapp, executor)
+    assert passos == [1, 2]
+    assert (resultados, erros) == ([], [])
@@ -0,0 +1,22 @@
+from datetime import date, timedelta
+
+# Dia 0 = 1970-01-01 (mesma base de cotacoes.data_dia)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def dia_epoch(data):
+    """Converte date/datetime em número de dias desde 1970-01-01"""
+    return data.toordinal() - _EPOCH_ORDINAL
+
+
+def data_de_dia_epoch(dia):
+    """Converte o número de dias de volta para date"""
+    return date.fromordinal(dia + _EPOCH_ORDINAL)
+
+
+def intervalo_mes(referencia=None):
+    """Primeiro e último dia (em dias epoch) do mês da data de referência"""
+    referencia = referencia or date.today()
+    inicio = referencia.replace(day=1)
+    proximo_mes = (inicio + timedelta(days=32)).replace(day=1)
+    return dia_epoch(inicio), dia_epoch(proximo_mes) - 1
@@ -1,4 +1,6 @@
+import math
 import re
+from decimal import Decimal, InvalidOperation
 
 class Formatters:
     @staticmethod
@@ -39,4 +41,44 @@ class Formatters:
     def validate_email(email):
         """Valida formato básico de email"""
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
\ No newline at end of file
+        return re.match(pattern, email) is not None
+
+    @staticmethod
+    def _texto_numerico(text):
+        """Normaliza "R$ 1.234,56" / "1234.56" para a notação com ponto decimal"""
+        text = str(text).replace('R$', '').replace(' ', '').strip()
+        # Um único ponto seguido só de dígitos é separador decimal ("1234.56")
+        if text.count('.') != 1 or not text.split('.')[1].isdigit():
+            text = text.replace('.', '').replace(',', '.')
+        return text
+
+    @staticmethod
+    def parse_decimal(text):
+        """Converte "R$ 1.234,56", "1234,56" ou "1234.56" para Decimal exato"""
+        if not text:
+            return Decimal(0)
+        
+        text = Formatters._texto_numerico(text)
+        try:
+            numero = Decimal(text) if text else Decimal(0)
+        except InvalidOperation:
+            return Decimal(0)
+        return numero if numero.is_finite() else Decimal(0)
+
+    @staticmethod
+    def parse_number(text):
+        """Converte texto para número (float), mesmas regras de parse_decimal"""
+        if not text:
+            return 0.0
+        
+        text = Formatters._texto_numerico(text)
+        try:
+            numero = float(text) if text else 0.0
+        except ValueError:
+            return 0.0
+        return numero if math.isfinite(numero) else 0.0
+
+    @staticmethod
+    def format_moeda(valor):
+        """Formata número como R$ 1.234,56"""
+        return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
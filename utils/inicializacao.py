@@ -0,0 +1,112 @@
+# inicializacao.py - TEMPO DE INICIALIZAÇÃO
+"""Mede onde vai o tempo até a janela principal aparecer.
+
+Ativado com python main.py --tempo-inicializacao. Depois de ativar(), cada
+import de módulo Python ou extensão é cronometrado como no
+python -X importtime (tempo próprio e acumulado com os imports internos) e
+main.py marca as etapas da abertura (imports, banco, janela, primeira
+pintura). O relatório sai no terminal quando a janela é exibida.
+
+Os tempos contam a partir do import deste módulo, que main.py faz antes de
+qualquer outro; a subida do interpretador fica de fora.
+"""
+import sys
+import time
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ExtensionFileLoader, SourceFileLoader, SourcelessFileLoader
+
+_INICIO = time.perf_counter()
+
+# Loaders criados um por módulo, que podem ser instrumentados na instância
+_LOADERS_MEDIDOS = (SourceFileLoader, SourcelessFileLoader, ExtensionFileLoader)
+
+
+class _MedidorImports(MetaPathFinder):
+    """Encontra o módulo pelos finders normais e cronometra o loader"""
+
+    def __init__(self):
+        # (profundidade, módulo, próprio, acumulado), na ordem de término
+        self.registros = []
+        self._pilha = []
+
+    def find_spec(self, nome, caminho, alvo=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(nome, caminho, alvo)
+            if spec is not None:
+                if isinstance(spec.loader, _LOADERS_MEDIDOS):
+                    self._cronometrar(spec.loader, nome)
+                return spec
+        return None
+
+    def _cronometrar(self, loader, nome):
+        # Extensões fazem o trabalho pesado (dlopen) em create_module
+        criar, executar = loader.create_module, loader.exec_module
+
+        def create_module(spec):
+            self._pilha.append([time.perf_counter(), 0.0])
+            try:
+                return criar(spec)
+            except BaseException:
+                self._terminar(nome)
+                raise
+
+        def exec_module(modulo):
+            try:
+                executar(modulo)
+            finally:
+                self._terminar(nome)
+
+        loader.create_module = create_module
+        loader.exec_module = exec_module
+
+    def _terminar(self, nome):
+        inicio, filhos = self._pilha.pop()
+        acumulado = time.perf_counter() - inicio
+        if self._pilha:
+            self._pilha[-1][1] += acumulado
+        self.registros.append((len(self._pilha), nome, acumulado - filhos, acumulado))
+
+
+_medidor = None
+_etapas = []
+
+
+def ativar():
+    """Passa a cronometrar imports e etapas"""
+    global _medidor
+    if _medidor is None:
+        _medidor = _MedidorImports()
+        sys.meta_path.insert(0, _medidor)
+
+
+def ativo():
+    return _medidor is not None
+
+
+def marcar(etapa):
+    """Fim de uma etapa; a duração é contada desde a marca anterior"""
+    if _medidor is not None:
+        _etapas.append((etapa, time.perf_counter()))
+
+
+def relatorio(limite=15):
+    """Texto com as etapas e os imports mais demorados"""
+    linhas = []
+    total = (_etapas[-1][1] if _etapas else time.perf_counter()) - _INICIO
+    linhas.append(f"⏱️ Inicialização: {total:.3f}s até a janela aparecer".replace('.', ','))
+
+    anterior = _INICIO
+    for etapa, instante in _etapas:
+        linhas.append(f"   {etapa:<20} {instante - anterior:7.3f}s".replace('.', ','))
+        anterior = instante
+
+    registros = _medidor.registros if _medidor else []
+    if registros:
+        diretos = sorted((r for r in registros if r[0] == 0), key=lambda r: r[3], reverse=True)
+        linhas.append(f"   {len(registros)} módulos importados; imports diretos mais lentos:")
+        linhas.append("   acumulado |   próprio | módulo")
+        for _profundidade, nome, proprio, acumulado in diretos[:limite]:
+            linhas.append(f"   {acumulado * 1000:7.1f} ms | {proprio * 1000:6.1f} ms | {nome}")
+    return "\n".join(linhas)
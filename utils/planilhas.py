@@ -0,0 +1,97 @@
+# planilhas.py - LEITURA EM STREAMING DE CSV E XLSX
+"""Abre planilhas de entrada sem carregar tudo em memória.
+
+CSV com separador e encoding detectados (UTF-8 ou o cp1252 do Excel em
+português) e a primeira planilha de um XLSX em modo read_only do openpyxl.
+Usado pela importação de cotações (database.importador) e pela leitura de
+listas de volumes da calculadora (pricing.cubagem).
+"""
+import csv
+import os
+import unicodedata
+
+
+class ErroArquivo(Exception):
+    """Arquivo vazio ou em formato não suportado"""
+
+
+def normalizar(texto):
+    """Minúsculas, sem acentos, "_" como espaço: chave de cabeçalhos e nomes"""
+    texto = unicodedata.normalize("NFKD", str(texto or ""))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.replace("_", " ").lower().split())
+
+
+def _contar_linhas(caminho):
+    """Estimativa rápida do total para a barra de progresso"""
+    linhas = 0
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+            linhas += bloco.count(b"\n")
+    return linhas
+
+
+def _ler_csv(caminho):
+    with open(caminho, "rb") as arquivo:
+        amostra = arquivo.read(64 * 1024)
+    try:
+        amostra.decode("utf-8")
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError:
+        # Planilhas salvas pelo Excel em português
+        encoding = "cp1252"
+    texto = amostra.decode(encoding, errors="ignore")
+    try:
+        dialeto = csv.Sniffer().sniff(texto, delimiters=";,\t|")
+    except csv.Error:
+        dialeto = csv.excel
+
+    arquivo = open(caminho, newline="", encoding=encoding)
+    leitor = csv.reader(arquivo, dialeto)
+    try:
+        cabecalho = next(leitor)
+    except StopIteration:
+        arquivo.close()
+        raise ErroArquivo("Arquivo vazio")
+
+    def linhas():
+        with arquivo:
+            yield from leitor
+
+    return cabecalho, linhas(), max(_contar_linhas(caminho) - 1, 0)
+
+
+def _ler_xlsx(caminho):
+    from openpyxl import load_workbook
+
+    livro = load_workbook(caminho, read_only=True, data_only=True)
+    planilha = livro.worksheets[0]
+    iterador = planilha.iter_rows(values_only=True)
+    try:
+        cabecalho = next(iterador)
+    except StopIteration:
+        livro.close()
+        raise ErroArquivo("Planilha vazia")
+    # Sem a dimensão gravada no arquivo o openpyxl não sabe o total (None)
+    total = planilha.max_row - 1 if planilha.max_row else None
+
+    def linhas():
+        try:
+            yield from iterador
+        finally:
+            livro.close()
+
+    return cabecalho, linhas(), total
+
+
+def abrir_arquivo(caminho):
+    """(cabeçalho, iterador de linhas, total estimado de linhas de dados)
+
+    O total é None quando não dá para estimar sem ler o arquivo inteiro.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in (".xlsx", ".xlsm"):
+        return _ler_xlsx(caminho)
+    if extensao in (".csv", ".txt"):
+        return _ler_csv(caminho)
+    raise ErroArquivo(f"Formato não suportado: {extensao or caminho}")